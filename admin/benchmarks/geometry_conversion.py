@@ -0,0 +1,122 @@
+"""
+Benchmark vectorized geometry conversion against the per-row implementations it replaced.
+
+Compares, on synthetic data:
+  - `multi`: converting single-part geometries to multi-part ones
+  - `df_to_gdf` with x/y columns: building points and nulling invalid ones
+  - `df_to_gdf` with a `point_xy_str` column: parsing points out of strings
+
+Usage:
+    python3 admin/benchmarks/geometry_conversion.py [--rows N]
+"""
+
+import time
+from typing import Callable
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import typer
+from shapely import LineString, Point, Polygon
+
+from dcpy.utils.formats import Geometry as FileGeometry
+from dcpy.utils.geospatial import geometry, transform
+
+app = typer.Typer(add_completion=False)
+
+XY_STR = geometry.PointXYStr(point_xy_str="x, y")
+
+
+def synthetic_geoms(rows: int) -> gpd.GeoSeries:
+    rng = np.random.default_rng(0)
+    coords = rng.uniform(-74.2, -73.7, rows)
+    kinds = rng.integers(0, 4, rows)
+    geoms = []
+    for x, kind in zip(coords, kinds):
+        match kind:
+            case 0:
+                geoms.append(Point(x, 40.7))
+            case 1:
+                geoms.append(LineString([(x, 40.7), (x + 0.01, 40.71)]))
+            case 2:
+                geoms.append(
+                    Polygon([(x, 40.7), (x + 0.01, 40.7), (x, 40.71), (x, 40.7)])
+                )
+            case _:
+                geoms.append(None)
+    return gpd.GeoSeries(geoms, crs="EPSG:4326")
+
+
+def synthetic_xy(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    x = rng.uniform(-74.2, -73.7, rows)
+    y = rng.uniform(40.5, 40.9, rows)
+    x[rng.random(rows) < 0.05] = np.nan
+    return pd.DataFrame({"x": x, "y": y})
+
+
+def row_multi(geoms: gpd.GeoSeries) -> gpd.GeoSeries:
+    return geoms.apply(transform.multi)
+
+
+def row_xy(df: pd.DataFrame) -> gpd.GeoSeries:
+    points = gpd.GeoSeries(gpd.points_from_xy(df["x"], df["y"]), crs="EPSG:4326")
+    return points.apply(lambda geom: geom if geom.is_valid else None)
+
+
+def row_xy_str(values: pd.Series) -> gpd.GeoSeries:
+    return gpd.GeoSeries.from_wkt(values.apply(XY_STR.wkt))
+
+
+def _time(fn: Callable, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+@app.command()
+def main(
+    rows: int = typer.Option(
+        1_000_000, "--rows", help="Features in the synthetic data"
+    ),
+):
+    geoms = synthetic_geoms(rows)
+    xy = synthetic_xy(rows)
+    # the per-row parser doesn't handle nulls, so leave them out of the string column
+    xy_str = xy.dropna().apply(lambda row: f"{row.x}, {row.y}", axis=1)
+
+    xy_geometry = FileGeometry(
+        geom_column=FileGeometry.PointColumns(x="x", y="y"), crs="EPSG:4326"
+    )
+    xy_str_geometry = FileGeometry(geom_column="geom", format=XY_STR, crs="EPSG:4326")
+    cases = [
+        (
+            "multi",
+            lambda: row_multi(geoms),
+            lambda: transform.multi_geoseries(geoms),
+        ),
+        (
+            "df_to_gdf (x/y)",
+            lambda: row_xy(xy),
+            lambda: transform.df_to_gdf(xy, xy_geometry),
+        ),
+        (
+            "df_to_gdf (xy str)",
+            lambda: row_xy_str(xy_str),
+            lambda: transform.df_to_gdf(xy_str.to_frame("geom"), xy_str_geometry),
+        ),
+    ]
+
+    print(f"{rows:,} features")
+    print(f"{'conversion':<22}{'per-row (s)':>14}{'vectorized (s)':>16}{'speedup':>10}")
+    for name, per_row, vectorized in cases:
+        per_row_seconds = _time(per_row)
+        vectorized_seconds = _time(vectorized)
+        print(
+            f"{name:<22}{per_row_seconds:>14.2f}{vectorized_seconds:>16.2f}"
+            f"{per_row_seconds / vectorized_seconds:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    app()
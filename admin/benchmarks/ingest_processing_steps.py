@@ -0,0 +1,128 @@
+"""
+Benchmark ingest processing steps on a synthetic dataset.
+
+Each step runs on the same synthetic dataframe in a forked process, so that one step's
+allocations don't count towards the next one's peak memory. Reports per step:
+  - wall time
+  - peak RSS of the process running it, and how far that is above the RSS it started
+    with (i.e. roughly the memory the step itself needed)
+
+Usage:
+    python3 admin/benchmarks/ingest_processing_steps.py [--rows N] [--exact-change-stats]
+
+Only runs where `fork` is available (linux, macos).
+"""
+
+import multiprocessing
+import resource
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import typer
+
+from dcpy.lifecycle.ingest.models import ProcessingStep
+from dcpy.lifecycle.ingest.transform import ProcessingFunctions
+
+STEPS = [
+    ProcessingStep(name="sort", args={"by": ["borough", "bbl"]}),
+    ProcessingStep(
+        name="filter_rows",
+        args={"type": "equals", "column_name": "borough", "val": "1"},
+    ),
+    ProcessingStep(name="filter_columns", args={"columns": ["bbl", "name"]}),
+    ProcessingStep(name="rename_columns", args={"map": {"Address ": "address"}}),
+    ProcessingStep(
+        name="clean_column_names",
+        args={"lower": True, "strip": True, "replace": {" ": "_"}},
+    ),
+    ProcessingStep(name="update_column", args={"column_name": "source", "val": "x"}),
+    ProcessingStep(name="deduplicate", args={"by": ["bbl"]}),
+    ProcessingStep(name="strip_columns"),
+    ProcessingStep(
+        name="coerce_column_types",
+        args={"column_types": {"bbl": "numeric", "units": "string"}},
+    ),
+    ProcessingStep(name="drop_columns", args={"columns": ["name"]}),
+    ProcessingStep(
+        name="pd_series_func",
+        args={"column_name": "name", "function_name": "str.upper"},
+    ),
+    ProcessingStep(
+        name="pd_df_func",
+        args={"function_name": "fillna", "value": {"units": 0}},
+    ),
+    ProcessingStep(name="groupby", args={"by": "borough", "agg": {"units": "sum"}}),
+]
+
+app = typer.Typer(add_completion=False)
+
+
+def synthetic_df(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    bbls = rng.integers(1_000_000_000, 5_999_999_999, rows)
+    units = rng.integers(0, 500, rows).astype(float)
+    units[rng.random(rows) < 0.1] = np.nan
+    return pd.DataFrame(
+        {
+            "bbl": bbls.astype(str),
+            "borough": (bbls // 1_000_000_000).astype(str),
+            "name": pd.Series(rng.choice(["  a", "b ", "c", " d "], rows)),
+            "Address ": pd.Series(rng.choice(["1 MAIN ST", "2 BROADWAY"], rows)),
+            "units": units,
+        }
+    )
+
+
+def _max_rss_bytes() -> int:
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # reported in bytes on macos, kilobytes on linux
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def _measure(
+    processor: ProcessingFunctions,
+    step: ProcessingStep,
+    df: pd.DataFrame,
+    results: multiprocessing.Queue,
+) -> None:
+    starting_rss = _max_rss_bytes()
+    start = time.perf_counter()
+    getattr(processor, step.name)(df, **step.args)
+    elapsed = time.perf_counter() - start
+    peak_rss = _max_rss_bytes()
+    results.put((elapsed, peak_rss, peak_rss - starting_rss))
+
+
+@app.command()
+def main(
+    rows: int = typer.Option(5_000_000, "--rows", help="Rows in the synthetic data"),
+    exact_change_stats: bool = typer.Option(
+        False,
+        "--exact-change-stats",
+        help="Compute step summaries from full comparisons of input and output",
+    ),
+):
+    df = synthetic_df(rows)
+    processor = ProcessingFunctions("benchmark", exact_change_stats=exact_change_stats)
+    context = multiprocessing.get_context("fork")
+    results: multiprocessing.Queue = context.Queue()
+
+    print(f"{rows:,} rows, exact_change_stats={exact_change_stats}")
+    print(f"{'step':<22}{'seconds':>10}{'peak rss (MB)':>16}{'step rss (MB)':>16}")
+    for step in STEPS:
+        process = context.Process(target=_measure, args=(processor, step, df, results))
+        process.start()
+        process.join()
+        if process.exitcode != 0:
+            print(f"{step.name:<22}{'failed':>10}")
+            continue
+        elapsed, peak_rss, step_rss = results.get()
+        print(
+            f"{step.name:<22}{elapsed:>10.2f}{peak_rss / 2**20:>16,.0f}{step_rss / 2**20:>16,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    app()
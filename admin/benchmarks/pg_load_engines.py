@@ -0,0 +1,122 @@
+"""
+Benchmark loading parquet files into Postgres with the `pandas` and `duckdb` load engines.
+
+Each load runs in a forked process and reports:
+  - wall time
+  - peak RSS of the process running it, and how far that is above the RSS it started
+    with (i.e. roughly the memory the load itself needed)
+
+Pass the largest pulled inputs of a build (e.g. from `.lifecycle/builds/load`) with
+`--file`; without any, a synthetic geoparquet file of `--rows` points is used.
+
+Usage:
+    python3 admin/benchmarks/pg_load_engines.py [--file PATH ...] [--rows N]
+
+Needs the BUILD_ENGINE_* environment variables of a Postgres database with PostGIS.
+Tables are created in a scratch schema, which is dropped afterwards. Only runs where
+`fork` is available (linux, macos).
+"""
+
+import multiprocessing
+import resource
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import geopandas as gpd
+import numpy as np
+import typer
+
+from dcpy.connectors.edm.models import DatasetType
+from dcpy.lifecycle import data_loader
+from dcpy.lifecycle.builds.models import InputDataset
+from dcpy.utils import postgres
+
+ENGINES = ["pandas", "duckdb"]
+
+app = typer.Typer(add_completion=False)
+
+
+def synthetic_geoparquet(rows: int, path: Path) -> Path:
+    rng = np.random.default_rng(0)
+    gpd.GeoDataFrame(
+        {
+            "bbl": rng.integers(1_000_000_000, 5_999_999_999, rows).astype(str),
+            "name": rng.choice(["a", "b", "c"], rows),
+            "units": rng.uniform(0, 500, rows),
+        },
+        geometry=gpd.points_from_xy(
+            rng.uniform(913_000, 1_067_000, rows), rng.uniform(120_000, 273_000, rows)
+        ),
+        crs="EPSG:2263",
+    ).to_parquet(path)
+    return path
+
+
+def _max_rss_bytes() -> int:
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # reported in bytes on macos, kilobytes on linux
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def _measure(
+    engine: str, path: Path, schema: str, results: multiprocessing.Queue
+) -> None:
+    pg_client = postgres.PostgresClient(schema=schema)
+    ds = InputDataset(
+        id=f"{path.stem}_{engine}",
+        version="benchmark",
+        file_type=DatasetType.parquet,
+        load_engine=engine,
+    )
+    starting_rss = _max_rss_bytes()
+    start = time.perf_counter()
+    data_loader.load_dataset_into_pg(ds, pg_client, path)
+    elapsed = time.perf_counter() - start
+    peak_rss = _max_rss_bytes()
+    results.put((elapsed, peak_rss, peak_rss - starting_rss))
+
+
+@app.command()
+def main(
+    files: list[Path] = typer.Option(
+        [], "--file", help="Parquet files to load, e.g. a build's largest inputs"
+    ),
+    rows: int = typer.Option(
+        5_000_000, "--rows", help="Rows in the synthetic data, if no files are given"
+    ),
+):
+    schema = f"benchmark_{uuid.uuid4().hex[:8]}"
+    pg_client = postgres.PostgresClient(schema=schema)
+    context = multiprocessing.get_context("fork")
+    results: multiprocessing.Queue = context.Queue()
+    try:
+        if not files:
+            files = [synthetic_geoparquet(rows, Path(f"/tmp/{schema}.parquet"))]
+
+        print(
+            f"{'file':<30}{'engine':<10}{'seconds':>10}"
+            f"{'peak rss (MB)':>16}{'load rss (MB)':>16}"
+        )
+        for path in files:
+            for engine in ENGINES:
+                process = context.Process(
+                    target=_measure, args=(engine, path, schema, results)
+                )
+                process.start()
+                process.join()
+                if process.exitcode != 0:
+                    print(f"{path.name:<30}{engine:<10}{'failed':>10}")
+                    continue
+                elapsed, peak_rss, load_rss = results.get()
+                print(
+                    f"{path.name:<30}{engine:<10}{elapsed:>10.2f}"
+                    f"{peak_rss / 2**20:>16,.0f}{load_rss / 2**20:>16,.0f}"
+                )
+    finally:
+        pg_client.drop_schema()
+
+
+if __name__ == "__main__":
+    app()
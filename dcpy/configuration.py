@@ -27,6 +27,10 @@ if "BUILD_ENGINE_SCHEMA" not in env:
 
 DEV_FLAG = env.get("DEV_FLAG") == "true"
 
+# Compute ingest processing step summaries by fully comparing each step's input and
+# output, rather than from metadata. Slow on large datasets; useful for debugging.
+INGEST_EXACT_CHANGE_STATS = env.get("INGEST_EXACT_CHANGE_STATS") == "true"
+
 # Defaulting this is maybe not ideal. However, it does enable us ensure
 # that we're NOT using the default bucket in integration tests.
 # This should also probably eventually live in pyproject.
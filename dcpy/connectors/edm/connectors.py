@@ -10,7 +10,8 @@ This module provides connectors for different stages of the EDM publishing pipel
 from dataclasses import asdict, dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Callable
+from typing import BinaryIO, Callable
+from zipfile import ZipFile
 
 import pytz
 
@@ -101,6 +102,21 @@ def _bucket() -> str:
     return PUBLISHING_BUCKET
 
 
+class _ClosingZipFile(ZipFile):
+    """ZipFile that also closes the file it reads from, which ZipFile only does for
+    files it opened itself."""
+
+    def __init__(self, file: BinaryIO):
+        super().__init__(file)
+        self._file = file
+
+    def close(self) -> None:
+        try:
+            super().close()
+        finally:
+            self._file.close()
+
+
 @dataclass
 class EdmConnectorConfig:
     """Configuration for EDM connector behavior."""
@@ -250,6 +266,41 @@ class EdmConnector(VersionedConnector, arbitrary_types_allowed=True):
         pulled_path = self._download_file(product_key, full_filepath, destination_path)
         return {"path": pulled_path}
 
+    def get_pull_etag(self, key: str, **kwargs) -> str | None:
+        """ETag of the file `pull_versioned` would fetch with the same kwargs. None for
+        pulls of whole version directories, which have no single ETag."""
+        version = kwargs.pop("version")
+        version_parts = {}
+        if self._config.version_parser:
+            version_parts = self._config.version_parser(version)
+        product_key = self._config.key_factory(key, version, version_parts)
+
+        filepath = kwargs.get("filepath", kwargs.get("source_path", ""))
+        if not filepath or filepath.endswith("/"):
+            return None
+        dataset = kwargs.get("dataset")
+        path_prefix = f"{dataset}/" if dataset else ""
+        return self.storage.get_pull_etag(f"{product_key.path}/{path_prefix}{filepath}")
+
+    def open_versioned(self, key: str, version: str, filepath: str) -> BinaryIO:
+        """Opens a file of a version for reading without downloading it, see
+        `PathedStorageConnector.open`."""
+        version_parts = {}
+        if self._config.version_parser:
+            version_parts = self._config.version_parser(version)
+        product_key = self._config.key_factory(key, version, version_parts)
+        return self.storage.open(f"{product_key.path}/{filepath}")
+
+    def open_zip_versioned(self, key: str, version: str, filepath: str) -> ZipFile:
+        """Opens a zip file of a version, see `open_versioned`. Its members are
+        fetched as they're read. Closing the ZipFile closes the underlying file."""
+        file = self.open_versioned(key, version, filepath)
+        try:
+            return _ClosingZipFile(file)
+        except BaseException:
+            file.close()
+            raise
+
     def push_versioned(self, key: str, version: str, **kwargs) -> dict:
         source_path = kwargs.get("source_path")
         if not source_path:
@@ -561,6 +612,7 @@ class _BuildsConnector(EdmConnector):
         *,
         acl: s3.ACL | None = None,
         build_name: str | None = None,
+        sync: bool = False,
     ) -> BuildKey:
         """
         Uploads a product build to an S3 bucket using cloudpathlib.
@@ -568,7 +620,9 @@ class _BuildsConnector(EdmConnector):
         This function handles uploading a local output folder to a specified
         location in an S3 bucket. The path, product, and build name must be
         provided, along with an optional ACL (Access Control List) to control
-        file access in S3.
+        file access in S3. With sync, files unchanged since the last upload
+        under the same build name aren't uploaded again, and keep that upload's
+        metadata (e.g. date-created and commit).
 
         Raises:
             FileNotFoundError: If the provided output_path does not exist.
@@ -597,6 +651,7 @@ class _BuildsConnector(EdmConnector):
             filepath=str(build_dir),
             acl=str(acl) if acl else "private",
             metadata=metadata,
+            sync=sync,
         )
 
         return build_key
@@ -616,6 +671,7 @@ class _BuildsConnector(EdmConnector):
             product=key,
             acl=acl,
             build_name=version,
+            sync=connector_args.get("sync", False),
         )
         return asdict(result)
 
@@ -1,11 +1,21 @@
+import functools
+import hashlib
+import io
 import logging as default_logging
+import mimetypes
 import os
 import shutil
-from dataclasses import dataclass
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
 from enum import Enum
 from pathlib import Path
-from typing import Any, Unpack
+from typing import Any, BinaryIO, Unpack
 
+from azure.core import MatchConditions
+from azure.core.exceptions import ResourceNotFoundError
+from azure.storage.blob import ContentSettings
+from botocore.exceptions import ClientError
 from cloudpathlib import CloudPath, S3Client
 from cloudpathlib.azure import AzureBlobClient
 from typing_extensions import NotRequired, TypedDict
@@ -13,6 +23,7 @@ from typing_extensions import NotRequired, TypedDict
 from dcpy.configuration import DEFAULT_S3_URL
 from dcpy.connectors.registry import Connector
 from dcpy.utils.logging import logger
+from dcpy.utils.range_reads import BLOCK_SIZE, RangeReader
 
 default_logging.getLogger("azure").setLevel(
     "ERROR"
@@ -83,6 +94,9 @@ class LocalPathWrapper:
 
 HybridPath = CloudPath | LocalPathWrapper
 
+# Files transferred at once by directory pushes and pulls
+TRANSFER_WORKERS = 8
+
 
 class StorageType(Enum):
     S3 = "s3"
@@ -100,6 +114,28 @@ class StorageKwargs(TypedDict, total=True):
     root_folder: NotRequired[str | Path]
 
 
+# cloudpathlib clients each set up a boto3 session or an Azure service client, so
+# storages share one per endpoint (and for S3, the ACL and metadata files are uploaded
+# with through cloudpathlib). Their underlying clients are thread-safe.
+@functools.cache
+def _s3_client(
+    endpoint_url: str,
+    public_upload_files: bool,
+    file_metadata: tuple[tuple[str, str], ...],
+) -> S3Client:
+    extra_args: dict[str, Any] = {}
+    if public_upload_files:
+        extra_args["ACL"] = "public-read"
+    if file_metadata:
+        extra_args["Metadata"] = dict(file_metadata)
+    return S3Client(endpoint_url=endpoint_url, extra_args=extra_args)
+
+
+@functools.cache
+def _azure_client(connection_string: str | None) -> AzureBlobClient:
+    return AzureBlobClient(connection_string=connection_string)
+
+
 @dataclass
 class HybridPathedStorage:
     """Underlying storage for a connector"""
@@ -114,9 +150,8 @@ class HybridPathedStorage:
             az_connection_string: str | None = None,
             root_folder: Path | str = "",
         ) -> "HybridPathedStorage":
-            root_path = AzureBlobClient(
-                connection_string=az_connection_string
-                or os.getenv("AZURE_STORAGE_CONNECTION_STRING")
+            root_path = _azure_client(
+                az_connection_string or os.getenv("AZURE_STORAGE_CONNECTION_STRING")
             ).CloudPath(f"az://{az_container_name}/{root_folder}")
             return HybridPathedStorage(
                 root_path=root_path, storage_type=StorageType.AZURE
@@ -130,14 +165,10 @@ class HybridPathedStorage:
             s3_public_upload_files: bool = False,
             s3_file_metadata: dict | None = None,
         ) -> "HybridPathedStorage":
-            # Merge extra_args with ACL and Metadata if provided
-            extra_args: dict[str, Any] = {}
-            if s3_public_upload_files:
-                extra_args["ACL"] = "public-read"
-            if s3_file_metadata:
-                extra_args["Metadata"] = s3_file_metadata
-            root_path = S3Client(
-                endpoint_url=s3_endpoint_url or DEFAULT_S3_URL, extra_args=extra_args
+            root_path = _s3_client(
+                s3_endpoint_url or DEFAULT_S3_URL,
+                s3_public_upload_files,
+                tuple(sorted((s3_file_metadata or {}).items())),
             ).CloudPath(f"s3://{s3_bucket}/{root_folder}")
             return HybridPathedStorage(root_path=root_path, storage_type=StorageType.S3)
 
@@ -189,6 +220,275 @@ class HybridPathedStorage:
         return f"{self.storage_type.value}://{self.root_path}"
 
 
+# Part sizes S3 files are commonly uploaded with: boto3's default (which cloudpathlib
+# uses) and larger ones. The ETag of a file uploaded in parts is the md5 of the parts'
+# md5s, so it can only be compared with a local file given the part size.
+_S3_PART_SIZES = [2**23, 2**24, 2**25, 2**26]
+_HASH_CHUNK_BYTES = 2**20
+
+
+@dataclass
+class SyncStats:
+    """What a push in sync mode transferred, and what it skipped as unchanged."""
+
+    files_transferred: int = 0
+    bytes_transferred: int = 0
+    files_skipped: int = 0
+    bytes_skipped: int = 0
+    files_deleted: int = 0
+
+    def summary(self) -> str:
+        return (
+            f"transferred {self.files_transferred} file(s) "
+            f"({self.bytes_transferred / 2**20:,.1f} MB), "
+            f"skipped {self.files_skipped} unchanged file(s) "
+            f"({self.bytes_skipped / 2**20:,.1f} MB), "
+            f"deleted {self.files_deleted} file(s)"
+        )
+
+
+@dataclass(frozen=True)
+class _StoredFile:
+    size: int
+    # S3 ETag, hex md5 of an Azure blob, or mtime (in ns) of a local file. None if
+    # unknown, e.g. for an Azure blob uploaded in blocks
+    fingerprint: str | None
+
+
+def _md5(path: Path) -> str:
+    digest = hashlib.md5()
+    with open(path, "rb") as f:
+        while chunk := f.read(_HASH_CHUNK_BYTES):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _matches_s3_etag(path: Path, etag: str) -> bool:
+    if "-" not in etag:
+        return _md5(path) == etag
+    size = path.stat().st_size
+    parts = int(etag.split("-")[1])
+    for part_size in _S3_PART_SIZES:
+        if -(-size // part_size) != parts:
+            continue
+        part_digests = []
+        with open(path, "rb") as f:
+            while part := f.read(part_size):
+                part_digests.append(hashlib.md5(part).digest())
+        if f"{hashlib.md5(b''.join(part_digests)).hexdigest()}-{parts}" == etag:
+            return True
+    return False
+
+
+def _is_unchanged(local: Path, stored: _StoredFile, storage_type: StorageType) -> bool:
+    if stored.fingerprint is None or local.stat().st_size != stored.size:
+        return False
+    match storage_type:
+        case StorageType.S3:
+            return _matches_s3_etag(local, stored.fingerprint)
+        case StorageType.AZURE:
+            return _md5(local) == stored.fingerprint
+        case _:
+            return str(local.stat().st_mtime_ns) == stored.fingerprint
+
+
+def _azure_md5(content_settings) -> str | None:
+    content_md5 = content_settings.content_md5
+    return bytes(content_md5).hex() if content_md5 else None
+
+
+def _list_stored_files(
+    root: HybridPath, storage_type: StorageType
+) -> dict[str, _StoredFile]:
+    """Files under root, keyed by their path relative to it, in one listing."""
+    match storage_type:
+        case StorageType.S3:
+            prefix = f"{root.key.rstrip('/')}/" if root.key else ""  # type: ignore
+            paginator = root.client.client.get_paginator("list_objects_v2")
+            return {
+                obj["Key"].removeprefix(prefix): _StoredFile(
+                    obj["Size"], obj["ETag"].strip('"')
+                )
+                for page in paginator.paginate(Bucket=root.bucket, Prefix=prefix)  # type: ignore
+                for obj in page.get("Contents", [])
+                if not obj["Key"].endswith("/")
+            }
+        case StorageType.AZURE:
+            prefix = f"{root.blob.rstrip('/')}/" if root.blob else ""  # type: ignore
+            container = root.client.service_client.get_container_client(
+                root.container  # type: ignore
+            )
+            return {
+                blob.name.removeprefix(prefix): _StoredFile(
+                    blob.size, _azure_md5(blob.content_settings)
+                )
+                for blob in container.list_blobs(name_starts_with=prefix)
+            }
+        case _:
+            if not root.exists():
+                return {}
+            return {
+                path.relative_to(root.path).as_posix(): _StoredFile(  # type: ignore
+                    path.stat().st_size, str(path.stat().st_mtime_ns)
+                )
+                for path in root.path.rglob("*")  # type: ignore
+                if path.is_file()
+            }
+
+
+def _stored_file(path: HybridPath, storage_type: StorageType) -> _StoredFile | None:
+    if not path.exists() or path.is_dir():
+        return None
+    match storage_type:
+        case StorageType.S3:
+            head = path.client.client.head_object(Bucket=path.bucket, Key=path.key)  # type: ignore
+            return _StoredFile(head["ContentLength"], head["ETag"].strip('"'))
+        case StorageType.AZURE:
+            properties = path.client.service_client.get_blob_client(
+                path.container,  # type: ignore
+                path.blob,  # type: ignore
+            ).get_blob_properties()
+            return _StoredFile(properties.size, _azure_md5(properties.content_settings))
+        case _:
+            stat = path.stat()
+            return _StoredFile(stat.st_size, str(stat.st_mtime_ns))
+
+
+def _upload(
+    local: Path,
+    target: HybridPath,
+    storage_type: StorageType,
+    *,
+    acl: str | None,
+    metadata: dict,
+) -> None:
+    """Uploads a file, with its ACL and metadata set in the same request."""
+    content_type, content_encoding = mimetypes.guess_type(local)
+    match storage_type:
+        case StorageType.S3:
+            extra_args: dict[str, Any] = {}
+            if acl == "public-read":
+                extra_args["ACL"] = acl
+            if metadata:
+                extra_args["Metadata"] = metadata
+            if content_type:
+                extra_args["ContentType"] = content_type
+            if content_encoding:
+                extra_args["ContentEncoding"] = content_encoding
+            target.client.client.upload_file(
+                str(local),
+                target.bucket,  # type: ignore
+                target.key,  # type: ignore
+                ExtraArgs=extra_args,
+            )
+        case StorageType.AZURE:
+            blob = target.client.service_client.get_blob_client(
+                target.container,  # type: ignore
+                target.blob,  # type: ignore
+            )
+            with open(local, "rb") as f:
+                blob.upload_blob(
+                    f,
+                    overwrite=True,
+                    metadata=metadata or None,
+                    content_settings=ContentSettings(
+                        content_type=content_type, content_encoding=content_encoding
+                    ),
+                )
+        case _:
+            target.path.parent.mkdir(parents=True, exist_ok=True)  # type: ignore
+            # keeping the modification time, which syncs compare
+            shutil.copy2(local, target.path)  # type: ignore
+
+
+def _download(source: HybridPath, local: Path, storage_type: StorageType) -> None:
+    local.parent.mkdir(parents=True, exist_ok=True)
+    match storage_type:
+        case StorageType.S3:
+            source.client.client.download_file(
+                source.bucket,  # type: ignore
+                source.key,  # type: ignore
+                str(local),
+            )
+        case StorageType.AZURE:
+            blob = source.client.service_client.get_blob_client(
+                source.container,  # type: ignore
+                source.blob,  # type: ignore
+            )
+            with open(local, "wb") as f:
+                blob.download_blob().readinto(f)
+        case _:
+            shutil.copy2(source.path, local)  # type: ignore
+
+
+def _run_concurrently(
+    fn: Callable[..., None], calls: Iterable[tuple], *, max_workers: int
+) -> None:
+    """Calls fn with each tuple of arguments on a pool of max_workers threads. The
+    first call to fail cancels those not yet started, and its error is raised."""
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(fn, *args) for args in calls]
+        try:
+            for future in as_completed(futures):
+                future.result()
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+
+def _sync(
+    source: Path,
+    dest: HybridPath,
+    storage_type: StorageType,
+    *,
+    acl: str | None,
+    metadata: dict,
+    max_workers: int,
+) -> SyncStats:
+    """Makes dest a copy of source (a file or a directory), transferring only files
+    whose size or contents (for local storage, modification time) differ from what's
+    stored, and deleting stored files that aren't in source."""
+    if source.is_dir():
+        stored = _list_stored_files(dest, storage_type)
+        files = []
+        for local in sorted(source.rglob("*")):
+            if local.is_file():
+                relative = local.relative_to(source).as_posix()
+                files.append((local, dest / relative, stored.pop(relative, None)))
+        extras = [dest / relative for relative in stored]
+    else:
+        files = [(source, dest, _stored_file(dest, storage_type))]
+        extras = []
+
+    stats = SyncStats()
+    changed = []
+    for local, target, stored_file in files:
+        size = local.stat().st_size
+        if stored_file is not None and _is_unchanged(local, stored_file, storage_type):
+            stats.files_skipped += 1
+            stats.bytes_skipped += size
+        else:
+            changed.append((local, target))
+            stats.files_transferred += 1
+            stats.bytes_transferred += size
+
+    _run_concurrently(
+        functools.partial(
+            _upload, storage_type=storage_type, acl=acl, metadata=metadata
+        ),
+        changed,
+        max_workers=max_workers,
+    )
+    _run_concurrently(
+        lambda target: target.unlink(),
+        [(target,) for target in extras],
+        max_workers=max_workers,
+    )
+    stats.files_deleted = len(extras)
+    return stats
+
+
 class PathedStorageConnector(Connector, arbitrary_types_allowed=True):
     """Connector where all the keys are expected to be stringified relative paths.
 
@@ -200,6 +500,7 @@ class PathedStorageConnector(Connector, arbitrary_types_allowed=True):
     storage: HybridPathedStorage
 
     base_storage_kwargs: StorageKwargs
+    max_workers: int = TRANSFER_WORKERS
 
     @staticmethod
     def from_storage_kwargs(
@@ -217,8 +518,6 @@ class PathedStorageConnector(Connector, arbitrary_types_allowed=True):
                 f"The root path {storage.root_path} doesn't exist"
             )
 
-        # there is a case where we have to create a different storage object, ie uploading to s3
-        # so we need to stash the kwargs
         return PathedStorageConnector(
             conn_type=conn_type,
             base_storage_kwargs=storage_kwargs,  # type: ignore
@@ -226,13 +525,20 @@ class PathedStorageConnector(Connector, arbitrary_types_allowed=True):
         )
 
     def push(self, key: str, **kwargs) -> dict:
-        # Push a file or directory from local to storage at key
+        """Push a file or directory from local to storage at key, replacing what's there.
+        The files of a directory are uploaded max_workers at a time.
+
+        With `sync=True`, only files that differ from what's stored are transferred,
+        comparing sizes and MD5s/ETags (for local storage, modification times).
+        Unchanged files keep the metadata they were pushed with, so sync only pushes
+        whose metadata needn't describe this push.
+        """
         metadata = kwargs.get("metadata", {})
 
         source = kwargs.get("filepath")
         if source is None:
             raise ValueError("'filepath' must be provided to push")
-        source_path = LocalPathWrapper(source)
+        source_path = Path(source)
 
         acl = kwargs.get("acl")
         if acl == "public-read" and (self.storage.storage_type != StorageType.S3):
@@ -240,57 +546,120 @@ class PathedStorageConnector(Connector, arbitrary_types_allowed=True):
                 f"Public ACL is only supported for S3 storage, found ACL: {acl} for {self.storage.storage_type}"
             )
 
-        # Leaky Abstraction Alert!
-        # Handle S3 public ACL. Unfortunately we have to instantiate a new client
-        # with the ACL and file metadata
-        if self.storage.storage_type == StorageType.S3:
-            dest_storage = HybridPathedStorage.Factory.s3(
-                root_folder=self.base_storage_kwargs.get("root_folder") or "",
-                s3_bucket=self.base_storage_kwargs["s3_bucket"],  # type: ignore
-                s3_endpoint_url=self.base_storage_kwargs.get("s3_endpoint_url"),
-                s3_public_upload_files=(acl == "public-read"),
-                s3_file_metadata=metadata,
-            )
-        else:
-            dest_storage = self.storage
+        storage_type = self.storage.storage_type
+        dest_path = self.storage.root_path / key
 
-        dest_path = dest_storage.root_path / key
+        if kwargs.get("sync"):
+            stats = _sync(
+                source_path,
+                dest_path,
+                storage_type,
+                acl=acl,
+                metadata=metadata,
+                max_workers=self.max_workers,
+            )
+            logger.info(f"Synced {source_path} to {dest_path}: {stats.summary()}")
+            return {"path": str(dest_path), "sync": asdict(stats)}
 
         if source_path.is_dir():
             if dest_path.exists():
                 dest_path.rmtree()
-            source_path.copytree(
-                dest_path,
+            _run_concurrently(
+                functools.partial(
+                    _upload, storage_type=storage_type, acl=acl, metadata=metadata
+                ),
+                [
+                    (local, dest_path / local.relative_to(source_path).as_posix())
+                    for local in source_path.rglob("*")
+                    if local.is_file()
+                ],
+                max_workers=self.max_workers,
             )
+        elif source_path.is_file():
+            _upload(source_path, dest_path, storage_type, acl=acl, metadata=metadata)
         else:
-            dest_path.parent.mkdir(parents=True, exist_ok=True)
-            if dest_path.exists():
-                dest_path.unlink()
-            source_path.copy(dest_path)
-
-        # Set metadata for Azure blobs if needed. Unlike S3, you do this post-upload
-        if dest_storage.storage_type == StorageType.AZURE and metadata:
-            blob = dest_path.client.service_client.get_blob_client(  # type: ignore
-                dest_path.container,  # type: ignore
-                dest_path.blob,  # type: ignore
-            )
-            blob.set_blob_metadata(metadata)
+            raise ValueError(f"Path {source_path} doesn't exist.")
 
         return {"path": str(dest_path)}
 
     def pull(self, key: str, destination_path: Path, **kwargs) -> dict:
-        # Pull a file or directory from storage at key to local destination_path
+        """Pull a file or directory from storage at key to local destination_path. The
+        files of a directory are downloaded max_workers at a time, into
+        destination_path; files already there that aren't in storage are kept."""
+        storage_type = self.storage.storage_type
         src_path = self.storage.root_path / key
         if not src_path.exists():
             raise FileNotFoundError(f"Source path {src_path} does not exist")
         if src_path.is_dir():
-            src_path.copytree(destination_path)
+            destination_path.mkdir(parents=True, exist_ok=True)
+            _run_concurrently(
+                functools.partial(_download, storage_type=storage_type),
+                [
+                    (src_path / relative, destination_path / relative)
+                    for relative in _list_stored_files(src_path, storage_type)
+                ],
+                max_workers=self.max_workers,
+            )
         else:
-            destination_path.parent.mkdir(parents=True, exist_ok=True)
-            assert destination_path.parent.exists()
-            src_path.copy(destination_path)
+            if destination_path.is_dir():
+                destination_path = destination_path / src_path.name
+            _download(src_path, destination_path, storage_type)
         return {"path": destination_path}
 
+    def open(self, key: str) -> BinaryIO:
+        """Opens the file at key for reading, without downloading it. For S3 and Azure,
+        reads are range requests for the bytes read (through a shared block cache),
+        and fail if the file is overwritten while open."""
+        path = self.storage.root_path / key
+        match self.storage.storage_type:
+            case StorageType.S3:
+                client = path.client.client
+                bucket, object_key = path.bucket, path.key  # type: ignore
+                try:
+                    head = client.head_object(Bucket=bucket, Key=object_key)
+                except ClientError as e:
+                    if e.response["Error"]["Code"] in ("404", "NoSuchKey"):
+                        raise FileNotFoundError(f"File {path} does not exist") from e
+                    raise
+                etag = head["ETag"]
+
+                def fetch(start: int, end: int) -> bytes:
+                    return client.get_object(
+                        Bucket=bucket,
+                        Key=object_key,
+                        Range=f"bytes={start}-{end - 1}",
+                        IfMatch=etag,
+                    )["Body"].read()
+
+                reader = RangeReader(f"{path}@{etag}", head["ContentLength"], fetch)
+            case StorageType.AZURE:
+                blob = path.client.service_client.get_blob_client(
+                    path.container,  # type: ignore
+                    path.blob,  # type: ignore
+                )
+                try:
+                    properties = blob.get_blob_properties()
+                except ResourceNotFoundError as e:
+                    raise FileNotFoundError(f"File {path} does not exist") from e
+
+                def fetch(start: int, end: int) -> bytes:
+                    return blob.download_blob(
+                        offset=start,
+                        length=end - start,
+                        etag=properties.etag,
+                        match_condition=MatchConditions.IfNotModified,
+                    ).readall()
+
+                reader = RangeReader(
+                    f"{path}@{properties.etag}", properties.size, fetch
+                )
+            case _:
+                return open(path.path, "rb")  # type: ignore
+        return io.BufferedReader(reader, buffer_size=BLOCK_SIZE)
+
+    def get_pull_etag(self, key: str, **kwargs) -> str | None:
+        return self.get_etag(key)
+
     def get_metadata(self, key: str):
         client = self.storage.root_path.client
         if isinstance(client, AzureBlobClient):
@@ -302,6 +671,25 @@ class PathedStorageConnector(Connector, arbitrary_types_allowed=True):
         else:
             return {}
 
+    def get_etag(self, key: str) -> str | None:
+        """ETag of the file at key, or for local storage, its mtime and size.
+        None if there's no such file."""
+        path = self.storage.root_path / key
+        client = getattr(path, "client", None)
+        try:
+            if isinstance(client, S3Client):
+                # a HEAD, rather than the GET cloudpathlib uses for its metadata
+                return client.client.head_object(Bucket=path.bucket, Key=path.key)[  # type: ignore
+                    "ETag"
+                ]
+            elif isinstance(client, AzureBlobClient):
+                return client._get_metadata(path).get("etag")  # type: ignore
+            else:
+                stat = path.stat()
+                return f"{stat.st_mtime_ns}-{stat.st_size}"
+        except (FileNotFoundError, ClientError):
+            return None
+
     def exists(self, key: str) -> bool:
         return (self.storage.root_path / key).exists()
 
@@ -73,18 +73,25 @@ class Connector(VersionedConnector, arbitrary_types_allowed=True):
     def push_versioned(self, key: str, version: str, **kwargs) -> dict:
         return self._push(key, version=version, **kwargs)
 
-    def pull_versioned(
-        self, key: str, version: str, destination_path: Path, **kwargs
-    ) -> dict:
-        filename = kwargs.get(
+    def _filename(self, key: str, **kwargs) -> str:
+        return kwargs.get(
             "filename",
             f"{key}.{DatasetType(kwargs.get('file_type', 'parquet')).to_extension()}",
         )
+
+    def pull_versioned(
+        self, key: str, version: str, destination_path: Path, **kwargs
+    ) -> dict:
+        filename = self._filename(key, **kwargs)
         return self.storage.pull(
             f"{key}/{version}/{filename}",
             destination_path / filename,
         )
 
+    def get_pull_etag(self, key: str, **kwargs) -> str | None:
+        version = kwargs.pop("version")
+        return self.storage.get_etag(f"{key}/{version}/{self._filename(key, **kwargs)}")
+
     def list_versions(self, key: str, *, sort_desc: bool = True, **kwargs) -> list[str]:
         """This is maybe a problem in my plan"""
         return sorted(self.storage.get_subfolders(key), reverse=sort_desc)
@@ -40,6 +40,12 @@ class Pull(GenericConnector, ABC):
     def pull(self, key: str, destination_path: Path, **kwargs) -> dict:
         """Pull a dataset to the given path"""
 
+    def get_pull_etag(self, key: str, **kwargs) -> str | None:
+        """An identifier of the current contents of what `pull` would fetch, if the
+        source can report one cheaply (e.g. an S3 ETag). Local caches of pulls are
+        revalidated against it. Takes the same kwargs as `pull`."""
+        return None
+
     def get_pull_local_sub_path(self, key: str, **kwargs) -> Path:
         """Calculate where the file should be stored locally, e.g. /{key}/{version}/
         Different resources might organize their local resources differently, for example
@@ -1,5 +1,7 @@
 from pathlib import Path
 
+from botocore.exceptions import ClientError
+
 from dcpy.connectors.registry import StorageConnector
 from dcpy.utils import s3
 from dcpy.utils.logging import logger
@@ -68,5 +70,15 @@ class S3Connector(StorageConnector):
         filepath = s3.download_file(bucket=bucket, key=key, path=destination_path)
         return {"path": filepath}
 
+    def get_pull_etag(
+        self, key: str, *, bucket: str | None = None, **kwargs
+    ) -> str | None:
+        bucket = self._bucket(bucket)
+        key = self._apply_prefix(key)
+        try:
+            return s3.get_metadata(bucket, key).etag
+        except ClientError:
+            return None
+
     def push(self, key, **kwargs) -> dict:
         return self._push(key, **kwargs)
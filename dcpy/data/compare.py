@@ -121,6 +121,28 @@ def compare_sql_keyed_rows(
     *,
     ignore_columns: list[str] | None = None,
     cast_to_numeric: list[str] | None = None,
+):
+    # one connection throughout: the temporary table only exists on the connection
+    # that created it, and this makes dozens of small queries
+    with client.session():
+        return _compare_sql_keyed_rows(
+            left,
+            right,
+            key_columns,
+            client,
+            ignore_columns=ignore_columns,
+            cast_to_numeric=cast_to_numeric,
+        )
+
+
+def _compare_sql_keyed_rows(
+    left: str,
+    right: str,
+    key_columns: list[str],
+    client: postgres.PostgresClient,
+    *,
+    ignore_columns: list[str] | None = None,
+    cast_to_numeric: list[str] | None = None,
 ):
     logger.info(f"Comparing {left} (left) and {right} (right) by keys {key_columns}")
     left_columns = client.get_table_columns(left)
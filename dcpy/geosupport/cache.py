@@ -0,0 +1,170 @@
+"""Persistent on-disk cache of Geosupport results.
+
+Monthly runs of the same datasets (PLUTO, developments, DEP CATS, ...) send mostly the
+same inputs through Geosupport every time. When `GEOSUPPORT_CACHE_PATH` is set, each
+Geosupport call is keyed on (function, mode, normalized inputs) and stored in a SQLite
+database, scoped by Geosupport version so that a new release never serves stale
+results. Opening the cache for a version drops the entries of every other version, so
+runs of different Geosupport releases shouldn't share a cache path. Calls that raise a `GeosupportError` are cached too, since the geocoding code
+falls back on `e.result` in that case.
+
+Hit/miss counts are tracked per process in `stats`; the geocoding engine folds counts
+from worker processes back into the parent's `stats`.
+"""
+
+import json
+import os
+import re
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from geosupport import Geosupport, GeosupportError
+
+CACHE_PATH_ENV_VAR = "GEOSUPPORT_CACHE_PATH"
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+
+    def __sub__(self, other: "CacheStats") -> "CacheStats":
+        return CacheStats(
+            hits=self.hits - other.hits, misses=self.misses - other.misses
+        )
+
+    def add(self, other: "CacheStats") -> None:
+        self.hits += other.hits
+        self.misses += other.misses
+
+    def copy(self) -> "CacheStats":
+        return CacheStats(hits=self.hits, misses=self.misses)
+
+    def summary(self) -> dict[str, int]:
+        return {"geocode_cache_hits": self.hits, "geocode_cache_misses": self.misses}
+
+
+stats = CacheStats()
+
+
+def _normalize(value: Any) -> str:
+    return re.sub(r"\s+", " ", "" if value is None else str(value)).strip().upper()
+
+
+def cache_key(function: str, mode: str | None, inputs: dict) -> tuple[str, str, str]:
+    """Normalize a Geosupport call so that equivalent inputs share a cache entry
+    (case, surrounding and repeated whitespace, and kwarg order are ignored)."""
+    normalized = {k.lower(): _normalize(v) for k, v in inputs.items()}
+    return (
+        function.upper(),
+        (mode or "").lower(),
+        json.dumps(normalized, sort_keys=True),
+    )
+
+
+class GeocodeCache:
+    """SQLite-backed store of Geosupport results for a single Geosupport version."""
+
+    def __init__(self, path: Path, version: str):
+        self.path = path
+        self.version = version
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # several geocoding worker processes may share one cache file
+        self._conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS geocodes (
+                version TEXT NOT NULL,
+                function TEXT NOT NULL,
+                mode TEXT NOT NULL,
+                inputs TEXT NOT NULL,
+                is_error INTEGER NOT NULL,
+                result TEXT NOT NULL,
+                PRIMARY KEY (version, function, mode, inputs)
+            )
+            """
+        )
+
+    def get(self, key: tuple[str, str, str]) -> tuple[bool, dict] | None:
+        """Returns (is_error, result) for a cached call, or None on a miss."""
+        row = self._conn.execute(
+            "SELECT is_error, result FROM geocodes "
+            "WHERE version = ? AND function = ? AND mode = ? AND inputs = ?",
+            (self.version, *key),
+        ).fetchone()
+        if row is None:
+            stats.misses += 1
+            return None
+        stats.hits += 1
+        return bool(row[0]), json.loads(row[1])
+
+    def put(self, key: tuple[str, str, str], is_error: bool, result: dict) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO geocodes VALUES (?, ?, ?, ?, ?, ?)",
+            (self.version, *key, int(is_error), json.dumps(result)),
+        )
+
+    def evict_stale_versions(self) -> None:
+        """Drop entries cached for any other Geosupport version."""
+        # two ranges rather than !=, so that the primary key's index is used
+        self._conn.execute(
+            "DELETE FROM geocodes WHERE version < ? OR version > ?",
+            (self.version, self.version),
+        )
+
+
+class CachedGeosupport:
+    """Drop-in for a `Geosupport` handle that reads through a `GeocodeCache`,
+    i.e. `g["1A"](house_number=..., street_name=..., borough=..., mode="regular")`.
+    """
+
+    def __init__(self, g: Geosupport, cache: GeocodeCache):
+        self.g = g
+        self.cache = cache
+
+    def call(self, function: str, mode: str | None = None, **kwargs) -> dict:
+        key = cache_key(function, mode, kwargs)
+        cached = self.cache.get(key)
+        if cached is not None:
+            is_error, result = cached
+            if is_error:
+                raise GeosupportError(
+                    f"{result.get('Message', '')} {result.get('Message 2', '')}",
+                    result,
+                )
+            return result
+
+        mode_kwargs = {"mode": mode} if mode else {}
+        try:
+            result = self.g[function](**mode_kwargs, **kwargs)
+        except GeosupportError as e:
+            self.cache.put(key, True, e.result)
+            raise
+        self.cache.put(key, False, result)
+        return result
+
+    def __getitem__(self, function: str):
+        return lambda **kwargs: self.call(function, **kwargs)
+
+
+# (path, version) of caches this process has evicted other versions from
+_evicted: set[tuple[str, str]] = set()
+
+
+def open_cache(version: str | None) -> GeocodeCache | None:
+    """Opens the cache configured by GEOSUPPORT_CACHE_PATH, if any. Results can only be
+    scoped when the Geosupport version is known, so no cache is used without one.
+
+    The first time a process opens the cache for a version, entries of other versions
+    are evicted."""
+    path = os.environ.get(CACHE_PATH_ENV_VAR)
+    if not path or not version:
+        return None
+    geocode_cache = GeocodeCache(Path(path), version)
+    if (path, version) not in _evicted:
+        geocode_cache.evict_stale_versions()
+        _evicted.add((path, version))
+    return geocode_cache
@@ -0,0 +1,191 @@
+"""Chunked, multi-process Geosupport geocoding.
+
+Geosupport is a single-threaded C library, so geocoding a dataframe row by row with
+`df.apply(..., axis=1)` keeps one core busy and leaves the rest idle. `geocode_df`
+splits the input records into chunks and geocodes them on a process pool. Each
+worker process owns its own `Geosupport` handle (see `ProcessLocalGeosupport`), and
+results are reassembled in the original row order.
+
+Inputs are deduplicated first: each distinct set of inputs is geocoded once, and its
+result is fanned back out to every row that shares it (permit data in particular
+repeats the same address many times).
+
+When a result cache is configured (see dcpy.geosupport.cache), handles read through it.
+"""
+
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Callable
+
+import pandas as pd
+from geosupport import Geosupport
+
+from dcpy.geosupport import cache
+from dcpy.utils.logging import logger
+
+DEFAULT_CHUNK_SIZE = 5_000
+
+GeocodeFunction = Callable[[dict], dict]
+ProgressCallback = Callable[[int, int], None]
+
+
+@dataclass
+class DedupStats:
+    rows: int = 0
+    distinct_inputs: int = 0
+
+    def __sub__(self, other: "DedupStats") -> "DedupStats":
+        return DedupStats(
+            rows=self.rows - other.rows,
+            distinct_inputs=self.distinct_inputs - other.distinct_inputs,
+        )
+
+    def copy(self) -> "DedupStats":
+        return DedupStats(rows=self.rows, distinct_inputs=self.distinct_inputs)
+
+    def summary(self) -> dict[str, int]:
+        return {
+            "geocode_input_rows": self.rows,
+            "geocode_distinct_inputs": self.distinct_inputs,
+        }
+
+
+# Rows passed to `geocode_df`, and how many distinct inputs were actually geocoded,
+# so far in this process
+dedup_stats = DedupStats()
+
+
+def geosupport_version() -> str | None:
+    geofiles = os.environ.get("GEOFILES")
+    if not geofiles:
+        return None
+    match = re.search(r"version-(\d+[a-zA-Z])", geofiles)
+    return match.group(1) if match else None
+
+
+class ProcessLocalGeosupport:
+    """Geosupport wrapper - lazy initialization to avoid loading until needed.
+
+    The handle is tied to the process that created it, so a worker forked from a
+    process that had already loaded Geosupport builds its own handle (and cache
+    connection) rather than sharing the parent's.
+    """
+
+    def __init__(self) -> None:
+        self.g: Geosupport | cache.CachedGeosupport | None = None
+        self._pid: int | None = None
+
+    @property
+    def geosupport(self) -> Geosupport | cache.CachedGeosupport:
+        if self.g is None or self._pid != os.getpid():
+            g = Geosupport()
+            geocode_cache = cache.open_cache(geosupport_version())
+            self.g = cache.CachedGeosupport(g, geocode_cache) if geocode_cache else g
+            self._pid = os.getpid()
+        return self.g
+
+
+def log_progress(rows_geocoded: int, total_rows: int) -> None:
+    logger.info(f"Geocoded {rows_geocoded} of {total_rows} rows")
+
+
+def _geocode_chunk(
+    geocode_fn: GeocodeFunction, records: list[dict]
+) -> tuple[list[dict], cache.CacheStats]:
+    """Geocodes one chunk, also returning the cache hits/misses it incurred so that
+    counts from worker processes can be added to the parent's."""
+    stats_before = cache.stats.copy()
+    geocoded = [geocode_fn(record) for record in records]
+    return geocoded, cache.stats - stats_before
+
+
+def geocode_records(
+    records: list[dict],
+    geocode_fn: GeocodeFunction,
+    *,
+    workers: int | None = None,
+    chunk_size: int | None = None,
+    progress_callback: ProgressCallback | None = log_progress,
+) -> list[dict]:
+    """Geocode each record with `geocode_fn`, returning results in input order.
+
+    Args:
+        records: geocoding inputs, one dict per row
+        geocode_fn: function mapping one record to a dict of geocoded outputs. Must be
+            picklable (i.e. a module-level function) when more than one worker is used.
+        workers: number of worker processes. Defaults to the number of cpus. With a
+            single worker, or a single chunk, records are geocoded in this process.
+        chunk_size: number of records sent to a worker at a time. Defaults to
+            DEFAULT_CHUNK_SIZE.
+        progress_callback: called with (rows_geocoded, total_rows) after each chunk
+    """
+    chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+    assert chunk_size > 0, "chunk_size must be positive"
+    total = len(records)
+    chunks = [records[i : i + chunk_size] for i in range(0, total, chunk_size)]
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+
+    results: list[list[dict] | None] = [None] * len(chunks)
+    rows_geocoded = 0
+    if workers <= 1:
+        for i, chunk in enumerate(chunks):
+            results[i], _ = _geocode_chunk(geocode_fn, chunk)
+            rows_geocoded += len(chunk)
+            if progress_callback:
+                progress_callback(rows_geocoded, total)
+    else:
+        logger.info(
+            f"Geocoding {total} rows in {len(chunks)} chunks on {workers} workers"
+        )
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(_geocode_chunk, geocode_fn, chunk): i
+                for i, chunk in enumerate(chunks)
+            }
+            for future in as_completed(futures):
+                i = futures[future]
+                results[i], chunk_stats = future.result()
+                cache.stats.add(chunk_stats)
+                rows_geocoded += len(chunks[i])
+                if progress_callback:
+                    progress_callback(rows_geocoded, total)
+
+    return [row for chunk_result in results for row in chunk_result or []]
+
+
+def geocode_df(
+    df: pd.DataFrame,
+    geocode_fn: GeocodeFunction,
+    *,
+    input_columns: list[str] | None = None,
+    workers: int | None = None,
+    chunk_size: int | None = None,
+    progress_callback: ProgressCallback | None = log_progress,
+) -> pd.DataFrame:
+    """Geocode each row of `df` with `geocode_fn`, the parallel equivalent of
+    `df.apply(geocode_fn, axis=1, result_type="expand")`.
+
+    Only `input_columns` (by default, all columns) are passed to `geocode_fn`, as a
+    dict. Each distinct combination of them is geocoded once, and the returned frame
+    has one row per row of `df`, sharing its index. See `geocode_records` for the
+    remaining arguments.
+    """
+    inputs = df[input_columns] if input_columns is not None else df
+    # number each distinct input in order of first appearance
+    input_ids = inputs.groupby(list(inputs.columns), dropna=False, sort=False).ngroup()
+    distinct = inputs[~input_ids.duplicated()]
+    dedup_stats.rows += len(inputs)
+    dedup_stats.distinct_inputs += len(distinct)
+    if len(distinct) < len(inputs):
+        logger.info(f"Geocoding {len(distinct)} distinct inputs of {len(inputs)} rows")
+
+    geocoded = geocode_records(
+        distinct.to_dict("records"),
+        geocode_fn,
+        workers=workers,
+        chunk_size=chunk_size,
+        progress_callback=progress_callback,
+    )
+    return pd.DataFrame(geocoded).iloc[input_ids.to_numpy()].set_index(df.index)
@@ -1,25 +1,19 @@
-import os
-import re
-
 import pandas as pd
 import usaddress
-from geosupport import Geosupport, GeosupportError
+from geosupport import GeosupportError
 
-g = Geosupport()
+from dcpy.geosupport import engine
 
+_gw = engine.ProcessLocalGeosupport()
 
-def geosupport_version() -> str | None:
-    geofiles = os.environ.get("GEOFILES")
-    if not geofiles:
-        return None
-    match = re.search(r"version-(\d+[a-zA-Z])", geofiles)
-    return match.group(1) if match else None
+geosupport_version = engine.geosupport_version
 
 
 ####### NUMBLDGS ###########################
 
 
 def get_bbl(inputs):
+    g = _gw.geosupport
     bin = inputs["bin"]
     try:
         geo = g["BN"](bin=bin)
@@ -33,9 +27,22 @@ def get_bbl(inputs):
     return {"bbl": bbl, "bin": bin}
 
 
-def geocode_df_bin(df: pd.DataFrame) -> pd.DataFrame:
+def geocode_df_bin(
+    df: pd.DataFrame,
+    *,
+    workers: int | None = None,
+    chunk_size: int | None = None,
+    progress_callback: engine.ProgressCallback | None = engine.log_progress,
+) -> pd.DataFrame:
     print("geocoding begins here ...")
-    df = df.apply(get_bbl, axis=1, result_type="expand")
+    df = engine.geocode_df(
+        df,
+        get_bbl,
+        input_columns=["bin"],
+        workers=workers,
+        chunk_size=chunk_size,
+        progress_callback=progress_callback,
+    )
     print("geocoding finished ...")
     return df
 
@@ -44,6 +51,7 @@ def geocode_df_bin(df: pd.DataFrame) -> pd.DataFrame:
 
 
 def get_address(bbl):
+    g = _gw.geosupport
     try:
         geo = g["BL"](bbl=bbl)
         addresses = geo.get("LIST OF GEOGRAPHIC IDENTIFIERS", "")
@@ -69,6 +77,7 @@ def get_address(bbl):
 
 
 def get_sname(b5sc):
+    g = _gw.geosupport
     try:
         geo = g["D"](B5SC=b5sc)
         return geo.get("First Street Name Normalized", "")
@@ -77,6 +86,7 @@ def get_sname(b5sc):
 
 
 def geocode(record):
+    g = _gw.geosupport
     boro = record["boro"]
     block = record["block"]
     lot = record["lot"]
@@ -161,9 +171,22 @@ def parse_output(geo):
     )
 
 
-def geocode_df_bbl(df: pd.DataFrame) -> pd.DataFrame:
+def geocode_df_bbl(
+    df: pd.DataFrame,
+    *,
+    workers: int | None = None,
+    chunk_size: int | None = None,
+    progress_callback: engine.ProgressCallback | None = engine.log_progress,
+) -> pd.DataFrame:
     print("geocoding begins here ...")
-    df = df.apply(geocode, axis=1, result_type="expand")
+    df = engine.geocode_df(
+        df,
+        geocode,
+        input_columns=["boro", "block", "lot"],
+        workers=workers,
+        chunk_size=chunk_size,
+        progress_callback=progress_callback,
+    )
     print("geocoding finished ...")
     return df
 
@@ -194,6 +217,7 @@ def _split_address(address: str) -> tuple[str, str]:
 def get_address_geocode(inputs):
     """Geocodes a street address via Geosupport functions 1A/1E, using ZIP Code in
     place of Borough Code (both are valid inputs; a ZIP Code is what we have)."""
+    g = _gw.geosupport
     house_number, street_name = _split_address(inputs["address"])
     zip_code = inputs["zip"]
     try:
@@ -219,15 +243,22 @@ def get_address_geocode(inputs):
 
 
 def geocode_df_address(
-    df: pd.DataFrame, address_column: str = "address1", zip_column: str = "zip5"
+    df: pd.DataFrame,
+    address_column: str = "address1",
+    zip_column: str = "zip5",
+    *,
+    workers: int | None = None,
+    chunk_size: int | None = None,
+    progress_callback: engine.ProgressCallback | None = engine.log_progress,
 ) -> pd.DataFrame:
     print("geocoding begins here ...")
-    geocoded = df.apply(
-        lambda row: get_address_geocode(
-            {"address": row[address_column], "zip": row[zip_column]}
-        ),
-        axis=1,
-        result_type="expand",
+    inputs = df[[address_column, zip_column]].set_axis(["address", "zip"], axis=1)
+    geocoded = engine.geocode_df(
+        inputs,
+        get_address_geocode,
+        workers=workers,
+        chunk_size=chunk_size,
+        progress_callback=progress_callback,
     )
     print("geocoding finished ...")
     return geocoded
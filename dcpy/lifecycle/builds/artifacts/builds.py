@@ -261,26 +261,15 @@ def read_parquet(product: str, build: str, filepath: str, **kwargs) -> pd.DataFr
         product: Product name
         build: Build name
         filepath: Path to Parquet file within the build
-        **kwargs: Additional arguments passed to pd.read_parquet()
+        **kwargs: Additional arguments passed to pd.read_parquet(). Only the file's
+            footer and the column chunks read are fetched, so pass `columns` to read
+            some of the columns, and `filters` to skip row groups by their statistics
 
     Returns:
         DataFrame containing the Parquet data
     """
-    connector = get_builds_default_connector()
-    with tempfile.NamedTemporaryFile(suffix=".parquet", delete=False) as tmp:
-        tmp_path = Path(tmp.name)
-
-    try:
-        result = connector.pull_versioned(
-            key=product,
-            version=build,
-            filepath=filepath,
-            destination_path=tmp_path,
-        )
-        return pd.read_parquet(result["path"], **kwargs)
-    finally:
-        if tmp_path.exists():
-            tmp_path.unlink()
+    with get_builds_default_connector().open_versioned(product, build, filepath) as f:
+        return pd.read_parquet(f, **kwargs)
 
 
 def get_file(product: str, build: str, filepath: str) -> bytes:
@@ -393,9 +382,7 @@ def get_zip(product: str, build: str, filepath: str) -> ZipFile:
         filepath: Path to zip file within the build
 
     Returns:
-        ZipFile object
+        ZipFile object, whose members are fetched as they are read. Close it (or use
+        it as a context manager) to close the underlying file
     """
-    file_bytes = get_file(product, build, filepath)
-    from io import BytesIO
-
-    return ZipFile(BytesIO(file_bytes))
+    return get_builds_default_connector().open_zip_versioned(product, build, filepath)
@@ -222,28 +222,18 @@ def read_parquet(
         version: Version string (e.g., "24v1")
         revision: Revision string (e.g., "1-my-draft")
         filepath: Path to Parquet file within the draft
-        **kwargs: Additional arguments passed to pd.read_parquet()
+        **kwargs: Additional arguments passed to pd.read_parquet(). Only the file's
+            footer and the column chunks read are fetched, so pass `columns` to read
+            some of the columns, and `filters` to skip row groups by their statistics
 
     Returns:
         DataFrame containing the Parquet data
     """
-    connector = get_drafts_default_connector()
     full_version = f"{version}.{revision}"
-
-    with tempfile.NamedTemporaryFile(suffix=".parquet", delete=False) as tmp:
-        tmp_path = Path(tmp.name)
-
-    try:
-        result = connector.pull_versioned(
-            key=product,
-            version=full_version,
-            filepath=filepath,
-            destination_path=tmp_path,
-        )
-        return pd.read_parquet(result["path"], **kwargs)
-    finally:
-        if tmp_path.exists():
-            tmp_path.unlink()
+    with get_drafts_default_connector().open_versioned(
+        product, full_version, filepath
+    ) as f:
+        return pd.read_parquet(f, **kwargs)
 
 
 def get_file(product: str, version: str, revision: str, filepath: str) -> bytes:
@@ -333,9 +323,10 @@ def get_zip(product: str, version: str, revision: str, filepath: str) -> ZipFile
         filepath: Path to zip file within the draft
 
     Returns:
-        ZipFile object
+        ZipFile object, whose members are fetched as they are read. Close it (or use
+        it as a context manager) to close the underlying file
     """
-    file_bytes = get_file(product, version, revision, filepath)
-    from io import BytesIO
-
-    return ZipFile(BytesIO(file_bytes))
+    full_version = f"{version}.{revision}"
+    return get_drafts_default_connector().open_zip_versioned(
+        product, full_version, filepath
+    )
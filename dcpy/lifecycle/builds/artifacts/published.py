@@ -413,26 +413,17 @@ def read_parquet(product: str, version: str, filepath: str, **kwargs) -> pd.Data
         product: Product name
         version: Version string
         filepath: Path to Parquet file within the version
-        **kwargs: Additional arguments passed to pd.read_parquet()
+        **kwargs: Additional arguments passed to pd.read_parquet(). Only the file's
+            footer and the column chunks read are fetched, so pass `columns` to read
+            some of the columns, and `filters` to skip row groups by their statistics
 
     Returns:
         DataFrame containing the Parquet data
     """
-    connector = get_published_default_connector()
-    with tempfile.NamedTemporaryFile(suffix=".parquet", delete=False) as tmp:
-        tmp_path = Path(tmp.name)
-
-    try:
-        result = connector.pull_versioned(
-            key=product,
-            version=version,
-            filepath=filepath,
-            destination_path=tmp_path,
-        )
-        return pd.read_parquet(result["path"], **kwargs)
-    finally:
-        if tmp_path.exists():
-            tmp_path.unlink()
+    with get_published_default_connector().open_versioned(
+        product, version, filepath
+    ) as f:
+        return pd.read_parquet(f, **kwargs)
 
 
 def get_file(product: str, version: str, filepath: str) -> bytes:
@@ -495,12 +486,12 @@ def get_zip(product: str, version: str, filepath: str) -> ZipFile:
         filepath: Path to zip file within the version
 
     Returns:
-        ZipFile object
+        ZipFile object, whose members are fetched as they are read. Close it (or use
+        it as a context manager) to close the underlying file
     """
-    file_bytes = get_file(product, version, filepath)
-    from io import BytesIO
-
-    return ZipFile(BytesIO(file_bytes))
+    return get_published_default_connector().open_zip_versioned(
+        product, version, filepath
+    )
 
 
 def get_filenames(product: str, version: str) -> list[str]:
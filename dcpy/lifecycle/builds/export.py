@@ -1,7 +1,9 @@
+import re
 import shutil
 import subprocess
 import tempfile
 from collections import defaultdict
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Literal
 
@@ -29,6 +31,11 @@ from dcpy.utils.logging import logger
 _POINT_TYPES = ["Point", "MultiPoint"]
 _POLYGON_TYPES = ["Polygon", "MultiPolygon"]
 _LINE_TYPES = ["LineString", "MultiLineString"]
+_GEOMETRY_TYPE_FILTERS = {
+    "points": _POINT_TYPES,
+    "polygons": _POLYGON_TYPES,
+    "lines": _LINE_TYPES,
+}
 
 
 def export_dataset_from_postgres(
@@ -61,16 +68,8 @@ def export_dataset_from_postgres(
 
             line_endings = "crlf"
         case ExportFormat.parquet:
-            df = pg_client.read_table_df(table_name)
-            # Convert geometry columns (WKBElement) to WKT strings for parquet compatibility
-            from geoalchemy2.elements import WKBElement
-
-            for col in df.columns:
-                if len(df) > 0 and isinstance(df[col].iloc[0], WKBElement):
-                    # Convert WKBElement to WKT string
-                    df[col] = df[col].apply(lambda x: x.desc if x is not None else None)
-            df.to_parquet(file_path, index=False)
-        case ExportFormat.shapefile | ExportFormat.gdb:
+            pg_client.export_to_parquet(table_name=table_name, output_path=file_path)
+        case ExportFormat.shapefile | ExportFormat.gdb | ExportFormat.geojson:
             export_geodataset_from_postgres(
                 table_name=table_name,
                 file_path=file_path,
@@ -120,6 +119,14 @@ def export_dataset_from_duckdb(
             duckdb_client.export_to_parquet(
                 table_name=table_name, output_path=file_path
             )
+        case ExportFormat.shapefile | ExportFormat.gdb | ExportFormat.geojson:
+            export_geodataset_from_duckdb(
+                table_name=table_name,
+                file_path=file_path,
+                format=format,
+                duckdb_client=duckdb_client,
+                **kwargs,
+            )
         case _:
             raise NotImplementedError(
                 f"Export of dataset format {format} from DuckDB not implemented yet"
@@ -142,7 +149,8 @@ def export_geodataset_from_postgres(
     geometry_type: str | None = None,  # "points" | "polygons" | None (no filter)
     layer: str | None = None,
 ) -> None:
-    """Export a geospatial table from postgres as a zipped shapefile or FGDB."""
+    """Export a geospatial table from postgres as a zipped shapefile or FGDB, or as
+    GeoJSON."""
     logger.info(
         f"Exporting geospatial table {table_name} to {file_path} in format {format}"
     )
@@ -154,6 +162,69 @@ def export_geodataset_from_postgres(
             _write_shapefile_zip(gdf, table_name, file_path, tmp_dir)
         elif format == ExportFormat.gdb:
             _write_gdb_zip([(layer or table_name, gdf)], file_path, tmp_dir)
+        elif format == ExportFormat.geojson:
+            gdf.to_file(file_path, driver="GeoJSON")
+
+
+def export_geodataset_from_duckdb(
+    table_name: str,
+    file_path: Path,
+    format: ExportFormat,
+    duckdb_client: duckdb_utils.DuckDBClient,
+    *,
+    geom_column: str = "geom",
+    geometry_type: str | None = None,  # "points" | "polygons" | "lines" | None
+    layer: str | None = None,
+) -> None:
+    """Export a geospatial table from DuckDB as a zipped shapefile or FGDB, or as
+    GeoJSON, with the same geometry type filtering as from postgres."""
+    logger.info(
+        f"Exporting geospatial table {table_name} from DuckDB to {file_path} in format {format}"
+    )
+    with tempfile.TemporaryDirectory() as tmp_str:
+        tmp_dir = Path(tmp_str)
+        if format == ExportFormat.shapefile:
+            query, single_type = _duckdb_single_geom_type_query(
+                table_name, duckdb_client, geom_column, geometry_type
+            )
+            if single_type is None:
+                raise ValueError(
+                    f"No features to export for '{table_name}' shapefile "
+                    "(geometry_type filter returned zero rows)"
+                )
+            shapefile_dir = tmp_dir / table_name
+            shapefile_dir.mkdir()
+            duckdb_client.export_to_gdal(
+                table_name,
+                shapefile_dir / f"{table_name}.shp",
+                driver="ESRI Shapefile",
+                query=query,
+                geometry_type=single_type.upper(),
+            )
+            shutil.make_archive(str(file_path.with_suffix("")), "zip", shapefile_dir)
+        elif format == ExportFormat.gdb:
+            _write_gdb_zip_from_duckdb(
+                [
+                    _GdbLayer(
+                        name=layer or table_name,
+                        table_name=table_name,
+                        geom_column=geom_column,
+                        geometry_type=geometry_type,
+                    )
+                ],
+                file_path,
+                tmp_dir,
+                duckdb_client,
+            )
+        elif format == ExportFormat.geojson:
+            duckdb_client.export_to_gdal(
+                table_name,
+                file_path,
+                driver="GeoJSON",
+                query=_duckdb_filtered_query(
+                    table_name, duckdb_client, geom_column, geometry_type
+                ),
+            )
 
 
 def _read_filtered_gdf(
@@ -172,6 +243,61 @@ def _read_filtered_gdf(
     return gdf
 
 
+def _duckdb_filtered_query(
+    table_name: str,
+    duckdb_client: duckdb_utils.DuckDBClient,
+    geom_column: str = "geom",
+    geometry_type: str | None = None,
+) -> str:
+    """Query of a DuckDB table's rows, filtered as `_read_filtered_gdf` does."""
+    query = (
+        f"SELECT * FROM {duckdb_client.schema}.{duckdb_utils.sanitize_name(table_name)}"
+    )
+    if geometry_type in _GEOMETRY_TYPE_FILTERS:
+        # ST_GeometryType names types in upper case, e.g. MULTIPOINT
+        types = ", ".join(
+            f"'{t.upper()}'" for t in _GEOMETRY_TYPE_FILTERS[geometry_type]
+        )
+        query += f" WHERE ST_GeometryType({geom_column}) IN ({types})"
+    return query
+
+
+def _duckdb_single_geom_type_query(
+    table_name: str,
+    duckdb_client: duckdb_utils.DuckDBClient,
+    geom_column: str = "geom",
+    geometry_type: str | None = None,
+) -> tuple[str, str | None]:
+    """`_duckdb_filtered_query`, with geometries normalized to a single type as
+    `_normalize_to_single_geom_type` does. Also returns that type, e.g. "MultiPoint",
+    or None if there are no geometries."""
+    query = _duckdb_filtered_query(
+        table_name, duckdb_client, geom_column, geometry_type
+    )
+    types_set = set(
+        duckdb_client.query_to_df(
+            f"SELECT DISTINCT ST_GeometryType({geom_column})::VARCHAR AS geom_type "
+            f"FROM ({query}) WHERE {geom_column} IS NOT NULL"
+        )["geom_type"]
+    )
+    if not types_set:
+        return query, None
+    for single_type, multi_type in (_POINT_TYPES, _POLYGON_TYPES, _LINE_TYPES):
+        if types_set == {single_type.upper()}:
+            return query, single_type
+        if types_set <= {single_type.upper(), multi_type.upper()}:
+            return (
+                f"SELECT * REPLACE (ST_Multi({geom_column}) AS {geom_column}) "
+                f"FROM ({query})",
+                multi_type,
+            )
+    raise ValueError(
+        f"'{table_name}' contains geometry types from different families: "
+        f"{sorted(types_set)}. Specify geometry_type='points', 'polygons', "
+        "or 'lines' in custom."
+    )
+
+
 def _normalize_to_single_geom_type(gdf, label: str):
     """Normalize a GDF to a single geometry type within a family.
 
@@ -267,6 +393,83 @@ def _write_gdb_zip(
     )
 
 
+@dataclass
+class _GdbLayer:
+    """A table of a DuckDB build to write as a layer of an FGDB."""
+
+    name: str
+    table_name: str
+    geom_column: str = "geom"
+    geometry_type: str | None = None  # "points" | "polygons" | "lines" | None
+    allow_empty: bool = False
+
+    @classmethod
+    def from_export(cls, output: ExportDataset) -> "_GdbLayer":
+        custom = output.custom or {}
+        return cls(
+            name=custom.get("layer", output.name),
+            table_name=output.name,
+            geom_column=custom.get("geom_column", "geom"),
+            geometry_type=custom.get("geometry_type"),
+            allow_empty=bool(custom.get("allow_empty")),
+        )
+
+
+def _write_gdb_zip_from_duckdb(
+    layers: list[_GdbLayer],
+    file_path: Path,
+    tmp_dir: Path,
+    duckdb_client: duckdb_utils.DuckDBClient,
+) -> None:
+    """Write DuckDB tables as the layers of a zipped FGDB, like `_write_gdb_zip`.
+
+    DuckDB's GDAL writer can neither add a layer to an existing FGDB nor write tables
+    without geometry, so layers are streamed from DuckDB as Arrow into GDAL (through
+    pyogrio) instead, never holding a whole table in memory. Tables with a
+    `geom_column` are written as spatial layers, filtered by `geometry_type` and
+    normalized to a single geometry type; others as plain tables.
+    """
+    gdb_name = file_path.stem
+    gdb_path = tmp_dir / f"{gdb_name}.gdb"
+    for i, layer in enumerate(layers):
+        column_types = duckdb_client.get_column_types(layer.table_name)
+        write_kwargs: dict[str, Any]
+        if layer.geom_column in column_types:
+            query, single_type = _duckdb_single_geom_type_query(
+                layer.table_name,
+                duckdb_client,
+                layer.geom_column,
+                layer.geometry_type,
+            )
+            # e.g. GEOMETRY('EPSG:2263')
+            crs = re.fullmatch(r"GEOMETRY\('(.+)'\)", column_types[layer.geom_column])
+            write_kwargs = {
+                "geometry_name": layer.geom_column,
+                # An empty layer carries no geometry to infer from, so name the type.
+                "geometry_type": single_type or "MultiPolygon",
+                "crs": crs.group(1) if crs else None,
+            }
+        else:
+            query = _duckdb_filtered_query(layer.table_name, duckdb_client)
+            write_kwargs = {"geometry_name": None, "geometry_type": None}
+        is_empty = not duckdb_client.query_to_df(
+            f"SELECT EXISTS ({query}) AS has_rows"
+        ).loc[0, "has_rows"]
+        if is_empty and not layer.allow_empty:
+            raise ValueError(f"No rows to export for GDB layer '{layer.name}'")
+        pyogrio.write_arrow(
+            duckdb_client.query_to_arrow_reader(query),
+            str(gdb_path),
+            driver="OpenFileGDB",
+            layer=layer.name,
+            append=i > 0,
+            **write_kwargs,
+        )
+    shutil.make_archive(
+        str(file_path.with_suffix("")), "zip", tmp_dir, f"{gdb_name}.gdb"
+    )
+
+
 def _output_filename(output: ExportDataset) -> str:
     if output.format in (ExportFormat.shapefile, ExportFormat.gdb):
         default_ext = "zip"
@@ -297,8 +500,8 @@ def export(
         return None
 
     # A recipe's export backend follows where its input datasets actually landed. Mixed
-    # postgres+duckdb recipes fall back to postgres (the long-standing default) since gdb/
-    # shapefile export - and mixed-backend exports generally - aren't supported from DuckDB yet.
+    # postgres+duckdb recipes fall back to postgres (the long-standing default), since
+    # mixed-backend exports aren't supported.
     destinations = {ds.destination for ds in recipe.inputs.datasets}
     uses_duckdb = InputDatasetDestination.duckdb in destinations
     uses_postgres = InputDatasetDestination.postgres in destinations
@@ -381,7 +584,9 @@ def export(
 
     for output in recipe.exports.datasets:
         filename = _output_filename(output)
-        if duckdb_client is not None:
+        if output.format == ExportFormat.gdb:
+            gdb_groups[filename].append(output)
+        elif duckdb_client is not None:
             export_dataset_from_duckdb(
                 table_name=output.name,
                 file_path=dataset_files_folder / filename,
@@ -389,8 +594,6 @@ def export(
                 format=output.format,
                 **output.custom or {},
             )
-        elif output.format == ExportFormat.gdb:
-            gdb_groups[filename].append(output)
         else:
             assert pg_client is not None
             export_dataset_from_postgres(
@@ -402,6 +605,18 @@ def export(
             )
 
     for filename, gdb_entries in gdb_groups.items():
+        if duckdb_client is not None:
+            logger.info(
+                f"Writing {len(gdb_entries)} layer(s) from DuckDB to {filename}"
+            )
+            with tempfile.TemporaryDirectory() as tmp_str:
+                _write_gdb_zip_from_duckdb(
+                    [_GdbLayer.from_export(output) for output in gdb_entries],
+                    dataset_files_folder / filename,
+                    Path(tmp_str),
+                    duckdb_client,
+                )
+            continue
         assert pg_client is not None
         layers = []
         allow_empty: set[str] = set()
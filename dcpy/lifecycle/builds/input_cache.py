@@ -0,0 +1,262 @@
+"""Cache of imported build inputs, shared by builds through one postgres schema.
+
+Every cached table is keyed by a fingerprint of everything that determines its
+contents: dataset id, version, file type, load engine, loader options (`custom`), and
+preprocessor, including a hash of the preprocessor module's source. A catalog table in
+the cache schema maps fingerprints to tables, so a whole recipe is looked up in one
+query.
+
+On a miss, a dataset is imported straight into the cache schema, under a name derived
+from its fingerprint, and registered. Either way, the build then gets a view of the
+cached table (no data is copied) or its own copy of it, see `CachedEntityType`.
+
+Entries are evicted once unused for longer than a maximum age, or least recently used
+first beyond a maximum count. Tables that builds still have views of are kept.
+
+Before the catalog, a cache schema held tables named after their datasets, listed in a
+`source_data_versions` table. Those are dropped the first time the schema is used as
+an input cache (see `InputCache.drop_legacy_tables`).
+"""
+
+import hashlib
+import importlib.util
+import json
+import re
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import timedelta
+
+from psycopg2 import errorcodes
+from psycopg2.extensions import AsIs
+from sqlalchemy import exc
+
+from dcpy.lifecycle.builds.models import DataPreprocessor, InputDataset
+from dcpy.utils import postgres
+from dcpy.utils.logging import logger
+
+CATALOG_TABLE = "input_cache_catalog"
+LEGACY_VERSIONS_TABLE = "source_data_versions"
+DEFAULT_MAX_AGE = timedelta(days=30)
+DEFAULT_MAX_ENTRIES = 500
+
+# postgres truncates identifiers longer than this
+_MAX_IDENTIFIER_LENGTH = 63
+_TABLE_FINGERPRINT_LENGTH = 16
+_CACHE_TABLE_NAME = re.compile(rf"__[0-9a-f]{{{_TABLE_FINGERPRINT_LENGTH}}}$")
+
+
+def preprocessor_hash(preprocessor: DataPreprocessor | None) -> str | None:
+    """sha256 of the preprocessor's function name and module source, so that editing
+    the preprocessor invalidates what was cached with it."""
+    if preprocessor is None:
+        return None
+    digest = hashlib.sha256(f"{preprocessor.module}.{preprocessor.function}".encode())
+    spec = importlib.util.find_spec(preprocessor.module)
+    if spec is None or spec.origin is None:
+        raise ModuleNotFoundError(
+            f"Preprocessor module {preprocessor.module} not found"
+        )
+    with open(spec.origin, "rb") as f:
+        digest.update(f.read())
+    return digest.hexdigest()
+
+
+def fingerprint(ds: InputDataset) -> str:
+    assert ds.is_resolved and ds.file_type, f"Dataset {ds.id} is not resolved"
+    return hashlib.sha256(
+        json.dumps(
+            {
+                "id": ds.id,
+                "version": ds.version,
+                "file_type": ds.file_type,
+                "load_engine": ds.load_engine or "pandas",
+                # pulling a dataset adds its file type to `custom`
+                "custom": {k: v for k, v in ds.custom.items() if k != "file_type"},
+                "preprocessor": preprocessor_hash(ds.preprocessor),
+            },
+            sort_keys=True,
+            default=str,
+        ).encode()
+    ).hexdigest()
+
+
+def cache_table_name(ds: InputDataset, ds_fingerprint: str) -> str:
+    """Lowercase (as some load engines force) and short enough not to be truncated."""
+    suffix = "__" + ds_fingerprint[:_TABLE_FINGERPRINT_LENGTH]
+    prefix = (ds.import_as or ds.id).lower()[: _MAX_IDENTIFIER_LENGTH - len(suffix)]
+    return prefix + suffix
+
+
+class InputCache:
+    def __init__(self, pg_client: postgres.PostgresClient):
+        """pg_client's schema is the cache schema."""
+        self.pg_client = pg_client
+        self.schema = pg_client.schema
+        self.pg_client.execute_query(
+            """
+            CREATE TABLE IF NOT EXISTS ":schema".":catalog" (
+                fingerprint text PRIMARY KEY,
+                dataset_id text NOT NULL,
+                version text NOT NULL,
+                file_type text NOT NULL,
+                load_engine text NOT NULL,
+                preprocessor_hash text,
+                table_name text NOT NULL,
+                created_at timestamptz NOT NULL DEFAULT now(),
+                last_used_at timestamptz NOT NULL DEFAULT now()
+            );
+            """,
+            schema=AsIs(self.schema),
+            catalog=AsIs(CATALOG_TABLE),
+        )
+
+    def lookup(self, fingerprints: list[str]) -> dict[str, str]:
+        """Cached table of each fingerprint that is cached, marking them used."""
+        if not fingerprints:
+            return {}
+        hits = self.pg_client.execute_select_query(
+            """
+            UPDATE ":schema".":catalog" SET last_used_at = now()
+            WHERE fingerprint = ANY(:fingerprints)
+                AND to_regclass(format('%I.%I', :schema_name, table_name)) IS NOT NULL
+            RETURNING fingerprint, table_name
+            """,
+            schema=AsIs(self.schema),
+            catalog=AsIs(CATALOG_TABLE),
+            schema_name=self.schema,
+            fingerprints=fingerprints,
+        )
+        return dict(zip(hits["fingerprint"], hits["table_name"]))
+
+    def register(self, ds: InputDataset, ds_fingerprint: str, table_name: str) -> None:
+        self.pg_client.execute_query(
+            """
+            INSERT INTO ":schema".":catalog"
+                (fingerprint, dataset_id, version, file_type, load_engine, preprocessor_hash, table_name)
+            VALUES
+                (:fingerprint, :dataset_id, :version, :file_type, :load_engine, :preprocessor_hash, :table_name)
+            ON CONFLICT (fingerprint) DO UPDATE SET
+                table_name = excluded.table_name,
+                created_at = now(),
+                last_used_at = now()
+            """,
+            schema=AsIs(self.schema),
+            catalog=AsIs(CATALOG_TABLE),
+            fingerprint=ds_fingerprint,
+            dataset_id=ds.id,
+            version=ds.version,
+            file_type=str(ds.file_type),
+            load_engine=ds.load_engine or "pandas",
+            preprocessor_hash=preprocessor_hash(ds.preprocessor),
+            table_name=table_name,
+        )
+
+    @contextmanager
+    def populating(self, ds_fingerprint: str) -> Iterator[None]:
+        """Holds a lock on a fingerprint (across processes) while it's populated, so a
+        dataset is only imported once. Operations of the cache's client in the block
+        run on the connection holding the lock."""
+        with self.pg_client.session():
+            self.pg_client.execute_select_query(
+                "SELECT pg_advisory_lock(hashtextextended(:fingerprint, 0))",
+                fingerprint=ds_fingerprint,
+            )
+            try:
+                yield
+            finally:
+                self.pg_client.execute_select_query(
+                    "SELECT pg_advisory_unlock(hashtextextended(:fingerprint, 0))",
+                    fingerprint=ds_fingerprint,
+                )
+
+    def evict(
+        self,
+        *,
+        max_age: timedelta = DEFAULT_MAX_AGE,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        keep: set[str] | None = None,
+    ) -> list[str]:
+        """Drops entries unused for longer than max_age, then the least recently used
+        beyond max_entries. Returns the fingerprints evicted."""
+        entries = self.pg_client.execute_select_query(
+            """
+            SELECT
+                fingerprint,
+                table_name,
+                last_used_at < now() - :max_age AS expired
+            FROM ":schema".":catalog"
+            ORDER BY last_used_at DESC
+            """,
+            schema=AsIs(self.schema),
+            catalog=AsIs(CATALOG_TABLE),
+            max_age=max_age,
+        )
+        evicted = []
+        for i, (entry_fingerprint, table_name, expired) in enumerate(
+            entries.itertuples(index=False, name=None)
+        ):
+            if entry_fingerprint in (keep or set()):
+                continue
+            if not expired and i < max_entries:
+                continue
+            if not self._drop_unused(table_name):
+                continue
+            self.pg_client.execute_query(
+                'DELETE FROM ":schema".":catalog" WHERE fingerprint = :fingerprint',
+                schema=AsIs(self.schema),
+                catalog=AsIs(CATALOG_TABLE),
+                fingerprint=entry_fingerprint,
+            )
+            evicted.append(entry_fingerprint)
+        if evicted:
+            logger.info(
+                f"Evicted {len(evicted)} table(s) from input cache {self.schema}"
+            )
+        return evicted
+
+    def _drop_unused(self, table_name: str) -> bool:
+        """Drops a table of the cache schema, unless builds still have views of it.
+        Returns whether it was dropped."""
+        try:
+            # no CASCADE: views of the table in other builds' schemas must survive
+            self.pg_client.execute_query(
+                'DROP TABLE IF EXISTS ":schema".":table"',
+                schema=AsIs(self.schema),
+                table=AsIs(table_name),
+            )
+        except exc.DBAPIError as e:
+            if (
+                getattr(e.orig, "pgcode", None)
+                != errorcodes.DEPENDENT_OBJECTS_STILL_EXIST
+            ):
+                raise
+            logger.info(f"Keeping cached {table_name}, which builds still use")
+            return False
+        return True
+
+    def drop_legacy_tables(self) -> list[str]:
+        """Drops the tables of the cache schema's layout from before the catalog: one
+        per dataset, named after it, and source_data_versions listing them. Nothing
+        reads them anymore and eviction doesn't know of them.
+
+        Does nothing unless the schema has a source_data_versions table. That's dropped
+        last, once every other legacy table is, so tables builds still have views of
+        are tried again next time. Returns the tables dropped."""
+        tables = self.pg_client.get_schema_tables()
+        if LEGACY_VERSIONS_TABLE not in tables:
+            return []
+        legacy = [
+            table
+            for table in tables
+            if table not in (CATALOG_TABLE, LEGACY_VERSIONS_TABLE)
+            and not _CACHE_TABLE_NAME.search(table)
+            and not self.pg_client.is_view(table)
+        ]
+        dropped = [table for table in legacy if self._drop_unused(table)]
+        if len(dropped) == len(legacy) and self._drop_unused(LEGACY_VERSIONS_TABLE):
+            dropped.append(LEGACY_VERSIONS_TABLE)
+        logger.info(
+            f"Dropped {len(dropped)} table(s) left in input cache {self.schema} from "
+            "before its catalog"
+        )
+        return dropped
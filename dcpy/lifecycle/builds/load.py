@@ -1,4 +1,11 @@
+import json
+import threading
+import time
 from collections import defaultdict
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import AbstractContextManager, nullcontext
+from datetime import timedelta
 from enum import StrEnum
 from pathlib import Path
 
@@ -7,7 +14,7 @@ import typer
 import yaml
 
 from dcpy.lifecycle import data_loader
-from dcpy.lifecycle.builds import metadata, plan, utils
+from dcpy.lifecycle.builds import input_cache, metadata, plan, utils
 from dcpy.lifecycle.builds.models import (
     BuildMetadata,
     ImportedDataset,
@@ -23,8 +30,10 @@ LIFECYCLE_STAGE = "builds.load"
 
 
 class CachedEntityType(StrEnum):
-    view = "view"
-    copy = "copy"
+    """How a build gets a table from the input cache"""
+
+    view = "view"  # a view of the cached table: nothing copied, but read-only
+    copy = "copy"  # its own copy, which the build can modify
 
 
 def setup_build_pg_schema(pg_client: postgres.PostgresClient):
@@ -79,6 +88,122 @@ def import_dataset(
             raise Exception(f"Unsupported dataset import destination: {d}")
 
 
+# Datasets pulled (and imported) at once when loading a recipe's source data. Pulls are
+# mostly waiting on S3, so threads are enough.
+DEFAULT_LOAD_WORKERS = 8
+# Postgres imports run at once when loading a recipe's source data, each holding one
+# connection of the client's pool
+DEFAULT_PG_IMPORT_CONNECTIONS = 4
+# Duckdb imports run at once, each on its own cursor of the build's duckdb connection.
+# Each import is itself parallelized by duckdb, so this is mostly to overlap reading
+# files with loading them.
+DEFAULT_DUCKDB_IMPORTS = 2
+
+
+# keys of `custom` that don't change what's pulled: pulling a dataset adds its file type,
+# and the layer name only picks what's imported from the pulled file
+_IMPORT_ONLY_CUSTOM_KEYS = {"file_type", "layer_name"}
+
+
+def _pull_key(ds: InputDataset) -> tuple:
+    """Datasets with the same key are pulled to the same place, e.g. the layers of a
+    multi-layer source, so must only be pulled once."""
+    pull_conf = {
+        k: v for k, v in ds.custom.items() if k not in _IMPORT_ONLY_CUSTOM_KEYS
+    }
+    return (
+        ds.source,
+        ds.id,
+        ds.version,
+        ds.file_type,
+        json.dumps(pull_conf, sort_keys=True, default=str),
+    )
+
+
+def _load_datasets(
+    datasets: list[InputDataset],
+    *,
+    pg_client: postgres.PostgresClient | None,
+    duckdb_client: duckdb_utils.DuckDBClient | None,
+    use_cached: Callable[[InputDataset], bool],
+    load_cached: Callable[[InputDataset], ImportedDataset],
+    import_pulled: Callable[[InputDataset, Path], ImportedDataset],
+    max_workers: int,
+    max_pg_connections: int,
+    max_duckdb_imports: int,
+) -> list[ImportedDataset]:
+    """
+    Pulls and imports datasets concurrently, returning one ImportedDataset per dataset,
+    in order.
+
+    Each distinct dataset is pulled once, on its own thread pool, so that an import
+    waiting on its pull never holds up other pulls. Imports into postgres (and copies
+    or views of cached tables) are limited to `max_pg_connections` at a time, and
+    imports into duckdb to `max_duckdb_imports`.
+    """
+    pg_slots = threading.BoundedSemaphore(max_pg_connections)
+    duckdb_slots = threading.BoundedSemaphore(max_duckdb_imports)
+
+    def timed_pull(ds: InputDataset) -> tuple[Path, float]:
+        start = time.perf_counter()
+        file_path = data_loader.pull_dataset(ds, stage=LIFECYCLE_STAGE)
+        return file_path, time.perf_counter() - start
+
+    def load(ds: InputDataset, pull: Future | None) -> ImportedDataset:
+        if pull is None:
+            assert pg_client, "cached datasets are only used with postgres"
+            with pg_slots, pg_client.session():
+                return load_cached(ds)
+
+        file_path, pull_seconds = pull.result()
+        match ds.destination or (
+            InputDatasetDestination.postgres if pg_client else None
+        ):
+            case InputDatasetDestination.postgres:
+                limit: AbstractContextManager = pg_slots
+            case InputDatasetDestination.duckdb:
+                limit = duckdb_slots
+            case _:
+                limit = nullcontext()
+        # an import makes many small queries, so keep them on one pooled connection
+        session = (
+            pg_client.session() if pg_client and limit is pg_slots else nullcontext()
+        )
+        with limit, session:
+            start = time.perf_counter()
+            imported = import_pulled(ds, file_path)
+            import_seconds = time.perf_counter() - start
+        imported.pull_seconds = pull_seconds
+        imported.import_seconds = import_seconds
+        logger.info(
+            f"Loaded {ds.id} (pulled in {pull_seconds:.1f}s, imported in {import_seconds:.1f}s)"
+        )
+        return imported
+
+    with (
+        ThreadPoolExecutor(max_workers, thread_name_prefix="pull") as pull_executor,
+        ThreadPoolExecutor(max_workers, thread_name_prefix="import") as load_executor,
+    ):
+        pulls: dict[tuple, Future] = {}
+        loads: list[Future] = []
+        for ds in datasets:
+            if use_cached(ds):
+                pull = None
+            else:
+                key = _pull_key(ds)
+                if key not in pulls:
+                    pulls[key] = pull_executor.submit(timed_pull, ds)
+                pull = pulls[key]
+            loads.append(load_executor.submit(load, ds, pull))
+        try:
+            return [future.result() for future in loads]
+        except BaseException:
+            # don't start anything new once one dataset has failed
+            for future in [*pulls.values(), *loads]:
+                future.cancel()
+            raise
+
+
 def load_source_data_from_resolved_recipe(
     recipe_or_path: "plan.Recipe | Path",
     clear_pg_schema: bool = True,
@@ -86,7 +211,26 @@ def load_source_data_from_resolved_recipe(
     cached_entity_type: CachedEntityType | None = None,
     target_schema: str | None = None,
     _write_metadata_file: bool = True,
+    max_workers: int = DEFAULT_LOAD_WORKERS,
+    max_pg_connections: int = DEFAULT_PG_IMPORT_CONNECTIONS,
+    max_duckdb_imports: int = DEFAULT_DUCKDB_IMPORTS,
+    cache_max_age: timedelta = input_cache.DEFAULT_MAX_AGE,
+    cache_max_entries: int = input_cache.DEFAULT_MAX_ENTRIES,
 ) -> LoadResult:
+    """
+    Pull every input dataset of a resolved recipe and import it into its destination.
+
+    Datasets are pulled and imported concurrently on up to `max_workers` threads (see
+    `_load_datasets`), with at most `max_pg_connections` postgres imports and
+    `max_duckdb_imports` duckdb imports at a time. The duckdb database's settings
+    (threads, memory limit, ...) come from the environment, see `DuckDBSettings`.
+    The returned LoadResult lists datasets in recipe order regardless.
+
+    With a `cache_schema` and `cached_entity_type`, postgres inputs go through the
+    input cache in that schema (see `input_cache`): unchanged inputs aren't pulled or
+    imported again, and entries older than `cache_max_age`, or beyond
+    `cache_max_entries`, are evicted afterwards.
+    """
     import os
 
     from dcpy.lifecycle import config
@@ -127,7 +271,13 @@ def load_source_data_from_resolved_recipe(
     ]
 
     if has_postgres:
-        pg_client = postgres.PostgresClient(schema=target_schema)
+        # a connection per concurrent import, plus one for this thread's lookups.
+        # Catalog lookups (e.g. for cached tables) share one query per schema.
+        pg_client = postgres.PostgresClient(
+            schema=target_schema,
+            pool_size=max_pg_connections + 1,
+            cache_catalog=True,
+        )
         if clear_pg_schema:
             setup_build_pg_schema(pg_client)
     else:
@@ -156,54 +306,86 @@ def load_source_data_from_resolved_recipe(
     else:
         duckdb_client = None
 
-    # Fetch source data versions if caching is enabled
-    cache_source_versions_df = None
+    cache = None
+    cached_tables: dict[str, str] = {}
     if cache_schema and cached_entity_type and pg_client:
-        try:
-            cache_source_versions_df = get_source_data_versions(cache_schema)
-        except Exception:
-            logger.warning(
-                f"Could not fetch source data versions from cache schema {cache_schema}"
+        cache = input_cache.InputCache(
+            postgres.PostgresClient(
+                schema=cache_schema, pool_size=max_pg_connections + 1
             )
+        )
+        cache.drop_legacy_tables()
+        cached_tables = cache.lookup(
+            [
+                input_cache.fingerprint(ds)
+                for ds in recipe.inputs.datasets
+                if ds.destination == InputDatasetDestination.postgres
+            ]
+        )
 
-    imported_datasets: dict[str, dict[str, ImportedDataset]] = defaultdict(dict)
-    for ds in recipe.inputs.datasets:
-        # source_data_versions is keyed by dataset id, so a multi-layer source (one
-        # id imported under several `import_as` names) reports every layer as cached
-        # once any one of them is. Confirm the table is really there before using it.
-        table_name = ds.import_as or ds.id
-        use_cached = (
-            cache_schema
-            and cached_entity_type
-            and ds.destination == InputDatasetDestination.postgres
-            and cache_source_versions_df is not None
-            and dataset_exists_in_schema(ds, cache_source_versions_df)
-            and pg_client is not None
-            and pg_client.table_or_view_exists(table_name, schema=cache_schema)
+    def use_cached(ds: InputDataset) -> bool:
+        return (
+            ds.destination == InputDatasetDestination.postgres
+            and input_cache.fingerprint(ds) in cached_tables
         )
-        if not use_cached:  # business as usual. Pull data and load it.
-            file_path = data_loader.pull_dataset(ds, stage=LIFECYCLE_STAGE)
-            imported_datasets[ds.id][str(ds.version)] = import_dataset(
-                ds, file_path, pg_client, duckdb_client
-            )
+
+    def share_cached(ds: InputDataset, cache_table: str) -> ImportedDataset:
+        assert pg_client and cache_schema
+        table_name = ds.import_as or ds.id
+        if cached_entity_type == CachedEntityType.view:
+            pg_client.create_view(table_name, cache_schema, from_table_name=cache_table)
         else:
-            assert pg_client and cache_schema
-            logger.info(
-                f"Dataset {ds.dataset} version {ds.version} exists in schema {cache_schema}"
-            )
-            imported_datasets[ds.id][str(ds.version)] = ImportedDataset.from_input(
-                ds, table_name
-            )
-            if cached_entity_type == CachedEntityType.view:
-                pg_client.create_view(table_name, cache_schema)
-                logger.info(
-                    f"Created a view of {cache_schema}.{table_name} -> {target_schema}.{table_name}"
-                )
-            else:
-                pg_client.copy_table(table_name, cache_schema)
-                logger.info(
-                    f"Copied {cache_schema}.{table_name} -> {target_schema}.{table_name}"
+            pg_client.copy_table(cache_table, cache_schema, table_name=table_name)
+        return ImportedDataset.from_input(ds, table_name)
+
+    def load_cached(ds: InputDataset) -> ImportedDataset:
+        logger.info(
+            f"Dataset {ds.dataset} version {ds.version} exists in input cache {cache_schema}"
+        )
+        return share_cached(ds, cached_tables[input_cache.fingerprint(ds)])
+
+    def import_pulled(ds: InputDataset, file_path: Path) -> ImportedDataset:
+        if cache is None or ds.destination != InputDatasetDestination.postgres:
+            return import_dataset(ds, file_path, pg_client, duckdb_client)
+        # import into the cache, so later builds can reuse the table
+        ds_fingerprint = input_cache.fingerprint(ds)
+        with cache.populating(ds_fingerprint):
+            # another build may have imported it since it was looked up
+            cache_table = cache.lookup([ds_fingerprint]).get(ds_fingerprint)
+            if cache_table is None:
+                cache_table = input_cache.cache_table_name(ds, ds_fingerprint)
+                import_dataset(
+                    ds.model_copy(update={"import_as": cache_table}),
+                    file_path,
+                    cache.pg_client,
                 )
+                cache.register(ds, ds_fingerprint, cache_table)
+        return share_cached(ds, cache_table)
+
+    imported = _load_datasets(
+        recipe.inputs.datasets,
+        pg_client=pg_client,
+        duckdb_client=duckdb_client,
+        use_cached=use_cached,
+        load_cached=load_cached,
+        import_pulled=import_pulled,
+        max_workers=max_workers,
+        max_pg_connections=max_pg_connections,
+        max_duckdb_imports=max_duckdb_imports,
+    )
+    if cache is not None:
+        cache.evict(
+            max_age=cache_max_age,
+            max_entries=cache_max_entries,
+            keep={
+                input_cache.fingerprint(ds)
+                for ds in recipe.inputs.datasets
+                if ds.destination == InputDatasetDestination.postgres
+            },
+        )
+    imported_datasets: dict[str, dict[str, ImportedDataset]] = defaultdict(dict)
+    for ds, imported_dataset in zip(recipe.inputs.datasets, imported):
+        imported_datasets[ds.id][str(ds.version)] = imported_dataset
 
     if has_postgres and recipe_lock_path:
         pg_client.create_table_from_csv(  # type: ignore
@@ -222,35 +404,6 @@ def load_source_data_from_resolved_recipe(
     return load_result
 
 
-def dataset_exists_in_schema(
-    ds: InputDataset, source_versions_df: pd.DataFrame
-) -> bool:
-    """Check if a dataset with specific version exists in the source_data_versions DataFrame."""
-    try:
-        logger.info(
-            f"Checking if dataset {ds.id} version {ds.version} file-type {ds.file_type} exists in cache"
-        )
-        # Check if this dataset id and version combination exists
-        matching_datasets = source_versions_df[
-            (source_versions_df["schema_name"] == ds.id)
-            & (source_versions_df["v"] == ds.version)
-            & (source_versions_df["file_type"] == ds.file_type)
-        ]
-        return len(matching_datasets) > 0
-    except Exception:
-        return False
-
-
-def get_source_data_versions(schema_name: str) -> pd.DataFrame:
-    """Get source data versions from the specified schema.
-
-    Returns DataFrame with columns: schema_name, v, file_type
-    """
-    return postgres.PostgresClient(schema=schema_name).execute_select_query(
-        "SELECT * FROM source_data_versions"
-    )
-
-
 def get_imported_df(
     load_result: LoadResult, ds_id: str, version: str = ""
 ) -> pd.DataFrame:
@@ -348,7 +501,11 @@ def _cli_wrapper_load(
         None,
         "--cache-schema",
         "-c",
-        help="Schema name to use for caching existing datasets",
+        help=(
+            "Schema of the input cache, shared by builds to reuse imported datasets. "
+            "Tables cached in it by earlier versions, listed in its "
+            "source_data_versions table, are dropped"
+        ),
     ),
     cached_entity_type: CachedEntityType = typer.Option(
         None,
@@ -356,6 +513,32 @@ def _cli_wrapper_load(
         "-t",
         help="How to cache datasets: 'view' creates views (read-only), 'copy' creates table copies (modifiable)",
     ),
+    max_workers: int = typer.Option(
+        DEFAULT_LOAD_WORKERS,
+        "--workers",
+        "-w",
+        help="Number of datasets to pull and import at once",
+    ),
+    max_pg_connections: int = typer.Option(
+        DEFAULT_PG_IMPORT_CONNECTIONS,
+        "--pg-connections",
+        help="Number of datasets to import into postgres at once",
+    ),
+    max_duckdb_imports: int = typer.Option(
+        DEFAULT_DUCKDB_IMPORTS,
+        "--duckdb-imports",
+        help="Number of datasets to import into duckdb at once",
+    ),
+    cache_max_age_days: int = typer.Option(
+        input_cache.DEFAULT_MAX_AGE.days,
+        "--cache-max-age-days",
+        help="Evict cached datasets unused for this many days",
+    ),
+    cache_max_entries: int = typer.Option(
+        input_cache.DEFAULT_MAX_ENTRIES,
+        "--cache-max-entries",
+        help="Evict the least recently used cached datasets beyond this many",
+    ),
 ):
     print(f"clearing schema? {clear_pg_schema}")
     recipe_lock_path = recipe_lock_path or (
@@ -366,6 +549,11 @@ def _cli_wrapper_load(
         clear_pg_schema=clear_pg_schema,
         cache_schema=cache_schema,
         cached_entity_type=cached_entity_type,
+        max_workers=max_workers,
+        max_pg_connections=max_pg_connections,
+        max_duckdb_imports=max_duckdb_imports,
+        cache_max_age=timedelta(days=cache_max_age_days),
+        cache_max_entries=cache_max_entries,
     )
 
 
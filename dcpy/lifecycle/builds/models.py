@@ -21,6 +21,9 @@ class RecipeInputsVersionStrategy(StrEnum):
 class DataPreprocessor(BaseModel, extra="forbid"):
     module: str
     function: str
+    # The function transforms each row independently of the others, so a dataset can be
+    # streamed through it in batches rather than loaded into memory all at once.
+    batch_safe: bool = False
 
 
 class InputDatasetDestination(StrEnum):
@@ -81,6 +84,7 @@ class ExportFormat(StrEnum):
     shapefile = "shp"
     gdb = "gdb"
     dat = "dat"
+    geojson = "geojson"
 
 
 class ExportDataset(BaseModel, extra="forbid"):
@@ -207,6 +211,10 @@ class ImportedDataset(BaseModel, extra="forbid", arbitrary_types_allowed=True):
     file_type: recipes.DatasetType
     destination: str | pd.DataFrame | Path
     destination_type: InputDatasetDestination | None = None
+    # wall time spent pulling the dataset (shared by every layer pulled together) and
+    # importing it into its destination, when loaded by `load_source_data_from_resolved_recipe`
+    pull_seconds: float | None = None
+    import_seconds: float | None = None
 
     @staticmethod
     def from_input(
@@ -232,6 +240,10 @@ class ImportedDataset(BaseModel, extra="forbid", arbitrary_types_allowed=True):
             "destination": self.destination
             if type(self.destination) is not pd.DataFrame
             else "dataframe",
+        } | {
+            timing: getattr(self, timing)
+            for timing in ("pull_seconds", "import_seconds")
+            if getattr(self, timing) is not None
         }
 
 
@@ -5,6 +5,9 @@ from pathlib import Path
 from dcpy import configuration
 from dcpy.utils.logging import logger
 
+# Disk budget for the machine-wide cache of pulled datasets (see dcpy.lifecycle.pull_cache)
+DEFAULT_PULL_CACHE_MAX_BYTES = 20 * 2**30
+
 
 def _set_default_conf():
     ## the default is a little sparse at the moment, and a little duplicative
@@ -22,6 +25,12 @@ def _set_default_conf():
             else None
         },
         "local_data_path": data_path,
+        "pull_cache": {
+            "local_data_path": "cache/pulls",
+            "max_bytes": int(
+                env.get("DCPY_PULL_CACHE_MAX_BYTES", DEFAULT_PULL_CACHE_MAX_BYTES)
+            ),
+        },
         "stages": {
             "ingest": {
                 "local_data_path": "ingest",
@@ -2,17 +2,20 @@ import importlib
 import json
 import os
 import subprocess
+from collections.abc import Callable
 from pathlib import Path
 
+import geopandas as gpd
 import pandas as pd
 import typer
+from pydantic import TypeAdapter
 
 from dcpy.connectors.edm.models import DatasetType
-from dcpy.lifecycle import config
+from dcpy.lifecycle import config, pull_cache
 from dcpy.lifecycle.builds.models import InputDataset
 from dcpy.lifecycle.connector_registry import connectors
 from dcpy.utils import duckdb as duckdb_utils
-from dcpy.utils import postgres
+from dcpy.utils import postgres, schema
 from dcpy.utils.geospatial import parquet as geoparquet
 from dcpy.utils.logging import logger
 
@@ -36,12 +39,35 @@ def pull_dataset(
     conn_sub_path = connector.get_pull_local_sub_path(
         key=ds.id, version=ds.version, pull_conf=ds.custom
     )
+    destination_path = dest_dir_override or stage_path / conn_sub_path
+
+    # only pulls that can be revalidated against their source are cached
+    cache = pull_cache.open_cache()
+    etag = (
+        connector.get_pull_etag(key=ds.id, version=ds.version, **ds.custom)
+        if cache
+        else None
+    )
+    if cache and etag:
+        cache_key = pull_cache.PullKey(
+            connector=ds.source,
+            dataset_id=ds.id,
+            version=ds.version,
+            file_type=str(ds.file_type),
+        )
+        cached_path = cache.get(cache_key, destination_path, etag=etag)
+        if cached_path:
+            logger.info(f"Pulled {ds.id} from the local cache to {cached_path}.")
+            return cached_path.absolute()
+
     pull_res = connector.pull(
         key=ds.id,
         version=ds.version,
-        destination_path=dest_dir_override or stage_path / conn_sub_path,
+        destination_path=destination_path,
         **ds.custom,
     )
+    if cache and etag:
+        cache.put(cache_key, pull_res["path"], destination_path, etag=etag)
     logger.info(f"Pulled {ds.id} to {pull_res['path']}.")
     return pull_res["path"].absolute()
 
@@ -66,13 +92,19 @@ def _get_preprocessor(ds: InputDataset):
 PARQUET_LOAD_BATCH_SIZE = 100_000
 
 
+def _sanitize_column(column: str) -> str:
+    return column.strip().replace("-", "_").replace("'", "_").replace(" ", "_")
+
+
 def _sanitize_columns(df: pd.DataFrame) -> pd.DataFrame:
     """Rename columns to be more sql-friendly."""
+    if isinstance(df, gpd.GeoDataFrame) and df.active_geometry_name is not None:
+        # a plain rename would leave the frame without an active geometry column
+        geometry = _sanitize_column(df.active_geometry_name)
+        if geometry != df.active_geometry_name:
+            df = df.rename_geometry(geometry)
     return df.rename(
-        columns={
-            column: column.strip().replace("-", "_").replace("'", "_").replace(" ", "_")
-            for column in df.columns
-        }
+        columns={column: _sanitize_column(column) for column in df.columns}
     )
 
 
@@ -94,25 +126,79 @@ def _load_parquet_chunked(
     ds_table_name: str,
     pg_client: postgres.PostgresClient,
     include_ogc_fid_col: bool = True,
+    *,
+    preprocess: Callable[[pd.DataFrame], pd.DataFrame] | None = None,
 ):
     """Stream a parquet file into Postgres in batches, never holding it all in memory.
 
-    Only safe for plain (non-geo, un-preprocessed) parquet — see load_dataset_into_pg
-    for why the preprocessor / geoparquet cases still read the whole frame.
+    Batches of a geoparquet file are GeoDataFrames, and geometry columns are created
+    with the geometry types of the whole file, so that every batch fits them.
+    `preprocess` is applied to each batch, so must be batch-safe (see
+    DataPreprocessor.batch_safe).
     """
+    geometry_types = (
+        {
+            _sanitize_column(column): geometry_type
+            for column, geometry_type in geoparquet.geometry_types(
+                local_dataset_path
+            ).items()
+        }
+        if geoparquet.is_geoparquet(local_dataset_path)
+        else None
+    )
     for i, batch in enumerate(
         geoparquet.iter_batches_df(local_dataset_path, PARQUET_LOAD_BATCH_SIZE)
     ):
+        if preprocess:
+            batch = preprocess(batch)
         pg_client.insert_dataframe(
             _sanitize_columns(batch),
             ds_table_name,
             if_exists="replace" if i == 0 else "append",
+            geometry_types=geometry_types,
         )
 
     if include_ogc_fid_col:
         pg_client.add_pk(ds_table_name, "ogc_fid")
 
 
+def _load_via_duckdb(
+    local_dataset_path: Path,
+    file_type: DatasetType | None,
+    ds_table_name: str,
+    pg_client: postgres.PostgresClient,
+    include_ogc_fid_col: bool = True,
+):
+    """Load a csv or (geo)parquet file without materializing it in Python: DuckDB
+    copies the rows straight into Postgres, then geometry columns are converted from
+    WKB with the type and SRID recorded in the file's geoparquet metadata."""
+    if file_type != DatasetType.csv and file_type != DatasetType.parquet:
+        raise Exception(f"Invalid file_type for the duckdb engine: {file_type}")
+    pg_client.drop_table(ds_table_name)
+    duckdb_utils.copy_file_to_postgres(
+        local_dataset_path,
+        file_format=file_type.value,
+        engine_uri=pg_client.engine_uri,
+        schema=pg_client.schema,
+        table_name=ds_table_name,
+        rename_column=_sanitize_column,
+    )
+
+    if file_type == DatasetType.parquet and geoparquet.is_geoparquet(
+        local_dataset_path
+    ):
+        srids = geoparquet.geometry_srids(local_dataset_path)
+        for column, geometry_type in geoparquet.geometry_types(
+            local_dataset_path
+        ).items():
+            pg_client.wkb_to_geometry(
+                ds_table_name, _sanitize_column(column), geometry_type, srids[column]
+            )
+
+    if include_ogc_fid_col:
+        pg_client.add_pk(ds_table_name, "ogc_fid")
+
+
 def load_dataset_into_pg(
     ds: InputDataset,
     pg_client: postgres.PostgresClient,
@@ -161,21 +247,37 @@ def load_dataset_into_pg(
             # process = subprocess.list2cmdline(command)
             # print(f"Command to be executed (list): {process}")
             subprocess.check_call(command, shell=True)
+        case "duckdb", _:
+            if has_preprocessor:
+                raise Exception(
+                    f"Cannot load {ds.id} with the duckdb engine: preprocessors need the pandas engine."
+                )
+            _load_via_duckdb(
+                local_dataset_path,
+                ds.file_type,
+                ds_table_name,
+                pg_client,
+                include_ogc_fid_col,
+            )
         case "pandas", DatasetType.csv:
             raw_df = pd.read_csv(local_dataset_path, dtype=str)
             df = preprocessor(ds.id, raw_df) if has_preprocessor else raw_df
             _load_df(df, ds_table_name, pg_client, include_ogc_fid_col)
         case "pandas", DatasetType.parquet:
-            # A preprocessor may need the whole frame, and geoparquet needs geometry
-            # reconstructed into a GeoDataFrame — neither is safe to stream in batches.
-            # The plain path streams to keep large files off the runner's memory.
-            if has_preprocessor or geoparquet.is_geoparquet(local_dataset_path):
-                raw_df = geoparquet.read_df(local_dataset_path)
-                df = preprocessor(ds.id, raw_df) if has_preprocessor else raw_df
+            # Streamed in batches to keep large files off the runner's memory, unless
+            # a preprocessor needs the whole frame.
+            if ds.preprocessor and not ds.preprocessor.batch_safe:
+                df = preprocessor(ds.id, geoparquet.read_df(local_dataset_path))
                 _load_df(df, ds_table_name, pg_client, include_ogc_fid_col)
             else:
                 _load_parquet_chunked(
-                    local_dataset_path, ds_table_name, pg_client, include_ogc_fid_col
+                    local_dataset_path,
+                    ds_table_name,
+                    pg_client,
+                    include_ogc_fid_col,
+                    preprocess=(lambda df: preprocessor(ds.id, df))
+                    if has_preprocessor
+                    else None,
                 )
         case "pandas", DatasetType.json:
             with open(local_dataset_path, "r") as json_file:
@@ -203,6 +305,18 @@ def load_dataset_into_pg(
     return f"{pg_client.schema}.{ds_table_name}"
 
 
+def _duckdb_csv_column_types(ds: InputDataset) -> dict[str, str] | None:
+    """DuckDB types of a csv dataset's columns, from its schema in `custom.columns`
+    (a list of dcpy.utils.schema.Column), if it has one."""
+    if "columns" not in ds.custom:
+        return None
+    columns = TypeAdapter(list[schema.Column]).validate_python(ds.custom["columns"])
+    return {
+        column.id: duckdb_utils.CSV_COLUMN_TYPES[column.data_type or "text"]
+        for column in columns
+    }
+
+
 def load_dataset_into_duckdb(
     ds: InputDataset,
     duckdb_client: duckdb_utils.DuckDBClient,
@@ -223,6 +337,8 @@ def load_dataset_into_duckdb(
     ds_table_name = ds.import_as or ds.id
 
     # If the path is a directory and custom.filename is specified, append the filename
+    # (which may be a glob of parquet files). Otherwise a directory of parquet files is
+    # loaded whole.
     if local_dataset_path.is_dir() and ds.custom and "filename" in ds.custom:
         local_dataset_path = local_dataset_path / ds.custom["filename"]
         logger.info(
@@ -232,7 +348,10 @@ def load_dataset_into_duckdb(
     match ds.file_type:
         case DatasetType.csv:
             duckdb_client.load_csv(
-                local_dataset_path, ds_table_name, include_ogc_fid_col
+                local_dataset_path,
+                ds_table_name,
+                include_ogc_fid_col,
+                column_types=_duckdb_csv_column_types(ds),
             )
         case DatasetType.parquet:
             duckdb_client.load_parquet(
@@ -0,0 +1,559 @@
+"""DuckDB execution engine for ingest processing steps.
+
+With `processing_engine: duckdb`, a template's processing steps run as DuckDB queries
+over the init parquet file rather than on a dataframe held in memory. DuckDB runs
+them on all cores and spills to disk when a dataset doesn't fit in memory, and
+geometry columns pass through untouched as native GEOMETRY values (crs included).
+
+Steps with a SQL equivalent (see `SqlProcessingFunctions`) each materialize a new
+table. Anything else (python_script, pd_series_func, geocoding, reprojection, ...)
+falls back to pandas: the current table is read into a dataframe and the step is run
+by `ProcessingFunctions`. Either way, a step's ProcessingSummary matches the one the
+pandas engine produces.
+"""
+
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Literal
+
+import duckdb  # type: ignore
+import pandas as pd
+
+from dcpy.lifecycle.ingest.models import ProcessingStep, ProcessingSummary
+from dcpy.lifecycle.ingest.transform import (
+    ProcessingFunctions,
+    _log_summary,
+    _run_step,
+    make_change_stats,
+)
+from dcpy.utils.geospatial import parquet as geoparquet
+from dcpy.utils.logging import logger
+
+SQL_STEPS = {
+    "filter_rows",
+    "filter_columns",
+    "rename_columns",
+    "clean_column_names",
+    "update_column",
+    "deduplicate",
+    "sort",
+    "groupby",
+    "strip_columns",
+    "coerce_column_types",
+    "drop_columns",
+}
+
+# pandas aggregation -> DuckDB aggregate. Pandas skips nulls, as do these
+_AGGREGATES = {
+    "sum": "coalesce(sum({0}), 0)",
+    "mean": "avg({0})",
+    "median": "median({0})",
+    "min": "min({0})",
+    "max": "max({0})",
+    "count": "count({0})",
+    "nunique": "count(DISTINCT {0})",
+}
+_NUMERIC_AGGREGATES = {"sum", "mean", "median"}
+
+_INTEGER_TYPES = {
+    "TINYINT",
+    "SMALLINT",
+    "INTEGER",
+    "BIGINT",
+    "HUGEINT",
+    "UTINYINT",
+    "USMALLINT",
+    "UINTEGER",
+    "UBIGINT",
+}
+_FLOAT_TYPES = {"FLOAT", "DOUBLE"}
+_TIMESTAMP_TYPES = {"TIMESTAMP", "TIMESTAMP_S", "TIMESTAMP_MS", "TIMESTAMP_NS"}
+
+# dtypes pandas' coerce_column_types produces that don't survive a parquet round trip
+_PANDAS_INTEGER_DTYPES = {"integer": "Int32", "bigint": "Int64"}
+_SQL_INTEGER_TYPES = {"integer": "INTEGER", "bigint": "BIGINT"}
+
+# whitespace as defined by python's str.strip
+_WHITESPACE = r"[\s\v\x1c-\x1f\x85\pZ]"
+_STRIP_PATTERN = f"^{_WHITESPACE}+|{_WHITESPACE}+$"
+
+_ROW_ID = "__row_id"
+
+
+def _quote(name: str | int) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _literal(val: str | int | float | bool | None) -> str:
+    if val is None:
+        return "NULL"
+    if isinstance(val, bool):
+        return "TRUE" if val else "FALSE"
+    if isinstance(val, int):
+        return f"CAST({val} AS BIGINT)"
+    if isinstance(val, float):
+        return f"CAST('{val!r}' AS DOUBLE)"
+    return "'" + str(val).replace("'", "''") + "'"
+
+
+def _order_by(columns: list[str], ascending: bool | list[bool]) -> list[str]:
+    """ORDER BY terms matching pandas' sort_values, which puts nulls last either way."""
+    if isinstance(ascending, bool):
+        ascending = [ascending] * len(columns)
+    return [
+        f"{_quote(c)} {'ASC' if asc else 'DESC'} NULLS LAST"
+        for c, asc in zip(columns, ascending)
+    ]
+
+
+def _is_numeric(sql_type: str) -> bool:
+    return (
+        sql_type in _INTEGER_TYPES
+        or sql_type in _FLOAT_TYPES
+        or sql_type.startswith("DECIMAL")
+    )
+
+
+class SqlProcessingFunctions:
+    """SQL equivalents of `ProcessingFunctions` steps.
+
+    Each step replaces the current table with a new one holding its result, and
+    returns the same summary as its `ProcessingFunctions` counterpart. Tables are
+    created in row order, so a table's `rowid` is its row position.
+    """
+
+    def __init__(self, conn: duckdb.DuckDBPyConnection):
+        self.conn = conn
+        self.table = ""
+        self._tables_created = 0
+
+    def load(self, path: Path) -> None:
+        self._replace(f"SELECT * FROM read_parquet('{path}')")
+
+    def write(self, path: Path) -> None:
+        self.conn.execute(f"COPY {self.table} TO '{path}' (FORMAT PARQUET)")
+
+    def _replace(self, query: str) -> None:
+        table = f"step_{self._tables_created}"
+        self._tables_created += 1
+        self.conn.execute(f"CREATE TABLE {table} AS {query}")
+        if self.table:
+            self.conn.execute(f"DROP TABLE {self.table}")
+        self.table = table
+
+    def _row(self, query: str) -> tuple:
+        """The single row an aggregate query returns."""
+        row = self.conn.execute(query).fetchone()
+        assert row is not None, f"No row returned by: {query}"
+        return row
+
+    @property
+    def columns(self) -> list[str]:
+        return self.conn.table(self.table).columns
+
+    def types(self) -> dict[str, str]:
+        relation = self.conn.table(self.table)
+        return {c: str(t) for c, t in zip(relation.columns, relation.types)}
+
+    def dtypes(self) -> pd.Series:
+        """The dtypes the current table's columns have when read into pandas."""
+        return (
+            self.conn.sql(f"SELECT * FROM {self.table} LIMIT 0")
+            .to_arrow_table()
+            .to_pandas()
+            .dtypes
+        )
+
+    def count(self) -> int:
+        return self._row(f"SELECT count(*) FROM {self.table}")[0]
+
+    def supports(self, step: ProcessingStep) -> bool:
+        """Whether `step`, run against the current table, can be run in SQL."""
+        if step.name not in SQL_STEPS:
+            return False
+        types = self.types()
+        match step.name:
+            case "groupby":
+                agg = step.args.get("agg")
+                return isinstance(agg, dict) and all(
+                    func in _AGGREGATES
+                    and (func not in _NUMERIC_AGGREGATES or _is_numeric(types[column]))
+                    for column, func in agg.items()
+                )
+            case "filter_rows" if "column_name" in step.args:
+                # pandas finds values of another type than the column's unequal,
+                # where DuckDB casts them to the column's type, failing if it can't
+                column_type = types.get(str(step.args["column_name"]), "")
+                val = step.args.get("val")
+                if step.args.get("type") == "contains" or isinstance(val, str):
+                    return column_type == "VARCHAR"
+                if isinstance(val, bool):
+                    return column_type == "BOOLEAN"
+                return _is_numeric(column_type)
+            case "coerce_column_types":
+                # pandas parses dates and integers much more leniently than DuckDB
+                # casts them, so only coercions that don't need parsing run in SQL
+                for column, type in step.args.get("column_types", {}).items():
+                    source = types.get(column, "")
+                    if type in ("date", "datetime") and not (
+                        source == "DATE" or source in _TIMESTAMP_TYPES
+                    ):
+                        return False
+                    if type in _SQL_INTEGER_TYPES and not _is_numeric(source):
+                        return False
+        return True
+
+    def filter_rows(
+        self,
+        type: Literal["equals", "contains"],
+        column_name: str | int,
+        val: str | int,
+    ) -> ProcessingSummary:
+        column = _quote(column_name)
+        if type == "contains":
+            condition = f"regexp_matches({column}, {_literal(str(val))})"
+        else:
+            condition = f"{column} = {_literal(val)}"
+        before = self.count()
+        self._replace(f"SELECT * FROM {self.table} WHERE {condition}")
+        return ProcessingSummary(
+            name="filter_rows",
+            description="Filtered Rows",
+            data_modifications={"rows_removed": before - self.count()},
+        )
+
+    def filter_columns(
+        self, columns: list[str], mode: Literal["keep", "drop"] = "keep"
+    ) -> ProcessingSummary:
+        before = self.columns
+        quoted = ", ".join(_quote(c) for c in columns)
+        select = quoted if mode == "keep" else f"* EXCLUDE ({quoted})"
+        self._replace(f"SELECT {select} FROM {self.table}")
+        return ProcessingSummary(
+            name="filter_columns",
+            description="filtered columns",
+            column_modifications={"dropped": set(before) - set(self.columns)},
+        )
+
+    def rename_columns(self, drop_others=False, **kwargs) -> ProcessingSummary:
+        assert "map" in kwargs, "map must be supplied to rename_columns"
+        col_map: dict[str, str] = kwargs["map"]
+        before = self.columns
+        missing = [c for c in col_map if c not in before]
+        if missing:
+            raise KeyError(f"{missing} not found in axis")
+        if drop_others:
+            select = [f"{_quote(old)} AS {_quote(new)}" for old, new in col_map.items()]
+        else:
+            select = [f"{_quote(c)} AS {_quote(col_map.get(c, c))}" for c in before]
+        self._replace(f"SELECT {', '.join(select)} FROM {self.table}")
+        removed_cols = []
+        if drop_others:
+            removed_cols = [
+                col for col in (set(before) - set(self.columns)) if col not in col_map
+            ]
+        return ProcessingSummary(
+            name="rename_columns",
+            description="Renamed columns",
+            column_modifications={"renamed": col_map, "removed": removed_cols},
+        )
+
+    def clean_column_names(
+        self,
+        *,
+        replace: dict[str, str] | None = None,
+        lower: bool = False,
+        strip: bool = False,
+    ) -> ProcessingSummary:
+        replace = replace or {}
+        before = self.columns
+        columns = list(before)
+        if strip:
+            columns = [c.strip() for c in columns]
+        for pattern in replace:
+            columns = [c.replace(pattern, replace[pattern]) for c in columns]
+        if lower:
+            columns = [c.lower() for c in columns]
+        select = [
+            f"{_quote(old)} AS {_quote(new)}" for old, new in zip(before, columns)
+        ]
+        self._replace(f"SELECT {', '.join(select)} FROM {self.table}")
+        return ProcessingSummary(
+            name="clean_column_names",
+            description="Cleaned column names",
+            column_modifications={
+                "renamed": {old: new for old, new in zip(before, columns) if old != new}
+            },
+        )
+
+    def update_column(self, column_name: str, val: str | int) -> ProcessingSummary:
+        value = f"{_literal(val)} AS {_quote(column_name)}"
+        select = (
+            f"* REPLACE ({value})" if column_name in self.columns else f"*, {value}"
+        )
+        self._replace(f"SELECT {select} FROM {self.table}")
+        return ProcessingSummary(
+            name="update_column",
+            description=f"Updated column '{column_name}' with value '{val}'",
+            data_modifications={"rows_updated": self.count()},
+        )
+
+    def deduplicate(
+        self,
+        sort_columns: list[str] | None = None,
+        sort_ascending: bool = True,
+        by: list[str] | None = None,
+    ) -> ProcessingSummary:
+        before = self.count()
+        by = [by] if isinstance(by, str) else by
+        partition = ", ".join(_quote(c) for c in (by or self.columns))
+        order = _order_by(sort_columns or [], sort_ascending)
+        # keep the first row of each group, in the order pandas would have them
+        self._replace(
+            f"""
+            SELECT * EXCLUDE ({_ROW_ID}, __rank) FROM (
+                SELECT
+                    *,
+                    rowid AS {_ROW_ID},
+                    row_number() OVER (
+                        PARTITION BY {partition} ORDER BY {", ".join(order + ["rowid"])}
+                    ) AS __rank
+                FROM {self.table}
+            )
+            WHERE __rank = 1
+            ORDER BY {", ".join(order + [_ROW_ID])}
+            """
+        )
+        return ProcessingSummary(
+            name="deduplicate",
+            description="Removed duplicates",
+            data_modifications={"rows_removed": before - self.count()},
+        )
+
+    def sort(self, by: list[str], ascending=True) -> ProcessingSummary:
+        by = [by] if isinstance(by, str) else by
+        order = ", ".join(_order_by(by, ascending) + ["rowid"])
+        rows = self.count()
+        rows_moved = self._row(
+            f"""
+            SELECT count(*) FROM (
+                SELECT rowid AS position, row_number() OVER (ORDER BY {order}) - 1 AS sorted_position
+                FROM {self.table}
+            )
+            WHERE position != sorted_position
+            """
+        )[0]
+        columns = self.columns
+        self._replace(f"SELECT * FROM {self.table} ORDER BY {order}")
+        summary = make_change_stats(
+            columns,
+            self.columns,
+            0,
+            name="sort",
+            description=f"Sorted by columns: {', '.join(by)}",
+        )
+        summary.data_modifications["rows_updated"] = rows if rows_moved else 0
+        return summary
+
+    def groupby(self, by: str | list[str], agg: dict[str, str]) -> ProcessingSummary:
+        by = [by] if isinstance(by, str) else by
+        before_columns, before_rows = self.columns, self.count()
+        types = self.types()
+        keys = ", ".join(_quote(c) for c in by)
+        aggregates = []
+        for column, func in agg.items():
+            aggregate = _AGGREGATES[func].format(_quote(column))
+            if func == "sum" and types[column] in _INTEGER_TYPES:
+                # DuckDB sums integers as 128-bit integers
+                aggregate = f"CAST({aggregate} AS BIGINT)"
+            aggregates.append(f"{aggregate} AS {_quote(column)}")
+        # like pandas, drop null keys and sort groups
+        self._replace(
+            f"""
+            SELECT {keys}, {", ".join(aggregates)}
+            FROM {self.table}
+            WHERE {" AND ".join(f"{_quote(c)} IS NOT NULL" for c in by)}
+            GROUP BY {keys}
+            ORDER BY {keys}
+            """
+        )
+        return make_change_stats(
+            before_columns,
+            self.columns,
+            self.count() - before_rows,
+            description="Grouped and aggregated",
+            name="group_by",
+        )
+
+    def strip_columns(self, cols: list[str] | None = None) -> ProcessingSummary:
+        cols = cols or [c for c, t in self.types().items() if t == "VARCHAR"]
+        stripped = {
+            c: f"regexp_replace({_quote(c)}, '{_STRIP_PATTERN}', '', 'g')" for c in cols
+        }
+        modifications: dict[str, int] = {}
+        if cols:
+            counts = self._row(
+                f"""
+                SELECT {", ".join(f"count(*) FILTER (WHERE {_quote(c)} != {expr})" for c, expr in stripped.items())}
+                FROM {self.table}
+                """
+            )
+            modifications = dict(zip(cols, counts))
+            replacements = ", ".join(
+                f"{expr} AS {_quote(c)}" for c, expr in stripped.items()
+            )
+            self._replace(f"SELECT * REPLACE ({replacements}) FROM {self.table}")
+        return ProcessingSummary(
+            name="strip_columns",
+            description="Stripped Whitespace",
+            data_modifications={"by_column": modifications},
+        )
+
+    def _to_numeric(self, column: str, source: str, cast: str) -> str:
+        if _is_numeric(source):
+            return column
+        # like pd.to_numeric, only produce integers when every value is one
+        is_integral = self._row(
+            f"""
+            SELECT bool_and({column} IS NOT NULL AND regexp_full_match({column}, '\\s*[+-]?\\d+\\s*'))
+            FROM {self.table}
+            """
+        )[0]
+        return f"{cast}({column} AS {'BIGINT' if is_integral else 'DOUBLE'})"
+
+    @staticmethod
+    def _to_str(column: str, source: str) -> str:
+        """Mirrors the `to_str` conversion in ProcessingFunctions.coerce_column_types"""
+        if source in _FLOAT_TYPES:
+            return f"""CASE
+                WHEN isnan({column}) THEN NULL
+                WHEN NOT isinf({column}) AND {column} = trunc({column})
+                    THEN CAST(CAST({column} AS HUGEINT) AS VARCHAR)
+                ELSE CAST({column} AS VARCHAR)
+            END"""
+        if source == "BOOLEAN":
+            return f"CASE WHEN {column} THEN 'True' WHEN NOT {column} THEN 'False' END"
+        return f"CAST({column} AS VARCHAR)"
+
+    def coerce_column_types(
+        self,
+        column_types: dict[
+            str, Literal["numeric", "integer", "bigint", "string", "date", "datetime"]
+        ],
+        errors: Literal["raise", "coerce"] = "raise",
+    ) -> ProcessingSummary:
+        before = self.dtypes()
+        types = self.types()
+        cast = "CAST" if errors == "raise" else "TRY_CAST"
+        replacements = []
+        for column, type in column_types.items():
+            quoted = _quote(column)
+            match type:
+                case "numeric":
+                    expr = self._to_numeric(quoted, types[column], cast)
+                case "integer" | "bigint":
+                    sql_type = _SQL_INTEGER_TYPES[type]
+                    expr = f"{cast}({quoted} AS {sql_type})"
+                    if types[column] in _FLOAT_TYPES:
+                        # pandas refuses to truncate, where a cast would round
+                        expr = f"""CASE
+                            WHEN {quoted} != trunc({quoted})
+                                THEN error('cannot safely cast non-equivalent float64 to {sql_type}')
+                            ELSE {expr}
+                        END"""
+                case "string":
+                    expr = self._to_str(quoted, types[column])
+                case "date":
+                    expr = f"CAST({quoted} AS DATE)"
+                case "datetime":
+                    expr = f"CAST({quoted} AS TIMESTAMP)"
+            replacements.append(f"{expr} AS {quoted}")
+        if replacements:
+            self._replace(
+                f"SELECT * REPLACE ({', '.join(replacements)}) FROM {self.table}"
+            )
+
+        after = self.dtypes()
+        modified = {}
+        for column in sorted(column_types):
+            to = _PANDAS_INTEGER_DTYPES.get(column_types[column], str(after[column]))
+            if str(before[column]) != to:
+                modified[column] = {"from": str(before[column]), "to": to}
+        return ProcessingSummary(
+            name="coerce_column_types",
+            description="Coerced Column Types",
+            column_modifications={"modified": modified},
+        )
+
+    def drop_columns(self, columns: list[str | int]) -> ProcessingSummary:
+        before = self.columns
+        columns = [before[i] if isinstance(i, int) else i for i in columns]
+        self._replace(
+            f"SELECT * EXCLUDE ({', '.join(_quote(c) for c in columns)}) FROM {self.table}"
+        )
+        return ProcessingSummary(
+            name="drop_columns",
+            description="Dropped columns",
+            column_modifications={"dropped": columns},
+        )
+
+
+def _run_sql_step(
+    sql: SqlProcessingFunctions, step: ProcessingStep
+) -> ProcessingSummary:
+    start_time = datetime.now()
+    summary = getattr(sql, step.name)(**step.args)
+    end_time = datetime.now()
+
+    summary.start_time = start_time.isoformat()
+    summary.end_time = end_time.isoformat()
+    summary.elapsed_seconds = (end_time - start_time).total_seconds()
+    return summary
+
+
+def process(
+    processor: ProcessingFunctions,
+    processing_steps: list[ProcessingStep],
+    input_path: Path,
+    output_path: Path,
+) -> list[ProcessingSummary]:
+    """Run processing steps on `input_path` with DuckDB, writing the result to
+    `output_path`. Consecutive steps that fall back to pandas share one dataframe."""
+    scratch_dir = output_path.parent / f"_{output_path.stem}_duckdb"
+    scratch_dir.mkdir(parents=True, exist_ok=True)
+    # an in-memory database still spills to temp_directory once it outgrows memory
+    conn = duckdb.connect(config={"temp_directory": str(scratch_dir)})
+    try:
+        sql = SqlProcessingFunctions(conn)
+        sql.load(input_path)
+        df: pd.DataFrame | None = None
+        summaries = []
+        for step in processing_steps:
+            if df is not None and step.name in SQL_STEPS:
+                df.to_parquet(scratch_dir / "pandas_output.parquet", index=False)
+                sql.load(scratch_dir / "pandas_output.parquet")
+                df = None
+
+            if df is None and sql.supports(step):
+                logger.info(f"Running processing step '{step.name}' in DuckDB")
+                summary = _run_sql_step(sql, step)
+            else:
+                logger.info(f"Running processing step '{step.name}' in pandas")
+                if df is None:
+                    sql.write(scratch_dir / "pandas_input.parquet")
+                    df = geoparquet.read_df(scratch_dir / "pandas_input.parquet")
+                result = _run_step(processor, step, df)
+                df = result.df
+                summary = result.summary
+            _log_summary(step, summary)
+            summaries.append(summary)
+
+        if df is not None:
+            df.to_parquet(output_path, index=False)
+        else:
+            sql.write(output_path)
+    finally:
+        conn.close()
+        shutil.rmtree(scratch_dir)
+    return summaries
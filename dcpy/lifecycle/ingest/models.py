@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Any
+from typing import Any, Literal
 
 import pandas as pd
 from pydantic import AliasChoices, AliasPath, BaseModel, Field, TypeAdapter
@@ -30,6 +30,9 @@ class Source(BaseModel, extra="allow"):
     )
 
 
+ProcessingEngine = Literal["pandas", "duckdb"]
+
+
 class ProcessingStep(SortedSerializedBase):
     name: str
     args: dict[str, Any] = {}
@@ -42,6 +45,10 @@ class Ingestion(BaseModel, extra="forbid"):
     source: Source
     file_format: file.Format
     processing_steps: list[ProcessingStep] = []
+    # when set, processing steps run in streaming mode over batches of this many rows
+    processing_batch_size: int | None = None
+    # "duckdb" runs processing steps as DuckDB queries, out of core
+    processing_engine: ProcessingEngine = "pandas"
 
 
 class Column(BaseColumn):
@@ -86,6 +93,8 @@ class DownstreamDatasetDefinition(BaseModel, extra="forbid"):
     target_crs: str | None = None
     file_format: dict
     processing_steps: list[ProcessingStep] = []
+    processing_batch_size: int | None = None
+    processing_engine: ProcessingEngine = "pandas"
     columns: list[Column] = []
     checks: list[str | dict[str, Any]] | None = None
 
@@ -95,6 +104,8 @@ class DatasetDefaults(BaseModel, extra="forbid"):
     target_crs: str | None = None
     file_format: dict | None = None
     processing_steps: list[ProcessingStep] | None = None
+    processing_batch_size: int | None = None
+    processing_engine: ProcessingEngine | None = None
 
 
 class DataSourceDefinition(TemplatedYamlReader, extra="forbid"):
@@ -129,6 +140,8 @@ class ResolvedDownstreamDataset(SortedSerializedBase):
     target_crs: str | None = None
     file_format: file.Format
     processing_steps: list[ProcessingStep] = []
+    processing_batch_size: int | None = None
+    processing_engine: ProcessingEngine = "pandas"
     columns: list[Column] = []
     checks: list[str | dict[str, Any]] | None = None
 
@@ -204,6 +217,7 @@ class Transformation(SortedSerializedBase):
     file_format: file.Format
     processing_steps: list[ProcessingStep] = []
     processing_mode: str | None = None
+    to_parquet_summary: ProcessingSummary | None = None
     processing_steps_summaries: list[ProcessingSummary] = []
     run_details: RunDetails
 
@@ -90,7 +90,7 @@ def resolve_definition(
             downstream_datasets = [
                 ResolvedDownstreamDataset(
                     **deep_merge_dict(
-                        definition.dataset_defaults.model_dump(),
+                        definition.dataset_defaults.model_dump(exclude_none=True),
                         d.model_dump(exclude_defaults=True, exclude_none=True),
                     )
                 )
@@ -99,7 +99,7 @@ def _transform_dataset(
     dataset_staging_dir = staging_dir / ds_id
 
     init_parquet = "_init.parquet"
-    transform.to_parquet(
+    to_parquet_summary = transform.to_parquet(
         transformation.file_format,
         staging_dir / raw_filename,
         dir=dataset_staging_dir,
@@ -117,6 +117,8 @@ def _transform_dataset(
         dataset_staging_dir / init_parquet,
         dataset_staging_dir / f"{ds_id}.parquet",  # TODO this is a tad inelegant
         output_csv=output_csv,
+        batch_size=transformation.processing_batch_size,
+        engine=transformation.processing_engine,
     )
 
     return Transformation(
@@ -124,6 +126,7 @@ def _transform_dataset(
         file_format=transformation.file_format,
         processing_steps=processing_steps,
         processing_mode=mode,
+        to_parquet_summary=to_parquet_summary,
         processing_steps_summaries=processing_steps_summaries,
         run_details=run_details,
     )
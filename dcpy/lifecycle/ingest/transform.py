@@ -1,4 +1,6 @@
 import json
+import shutil
+import sys
 import textwrap
 from datetime import datetime
 from pathlib import Path
@@ -6,10 +8,14 @@ from typing import Literal
 
 import geopandas as gpd
 import pandas as pd
+import pyarrow as pa
+from pyarrow import parquet
 
+from dcpy.configuration import INGEST_EXACT_CHANGE_STATS
 from dcpy.connectors.edm import recipes
 from dcpy.lifecycle.ingest.models import (
     Column,
+    ProcessingEngine,
     ProcessingResult,
     ProcessingStep,
     ProcessingSummary,
@@ -21,6 +27,9 @@ from dcpy.utils.geospatial import transform
 from dcpy.utils.logging import logger
 
 OUTPUT_GEOM_COLUMN = "geom"
+# type conflicts in a chunked csv after which all of its columns are read as strings,
+# rather than reading it again for each conflicting column
+MAX_CSV_TYPE_CONFLICTS = 3
 
 
 def determine_processing_steps(
@@ -50,10 +59,27 @@ def make_generic_change_stats(
     before: pd.DataFrame, after: pd.DataFrame, *, name: str, description: str
 ) -> ProcessingSummary:
     """Generate a ProcessingSummary by comparing two dataframes before and after processing."""
-    initial_columns = set(before.columns)
-    final_columns = set(after.columns)
+    return make_change_stats(
+        list(before.columns),
+        list(after.columns),
+        len(after) - len(before),
+        name=name,
+        description=description,
+    )
 
-    rows_added = len(after) - len(before)
+
+def make_change_stats(
+    before_columns: list[str],
+    after_columns: list[str],
+    rows_added: int,
+    *,
+    name: str,
+    description: str,
+) -> ProcessingSummary:
+    """Generate a ProcessingSummary from the columns and change in row count of a
+    dataset before and after processing."""
+    initial_columns = set(before_columns)
+    final_columns = set(after_columns)
 
     return ProcessingSummary(
         name=name,
@@ -68,12 +94,90 @@ def make_generic_change_stats(
     )
 
 
+def _to_output_geometry(gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+    # rename geom column to "geom" regardless of input data type
+    if gdf.geometry.name != OUTPUT_GEOM_COLUMN:
+        gdf = gdf.rename_geometry(OUTPUT_GEOM_COLUMN)
+    gdf[OUTPUT_GEOM_COLUMN] = gdf.make_valid()
+    return gdf
+
+
+def _csv_to_parquet_in_chunks(
+    file_format: file.Csv,
+    local_data_path: Path,
+    output_file_path: Path,
+    read_stats: dict,
+) -> None:
+    """
+    Streams a csv to parquet `file_format.chunk_size_mb` at a time, with column types
+    inferred from a sample at the start of the file. If a later chunk has a value that
+    doesn't fit its column's inferred type, the conflict is reported (logged, and
+    recorded in `read_stats`) and the file is read again with that column widened,
+    rather than failing once most of the file has been read.
+
+    Each conflict costs another read of the file, up to where the conflict is. After
+    MAX_CSV_TYPE_CONFLICTS conflicts, every column is read as a string, so the file
+    is read at most MAX_CSV_TYPE_CONFLICTS + 1 times.
+    """
+    assert file_format.chunk_size_mb
+    data_path, extracted_files_dir = data.unzip_input(
+        file_format, local_data_path, read_stats
+    )
+    column_types = data.infer_csv_types(file_format, data_path, file_format.sample_rows)
+    conflicts: list[dict] = []
+    try:
+        while True:
+            try:
+                with geoparquet.BatchWriter(output_file_path) as writer:
+                    for batch in data.iter_csv_batches(
+                        file_format, data_path, column_types, file_format.chunk_size_mb
+                    ):
+                        if file_format.geometry:
+                            gdf = transform.df_to_gdf(
+                                batch.to_pandas(), file_format.geometry
+                            )
+                            writer.write(_to_output_geometry(gdf))
+                        else:
+                            writer.write(batch)
+                break
+            except data.CsvTypeConflictError as conflict:
+                column_types = data.widen_csv_types(column_types, conflict)
+                widened = column_types[conflict.column]
+                if len(conflicts) + 1 < MAX_CSV_TYPE_CONFLICTS:
+                    logger.warning(
+                        f"{conflict}. Reading {local_data_path.name} again with "
+                        f"'{conflict.column}' as {widened}. Set a dtype for it to "
+                        "avoid this."
+                    )
+                else:
+                    column_types = {name: pa.string() for name in column_types}
+                    widened = pa.string()
+                    logger.warning(
+                        f"{conflict}. That's {MAX_CSV_TYPE_CONFLICTS} type conflicts, "
+                        f"so reading {local_data_path.name} again with every column "
+                        "as a string. Set dtypes to avoid this."
+                    )
+                conflicts.append(
+                    {
+                        "column": conflict.column,
+                        "inferred_type": str(conflict.inferred_type),
+                        "value": conflict.value,
+                        "chunk_start_row": conflict.row,
+                        "read_as": str(widened),
+                    }
+                )
+    finally:
+        if extracted_files_dir:
+            shutil.rmtree(extracted_files_dir)
+    read_stats["csv_type_conflicts"] = conflicts
+
+
 def to_parquet(
     file_format: file.Format,
     local_data_path: Path,
     dir: Path,
     output_filename: str = "init.parquet",
-) -> None:
+) -> ProcessingSummary:
     """
     Transforms raw data into a parquet file format and saves it locally.
 
@@ -84,12 +188,19 @@ def to_parquet(
     .csv or zipped format. For csv files, if geometry is present, it is converted into a GeoSeries before creating
     the GeoDataFrame.
 
+    Formats that can be read as arrow (see `data.supports_arrow`), i.e. vector formats and csvs
+    without geometry, are written straight from the arrow table rather than through a dataframe.
+    Csvs with `chunk_size_mb` set are streamed to parquet in chunks, to bound memory use.
+
     Parameters:
         file_format_config (file.Format): Config object containing geometry info.
         local_data_path (Path): Path to the local data file.
         dir (Path): Directory to use for output file.
         output_filename (str): Output file name.
 
+    Returns:
+        ProcessingSummary: timing of the conversion, including time spent on unzipping.
+
     Raises:
         AssertionError: `local_data_path` does not point to a valid file or directory.
         AssertionError: If `geom_column` is present in yaml definition but not in the dataset.
@@ -103,16 +214,79 @@ def to_parquet(
         "Local path should be a valid file or directory"
     )
     logger.info(f"Converting {local_data_path.name} to {output_filename}")
+    start_time = datetime.now()
+    read_stats: dict = {}
+    if isinstance(file_format, file.Csv) and file_format.chunk_size_mb:
+        if not data.supports_chunked_csv(file_format):
+            raise ValueError(
+                "Csvs read in chunks may only set encoding and delimiter as read "
+                "options, and only string dtypes"
+            )
+        reader = "chunked"
+    else:
+        reader = "arrow" if data.supports_arrow(file_format) else "pandas"
+
+    if reader == "chunked":
+        assert isinstance(file_format, file.Csv)
+        _csv_to_parquet_in_chunks(
+            file_format, local_data_path, output_file_path, read_stats
+        )
+    elif reader == "arrow":
+        table, geometry = data.read_data_to_arrow(
+            file_format, local_data_path, read_stats=read_stats
+        )
+        if geometry is not None:
+            geometry = geometry.make_valid().rename(OUTPUT_GEOM_COLUMN)
+            table = geoparquet.append_geometry(table, geometry)
+        parquet.write_table(table, output_file_path)
+    else:
+        gdf = data.read_data_to_df(file_format, local_data_path, read_stats=read_stats)
 
-    gdf = data.read_data_to_df(file_format, local_data_path)
+        if isinstance(gdf, gpd.GeoDataFrame):
+            gdf = _to_output_geometry(gdf)
 
-    if isinstance(gdf, gpd.GeoDataFrame):
-        # rename geom column to "geom" regardless of input data type
-        if gdf.geometry.name != OUTPUT_GEOM_COLUMN:
-            gdf.rename_geometry(OUTPUT_GEOM_COLUMN, inplace=True)
-        gdf[OUTPUT_GEOM_COLUMN] = gdf.make_valid()
+        gdf.to_parquet(output_file_path, index=False)
+
+    end_time = datetime.now()
+    return ProcessingSummary(
+        name="to_parquet",
+        description=f"Converted {local_data_path.name} to parquet",
+        custom={"reader": reader, **read_stats},
+        start_time=start_time.isoformat(),
+        end_time=end_time.isoformat(),
+        elapsed_seconds=(end_time - start_time).total_seconds(),
+    )
 
-    gdf.to_parquet(output_file_path, index=False)
+
+def _geosupport_stats() -> dict[str, int]:
+    """Geosupport input dedup and result cache counts so far in this process.
+
+    Scripts run via `python_script` may geocode (e.g. dep_cats_permits_geocode). The
+    geosupport modules are only inspected if something has already imported them,
+    since python-geosupport isn't installed everywhere ingest runs.
+    """
+    stats: dict[str, int] = {}
+    if engine := sys.modules.get("dcpy.geosupport.engine"):
+        stats.update(engine.dedup_stats.summary())
+    if cache := sys.modules.get("dcpy.geosupport.cache"):
+        stats.update(cache.stats.summary())
+    return stats
+
+
+def _geosupport_stats_since(before: dict[str, int]) -> dict:
+    """Counts accrued since `before` (see `_geosupport_stats`), plus the ratio of
+    geocoded rows to distinct inputs actually sent to Geosupport."""
+    return _with_dedup_ratio(
+        {k: v - before.get(k, 0) for k, v in _geosupport_stats().items()}
+    )
+
+
+def _with_dedup_ratio(stats: dict) -> dict:
+    if stats.get("geocode_distinct_inputs"):
+        stats["geocode_dedup_ratio"] = round(
+            stats["geocode_input_rows"] / stats["geocode_distinct_inputs"], 2
+        )
+    return stats
 
 
 class ProcessingFunctions:
@@ -121,8 +295,14 @@ class ProcessingFunctions:
     This should/will be iterated on when implementing actual processing steps for chosen definitions
     """
 
-    def __init__(self, dataset_id: str):
+    def __init__(
+        self, dataset_id: str, exact_change_stats: bool = INGEST_EXACT_CHANGE_STATS
+    ):
         self.dataset_id = dataset_id
+        # steps run under pandas copy-on-write, so they don't make defensive copies of
+        # their input, and compute change stats from cheap metadata where they can.
+        # This falls back to full comparisons of input and output, for debugging.
+        self.exact_change_stats = exact_change_stats
         self._REPROJECTION_DESCRIPTION_PREFIX = "Reprojected geometries"
         self._REPROJECTION_NOT_REQUIRED_DESCRIPTION = (
             "No reprojection required, as source and target crs are the same."
@@ -150,16 +330,20 @@ class ProcessingFunctions:
         )
 
     def sort(self, df: pd.DataFrame, by: list[str], ascending=True) -> ProcessingResult:
-        sorted = df.sort_values(by=by, ascending=ascending).reset_index(drop=True)
+        sorted = df.reset_index(drop=True).sort_values(by=by, ascending=ascending)
+        if self.exact_change_stats:
+            reordered = not sorted.reset_index(drop=True).equals(df)
+        else:
+            # rows were reordered iff their positions are no longer 0..n-1
+            reordered = not sorted.index.equals(pd.RangeIndex(len(df)))
+        sorted = sorted.reset_index(drop=True)
         summary = make_generic_change_stats(
             df,
             sorted,
             name="sort",
             description=f"{self._SORTED_BY_COLUMNS_DESCRIPTION_PREFIX}: {', '.join(by)}",
         )
-        summary.data_modifications["rows_updated"] = (
-            len(df) if not sorted.equals(df) else 0
-        )
+        summary.data_modifications["rows_updated"] = len(df) if reordered else 0
         return ProcessingResult(df=sorted, summary=summary)
 
     def filter_rows(
@@ -212,9 +396,9 @@ class ProcessingFunctions:
             kwargs["map"]
         )  # doing this to avoid shadowing the builtin `map` fn
         full_col_map = dict(col_map)
-        renamed = df.copy()
+        renamed = df
         if isinstance(renamed, gpd.GeoDataFrame) and renamed.geometry.name in col_map:
-            renamed.rename_geometry(col_map.pop(renamed.geometry.name), inplace=True)
+            renamed = renamed.rename_geometry(col_map.pop(renamed.geometry.name))
         renamed = renamed.rename(columns=col_map, errors="raise")
         removed_cols = []
         if drop_others:
@@ -241,16 +425,15 @@ class ProcessingFunctions:
         lower: bool = False,
         strip: bool = False,
     ) -> ProcessingResult:
-        cleaned = df.copy()
         replace = replace or {}
-        columns = list(cleaned.columns)
+        columns = list(df.columns)
         if strip:
             columns = [c.strip() for c in columns]
         for pattern in replace:
             columns = [c.replace(pattern, replace[pattern]) for c in columns]
         if lower:
             columns = [c.lower() for c in columns]
-        cleaned.columns = pd.Index(columns)
+        cleaned = df.set_axis(pd.Index(columns), axis=1)
         renamed_cols = {old: new for old, new in zip(df.columns, columns) if old != new}
         return ProcessingResult(
             df=cleaned,
@@ -267,7 +450,7 @@ class ProcessingFunctions:
         column_name: str,
         val: str | int,
     ) -> ProcessingResult:
-        updated = df.copy()
+        updated = df.copy(deep=False)
         updated[column_name] = val
         return ProcessingResult(
             df=updated,
@@ -331,7 +514,7 @@ class ProcessingFunctions:
         sort_ascending: bool = True,
         by: list[str] | None = None,
     ) -> ProcessingResult:
-        deduped = df.copy()
+        deduped = df
         if sort_columns:
             deduped = deduped.sort_values(by=sort_columns, ascending=sort_ascending)
         deduped = deduped.drop_duplicates(by).reset_index(drop=True)
@@ -357,13 +540,19 @@ class ProcessingFunctions:
     def strip_columns(
         self, df: pd.DataFrame, cols: list[str] | None = None
     ) -> ProcessingResult:
-        stripped = df.copy()
+        stripped = df.copy(deep=False)
         modifications = {}
         for col in cols or [
             c for c in df.columns if pd.api.types.is_string_dtype(df[c])
         ]:
             stripped[col] = stripped[col].str.strip()
-            modifications[col] = len(stripped[col].compare(df[col]))
+            if self.exact_change_stats:
+                modifications[col] = len(stripped[col].compare(df[col]))
+            else:
+                # stripping changes a value iff it shortens it
+                modifications[col] = int(
+                    (df[col].str.len() - stripped[col].str.len()).gt(0).sum()
+                )
         return ProcessingResult(
             df=stripped,
             summary=ProcessingSummary(
@@ -391,7 +580,7 @@ class ProcessingFunctions:
             else:
                 return str(obj)
 
-        result = df.copy()
+        result = df.copy(deep=False)
         for column in column_types:
             match column_types[column]:
                 case "numeric":
@@ -411,12 +600,11 @@ class ProcessingFunctions:
                     result[column] = pd.to_datetime(result[column], errors=errors)
                     result[column] = result[column].replace(pd.NaT, None)  # type: ignore
 
-        # Compare dtype string reprs, not dtype objects: elementwise comparison
-        # of a Series of numpy dtype objects raises under numpy 2.5+.
-        modified_cols = (
-            df.dtypes.astype(str).sort_index() != result.dtypes.astype(str).sort_index()
-        )
-        modified = modified_cols.loc[modified_cols].keys()
+        # only coerced columns can have changed. Compare dtype string reprs, since
+        # numpy and pandas extension dtypes don't always compare equal to each other
+        modified = [
+            c for c in sorted(column_types) if str(df[c].dtype) != str(result[c].dtype)
+        ]
 
         return ProcessingResult(
             df=result,
@@ -434,11 +622,7 @@ class ProcessingFunctions:
 
     # TODO
     def multi(self, df: gpd.GeoDataFrame) -> ProcessingResult:
-        multi_gdf = df.copy()
-        multi_gdf.set_geometry(
-            gpd.GeoSeries([transform.multi(feature) for feature in multi_gdf.geometry]),
-            inplace=True,
-        )
+        multi_gdf = df.set_geometry(transform.multi_geoseries(df.geometry))
         summary = make_generic_change_stats(
             df, multi_gdf, description="Converted geometries", name="multi"
         )
@@ -468,9 +652,8 @@ class ProcessingFunctions:
             raise TypeError(
                 "GeoDataFrame processing function specified for non-geo df. Ensure that gdf is read in properly"
             )
-        transformed = df.copy()
         parts = function_name.split(".")
-        func = transformed
+        func = df
         for part in parts:
             func = func.__getattribute__(part)
 
@@ -517,9 +700,9 @@ class ProcessingFunctions:
             raise TypeError(
                 "GeoSeries processing function specified for non-geo df. Specify pd Series function instead, or ensure that gdf is read in properly"
             )
-        transformed = df.copy()
+        transformed = df.copy(deep=False)
         parts = function_name.split(".")
-        func = transformed[column_name]
+        func = df[column_name]
         for part in parts:
             func = func.__getattribute__(part)
 
@@ -576,10 +759,15 @@ class ProcessingFunctions:
         # boro_column: str = "boro",
         # block_column: str = "block",
         # lot_column: str = "lot",
+        workers: int | None = None,
+        chunk_size: int | None = None,
     ) -> ProcessingResult:
         from dcpy.geosupport import pluto as geosupport_pluto
 
-        transformed = geosupport_pluto.geocode_df_bbl(df)
+        geosupport_stats = _geosupport_stats()
+        transformed = geosupport_pluto.geocode_df_bbl(
+            df, workers=workers, chunk_size=chunk_size
+        )
         summary = ProcessingSummary(
             name="geocode_bbl",
             description="Geocoded with function BL",
@@ -590,6 +778,7 @@ class ProcessingFunctions:
                 "rows_geocoded": int(transformed["latitude"].notna().sum()),
                 "total_rows": len(transformed),
                 "geosupport_version": geosupport_pluto.geosupport_version(),
+                **_geosupport_stats_since(geosupport_stats),
             },
         )
         return ProcessingResult(df=transformed, summary=summary)
@@ -597,10 +786,15 @@ class ProcessingFunctions:
     def geocode_bin(
         self,
         df: pd.DataFrame,
+        workers: int | None = None,
+        chunk_size: int | None = None,
     ) -> ProcessingResult:
         from dcpy.geosupport import pluto as geosupport_pluto
 
-        transformed = geosupport_pluto.geocode_df_bin(df)
+        geosupport_stats = _geosupport_stats()
+        transformed = geosupport_pluto.geocode_df_bin(
+            df, workers=workers, chunk_size=chunk_size
+        )
         summary = ProcessingSummary(
             name="geocode_bin",
             description="Geocoded with function BN",
@@ -610,6 +804,7 @@ class ProcessingFunctions:
             custom={
                 "rows_geocoded": sum(transformed["bbl"] != ""),
                 "total_rows": len(transformed),
+                **_geosupport_stats_since(geosupport_stats),
             },
         )
         return ProcessingResult(df=transformed, summary=summary)
@@ -620,6 +815,8 @@ class ProcessingFunctions:
         address_column: str = "address1",
         zip_column: str = "zip5",
         output_prefix: str = "geosupport_",
+        workers: int | None = None,
+        chunk_size: int | None = None,
     ) -> ProcessingResult:
         """Geocodes a street address + zip column via Geosupport functions 1A/1E,
         appending the resulting columns (bbl, cd, council, census tract, borough,
@@ -627,11 +824,19 @@ class ProcessingFunctions:
         geocode_bin) the input isn't already reduced to just the geocoding inputs.
         Output columns are prefixed to avoid colliding with source columns of the
         same name (e.g. a source "latitude"/"longitude" already on df).
+
+        `workers` and `chunk_size` control the geocoding process pool (see
+        dcpy.geosupport.engine); by default, all cpus are used.
         """
         from dcpy.geosupport import pluto as geosupport_pluto
 
+        geosupport_stats = _geosupport_stats()
         geocoded = geosupport_pluto.geocode_df_address(
-            df, address_column=address_column, zip_column=zip_column
+            df,
+            address_column=address_column,
+            zip_column=zip_column,
+            workers=workers,
+            chunk_size=chunk_size,
         ).add_prefix(output_prefix)
         transformed = pd.concat(
             [df.reset_index(drop=True), geocoded.reset_index(drop=True)], axis=1
@@ -646,6 +851,7 @@ class ProcessingFunctions:
                 ),
                 "total_rows": len(transformed),
                 "geosupport_version": geosupport_pluto.geosupport_version(),
+                **_geosupport_stats_since(geosupport_stats),
             },
         )
         return ProcessingResult(df=transformed, summary=summary)
@@ -714,8 +920,11 @@ class ProcessingFunctions:
         original_crs = df.crs if is_geodataframe else None
         original_geom_col = df.geometry.name if is_geodataframe else None
 
+        geosupport_stats = _geosupport_stats()
+
         # Execute the function with DataFrame and any additional kwargs
         result_df = fn(df, **kwargs)
+        geosupport_stats_since = _geosupport_stats_since(geosupport_stats)
 
         # Validate return type at runtime
         if not isinstance(result_df, pd.DataFrame):
@@ -757,6 +966,7 @@ class ProcessingFunctions:
                     "module": module,
                     "function": function,
                     "kwargs": kwargs,
+                    **{k: v for k, v in geosupport_stats_since.items() if v},
                 },
             ),
         )
@@ -774,6 +984,149 @@ def validate_columns(df: pd.DataFrame, columns: list[Column]) -> None:
         )
 
 
+# Steps that need the whole dataset at once. In streaming mode, every other step runs
+# batch by batch, and the dataset is only read fully into memory to run these.
+BARRIER_STEPS = {
+    "sort",
+    "deduplicate",
+    "groupby",
+    "append_prev",
+    "upsert_column_of_previous_version",
+    "pd_df_func",
+    "python_script",
+}
+# pd_series_func is row-local only for elementwise accessors (not e.g. `rank`, `shift`)
+_ROW_LOCAL_SERIES_FUNCTION_PREFIXES = ("str.", "dt.")
+
+
+def is_barrier(step: ProcessingStep) -> bool:
+    if step.name == "pd_series_func":
+        function_name = step.args.get("function_name", "")
+        return not function_name.startswith(_ROW_LOCAL_SERIES_FUNCTION_PREFIXES)
+    return step.name in BARRIER_STEPS
+
+
+def _run_step(
+    processor: ProcessingFunctions, step: ProcessingStep, df: pd.DataFrame
+) -> ProcessingResult:
+    step_callable = getattr(processor, step.name)
+    start_time = datetime.now()
+    result = step_callable(df, **step.args)
+    end_time = datetime.now()
+
+    # Add timing information to the summary
+    result.summary.start_time = start_time.isoformat()
+    result.summary.end_time = end_time.isoformat()
+    result.summary.elapsed_seconds = (end_time - start_time).total_seconds()
+    return result
+
+
+def _log_summary(step: ProcessingStep, summary: ProcessingSummary) -> None:
+    logger.info(f"Processing step '{step.name}' results summary:")
+    logger.info(
+        f"{textwrap.indent(json.dumps(summary.model_dump(mode='json'), indent=4), '    ')}"
+    )
+
+
+def _merge_counts(dicts: list[dict]) -> dict:
+    """Sum integer values (recursing into nested dicts); anything else is taken from
+    the first dict it appears in."""
+    merged: dict = {}
+    for d in dicts:
+        for k, v in d.items():
+            if k not in merged:
+                merged[k] = v
+            elif isinstance(v, int) and not isinstance(v, bool):
+                merged[k] += v
+            elif isinstance(v, dict):
+                merged[k] = _merge_counts([merged[k], v])
+    return merged
+
+
+def merge_batch_summaries(summaries: list[ProcessingSummary]) -> ProcessingSummary:
+    """Combine the summaries of a single step run over several batches."""
+    first, last = summaries[0], summaries[-1]
+    return ProcessingSummary(
+        name=first.name,
+        description=first.description,
+        data_modifications=_merge_counts([s.data_modifications for s in summaries]),
+        column_modifications=_merge_counts([s.column_modifications for s in summaries]),
+        # a ratio can't be summed across batches, so recompute it from the totals
+        custom=_with_dedup_ratio(_merge_counts([s.custom for s in summaries])),
+        start_time=first.start_time,
+        end_time=last.end_time,
+        elapsed_seconds=sum(s.elapsed_seconds or 0 for s in summaries),
+    )
+
+
+def _segment_steps(
+    steps: list[ProcessingStep],
+) -> list[tuple[bool, list[ProcessingStep]]]:
+    """Split steps into consecutive runs of (is_barrier, steps)."""
+    segments: list[tuple[bool, list[ProcessingStep]]] = []
+    for step in steps:
+        barrier = is_barrier(step)
+        if segments and segments[-1][0] == barrier:
+            segments[-1][1].append(step)
+        else:
+            segments.append((barrier, [step]))
+    return segments
+
+
+def _process_streaming(
+    processor: ProcessingFunctions,
+    processing_steps: list[ProcessingStep],
+    input_path: Path,
+    output_path: Path,
+    batch_size: int,
+) -> list[ProcessingSummary]:
+    """Run row-local steps over batches of `batch_size` rows, writing each run of them
+    to an intermediate parquet file as it goes, so that the full dataset is only held
+    in memory for barrier steps (see BARRIER_STEPS). Batches of data with geometry are
+    GeoDataFrames (see geoparquet.iter_batches_df).
+    """
+    summaries = []
+    path = input_path
+    for i, (barrier, steps) in enumerate(_segment_steps(processing_steps)):
+        segment_output = output_path.parent / f"_{output_path.stem}_{i}.parquet"
+        if barrier:
+            logger.info(f"Running steps {[s.name for s in steps]} on full dataset")
+            df = geoparquet.read_df(path)
+            for step in steps:
+                result = _run_step(processor, step, df)
+                df = result.df
+                _log_summary(step, result.summary)
+                summaries.append(result.summary)
+            df.to_parquet(segment_output, index=False)
+            del df
+        else:
+            logger.info(
+                f"Running steps {[s.name for s in steps]} in batches of {batch_size} rows"
+            )
+            batch_summaries: list[list[ProcessingSummary]] = [[] for _ in steps]
+            with geoparquet.BatchWriter(segment_output) as writer:
+                for batch in geoparquet.iter_batches_df(path, batch_size):
+                    for step, step_summaries in zip(steps, batch_summaries):
+                        result = _run_step(processor, step, batch)
+                        batch = result.df
+                        step_summaries.append(result.summary)
+                    writer.write(batch)
+            for step, step_summaries in zip(steps, batch_summaries):
+                summary = merge_batch_summaries(step_summaries)
+                _log_summary(step, summary)
+                summaries.append(summary)
+
+        if path != input_path:
+            path.unlink()
+        path = segment_output
+
+    if path == input_path:
+        shutil.copyfile(path, output_path)
+    else:
+        path.replace(output_path)
+    return summaries
+
+
 def process(
     dataset_id: str,
     processing_steps: list[ProcessingStep],
@@ -781,39 +1134,70 @@ def process(
     input_path: Path,
     output_path: Path,
     output_csv: bool = False,
+    batch_size: int | None = None,
+    engine: ProcessingEngine = "pandas",
 ) -> list[ProcessingSummary]:
-    """Validates and runs processing steps defined in config object"""
+    """Validates and runs processing steps defined in config object
+
+    With the "duckdb" engine, steps run as DuckDB queries (see
+    dcpy.lifecycle.ingest.duckdb_engine). Otherwise, if `batch_size` is given, runs in
+    streaming mode (see `_process_streaming`) rather than reading the whole dataset
+    into memory up front.
+    """
     logger.info(f"Processing {input_path.name} to {output_path.name}")
-    df = geoparquet.read_df(input_path)
     processor = ProcessingFunctions(dataset_id)
 
     logger.info("Running processing steps")
+    if engine == "duckdb":
+        from dcpy.lifecycle.ingest import duckdb_engine
+
+        summaries = duckdb_engine.process(
+            processor, processing_steps, input_path, output_path
+        )
+    elif batch_size:
+        summaries = _process_streaming(
+            processor, processing_steps, input_path, output_path, batch_size
+        )
+    else:
+        return _process_in_memory(
+            processor,
+            processing_steps,
+            expected_columns,
+            input_path,
+            output_path,
+            output_csv,
+        )
+
+    schema = parquet.read_schema(output_path)
+    validate_columns(pd.DataFrame(columns=schema.names), expected_columns)
+    if output_csv:
+        geoparquet.read_df(output_path).to_csv(
+            output_path.parent / f"{processor.dataset_id}.csv"
+        )
+    return summaries
+
+
+def _process_in_memory(
+    processor: ProcessingFunctions,
+    processing_steps: list[ProcessingStep],
+    expected_columns: list[Column],
+    input_path: Path,
+    output_path: Path,
+    output_csv: bool,
+) -> list[ProcessingSummary]:
+    df = geoparquet.read_df(input_path)
     summaries = []
     for step in processing_steps:
-        step_callable = getattr(processor, step.name)
         logger.info(f"Running processing step '{step.name}'")
-        start_time = datetime.now()
-        result = step_callable(df, **step.args)
-        end_time = datetime.now()
-        elapsed_seconds = (end_time - start_time).total_seconds()
-
+        result = _run_step(processor, step, df)
         df = result.df
-
-        # Add timing information to the summary
-        result.summary.start_time = start_time.isoformat()
-        result.summary.end_time = end_time.isoformat()
-        result.summary.elapsed_seconds = elapsed_seconds
-
-        logger.info(f"Processing step '{step.name}' results summary:")
-        logger.info(
-            f"{textwrap.indent(json.dumps(result.summary.model_dump(mode='json'), indent=4), '    ')}"
-        )
+        _log_summary(step, result.summary)
         summaries.append(result.summary)
 
     validate_columns(df, expected_columns)
 
     if output_csv:
-        df.to_csv(output_path.parent / f"{dataset_id}.csv")
+        df.to_csv(output_path.parent / f"{processor.dataset_id}.csv")
 
     df.to_parquet(output_path)
 
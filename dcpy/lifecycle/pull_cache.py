@@ -0,0 +1,294 @@
+"""Machine-wide, content-addressed cache of pulled datasets.
+
+Every build pulls the same multi-hundred-MB inputs, so a pulled file is kept under
+`{DCPY_LIFECYCLE_DATA_DIR}/cache/pulls` and reused by any later pull of the same
+(connector, dataset id, version, file type). Files are stored once per sha256 of their
+contents, with a SQLite index mapping pull keys to contents; the index is shared by
+every process on the machine.
+
+Only pulls from connectors that report an ETag for the dataset (see
+`Pull.get_pull_etag`) are cached, and a cache entry is served only if
+  - the connector's current ETag matches the one stored with the entry, and
+  - the cached file still hashes to its sha256 (i.e. it hasn't been modified in place
+    through a hard link or otherwise corrupted). Files are only hashed again if their
+    size, modification time or inode changed since they were stored, so a hit doesn't
+    read the file.
+
+Cached files are evicted least-recently-used first once they exceed a byte budget
+(`DCPY_PULL_CACHE_MAX_BYTES`, 0 disables the cache). Hit/miss counts are tracked per
+process in `stats`.
+"""
+
+import hashlib
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+from dcpy.lifecycle import config
+from dcpy.utils.logging import logger
+
+_HASH_CHUNK_BYTES = 2**20
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+
+    def summary(self) -> dict[str, int]:
+        return {"pull_cache_hits": self.hits, "pull_cache_misses": self.misses}
+
+
+stats = CacheStats()
+_stats_lock = threading.Lock()
+
+
+def _record(hit: bool) -> None:
+    with _stats_lock:
+        if hit:
+            stats.hits += 1
+        else:
+            stats.misses += 1
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(_HASH_CHUNK_BYTES):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _link_or_copy(source: Path, destination: Path) -> None:
+    """Hard link where possible, so a hit costs no copy or extra disk."""
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    destination.unlink(missing_ok=True)
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+
+
+@dataclass(frozen=True)
+class PullKey:
+    connector: str
+    dataset_id: str
+    version: str
+    file_type: str
+
+
+class PullCache:
+    def __init__(self, path: Path, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.blobs_path = path / "blobs"
+        self.blobs_path.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS blobs (
+                    sha256 TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    inode INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS entries (
+                    connector TEXT NOT NULL,
+                    dataset_id TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    file_type TEXT NOT NULL,
+                    file_name TEXT NOT NULL,
+                    etag TEXT,
+                    sha256 TEXT NOT NULL REFERENCES blobs (sha256),
+                    PRIMARY KEY (connector, dataset_id, version, file_type)
+                );
+                """
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # a connection per operation, since pulls run on several threads and processes
+        conn = sqlite3.connect(
+            self.path / "index.sqlite", timeout=60, isolation_level=None
+        )
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _blob_path(self, sha256: str) -> Path:
+        return self.blobs_path / sha256
+
+    def _blob_intact(self, sha256: str) -> bool:
+        """Whether the file stored for sha256 still has those contents. It's hashed
+        again only if it changed on disk since it was stored."""
+        blob = self._blob_path(sha256)
+        try:
+            stat = blob.stat()
+        except FileNotFoundError:
+            return False
+        on_disk = (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+        with self._connect() as conn:
+            stored = conn.execute(
+                "SELECT size, mtime_ns, inode FROM blobs WHERE sha256 = ?", (sha256,)
+            ).fetchone()
+        if stored == on_disk:
+            return True
+        if file_sha256(blob) != sha256:
+            return False
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE blobs SET size = ?, mtime_ns = ?, inode = ? WHERE sha256 = ?",
+                (*on_disk, sha256),
+            )
+        return True
+
+    def _invalidate(self, key: PullKey) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM entries "
+                "WHERE connector = ? AND dataset_id = ? AND version = ? AND file_type = ?",
+                (key.connector, key.dataset_id, key.version, key.file_type),
+            )
+
+    def get(
+        self, key: PullKey, destination_dir: Path, *, etag: str | None = None
+    ) -> Path | None:
+        """Places a cached pull at destination_dir and returns its path, or returns
+        None on a miss. Entries whose contents or ETag no longer match are dropped."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT file_name, etag, sha256 FROM entries "
+                "WHERE connector = ? AND dataset_id = ? AND version = ? AND file_type = ?",
+                (key.connector, key.dataset_id, key.version, key.file_type),
+            ).fetchone()
+        if row is None:
+            _record(hit=False)
+            return None
+
+        file_name, cached_etag, sha256 = row
+        blob = self._blob_path(sha256)
+        if etag is not None and etag != cached_etag:
+            logger.info(f"Pull cache entry for {key} is stale (ETag changed)")
+            self._invalidate(key)
+            _record(hit=False)
+            return None
+        if not self._blob_intact(sha256):
+            logger.warning(f"Pull cache entry for {key} is missing or corrupt")
+            self._invalidate(key)
+            with self._connect() as conn:
+                conn.execute("DELETE FROM blobs WHERE sha256 = ?", (sha256,))
+            blob.unlink(missing_ok=True)
+            _record(hit=False)
+            return None
+
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE blobs SET last_access = ? WHERE sha256 = ?",
+                (time.time(), sha256),
+            )
+        destination = destination_dir / file_name
+        try:
+            _link_or_copy(blob, destination)
+        except FileNotFoundError:
+            # evicted by another process in the meantime
+            _record(hit=False)
+            return None
+        _record(hit=True)
+        return destination
+
+    def put(
+        self,
+        key: PullKey,
+        pulled_path: Path,
+        destination_dir: Path,
+        *,
+        etag: str | None = None,
+    ) -> None:
+        """Stores a freshly pulled file. Directories, and files pulled outside of
+        destination_dir, aren't cached."""
+        if not pulled_path.is_file() or not pulled_path.is_relative_to(destination_dir):
+            logger.info(f"Not caching pull of {key}: {pulled_path} isn't a single file")
+            return
+        size = pulled_path.stat().st_size
+        if size > self.max_bytes:
+            logger.info(f"Not caching pull of {key}: larger than the cache budget")
+            return
+
+        sha256 = file_sha256(pulled_path)
+        blob = self._blob_path(sha256)
+        if not self._blob_intact(sha256):
+            # write under a unique name and rename, so readers never see a partial file
+            staging = self.blobs_path / f".{sha256}.{uuid.uuid4().hex}"
+            _link_or_copy(pulled_path, staging)
+            staging.replace(blob)
+        stat = blob.stat()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?)",
+                (sha256, size, time.time(), stat.st_mtime_ns, stat.st_ino),
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key.connector,
+                    key.dataset_id,
+                    key.version,
+                    key.file_type,
+                    str(pulled_path.relative_to(destination_dir)),
+                    etag,
+                    sha256,
+                ),
+            )
+        self.evict(keep={sha256})
+
+    def size(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[
+                0
+            ]
+
+    def evict(self, keep: frozenset[str] | set[str] = frozenset()) -> list[str]:
+        """Drops least recently used files until the cache fits its byte budget.
+        Returns the sha256s of the dropped files."""
+        evicted = []
+        with self._connect() as conn:
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[
+                0
+            ]
+            for sha256, size in conn.execute(
+                "SELECT sha256, size FROM blobs ORDER BY last_access"
+            ).fetchall():
+                if total <= self.max_bytes:
+                    break
+                if sha256 in keep:
+                    continue
+                conn.execute("DELETE FROM entries WHERE sha256 = ?", (sha256,))
+                conn.execute("DELETE FROM blobs WHERE sha256 = ?", (sha256,))
+                self._blob_path(sha256).unlink(missing_ok=True)
+                total -= size
+                evicted.append(sha256)
+        if evicted:
+            logger.info(f"Evicted {len(evicted)} file(s) from the pull cache")
+        return evicted
+
+
+def open_cache() -> PullCache | None:
+    """Opens the pull cache configured in the lifecycle config, unless its byte budget
+    is 0."""
+    conf = config.CONF["pull_cache"]
+    if not conf["max_bytes"]:
+        return None
+    return PullCache(
+        Path(config.CONF["local_data_path"]) / conf["local_data_path"],
+        conf["max_bytes"],
+    )
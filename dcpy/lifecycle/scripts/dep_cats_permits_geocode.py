@@ -11,9 +11,11 @@ import re
 import unicodedata
 
 import pandas as pd
-from geosupport import Geosupport, GeosupportError
+from geosupport import GeosupportError
 from pyproj import Transformer
 
+from dcpy.geosupport import engine
+
 # NAD83 / New York Long Island (ft) -> WGS84, used only for intersection matches,
 # which Geosupport returns as a state-plane x/y pair rather than lat/lon.
 _TRANSFORMER_2263_TO_4326 = Transformer.from_crs(
@@ -21,20 +23,8 @@ _TRANSFORMER_2263_TO_4326 = Transformer.from_crs(
 )
 
 
-class _GeosupportWrapper:
-    """Geosupport wrapper - lazy initialization to avoid loading until needed."""
-
-    def __init__(self) -> None:
-        self.g = None
-
-    @property
-    def geosupport(self):
-        if not self.g:
-            self.g = Geosupport()
-        return self.g
-
-
-_gw = _GeosupportWrapper()
+# lazily initialized, and read through the Geosupport result cache when configured
+_gw = engine.ProcessLocalGeosupport()
 
 
 def _safe_str(x) -> str:
@@ -146,6 +136,16 @@ def geo_parser(geo: dict) -> dict:
     )
 
 
+GEOCODE_INPUT_COLUMNS = [
+    "hnum",
+    "sname",
+    "borough",
+    "streetname_1",
+    "streetname_2",
+    "streetname_3",
+]
+
+
 def geocode(inputs: dict) -> dict:
     """Run cleaned/parsed address information through Geosupport.
 
@@ -155,14 +155,7 @@ def geocode(inputs: dict) -> dict:
     g = _gw.geosupport
     hnum, sname, borough, street_name_1, street_name_2, street_name_3 = (
         str("" if k not in inputs or inputs[k] is None else inputs[k])
-        for k in (
-            "hnum",
-            "sname",
-            "borough",
-            "streetname_1",
-            "streetname_2",
-            "streetname_3",
-        )
+        for k in GEOCODE_INPUT_COLUMNS
     )
 
     if street_name_1 != "":
@@ -218,7 +211,7 @@ def process(df: pd.DataFrame) -> pd.DataFrame:
     minus the CEQR app dependency:
     1. Clean/parse addresses (borough, house number, street name, stretch/intersection)
     2. Apply the same permit-status filter rules as the CEQR build's create.sql
-    3. Geocode each row with the 1B -> 1B-tpad -> 2 -> 3 fallback
+    3. Geocode each distinct address with the 1B -> 1B-tpad -> 2 -> 3 fallback
     4. Normalize geometry to longitude/latitude in EPSG:4326 (intersections come back
        as an x/y pair in EPSG:2263 and need reprojecting; everything else is already
        lon/lat), dropping rows Geosupport couldn't match at all
@@ -299,9 +292,8 @@ def process(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty:
         geocoded = pd.DataFrame(columns=geo_columns)
     else:
-        geocoded = df.apply(
-            lambda row: geocode(row.to_dict()), axis=1, result_type="expand"
-        )
+        # permits repeat the same address many times; each is only geocoded once
+        geocoded = engine.geocode_df(df, geocode, input_columns=GEOCODE_INPUT_COLUMNS)
     df = pd.concat([df, geocoded], axis=1)
 
     df = df[df["geo_grc"] != "71"].reset_index(drop=True)
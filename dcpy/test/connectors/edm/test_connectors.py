@@ -0,0 +1,71 @@
+from pathlib import Path
+from unittest.mock import MagicMock
+from zipfile import ZipFile
+
+import pytest
+
+from dcpy.connectors.edm.connectors import (
+    EdmConnector,
+    PublishedConnector,
+    create_builds_connector,
+)
+from dcpy.connectors.hybrid_pathed_storage import PathedStorageConnector, StorageType
+
+
+@pytest.fixture
+def published_conn(tmp_path: Path) -> EdmConnector:
+    (tmp_path / "storage").mkdir()
+    storage = PathedStorageConnector.from_storage_kwargs(
+        conn_type="edm.publishing.published.test",
+        storage_backend=StorageType.LOCAL,
+        local_dir=tmp_path / "storage",
+    )
+    data = tmp_path / "data.csv"
+    data.write_text("a,b\n1,2\n")
+    storage.push("product/publish/24v1/census/data.csv", filepath=data)
+    with ZipFile(tmp_path / "data.zip", "w") as zf:
+        zf.write(data, "data.csv")
+    storage.push("product/publish/24v1/data.zip", filepath=tmp_path / "data.zip")
+    return PublishedConnector.create(storage)
+
+
+def test_get_pull_etag(published_conn: EdmConnector, tmp_path: Path):
+    pull_conf = {"dataset": "census", "filepath": "data.csv", "file_type": "csv"}
+
+    etag = published_conn.get_pull_etag("product", version="24v1", **pull_conf)
+
+    assert etag
+    assert etag == published_conn.storage.get_etag(
+        "product/publish/24v1/census/data.csv"
+    )
+    assert published_conn.get_pull_etag("product", version="24v1") is None
+    assert (
+        published_conn.get_pull_etag(
+            "product", version="24v2", dataset="census", filepath="data.csv"
+        )
+        is None
+    )
+
+
+def test_open_zip_versioned_closes_file(published_conn: EdmConnector):
+    with published_conn.open_zip_versioned("product", "24v1", "data.zip") as zf:
+        file = zf.fp
+        assert zf.read("data.csv") == b"a,b\n1,2\n"
+
+    assert file is not None and file.closed
+
+
+@pytest.mark.parametrize("connector_args, sync", [({}, False), ({"sync": True}, True)])
+def test_build_uploads_sync_only_when_asked(
+    tmp_path: Path, connector_args: dict, sync: bool
+):
+    """Synced files keep the metadata of the upload that last changed them, so
+    uploads only sync on request."""
+    storage = MagicMock(spec=PathedStorageConnector)
+    builds_conn = create_builds_connector(storage)
+
+    builds_conn.push_versioned(
+        "product", "build", build_path=tmp_path, connector_args=connector_args
+    )
+
+    assert storage.push.call_args.kwargs["sync"] is sync
@@ -0,0 +1,227 @@
+import os
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from dcpy.connectors import hybrid_pathed_storage
+from dcpy.connectors.hybrid_pathed_storage import (
+    HybridPathedStorage,
+    PathedStorageConnector,
+    StorageType,
+    _matches_s3_etag,
+    _run_concurrently,
+)
+from dcpy.test.conftest import TEST_BUCKET
+from dcpy.utils import s3
+from dcpy.utils.range_reads import block_cache
+
+# moto only intercepts requests to AWS endpoints
+MOCK_S3_ENDPOINT = "https://s3.amazonaws.com"
+CONNECTORS = ["local_connector", "s3_connector"]
+
+
+@pytest.fixture(autouse=True)
+def clear_client_cache():
+    # so that no test uses a client created under another test's mock
+    hybrid_pathed_storage._s3_client.cache_clear()
+    block_cache.clear()
+    yield
+    hybrid_pathed_storage._s3_client.cache_clear()
+    block_cache.clear()
+
+
+@pytest.fixture
+def local_connector(tmp_path: Path) -> PathedStorageConnector:
+    (tmp_path / "storage").mkdir()
+    return PathedStorageConnector.from_storage_kwargs(
+        conn_type="local_test",
+        storage_backend=StorageType.LOCAL,
+        local_dir=tmp_path / "storage",
+    )
+
+
+@pytest.fixture
+def s3_connector(create_buckets) -> PathedStorageConnector:
+    return PathedStorageConnector.from_storage_kwargs(
+        conn_type="s3_test",
+        storage_backend=StorageType.S3,
+        s3_bucket=TEST_BUCKET,
+        s3_endpoint_url=MOCK_S3_ENDPOINT,
+        _validate_root_path=False,
+    )
+
+
+@pytest.fixture
+def build_dir(tmp_path: Path) -> Path:
+    build = tmp_path / "build"
+    for name in ["a.csv", "b.csv", "attachments/c.pdf"]:
+        (build / name).parent.mkdir(parents=True, exist_ok=True)
+        (build / name).write_text(name * 100)
+    return build
+
+
+def _sync_twice(connector: PathedStorageConnector, build_dir: Path) -> dict:
+    first = connector.push("build", filepath=build_dir, sync=True)["sync"]
+    assert first["files_transferred"] == 3
+    assert first["files_skipped"] == 0
+
+    (build_dir / "a.csv").write_text("changed")
+    (build_dir / "b.csv").unlink()
+    (build_dir / "d.csv").write_text("new")
+    return connector.push("build", filepath=build_dir, sync=True)["sync"]
+
+
+@pytest.mark.parametrize("connector", CONNECTORS)
+def test_push_and_pull_folder(connector, build_dir, tmp_path, request):
+    connector = request.getfixturevalue(connector)
+    connector.max_workers = 2
+    connector.push("build", filepath=build_dir / "attachments")
+
+    # pushing a folder replaces what's there
+    connector.push("build", filepath=build_dir)
+    connector.pull("build", destination_path=tmp_path / "pulled")
+    connector.pull("build/a.csv", destination_path=tmp_path / "pulled_a.csv")
+
+    pulled = sorted(
+        p.relative_to(tmp_path / "pulled").as_posix()
+        for p in (tmp_path / "pulled").rglob("*")
+        if p.is_file()
+    )
+    assert pulled == ["a.csv", "attachments/c.pdf", "b.csv"]
+    assert (tmp_path / "pulled" / "attachments/c.pdf").read_text() == (
+        "attachments/c.pdf" * 100
+    )
+    assert (tmp_path / "pulled_a.csv").read_text() == "a.csv" * 100
+
+
+@pytest.mark.parametrize("connector", CONNECTORS)
+def test_pull_missing_key(connector, tmp_path, request):
+    connector = request.getfixturevalue(connector)
+    with pytest.raises(FileNotFoundError):
+        connector.pull("missing", destination_path=tmp_path / "missing")
+
+
+def test_push_to_s3_with_acl_and_metadata(s3_connector, build_dir):
+    s3_connector.push(
+        "build", filepath=build_dir, acl="public-read", metadata={"version": "1"}
+    )
+
+    assert s3_connector.get_metadata("build/attachments/c.pdf") == {"version": "1"}
+    grants = s3.client().get_object_acl(Bucket=TEST_BUCKET, Key="build/a.csv")
+    assert any(
+        grant["Grantee"].get("URI", "").endswith("AllUsers")
+        for grant in grants["Grants"]
+    )
+    assert (
+        s3.client().head_object(Bucket=TEST_BUCKET, Key="build/a.csv")["ContentType"]
+        == "text/csv"
+    )
+
+
+def test_public_acl_only_on_s3(local_connector, build_dir):
+    with pytest.raises(ValueError, match="Public ACL"):
+        local_connector.push("build", filepath=build_dir, acl="public-read")
+
+
+def test_s3_clients_are_reused(s3_connector, build_dir):
+    storage = HybridPathedStorage.Factory.s3(TEST_BUCKET, MOCK_S3_ENDPOINT)
+    assert storage.root_path.client is s3_connector.storage.root_path.client
+
+    s3_connector.push(
+        "build", filepath=build_dir, acl="public-read", metadata={"a": "1"}
+    )
+    assert hybrid_pathed_storage._s3_client.cache_info().currsize == 1
+
+
+def test_run_concurrently_raises_first_error():
+    def fail_on_two(n: int) -> None:
+        if n == 2:
+            raise ValueError("two")
+
+    with pytest.raises(ValueError, match="two"):
+        _run_concurrently(fail_on_two, [(n,) for n in range(5)], max_workers=2)
+
+
+@pytest.mark.parametrize("connector", CONNECTORS)
+def test_sync_transfers_only_changes(connector, build_dir, tmp_path, request):
+    connector = request.getfixturevalue(connector)
+
+    stats = _sync_twice(connector, build_dir)
+
+    assert stats == {
+        "files_transferred": 2,
+        "bytes_transferred": len("changed") + len("new"),
+        "files_skipped": 1,
+        "bytes_skipped": len("attachments/c.pdf") * 100,
+        "files_deleted": 1,
+    }
+    connector.pull("build", destination_path=tmp_path / "pulled")
+    pulled = sorted(
+        p.relative_to(tmp_path / "pulled").as_posix()
+        for p in (tmp_path / "pulled").rglob("*")
+        if p.is_file()
+    )
+    assert pulled == ["a.csv", "attachments/c.pdf", "d.csv"]
+    assert (tmp_path / "pulled" / "a.csv").read_text() == "changed"
+
+
+def test_sync_file(local_connector, build_dir):
+    file = build_dir / "a.csv"
+
+    first = local_connector.push("a.csv", filepath=file, sync=True)["sync"]
+    second = local_connector.push("a.csv", filepath=file, sync=True)["sync"]
+
+    assert (first["files_transferred"], first["files_skipped"]) == (1, 0)
+    assert (second["files_transferred"], second["files_skipped"]) == (0, 1)
+
+
+def test_multipart_etag(create_buckets, tmp_path):
+    file = tmp_path / "large.bin"
+    file.write_bytes(os.urandom(2**23 + 1))
+    # uploaded in two parts, boto3's default part size being 8MB
+    s3.client().upload_file(str(file), TEST_BUCKET, "large.bin")
+    etag = s3.get_metadata(TEST_BUCKET, "large.bin").etag.strip('"')
+    assert etag.endswith("-2")
+
+    assert _matches_s3_etag(file, etag)
+    with open(file, "r+b") as f:
+        f.write(b"x")
+    assert not _matches_s3_etag(file, etag)
+
+
+@pytest.mark.parametrize("connector", CONNECTORS)
+def test_open(connector, tmp_path, request):
+    connector = request.getfixturevalue(connector)
+    df = pd.DataFrame({name: range(1000) for name in "abc"})
+    df.to_parquet(tmp_path / "data.parquet")
+    connector.push("data.parquet", filepath=tmp_path / "data.parquet")
+
+    with connector.open("data.parquet") as f:
+        projected = pd.read_parquet(f, columns=["b"], filters=[("a", "<", 10)])
+
+    pd.testing.assert_frame_equal(projected, df[["b"]].head(10))
+    with pytest.raises(FileNotFoundError):
+        connector.open("missing.parquet")
+
+
+def test_open_s3_fetches_ranges(s3_connector, tmp_path):
+    file = tmp_path / "data.bin"
+    file.write_bytes(os.urandom(2**21))
+    s3_connector.push("data.bin", filepath=file)
+
+    with s3_connector.open("data.bin") as f:
+        f.seek(2**20 + 10)
+        assert f.read(10) == file.read_bytes()[2**20 + 10 : 2**20 + 20]
+    with s3_connector.open("data.bin") as f:
+        f.seek(2**20)
+        f.read(100)
+
+    # only the second 1MB block was fetched, and then read from the cache
+    assert (block_cache.misses, block_cache.hits) == (1, 1)
+
+    with s3_connector.open("data.bin") as f:
+        file.write_bytes(b"overwritten")
+        s3_connector.push("data.bin", filepath=file)
+        with pytest.raises(Exception, match="PreconditionFailed"):
+            f.read()
@@ -55,6 +55,12 @@ class TestConnector:
         self.connector_prefix.pull(key=f"{SUBFOLDER}{FILE}", destination_path=tmp_path)
         assert file.exists()
 
+    def test_get_pull_etag(self, s3_object):
+        assert self.connector.get_pull_etag(KEY + "a") is None
+        etag = self.connector.get_pull_etag(KEY)
+        assert etag
+        assert self.connector_prefix.get_pull_etag(f"{SUBFOLDER}{FILE}") == etag
+
     def test_push(self, tmp_file: Path, create_buckets):
         self.connector.push(key=KEY, filepath=tmp_file)
         assert s3_utils.object_exists(TEST_BUCKET, KEY)
@@ -0,0 +1,94 @@
+import pytest
+from geosupport import GeosupportError
+
+from dcpy.geosupport import cache
+
+
+class FakeGeosupport:
+    def __init__(self):
+        self.calls: list[tuple[str, dict]] = []
+
+    def __getitem__(self, function: str):
+        def call(**kwargs):
+            self.calls.append((function, kwargs))
+            if kwargs.get("bin") == "0":
+                raise GeosupportError("BIN NOT FOUND", {"Message": "BIN NOT FOUND"})
+            return {"function": function, **kwargs}
+
+        return call
+
+
+@pytest.fixture
+def geocode_cache(tmp_path) -> cache.GeocodeCache:
+    return cache.GeocodeCache(tmp_path / "geocodes.sqlite", "25a")
+
+
+def test_cache_key_normalizes_inputs():
+    assert cache.cache_key(
+        "1a", "Regular", {"street_name": " greene  st", "house_number": "124"}
+    ) == cache.cache_key(
+        "1A", "regular", {"house_number": "124", "street_name": "GREENE ST"}
+    )
+    assert cache.cache_key("1A", None, {"bbl": "1"}) != cache.cache_key(
+        "1E", None, {"bbl": "1"}
+    )
+
+
+def test_cached_geosupport_skips_repeat_calls(geocode_cache):
+    fake = FakeGeosupport()
+    g = cache.CachedGeosupport(fake, geocode_cache)  # type: ignore[arg-type]
+    stats_before = cache.stats.copy()
+
+    first = g["BN"](bin="1000000", mode="tpad")
+    second = g["BN"](bin=" 1000000 ", mode="tpad")
+
+    assert first == second
+    assert fake.calls == [("BN", {"mode": "tpad", "bin": "1000000"})]
+    assert cache.stats - stats_before == cache.CacheStats(hits=1, misses=1)
+
+
+def test_cached_geosupport_caches_errors(geocode_cache):
+    fake = FakeGeosupport()
+    g = cache.CachedGeosupport(fake, geocode_cache)  # type: ignore[arg-type]
+    for _ in range(2):
+        with pytest.raises(GeosupportError) as e:
+            g["BN"](bin="0")
+        assert e.value.result == {"Message": "BIN NOT FOUND"}
+    assert len(fake.calls) == 1
+
+
+def test_cache_is_scoped_by_version(tmp_path):
+    path = tmp_path / "geocodes.sqlite"
+    key = cache.cache_key("BL", None, {"bbl": "1000010001"})
+    old = cache.GeocodeCache(path, "24d")
+    old.put(key, False, {"bbl": "1000010001"})
+
+    new = cache.GeocodeCache(path, "25a")
+    assert new.get(key) is None
+    new.evict_stale_versions()
+    assert old.get(key) is None
+
+
+def test_open_cache(tmp_path, monkeypatch):
+    monkeypatch.delenv(cache.CACHE_PATH_ENV_VAR, raising=False)
+    assert cache.open_cache("25a") is None
+
+    monkeypatch.setenv(cache.CACHE_PATH_ENV_VAR, str(tmp_path / "geocodes.sqlite"))
+    assert cache.open_cache(None) is None
+    opened = cache.open_cache("25a")
+    assert opened and opened.version == "25a"
+
+
+def test_open_cache_evicts_other_versions(tmp_path, monkeypatch):
+    path = tmp_path / "geocodes.sqlite"
+    monkeypatch.setenv(cache.CACHE_PATH_ENV_VAR, str(path))
+    monkeypatch.setattr(cache, "_evicted", set())
+    key = cache.cache_key("BL", None, {"bbl": "1000010001"})
+    for version in ["24c", "24d", "25a", "25b"]:
+        cache.GeocodeCache(path, version).put(key, False, {})
+
+    opened = cache.open_cache("25a")
+
+    assert opened and opened.get(key) == (False, {})
+    for version in ["24c", "24d", "25b"]:
+        assert cache.GeocodeCache(path, version).get(key) is None
@@ -0,0 +1,115 @@
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from dcpy.geosupport import cache, engine
+from dcpy.geosupport import pluto as geosupport_pluto
+
+
+def _fake_geocode(record: dict) -> dict:
+    return {"bbl": f"{record['boro']}{record['block']:0>5}{record['lot']:0>4}"}
+
+
+@pytest.fixture
+def bbl_df() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "boro": ["1", "2", "3", "4", "5"] * 5,
+            "block": [str(i) for i in range(25)],
+            "lot": ["1"] * 25,
+        },
+        index=range(100, 125),
+    )
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_geocode_df_preserves_row_order(bbl_df, workers):
+    geocoded = engine.geocode_df(
+        bbl_df, _fake_geocode, workers=workers, chunk_size=4, progress_callback=None
+    )
+    expected = bbl_df.apply(_fake_geocode, axis=1, result_type="expand")
+    pd.testing.assert_frame_equal(geocoded, expected)
+
+
+def test_geocode_df_reports_progress(bbl_df):
+    progress: list[tuple[int, int]] = []
+    engine.geocode_df(
+        bbl_df,
+        _fake_geocode,
+        workers=1,
+        chunk_size=10,
+        progress_callback=lambda done, total: progress.append((done, total)),
+    )
+    assert progress == [(10, 25), (20, 25), (25, 25)]
+
+
+def test_geocode_df_empty():
+    geocoded = engine.geocode_df(
+        pd.DataFrame(columns=["boro", "block", "lot"]), _fake_geocode
+    )
+    assert geocoded.empty
+
+
+def test_process_local_geosupport_is_lazy():
+    with patch.object(engine, "Geosupport") as geosupport:
+        handle = engine.ProcessLocalGeosupport()
+        geosupport.assert_not_called()
+        assert handle.geosupport is handle.geosupport
+        geosupport.assert_called_once()
+
+
+def test_geocode_df_address_maps_input_columns():
+    df = pd.DataFrame({"addr": ["124 GREENE ST"], "zipcode": ["10012"]})
+    with patch.object(
+        geosupport_pluto,
+        "get_address_geocode",
+        side_effect=lambda inputs: {"input": f"{inputs['address']} {inputs['zip']}"},
+    ):
+        geocoded = geosupport_pluto.geocode_df_address(
+            df, address_column="addr", zip_column="zipcode", workers=1
+        )
+    assert geocoded["input"].tolist() == ["124 GREENE ST 10012"]
+
+
+def _fake_cached_geocode(record: dict) -> dict:
+    cache.stats.hits += 1
+    return _fake_geocode(record)
+
+
+def test_geocode_df_collects_cache_stats_from_workers(bbl_df):
+    stats_before = cache.stats.copy()
+    engine.geocode_df(
+        bbl_df, _fake_cached_geocode, workers=2, chunk_size=5, progress_callback=None
+    )
+    assert (cache.stats - stats_before).hits == len(bbl_df)
+
+
+def test_geocode_df_geocodes_distinct_inputs_once():
+    df = pd.DataFrame(
+        {
+            "boro": ["1", "1", "2", "1", None, None],
+            "block": ["1", "1", "1", "1", "1", "1"],
+            "lot": ["1", "1", "1", "1", "1", "1"],
+            "other": ["a", "b", "c", "d", "e", "f"],
+        }
+    )
+    calls: list[dict] = []
+
+    def geocode(record: dict) -> dict:
+        calls.append(record)
+        return {"boro_out": record["boro"]}
+
+    stats_before = engine.dedup_stats.copy()
+    geocoded = engine.geocode_df(
+        df, geocode, input_columns=["boro", "block", "lot"], progress_callback=None
+    )
+
+    assert len(calls) == 3
+    assert "other" not in calls[0]
+    assert geocoded["boro_out"].iloc[:4].tolist() == ["1", "1", "2", "1"]
+    assert geocoded["boro_out"].iloc[4:].isna().all()
+    assert geocoded.index.equals(df.index)
+    assert engine.dedup_stats - stats_before == engine.DedupStats(
+        rows=6, distinct_inputs=3
+    )
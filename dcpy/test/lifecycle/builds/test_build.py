@@ -5,7 +5,7 @@ from unittest.mock import MagicMock, patch
 
 import geopandas as gpd
 import pytest
-from shapely import LineString, MultiPolygon, Point, Polygon
+from shapely import LineString, MultiPoint, MultiPolygon, Point, Polygon
 
 from dcpy.lifecycle.builds.export import (
     export,
@@ -410,19 +410,151 @@ def test_dat_export_from_duckdb_uses_crlf_no_header(tmp_path):
     client.close()
 
 
-def test_unsupported_format_from_duckdb_raises(tmp_path):
+def _make_duckdb_client(tmp_path: Path, gdf: gpd.GeoDataFrame):
+    """A DuckDB client with `gdf` as table test_schema.mytable, geometry in `geom`."""
     client = duckdb_utils.DuckDBClient(
         db_path=tmp_path / "test.duckdb", schema="test_schema"
     )
-    client.conn.execute("CREATE TABLE test_schema.mytable AS SELECT 1 AS a")
+    gdf.rename_geometry("geom").to_parquet(tmp_path / "mytable.parquet")
+    client.load_parquet(tmp_path / "mytable.parquet", "mytable", False)
+    return client
+
+
+def test_shapefile_export_from_duckdb_points(tmp_path):
+    client = _make_duckdb_client(tmp_path, _mixed_gdf)
+    out = tmp_path / "out.zip"
+    export_dataset_from_duckdb(
+        table_name="mytable",
+        file_path=out,
+        format=ExportFormat.shapefile,
+        duckdb_client=client,
+        geometry_type="points",
+    )
+    result = _read_shapefile_from_zip(out)
+    assert len(result) == 1
+    assert result.geom_type.iloc[0] == "Point"
+    assert result.crs == "EPSG:4326"
+    client.close()
+
 
-    with pytest.raises(NotImplementedError, match="shp"):
+def test_shapefile_export_from_duckdb_point_and_multipoint(tmp_path):
+    """Point + MultiPoint in one column are promoted to MultiPoint."""
+    gdf = gpd.GeoDataFrame(
+        {"id": [1, 2]},
+        geometry=[Point(0, 0), MultiPoint([(1, 1), (2, 2)])],
+        crs="EPSG:2263",
+    )
+    client = _make_duckdb_client(tmp_path, gdf)
+    out = tmp_path / "out.zip"
+    export_dataset_from_duckdb(
+        table_name="mytable",
+        file_path=out,
+        format=ExportFormat.shapefile,
+        duckdb_client=client,
+    )
+    result = _read_shapefile_from_zip(out)
+    assert len(result) == 2
+    assert set(result.geom_type) == {"MultiPoint"}
+    client.close()
+
+
+def test_shapefile_export_from_duckdb_mixed_raises(tmp_path):
+    client = _make_duckdb_client(tmp_path, _mixed_gdf)
+    with pytest.raises(ValueError, match="different families"):
         export_dataset_from_duckdb(
             table_name="mytable",
             file_path=tmp_path / "out.zip",
             format=ExportFormat.shapefile,
             duckdb_client=client,
         )
+    with pytest.raises(ValueError, match="zero rows"):
+        export_dataset_from_duckdb(
+            table_name="mytable",
+            file_path=tmp_path / "out.zip",
+            format=ExportFormat.shapefile,
+            duckdb_client=client,
+            geometry_type="lines",
+        )
+    client.close()
+
+
+def test_geojson_export_from_duckdb(tmp_path):
+    client = _make_duckdb_client(tmp_path, _mixed_gdf)
+    out = tmp_path / "mytable.geojson"
+    export_dataset_from_duckdb(
+        table_name="mytable",
+        file_path=out,
+        format=ExportFormat.geojson,
+        duckdb_client=client,
+        geometry_type="polygons",
+    )
+    result = gpd.read_file(out)
+    assert result["id"].tolist() == [2]
+    assert result.geom_type.tolist() == ["MultiPolygon"]
+    client.close()
+
+
+def test_gdb_export_from_duckdb_multi_layer(tmp_path):
+    """export() writes gdb entries sharing a filename from DuckDB as one FGDB, including
+    non-spatial tables."""
+    client = _make_duckdb_client(tmp_path, _mixed_gdf)
+    client.conn.execute(
+        "CREATE TABLE test_schema.names AS SELECT 1 AS id, 'first' AS name"
+    )
+    recipe_path = tmp_path / "recipe.lock.yml"
+    recipe_path.write_text(
+        """\
+name: Test Product
+product: test
+version: 24Q1
+inputs:
+  datasets:
+  - name: mytable
+    destination: duckdb
+exports:
+  output_folder: {output_folder}
+  datasets:
+  - name: mytable
+    filename: combined.zip
+    format: gdb
+    custom:
+      layer: places
+      geometry_type: points
+  - name: mytable
+    filename: combined.zip
+    format: gdb
+    custom:
+      layer: boundaries
+      geometry_type: polygons
+  - name: names
+    filename: combined.zip
+    format: gdb
+""".format(output_folder=str(tmp_path / "output"))
+    )
+
+    export(recipe_path, duckdb_client=client)
+
+    out = tmp_path / "output" / "dataset_files" / "combined.zip"
+    places = gpd.read_file(f"zip://{out}!combined.gdb", layer="places")
+    boundaries = gpd.read_file(f"zip://{out}!combined.gdb", layer="boundaries")
+    names = gpd.read_file(f"zip://{out}!combined.gdb", layer="names")
+    assert places.geom_type.tolist() == ["Point"]
+    assert places.crs == "EPSG:4326"
+    assert boundaries.geom_type.tolist() == ["MultiPolygon"]
+    assert names["name"].tolist() == ["first"]
+    client.close()
+
+
+def test_gdb_export_from_duckdb_empty_layer_raises(tmp_path):
+    client = _make_duckdb_client(tmp_path, _mixed_gdf)
+    with pytest.raises(ValueError, match="No rows to export"):
+        export_dataset_from_duckdb(
+            table_name="mytable",
+            file_path=tmp_path / "out.zip",
+            format=ExportFormat.gdb,
+            duckdb_client=client,
+            geometry_type="lines",
+        )
     client.close()
 
 
@@ -457,7 +589,7 @@ exports:
 
 def test_export_mixed_destinations_falls_back_to_postgres(tmp_path):
     """A recipe with both postgres- and duckdb-destined inputs falls back to the postgres
-    export path (gdb/shapefile export and mixed-backend export aren't supported for DuckDB)."""
+    export path (mixed-backend export isn't supported)."""
     recipe_path = tmp_path / "recipe.lock.yml"
     recipe_path.write_text(
         """\
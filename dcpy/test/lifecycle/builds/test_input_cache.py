@@ -0,0 +1,66 @@
+import pytest
+
+from dcpy.connectors.edm import recipes
+from dcpy.lifecycle.builds import input_cache
+from dcpy.lifecycle.builds.models import DataPreprocessor, InputDataset
+
+
+def _dataset(**kwargs) -> InputDataset:
+    return InputDataset(
+        **{
+            "id": "dcp_mappluto",
+            "version": "24v1",
+            "file_type": recipes.DatasetType.parquet,
+            **kwargs,
+        }
+    )
+
+
+def test_fingerprint_ignores_table_name():
+    assert input_cache.fingerprint(_dataset()) == input_cache.fingerprint(
+        _dataset(import_as="pluto", load_engine="pandas")
+    )
+
+
+def test_fingerprint_unchanged_by_pull():
+    pulled = _dataset()
+    pulled.custom["file_type"] = pulled.file_type
+    assert input_cache.fingerprint(pulled) == input_cache.fingerprint(_dataset())
+
+
+@pytest.mark.parametrize(
+    "changes",
+    [
+        {"version": "24v2"},
+        {"file_type": recipes.DatasetType.csv},
+        {"load_engine": "duckdb"},
+        {"custom": {"layer_name": "a"}},
+        {"preprocessor": DataPreprocessor(module=__name__, function="_dataset")},
+    ],
+)
+def test_fingerprint_changes_with_contents(changes):
+    assert input_cache.fingerprint(_dataset()) != input_cache.fingerprint(
+        _dataset(**changes)
+    )
+
+
+def test_preprocessor_hash_follows_source(tmp_path, monkeypatch):
+    module = tmp_path / "preprocessor_module.py"
+    module.write_text("def preprocess(name, df):\n    return df\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    preprocessor = DataPreprocessor(module="preprocessor_module", function="preprocess")
+    before = input_cache.preprocessor_hash(preprocessor)
+
+    module.write_text("def preprocess(name, df):\n    return df.head()\n")
+
+    assert input_cache.preprocessor_hash(preprocessor) != before
+
+
+def test_cache_table_name():
+    ds = _dataset(import_as="A" * 100)
+    fingerprint = input_cache.fingerprint(ds)
+    table_name = input_cache.cache_table_name(ds, fingerprint)
+
+    assert len(table_name) == 63
+    assert table_name == table_name.lower()
+    assert table_name.endswith(fingerprint[:16])
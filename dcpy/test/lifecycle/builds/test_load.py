@@ -1,3 +1,4 @@
+import time
 from pathlib import Path
 from unittest import TestCase
 from unittest.mock import MagicMock, patch
@@ -181,7 +182,8 @@ class TestGetDataset:
 
 
 class TestCachedLoad:
-    """The cache is keyed by dataset id, but tables are named by `import_as`."""
+    """Inputs are looked up in the input cache by fingerprint, and shared with the
+    build under their `import_as` name."""
 
     @staticmethod
     def _recipe():
@@ -198,30 +200,18 @@ class TestCachedLoad:
         ]
         return recipe
 
-    def _load(self, table_exists: bool):
+    def _load(self, cached_tables: dict[str, str]):
         pg_client = MagicMock()
-        pg_client.table_or_view_exists.return_value = table_exists
-        # source_data_versions reports the *dataset id*, so the cache looks populated
-        # for every layer of a multi-layer source once any one of them is cached.
-        versions = pd.DataFrame(
-            [{"schema_name": "multi_layer_source", "v": "v1", "file_type": "csv"}]
-        )
+        cache = MagicMock()
+        cache.lookup.side_effect = lambda fingerprints: {
+            fp: cached_tables[fp] for fp in fingerprints if fp in cached_tables
+        }
         with (
             patch.object(load.postgres, "PostgresClient", return_value=pg_client),
-            patch.object(load, "get_source_data_versions", return_value=versions),
+            patch.object(load.input_cache, "InputCache", return_value=cache),
             patch.object(load, "setup_build_pg_schema"),
             patch.object(load.data_loader, "pull_dataset", return_value=CSV),
-            patch.object(
-                load,
-                "import_dataset",
-                return_value=ImportedDataset(
-                    id="multi_layer_source",
-                    version="v1",
-                    file_type=recipes.DatasetType.csv,
-                    destination="layer_b",
-                    destination_type=InputDatasetDestination.postgres,
-                ),
-            ) as import_dataset,
+            patch.object(load, "import_dataset") as import_dataset,
         ):
             load.load_source_data_from_resolved_recipe(
                 self._recipe(),
@@ -230,17 +220,149 @@ class TestCachedLoad:
                 target_schema="build_schema",
                 _write_metadata_file=False,
             )
-        return pg_client, import_dataset
+        return pg_client, cache, import_dataset
+
+    def test_uses_cache_on_hit(self):
+        fingerprint = load.input_cache.fingerprint(self._recipe().inputs.datasets[0])
+        pg_client, cache, import_dataset = self._load({fingerprint: "cached_table"})
 
-    def test_uses_cache_when_table_present(self):
-        pg_client, import_dataset = self._load(table_exists=True)
-        pg_client.create_view.assert_called_once_with("layer_b", "recipe_cache")
+        pg_client.create_view.assert_called_once_with(
+            "layer_b", "recipe_cache", from_table_name="cached_table"
+        )
         import_dataset.assert_not_called()
+        cache.register.assert_not_called()
+        assert cache.evict.call_args.kwargs["keep"] == {fingerprint}
 
-    def test_falls_back_to_pull_when_table_absent(self):
-        pg_client, import_dataset = self._load(table_exists=False)
-        pg_client.table_or_view_exists.assert_called_once_with(
-            "layer_b", schema="recipe_cache"
+    def test_populates_cache_on_miss(self):
+        fingerprint = load.input_cache.fingerprint(self._recipe().inputs.datasets[0])
+        cache_table = load.input_cache.cache_table_name(
+            self._recipe().inputs.datasets[0], fingerprint
         )
-        pg_client.create_view.assert_not_called()
-        import_dataset.assert_called_once()
+
+        pg_client, cache, import_dataset = self._load({})
+
+        imported_ds = import_dataset.call_args.args[0]
+        assert imported_ds.import_as == cache_table
+        assert import_dataset.call_args.args[2] is cache.pg_client
+        cache.populating.assert_called_once_with(fingerprint)
+        cache.register.assert_called_once()
+        pg_client.create_view.assert_called_once_with(
+            "layer_b", "recipe_cache", from_table_name=cache_table
+        )
+
+
+class TestConcurrentLoad:
+    @pytest.fixture(autouse=True)
+    def build_output_dir(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("BUILD_ENV_OUTPUT_DIR", str(tmp_path))
+
+    @staticmethod
+    def _recipe(datasets: list[InputDataset]):
+        recipe = MagicMock()
+        recipe.name = "Tester"
+        recipe.inputs.datasets = datasets
+        return recipe
+
+    def test_order_and_timing(self):
+        """Datasets finishing out of order are still reported in recipe order, and
+        layers of the same source are only pulled once."""
+        datasets = [
+            InputDataset(
+                id=f"ds_{i}",
+                version="v1",
+                file_type=recipes.DatasetType.csv,
+                destination=InputDatasetDestination.file,
+            )
+            for i in range(4)
+        ] + [
+            InputDataset(
+                name="ds_0",
+                import_as="ds_0_layer",
+                version="v1",
+                file_type=recipes.DatasetType.csv,
+                destination=InputDatasetDestination.file,
+                custom={"layer_name": "other_layer"},
+            )
+        ]
+
+        def pull(ds, stage):
+            # earlier datasets take longer
+            time.sleep(0.05 * (4 - int(ds.id[-1])))
+            return Path(f"{ds.id}.csv")
+
+        with patch.object(
+            load.data_loader, "pull_dataset", side_effect=pull
+        ) as pull_dataset:
+            result = load.load_source_data_from_resolved_recipe(
+                self._recipe(datasets),
+                target_schema="build_schema",
+                _write_metadata_file=False,
+                max_workers=4,
+            )
+
+        assert pull_dataset.call_count == 4
+        assert list(result.datasets) == ["ds_0", "ds_1", "ds_2", "ds_3"]
+        for ds_id, versions in result.datasets.items():
+            imported = versions["v1"]
+            assert imported.destination == Path(f"{ds_id}.csv")
+            assert imported.pull_seconds is not None
+            assert imported.import_seconds is not None
+        assert "pull_seconds" in result.datasets["ds_0"]["v1"].model_dump()
+
+    def test_different_files_pulled_separately(self):
+        """Datasets of the same product and version can pull different files."""
+        datasets = [
+            InputDataset(
+                name="db-cpdb",
+                import_as=f"cpdb_projects_{kind}",
+                version="v1",
+                file_type=recipes.DatasetType.shapefile,
+                destination=InputDatasetDestination.file,
+                custom={"filepath": f"cpdb_projects_{kind}.shp.zip"},
+            )
+            for kind in ["poly", "pts"]
+        ]
+
+        def pull(ds, stage):
+            # as pull_dataset does
+            ds.custom["file_type"] = ds.file_type
+            return Path(ds.custom["filepath"])
+
+        with patch.object(
+            load.data_loader, "pull_dataset", side_effect=pull
+        ) as pull_dataset:
+            load.load_source_data_from_resolved_recipe(
+                self._recipe(datasets),
+                target_schema="build_schema",
+                _write_metadata_file=False,
+                max_workers=2,
+            )
+
+        pulled = {
+            call.args[0].custom["filepath"] for call in pull_dataset.call_args_list
+        }
+        assert pulled == {"cpdb_projects_poly.shp.zip", "cpdb_projects_pts.shp.zip"}
+
+    def test_failure_raised(self):
+        datasets = [
+            InputDataset(
+                id=ds_id,
+                version="v1",
+                file_type=recipes.DatasetType.csv,
+                destination=InputDatasetDestination.file,
+            )
+            for ds_id in ["ok", "broken"]
+        ]
+
+        def pull(ds, stage):
+            if ds.id == "broken":
+                raise FileNotFoundError(ds.id)
+            return Path(f"{ds.id}.csv")
+
+        with patch.object(load.data_loader, "pull_dataset", side_effect=pull):
+            with pytest.raises(FileNotFoundError, match="broken"):
+                load.load_source_data_from_resolved_recipe(
+                    self._recipe(datasets),
+                    target_schema="build_schema",
+                    _write_metadata_file=False,
+                )
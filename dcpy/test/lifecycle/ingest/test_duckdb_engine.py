@@ -0,0 +1,222 @@
+from pathlib import Path
+
+import geopandas as gpd
+import pandas as pd
+import pytest
+from shapely import Point
+
+from dcpy.lifecycle.ingest import duckdb_engine, transform
+from dcpy.lifecycle.ingest.models import ProcessingStep
+from dcpy.utils.geospatial import parquet as geoparquet
+
+from .shared import TEST_DATASET_NAME
+
+
+@pytest.fixture
+def input_path(tmp_path: Path) -> Path:
+    path = tmp_path / "_init.parquet"
+    pd.DataFrame(
+        {
+            "Boro Code": ["1", "2", "1", "3", "1", "1", None],
+            "Name": [" f", "e ", " d\t", "c", "b", "b", None],
+            "bbl": ["10", "20", "30", "40", "50", "50", "70"],
+            "x": [1.0, 2.0, None, 4.0, 5.0, 5.0, 7.5],
+            "count": [1, 2, 3, 4, 5, 5, 7],
+        }
+    ).to_parquet(path, index=False)
+    return path
+
+
+def _run_engines(
+    steps: list[ProcessingStep], input_path: Path
+) -> tuple[pd.DataFrame, list[dict], pd.DataFrame, list[dict]]:
+    outputs: list = []
+    for engine in ("pandas", "duckdb"):
+        output_path = input_path.parent / f"{engine}.parquet"
+        summaries = transform.process(
+            TEST_DATASET_NAME, steps, [], input_path, output_path, engine=engine
+        )
+        outputs.append(geoparquet.read_df(output_path).reset_index(drop=True))
+        outputs.append(
+            [
+                s.model_dump(exclude={"start_time", "end_time", "elapsed_seconds"})
+                for s in summaries
+            ]
+        )
+    return tuple(outputs)
+
+
+@pytest.mark.parametrize(
+    "step",
+    [
+        ProcessingStep(
+            name="filter_rows",
+            args={"type": "equals", "column_name": "Boro Code", "val": "1"},
+        ),
+        ProcessingStep(
+            name="filter_rows",
+            args={"type": "equals", "column_name": "Boro Code", "val": 1},
+        ),
+        ProcessingStep(
+            name="filter_rows",
+            args={"type": "equals", "column_name": "count", "val": 5},
+        ),
+        ProcessingStep(
+            name="filter_rows",
+            args={"type": "contains", "column_name": "bbl", "val": "^[1-3]"},
+        ),
+        ProcessingStep(name="filter_columns", args={"columns": ["bbl", "x"]}),
+        ProcessingStep(
+            name="filter_columns", args={"columns": ["bbl", "x"], "mode": "drop"}
+        ),
+        ProcessingStep(name="rename_columns", args={"map": {"Name": "name"}}),
+        ProcessingStep(
+            name="rename_columns",
+            args={"map": {"bbl": "BBL", "Name": "name"}, "drop_others": True},
+        ),
+        ProcessingStep(
+            name="clean_column_names", args={"lower": True, "replace": {" ": "_"}}
+        ),
+        ProcessingStep(name="update_column", args={"column_name": "bbl", "val": "0"}),
+        ProcessingStep(name="deduplicate"),
+        ProcessingStep(name="deduplicate", args={"by": ["Boro Code"]}),
+        ProcessingStep(
+            name="deduplicate",
+            args={"by": ["Boro Code"], "sort_columns": ["x"], "sort_ascending": False},
+        ),
+        ProcessingStep(name="sort", args={"by": ["Name", "bbl"]}),
+        ProcessingStep(name="sort", args={"by": ["bbl"]}),
+        ProcessingStep(
+            name="groupby",
+            args={
+                "by": "Boro Code",
+                "agg": {"count": "sum", "x": "mean", "bbl": "nunique"},
+            },
+        ),
+        ProcessingStep(name="strip_columns"),
+        ProcessingStep(name="strip_columns", args={"cols": ["Name"]}),
+        ProcessingStep(
+            name="coerce_column_types",
+            args={"column_types": {"bbl": "numeric", "x": "string"}},
+        ),
+        ProcessingStep(name="drop_columns", args={"columns": ["bbl", 0]}),
+    ],
+)
+def test_sql_steps_match_pandas(step: ProcessingStep, input_path: Path):
+    pandas_df, pandas_summaries, duckdb_df, duckdb_summaries = _run_engines(
+        [step], input_path
+    )
+    pd.testing.assert_frame_equal(duckdb_df, pandas_df, check_dtype=False)
+    assert duckdb_summaries == pandas_summaries
+
+
+def test_pandas_fallback(input_path: Path):
+    steps = [
+        ProcessingStep(name="rename_columns", args={"map": {"Name": "name"}}),
+        ProcessingStep(
+            name="pd_series_func",
+            args={"column_name": "name", "function_name": "str.upper"},
+        ),
+        ProcessingStep(
+            name="convert_to_geometry",
+            args={"geom_column": {"x": "x", "y": "count"}, "crs": "EPSG:2263"},
+        ),
+        ProcessingStep(name="strip_columns"),
+    ]
+    pandas_df, pandas_summaries, duckdb_df, duckdb_summaries = _run_engines(
+        steps, input_path
+    )
+
+    assert isinstance(duckdb_df, gpd.GeoDataFrame)
+    assert duckdb_df.crs == "EPSG:2263"
+    pd.testing.assert_frame_equal(duckdb_df, pandas_df, check_dtype=False)
+    assert duckdb_summaries == pandas_summaries
+    # scratch files are cleaned up
+    assert not list(input_path.parent.glob("_duckdb_*"))
+
+
+def test_geometry_passes_through_sql_steps(tmp_path: Path):
+    input_path = tmp_path / "_init.parquet"
+    gpd.GeoDataFrame(
+        {"a": [1, 2, 3]},
+        geometry=[Point(0, 0), None, Point(1, 1)],
+        crs="EPSG:2263",
+    ).rename_geometry("geom").to_parquet(input_path, index=False)
+    steps = [
+        ProcessingStep(
+            name="filter_rows", args={"type": "equals", "column_name": "a", "val": 3}
+        ),
+        ProcessingStep(name="rename_columns", args={"map": {"a": "b"}}),
+    ]
+    pandas_df, _, duckdb_df, _ = _run_engines(steps, input_path)
+
+    assert isinstance(duckdb_df, gpd.GeoDataFrame)
+    assert duckdb_df.crs == "EPSG:2263"
+    assert duckdb_df.geometry.name == "geom"
+    pd.testing.assert_frame_equal(duckdb_df, pandas_df, check_dtype=False)
+
+
+class TestSupports:
+    @pytest.fixture
+    def sql(self, input_path: Path):
+        import duckdb
+
+        sql = duckdb_engine.SqlProcessingFunctions(duckdb.connect())
+        sql.load(input_path)
+        return sql
+
+    @pytest.mark.parametrize(
+        "step, expected",
+        [
+            (ProcessingStep(name="filter_rows"), True),
+            (
+                ProcessingStep(
+                    name="filter_rows", args={"column_name": "count", "val": 5}
+                ),
+                True,
+            ),
+            (
+                ProcessingStep(
+                    name="filter_rows", args={"column_name": "Boro Code", "val": 1}
+                ),
+                False,
+            ),
+            (
+                ProcessingStep(
+                    name="filter_rows", args={"column_name": "count", "val": "5"}
+                ),
+                False,
+            ),
+            (ProcessingStep(name="python_script"), False),
+            (ProcessingStep(name="pd_series_func"), False),
+            (
+                ProcessingStep(
+                    name="groupby", args={"by": "bbl", "agg": {"count": "sum"}}
+                ),
+                True,
+            ),
+            (ProcessingStep(name="groupby", args={"by": "bbl", "agg": "sum"}), False),
+            (
+                ProcessingStep(
+                    name="groupby", args={"by": "bbl", "agg": {"Name": "sum"}}
+                ),
+                False,
+            ),
+            (
+                ProcessingStep(
+                    name="coerce_column_types",
+                    args={"column_types": {"bbl": "date"}},
+                ),
+                False,
+            ),
+            (
+                ProcessingStep(
+                    name="coerce_column_types",
+                    args={"column_types": {"count": "integer"}},
+                ),
+                True,
+            ),
+        ],
+    )
+    def test_supports(self, sql, step, expected):
+        assert sql.supports(step) == expected
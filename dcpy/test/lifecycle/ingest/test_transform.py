@@ -5,13 +5,15 @@ from unittest import mock
 import geopandas as gpd
 import numpy as np
 import pandas as pd
+import pyarrow as pa
 import pytest
 import yaml
+from pyarrow import parquet
 from pydantic import BaseModel, TypeAdapter
 from shapely import MultiPolygon, Point, Polygon
 
 from dcpy.lifecycle.ingest import transform
-from dcpy.lifecycle.ingest.models import Column, ProcessingStep
+from dcpy.lifecycle.ingest.models import Column, ProcessingStep, ProcessingSummary
 from dcpy.utils import data
 from dcpy.utils.formats import Format
 from dcpy.utils.geospatial import parquet as geoparquet
@@ -91,6 +93,97 @@ def test_to_parquet(file: dict, create_temp_filesystem: Path):
     )
 
 
+def test_to_parquet_arrow_geometry(tmp_path: Path):
+    """Vector formats are written from arrow, and should still be valid geoparquet"""
+    gdb_format = TypeAdapter(Format).validate_python(
+        {"type": "geodatabase", "crs": "EPSG:4326", "layer": "test"}
+    )
+    transform.to_parquet(
+        gdb_format,
+        RESOURCES / TEST_DATA_DIR / "test.gdb",
+        dir=tmp_path,
+        output_filename="init.parquet",
+    )
+
+    gdf = geoparquet.read_df(tmp_path / "init.parquet")
+    expected = data.read_data_to_df(gdb_format, RESOURCES / TEST_DATA_DIR / "test.gdb")
+    assert isinstance(gdf, gpd.GeoDataFrame)
+    assert gdf.geometry.name == transform.OUTPUT_GEOM_COLUMN
+    assert gdf.crs == expected.crs
+    assert gdf.geometry.rename("geometry").equals(expected.geometry)
+
+
+def test_to_parquet_csv_in_chunks(tmp_path: Path):
+    csv_path = tmp_path / "data.csv"
+    rows = [f"{i},{i % 7}.5,-74.0,40.{i}" for i in range(2_000)]
+    rows[-1] = "x,1.5,-74.0,40.7"
+    csv_path.write_text("id,value,longitude,latitude\n" + "\n".join(rows) + "\n")
+    csv_format = TypeAdapter(Format).validate_python(
+        {
+            "type": "csv",
+            "chunk_size_mb": 1,
+            "sample_rows": 100,
+            "geometry": {
+                "crs": "EPSG:4326",
+                "geom_column": {"x": "longitude", "y": "latitude"},
+            },
+        }
+    )
+
+    summary = transform.to_parquet(
+        csv_format, csv_path, dir=tmp_path, output_filename="chunked.parquet"
+    )
+
+    assert summary.custom["reader"] == "chunked"
+    assert summary.custom["csv_type_conflicts"] == [
+        {
+            "column": "id",
+            "inferred_type": "int64",
+            "value": "x",
+            "chunk_start_row": 0,
+            "read_as": "string",
+        }
+    ]
+    chunked = geoparquet.read_df(tmp_path / "chunked.parquet")
+    assert isinstance(chunked, gpd.GeoDataFrame)
+    assert chunked.crs == "EPSG:4326"
+    expected = data.read_data_to_df(
+        csv_format.model_copy(update={"chunk_size_mb": None, "dtype": {"id": "str"}}),
+        csv_path,
+    )
+    assert isinstance(expected, gpd.GeoDataFrame)
+    pd.testing.assert_frame_equal(
+        pd.DataFrame(chunked.to_wkb()),
+        pd.DataFrame(expected.rename_geometry(transform.OUTPUT_GEOM_COLUMN).to_wkb()),
+        check_dtype=False,
+    )
+
+
+def test_to_parquet_csv_in_chunks_conflicts_capped(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(transform, "MAX_CSV_TYPE_CONFLICTS", 2)
+    csv_path = tmp_path / "data.csv"
+    rows = [f"{i},{i},{i}" for i in range(2_000)] + ["x,y,z"]
+    csv_path.write_text("a,b,c\n" + "\n".join(rows) + "\n")
+    csv_format = TypeAdapter(Format).validate_python(
+        {"type": "csv", "chunk_size_mb": 1, "sample_rows": 100}
+    )
+    iter_csv_batches = mock.MagicMock(wraps=data.iter_csv_batches)
+    monkeypatch.setattr(data, "iter_csv_batches", iter_csv_batches)
+
+    summary = transform.to_parquet(
+        csv_format, csv_path, dir=tmp_path, output_filename="chunked.parquet"
+    )
+
+    # a's conflict is resolved by reading again, b's by reading every column as a string
+    assert iter_csv_batches.call_count == 3
+    assert [
+        (c["column"], c["read_as"]) for c in summary.custom["csv_type_conflicts"]
+    ] == [("a", "string"), ("b", "string")]
+    table = parquet.read_table(tmp_path / "chunked.parquet")
+    assert all(field.type == pa.string() for field in table.schema)
+    assert table.num_rows == 2_001
+
+
 class TestDetermineProcessingSteps:  # TODO
     steps = [
         ProcessingStep(name="clean_column_names", args={"lower": True}),
@@ -179,6 +272,28 @@ class TestProcessors:
         )
         assert 0 == sorted_again.summary.data_modifications["rows_updated"]
 
+    @pytest.mark.parametrize(
+        "step, kwargs",
+        [
+            ("sort", {"by": ["a"]}),
+            ("sort", {"by": ["b"]}),
+            ("strip_columns", {}),
+            ("coerce_column_types", {"column_types": {"a": "string"}}),
+        ],
+    )
+    def test_change_stats_match_exact(self, step, kwargs):
+        exact_proc = transform.ProcessingFunctions(
+            TEST_DATASET_NAME, exact_change_stats=True
+        )
+        df = self.whitespace_df
+        before = df.copy()
+        result = getattr(self.proc, step)(df, **kwargs)
+        exact_result = getattr(exact_proc, step)(df, **kwargs)
+
+        assert result.summary == exact_result.summary
+        assert result.df.equals(exact_result.df)
+        pd.testing.assert_frame_equal(df, before)  # input is left untouched
+
     def test_filter_rows_equals(self):
         filtered = self.proc.filter_rows(
             self.basic_df, type="equals", column_name="a", val=1
@@ -650,6 +765,22 @@ class TestProcessors:
                 function="returns_wrong_type_at_runtime",
             )
 
+    def test_geocode_bin_reports_dedup(self):
+        from dcpy.geosupport import pluto as geosupport_pluto
+
+        df = pd.DataFrame({"bin": ["1000000", "1000000", "2000000", "1000000"]})
+        with mock.patch.object(
+            geosupport_pluto,
+            "get_bbl",
+            side_effect=lambda inputs: {"bbl": "1000010001", "bin": inputs["bin"]},
+        ) as get_bbl:
+            result = self.proc.geocode_bin(df)
+        assert get_bbl.call_count == 2
+        assert result.df["bin"].tolist() == df["bin"].tolist()
+        assert result.summary.custom["geocode_input_rows"] == 4
+        assert result.summary.custom["geocode_distinct_inputs"] == 2
+        assert result.summary.custom["geocode_dedup_ratio"] == 2.0
+
 
 def test_processing_no_steps(create_temp_filesystem: Path):
     input = RESOURCES / TEST_DATA_DIR / "test.parquet"
@@ -694,6 +825,134 @@ def test_processing(create_temp_filesystem: Path):
     assert (create_temp_filesystem / f"{TEST_DATASET_NAME}.csv").exists()
 
 
+def test_processing_streaming(tmp_path: Path):
+    input = tmp_path / "_init.parquet"
+    pd.DataFrame(
+        {
+            "Boro Code": ["1", "2", "1", "3", "1", "4", "1"],
+            "Name": [" f", "e ", " d ", "c", "b", "a", " g"],
+            "x": [1.0, 2.0, None, 4.0, 5.0, 6.0, 7.0],
+            "y": [1.0, 2.0, None, 4.0, 5.0, 6.0, 7.0],
+        }
+    ).to_parquet(input)
+    steps = [
+        ProcessingStep(
+            name="clean_column_names", args={"lower": True, "replace": {" ": "_"}}
+        ),
+        ProcessingStep(
+            name="filter_rows",
+            args={"type": "equals", "column_name": "boro_code", "val": "1"},
+        ),
+        ProcessingStep(name="strip_columns"),
+        ProcessingStep(name="sort", args={"by": ["name"]}),
+        ProcessingStep(name="rename_columns", args={"map": {"boro_code": "borough"}}),
+        ProcessingStep(
+            name="convert_to_geometry",
+            args={"geom_column": {"x": "x", "y": "y"}, "crs": "EPSG:2263"},
+        ),
+    ]
+    columns = [Column(id="borough", data_type="text")]
+
+    in_memory_output = tmp_path / "in_memory.parquet"
+    in_memory_summaries = transform.process(
+        TEST_DATASET_NAME, steps, columns, input, in_memory_output
+    )
+    streaming_output = tmp_path / "streaming.parquet"
+    streaming_summaries = transform.process(
+        TEST_DATASET_NAME, steps, columns, input, streaming_output, batch_size=2
+    )
+
+    streamed = geoparquet.read_df(streaming_output)
+    assert isinstance(streamed, gpd.GeoDataFrame)
+    assert streamed.crs == "EPSG:2263"
+    pd.testing.assert_frame_equal(
+        streamed, geoparquet.read_df(in_memory_output).reset_index(drop=True)
+    )
+    assert [s.name for s in streaming_summaries] == [
+        s.name for s in in_memory_summaries
+    ]
+    filter_summary = streaming_summaries[1]
+    assert filter_summary.data_modifications == {"rows_removed": 3}
+    # intermediate files are cleaned up
+    assert not list(tmp_path.glob("_streaming_*"))
+
+
+def test_processing_streaming_geoparquet(tmp_path: Path):
+    input = tmp_path / "_init.parquet"
+    gpd.GeoDataFrame(
+        {"Name": [" a", "b ", "c"]},
+        geometry=[Point(0, 0), None, Point(1, 1)],
+        crs="EPSG:2263",
+    ).to_parquet(input)
+    steps = [
+        ProcessingStep(name="strip_columns"),
+        ProcessingStep(name="rename_columns", args={"map": {"Name": "name"}}),
+    ]
+
+    in_memory_output = tmp_path / "in_memory.parquet"
+    transform.process(TEST_DATASET_NAME, steps, [], input, in_memory_output)
+    streaming_output = tmp_path / "streaming.parquet"
+    transform.process(
+        TEST_DATASET_NAME, steps, [], input, streaming_output, batch_size=2
+    )
+
+    streamed = geoparquet.read_df(streaming_output)
+    assert isinstance(streamed, gpd.GeoDataFrame)
+    assert streamed.crs == "EPSG:2263"
+    pd.testing.assert_frame_equal(streamed, geoparquet.read_df(in_memory_output))
+
+
+class TestStreaming:
+    @pytest.mark.parametrize(
+        "step, expected",
+        [
+            (ProcessingStep(name="filter_rows"), False),
+            (ProcessingStep(name="deduplicate"), True),
+            (ProcessingStep(name="append_prev"), True),
+            (
+                ProcessingStep(
+                    name="pd_series_func", args={"function_name": "str.replace"}
+                ),
+                False,
+            ),
+            (
+                ProcessingStep(name="pd_series_func", args={"function_name": "rank"}),
+                True,
+            ),
+        ],
+    )
+    def test_is_barrier(self, step, expected):
+        assert transform.is_barrier(step) == expected
+
+    def test_merge_batch_summaries(self):
+        summaries = [
+            ProcessingSummary(
+                name="strip_columns",
+                description="Stripped Whitespace",
+                data_modifications={"by_column": {"a": 1, "b": 0}},
+                custom={"geocode_input_rows": 4, "geocode_distinct_inputs": 1},
+                start_time="2024-01-01T00:00:00",
+                end_time="2024-01-01T00:00:01",
+                elapsed_seconds=1.0,
+            ),
+            ProcessingSummary(
+                name="strip_columns",
+                description="Stripped Whitespace",
+                data_modifications={"by_column": {"a": 2, "b": 3}},
+                custom={"geocode_input_rows": 4, "geocode_distinct_inputs": 3},
+                start_time="2024-01-01T00:00:01",
+                end_time="2024-01-01T00:00:03",
+                elapsed_seconds=2.0,
+            ),
+        ]
+        merged = transform.merge_batch_summaries(summaries)
+        assert merged.data_modifications == {"by_column": {"a": 3, "b": 3}}
+        assert merged.custom["geocode_dedup_ratio"] == 2.0
+        assert merged.start_time == "2024-01-01T00:00:00"
+        assert merged.end_time == "2024-01-01T00:00:03"
+        assert merged.elapsed_seconds == 3.0
+
+
 class TestValidateColumns:
     df = pd.DataFrame({"a": [2, 3, 1], "b": ["b_1", "b_2", "c_3"]})
 
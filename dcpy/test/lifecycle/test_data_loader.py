@@ -2,9 +2,14 @@ from pathlib import Path
 from tempfile import TemporaryDirectory
 from unittest.mock import MagicMock
 
+import geopandas as gpd
 import pandas as pd
+import pytest
+from shapely import MultiPoint, Point
 
+from dcpy.connectors.edm.models import DatasetType
 from dcpy.lifecycle import data_loader
+from dcpy.lifecycle.builds.models import DataPreprocessor, InputDataset
 
 
 def _write_parquet(dir: str, n_rows: int) -> Path:
@@ -45,3 +50,79 @@ def test_load_parquet_chunked_skips_pk_when_not_requested(monkeypatch):
         )
 
     pg_client.add_pk.assert_not_called()
+
+
+def _uppercase_names(_: str, df: pd.DataFrame) -> pd.DataFrame:
+    return df.assign(name=df["name"].str.upper())
+
+
+@pytest.mark.parametrize("batch_safe", [True, False])
+def test_load_geoparquet_with_preprocessor(tmp_path: Path, monkeypatch, batch_safe):
+    monkeypatch.setattr(data_loader, "PARQUET_LOAD_BATCH_SIZE", 2)
+    filepath = tmp_path / "geo.parquet"
+    gpd.GeoDataFrame(
+        {"name": ["a", "b", "c"]},
+        geometry=[Point(0, 0), MultiPoint([(1, 1), (2, 2)]), None],
+        crs="EPSG:2263",
+    ).rename_geometry("the geom").to_parquet(filepath)
+    ds = InputDataset(
+        id="ds",
+        version="1",
+        file_type=DatasetType.parquet,
+        preprocessor=DataPreprocessor(
+            module=__name__, function="_uppercase_names", batch_safe=batch_safe
+        ),
+    )
+    pg_client = MagicMock(schema="schema")
+
+    data_loader.load_dataset_into_pg(ds, pg_client, filepath)
+
+    inserts = pg_client.insert_dataframe.call_args_list
+    assert len(inserts) == (2 if batch_safe else 1)
+    for insert in inserts:
+        df = insert.args[0]
+        assert isinstance(df, gpd.GeoDataFrame)
+        assert df.crs == "EPSG:2263"
+        assert df.geometry.name == "the_geom"
+    assert list(pd.concat([i.args[0] for i in inserts])["name"]) == ["A", "B", "C"]
+    if batch_safe:
+        # every batch's table columns fit the whole file's geometries
+        assert all(
+            i.kwargs["geometry_types"] == {"the_geom": "GEOMETRY"} for i in inserts
+        )
+
+
+def test_load_geoparquet_via_duckdb(tmp_path: Path, monkeypatch):
+    copy = MagicMock()
+    monkeypatch.setattr(data_loader.duckdb_utils, "copy_file_to_postgres", copy)
+    filepath = tmp_path / "geo.parquet"
+    gpd.GeoDataFrame(
+        {"a b": [1]}, geometry=[Point(0, 0)], crs="EPSG:2263"
+    ).rename_geometry("the geom").to_parquet(filepath)
+    ds = InputDataset(
+        id="ds", version="1", file_type=DatasetType.parquet, load_engine="duckdb"
+    )
+    pg_client = MagicMock(schema="schema", engine_uri="postgresql://db")
+
+    assert data_loader.load_dataset_into_pg(ds, pg_client, filepath) == "schema.ds"
+
+    pg_client.drop_table.assert_called_once_with("ds")
+    assert copy.call_args.kwargs["file_format"] == "parquet"
+    assert copy.call_args.kwargs["rename_column"]("a b") == "a_b"
+    pg_client.wkb_to_geometry.assert_called_once_with("ds", "the_geom", "POINT", 2263)
+    pg_client.add_pk.assert_called_once_with("ds", "ogc_fid")
+    assert pg_client.add_table_column.call_args.kwargs["col_name"] == (
+        "data_library_version"
+    )
+
+
+def test_duckdb_engine_rejects_preprocessors():
+    ds = InputDataset(
+        id="ds",
+        version="1",
+        file_type=DatasetType.csv,
+        load_engine="duckdb",
+        preprocessor=DataPreprocessor(module=__name__, function="_uppercase_names"),
+    )
+    with pytest.raises(Exception, match="preprocessors need the pandas engine"):
+        data_loader.load_dataset_into_pg(ds, MagicMock(), Path("ds.csv"))
@@ -4,6 +4,7 @@ import pandas as pd
 import pytest
 
 from dcpy.connectors import ingest_datastore
+from dcpy.connectors.edm.models import DatasetType
 from dcpy.connectors.hybrid_pathed_storage import PathedStorageConnector, StorageType
 from dcpy.lifecycle import data_loader
 from dcpy.lifecycle.builds.models import InputDataset
@@ -561,3 +562,129 @@ def test_load_specific_file_from_directory(tmp_path):
     assert "other_col" not in result_df.columns
 
     duckdb_client.close()
+
+
+def test_load_csv_with_schema_into_duckdb(tmp_path):
+    """Columns in the dataset's schema get its types, the rest are read as text."""
+    csv_path = tmp_path / "lots.csv"
+    csv_path.write_text("bbl,zipcode,units,opened\n1000010001,01234,5,2024-01-02\n")
+
+    duckdb_client = duckdb_utils.DuckDBClient(
+        db_path=tmp_path / "test.duckdb", schema="test_schema"
+    )
+    dataset = InputDataset(
+        id="lots",
+        version="v1",
+        file_type="csv",
+        custom={
+            "columns": [
+                {"id": "bbl", "data_type": "bbl"},
+                {"id": "units", "data_type": "integer"},
+                {"id": "opened", "data_type": "date"},
+            ]
+        },
+    )
+    data_loader.load_dataset_into_duckdb(dataset, duckdb_client, csv_path)
+
+    column_types = duckdb_client.query_to_df(
+        "SELECT column_name, data_type FROM information_schema.columns "
+        "WHERE table_schema = 'test_schema' AND table_name = 'lots'"
+    ).set_index("column_name")["data_type"]
+    assert column_types["bbl"] == "VARCHAR"
+    assert column_types["zipcode"] == "VARCHAR"
+    assert column_types["units"] == "BIGINT"
+    assert column_types["opened"] == "DATE"
+    assert duckdb_client.query_to_df("SELECT zipcode FROM test_schema.lots")[
+        "zipcode"
+    ].tolist() == ["01234"]
+
+    duckdb_client.close()
+
+
+def test_load_partitioned_parquet_into_duckdb(tmp_path):
+    """A directory of hive partitioned parquet files is loaded into one table."""
+    data_dir = tmp_path / "lots"
+    for borough in [1, 2]:
+        partition = data_dir / f"borough={borough}"
+        partition.mkdir(parents=True)
+        pd.DataFrame({"block": [borough * 10, borough * 10 + 1]}).to_parquet(
+            partition / "part-0.parquet"
+        )
+
+    duckdb_client = duckdb_utils.DuckDBClient(
+        db_path=tmp_path / "test.duckdb", schema="test_schema"
+    )
+    dataset = InputDataset(id="lots", version="v1", file_type=DatasetType.parquet)
+    data_loader.load_dataset_into_duckdb(dataset, duckdb_client, data_dir)
+
+    result_df = duckdb_client.query_to_df(
+        "SELECT borough, block FROM test_schema.lots ORDER BY block"
+    )
+    assert result_df["borough"].tolist() == [1, 1, 2, 2]
+    assert result_df["block"].tolist() == [10, 11, 20, 21]
+
+    duckdb_client.close()
+
+
+def test_concurrent_loads_into_duckdb(test_data_dir, tmp_path):
+    """Datasets can be loaded from several threads over one client."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    data_dir, _, _ = test_data_dir
+    duckdb_client = duckdb_utils.DuckDBClient(
+        db_path=tmp_path / "test.duckdb",
+        schema="test_schema",
+        settings=duckdb_utils.DuckDBSettings(
+            threads=2, memory_limit="1GB", preserve_insertion_order=False
+        ),
+    )
+
+    def load(i: int) -> str:
+        dataset = InputDataset(
+            id="test_cities",
+            version="v1",
+            file_type=DatasetType.parquet,
+            import_as=f"t{i}",
+        )
+        return data_loader.load_dataset_into_duckdb(
+            dataset, duckdb_client, data_dir / "test_cities.parquet"
+        )
+
+    with ThreadPoolExecutor(4) as executor:
+        tables = list(executor.map(load, range(8)))
+
+    assert tables == [f"test_schema.t{i}" for i in range(8)]
+    assert all(duckdb_client.get_table_count(f"t{i}") == 5 for i in range(8))
+    assert (
+        duckdb_client.query_to_df("SELECT current_setting('threads') AS threads").loc[
+            0, "threads"
+        ]
+        == 2
+    )
+
+    duckdb_client.close()
+
+
+def test_duckdb_settings_from_env(monkeypatch, tmp_path):
+    monkeypatch.setenv("DUCKDB_THREADS", "4")
+    monkeypatch.setenv("DUCKDB_MEMORY_LIMIT", "8GB")
+    monkeypatch.setenv("DUCKDB_TEMP_DIRECTORY", str(tmp_path))
+    monkeypatch.setenv("DUCKDB_PRESERVE_INSERTION_ORDER", "false")
+
+    assert duckdb_utils.DuckDBSettings.from_env().config() == {
+        "threads": 4,
+        "memory_limit": "8GB",
+        "temp_directory": str(tmp_path),
+        "preserve_insertion_order": False,
+    }
+
+
+def test_duckdb_settings_default_to_duckdbs(monkeypatch):
+    for var in [
+        "DUCKDB_THREADS",
+        "DUCKDB_MEMORY_LIMIT",
+        "DUCKDB_TEMP_DIRECTORY",
+        "DUCKDB_PRESERVE_INSERTION_ORDER",
+    ]:
+        monkeypatch.delenv(var, raising=False)
+    assert duckdb_utils.DuckDBSettings.from_env().config() == {}
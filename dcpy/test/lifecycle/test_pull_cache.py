@@ -0,0 +1,152 @@
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from dcpy.connectors.edm.models import DatasetType
+from dcpy.lifecycle import config, data_loader, pull_cache
+from dcpy.lifecycle.builds.models import InputDataset
+
+KEY = pull_cache.PullKey(
+    connector="edm.recipes.datasets", dataset_id="ds", version="v1", file_type="csv"
+)
+
+
+@pytest.fixture
+def cache(tmp_path: Path) -> pull_cache.PullCache:
+    return pull_cache.PullCache(tmp_path / "cache", max_bytes=100)
+
+
+@pytest.fixture(autouse=True)
+def reset_stats(monkeypatch):
+    monkeypatch.setattr(pull_cache, "stats", pull_cache.CacheStats())
+
+
+def _pulled_file(dir: Path, contents: str, name: str = "ds.csv") -> Path:
+    path = dir / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(contents)
+    return path
+
+
+def test_get_put(cache: pull_cache.PullCache, tmp_path: Path):
+    pulled = _pulled_file(tmp_path / "first", "a,b\n1,2\n")
+    assert cache.get(KEY, tmp_path / "second") is None
+
+    cache.put(KEY, pulled, tmp_path / "first")
+    cached = cache.get(KEY, tmp_path / "second")
+
+    assert cached == tmp_path / "second" / "ds.csv"
+    assert cached.read_text() == "a,b\n1,2\n"
+    assert pull_cache.stats == pull_cache.CacheStats(hits=1, misses=1)
+
+
+def test_changed_etag_is_a_miss(cache: pull_cache.PullCache, tmp_path: Path):
+    cache.put(KEY, _pulled_file(tmp_path, "1"), tmp_path, etag="a")
+
+    assert cache.get(KEY, tmp_path / "out", etag="a") is not None
+    assert cache.get(KEY, tmp_path / "out", etag="b") is None
+    # the stale entry is dropped
+    assert cache.get(KEY, tmp_path / "out") is None
+
+
+def test_modified_file_is_a_miss(cache: pull_cache.PullCache, tmp_path: Path):
+    pulled = _pulled_file(tmp_path, "1")
+    cache.put(KEY, pulled, tmp_path)
+    # the pulled file may be a hard link to the cached one
+    with open(pulled, "a") as f:
+        f.write("2")
+
+    assert cache.get(KEY, tmp_path / "out") is None
+
+
+def test_modified_file_replaced_by_next_put(
+    cache: pull_cache.PullCache, tmp_path: Path
+):
+    pulled = _pulled_file(tmp_path / "first", "1")
+    cache.put(KEY, pulled, tmp_path / "first")
+    with open(pulled, "a") as f:
+        f.write("2")
+
+    cache.put(KEY, _pulled_file(tmp_path / "second", "1"), tmp_path / "second")
+
+    cached = cache.get(KEY, tmp_path / "out")
+    assert cached is not None and cached.read_text() == "1"
+
+
+def test_hit_does_not_rehash(cache: pull_cache.PullCache, tmp_path: Path, monkeypatch):
+    cache.put(KEY, _pulled_file(tmp_path, "1"), tmp_path)
+    file_sha256 = MagicMock(wraps=pull_cache.file_sha256)
+    monkeypatch.setattr(pull_cache, "file_sha256", file_sha256)
+
+    assert cache.get(KEY, tmp_path / "out") is not None
+    file_sha256.assert_not_called()
+
+
+def test_lru_eviction(cache: pull_cache.PullCache, tmp_path: Path):
+    keys = [
+        pull_cache.PullKey(connector="c", dataset_id=str(i), version="1", file_type="")
+        for i in range(3)
+    ]
+    for i, key in enumerate(keys[:2]):
+        cache.put(key, _pulled_file(tmp_path / str(i), str(i) * 40), tmp_path / str(i))
+    # use the first, so the second is least recently used
+    assert cache.get(keys[0], tmp_path / "out")
+
+    cache.put(keys[2], _pulled_file(tmp_path / "2", "2" * 40), tmp_path / "2")
+
+    assert cache.size() == 80
+    assert cache.get(keys[0], tmp_path / "out")
+    assert cache.get(keys[1], tmp_path / "out") is None
+    assert cache.get(keys[2], tmp_path / "out")
+
+
+def test_identical_contents_stored_once(cache: pull_cache.PullCache, tmp_path: Path):
+    other_key = pull_cache.PullKey(
+        connector="c", dataset_id="other", version="1", file_type=""
+    )
+    cache.put(KEY, _pulled_file(tmp_path, "1" * 60), tmp_path)
+    cache.put(other_key, _pulled_file(tmp_path, "1" * 60, "other.csv"), tmp_path)
+
+    assert cache.size() == 60
+    assert cache.get(other_key, tmp_path / "out") == tmp_path / "out" / "other.csv"
+
+
+def test_directories_and_large_files_not_cached(
+    cache: pull_cache.PullCache, tmp_path: Path
+):
+    (tmp_path / "dir").mkdir()
+    cache.put(KEY, tmp_path / "dir", tmp_path)
+    cache.put(KEY, _pulled_file(tmp_path, "1" * 101), tmp_path)
+
+    assert cache.size() == 0
+
+
+def test_pull_dataset_uses_cache(tmp_path: Path, monkeypatch):
+    monkeypatch.setitem(config.CONF, "local_data_path", tmp_path / ".lifecycle")
+    connector = MagicMock()
+    connector.get_pull_local_sub_path.return_value = Path("ds/v1")
+    connector.get_pull_etag.return_value = "etag"
+
+    def pull(key: str, version: str, destination_path: Path, **kwargs) -> dict:
+        return {"path": _pulled_file(destination_path, "a,b\n")}
+
+    connector.pull.side_effect = pull
+    monkeypatch.setattr(data_loader, "connectors", MagicMock(pull={"conn": connector}))
+    ds = InputDataset(id="ds", version="v1", source="conn", file_type=DatasetType.csv)
+
+    first = data_loader.pull_dataset(ds, "builds.load")
+    second = data_loader.pull_dataset(
+        ds, "builds.load", dest_dir_override=tmp_path / "elsewhere"
+    )
+
+    connector.pull.assert_called_once()
+    assert first.read_text() == second.read_text() == "a,b\n"
+    assert second == tmp_path / "elsewhere" / "ds.csv"
+    assert pull_cache.stats == pull_cache.CacheStats(hits=1, misses=1)
+
+
+def test_cache_disabled(monkeypatch):
+    monkeypatch.setitem(config.CONF, "pull_cache", {**config.CONF["pull_cache"]})
+    monkeypatch.setitem(config.CONF["pull_cache"], "max_bytes", 0)
+    assert pull_cache.open_cache() is None
@@ -0,0 +1,50 @@
+import json
+
+import geopandas as gpd
+import pytest
+from shapely import LinearRing, Point
+
+from dcpy.utils.geospatial import _geopandas_compat as gpd_compat
+from dcpy.utils.geospatial import parquet_models
+
+# geopandas versions (major, minor) the private functions in _geopandas_compat have
+# been checked against
+TESTED_VERSIONS = {(1, 1), (1, 2)}
+
+
+def test_geopandas_version_tested():
+    version = tuple(int(part) for part in gpd.__version__.split(".")[:2])
+    assert version in TESTED_VERSIONS, (
+        f"dcpy.utils.geospatial._geopandas_compat relies on private geopandas "
+        f"functions. Check them against geopandas {gpd.__version__}, then add it to "
+        "TESTED_VERSIONS"
+    )
+
+
+@pytest.fixture
+def gdf() -> gpd.GeoDataFrame:
+    return gpd.GeoDataFrame(
+        {"id": [1, 2]}, geometry=[Point(0, 0), Point(1, 1)], crs="EPSG:2263"
+    )
+
+
+def test_arrow_round_trip(gdf: gpd.GeoDataFrame):
+    table = gpd_compat.geopandas_to_arrow(gdf, index=False)
+    geo_metadata = gpd_compat.decode_geo_metadata(table.schema.metadata)
+
+    assert json.loads(table.schema.metadata[parquet_models.GEOPARQUET_METADATA_KEY])
+    assert geo_metadata["primary_column"] == "geometry"
+    round_tripped = gpd_compat.arrow_to_geopandas(table, geo_metadata)
+    assert isinstance(round_tripped, gpd.GeoDataFrame)
+    assert round_tripped.crs == gdf.crs
+    assert round_tripped.geom_equals(gdf.geometry).all()
+
+
+def test_postgis_column_helpers(gdf: gpd.GeoDataFrame):
+    assert gpd_compat.get_srid_from_crs(gdf) == 2263
+    assert gpd_compat.get_geometry_type(gdf) == ("POINT", False)
+
+    rings = gpd.GeoDataFrame(geometry=[LinearRing([(0, 0), (1, 0), (1, 1)])])
+    assert gpd_compat.get_geometry_type(rings) == ("LINESTRING", True)
+    converted = gpd_compat.convert_linearring_to_linestring(rings, "geometry")
+    assert list(converted.geom_type) == ["LineString"]
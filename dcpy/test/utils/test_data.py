@@ -1,8 +1,10 @@
+import shutil
 import tempfile
 import zipfile
 from pathlib import Path
 
 import pandas as pd
+import pyarrow as pa
 import pytest
 
 from dcpy.utils import data, formats
@@ -203,3 +205,204 @@ def test_read_parquet():
     assert df.shape == (5, 1)
     assert "row_id" in df.columns
     assert df["row_id"].tolist() == ["a", "b", "c", "d", "e"]
+
+
+@pytest.mark.parametrize(
+    "data_format, expected",
+    [
+        (formats.Csv(type="csv"), True),
+        (
+            formats.Csv.model_validate(
+                {"type": "csv", "dtype": "str", "delimiter": "|"}
+            ),
+            True,
+        ),
+        (formats.Csv(type="csv", dtype={"a": "str", "__default__": "str"}), True),
+        (formats.Csv(type="csv", dtype={"a": "int"}), False),
+        (formats.Csv.model_validate({"type": "csv", "skiprows": 2}), False),
+        (
+            formats.Csv(
+                type="csv",
+                geometry=formats.Geometry(geom_column="wkt", crs="EPSG:4326"),
+            ),
+            False,
+        ),
+        (formats.Shapefile(type="shapefile", crs="EPSG:2263"), True),
+        (formats.GeoJson(type="geojson"), True),
+        (formats.Parquet(type="parquet"), False),
+    ],
+)
+def test_supports_arrow(data_format, expected):
+    assert data.supports_arrow(data_format) == expected
+
+
+@pytest.mark.parametrize(
+    "dtype",
+    [None, "str", {"bbl": "str"}, {"bbl": "str", "__default__": "str"}],
+)
+def test_read_csv_to_arrow(tmp_path: Path, dtype):
+    csv_path = tmp_path / "data.csv"
+    csv_path.write_text(
+        "bbl,units,date,name,name,\n"
+        "1000010001,1.5,2024-01-01,a,b,x\n"
+        "1000010002,,2024-01-02,,d,y\n"
+    )
+    data_format = formats.Csv(type="csv", dtype=dtype)
+
+    table, geometry = data.read_data_to_arrow(data_format, csv_path)
+    df = data.read_data_to_df(data_format, csv_path)
+
+    assert geometry is None
+    # pandas doesn't infer dates from csvs, so neither should the arrow reader
+    assert table.schema.field("date").type == "string"
+    pd.testing.assert_frame_equal(table.to_pandas(), df, check_dtype=False)
+
+
+def test_read_shapefile_to_arrow():
+    data_format = formats.Shapefile(
+        type="shapefile",
+        crs="EPSG:2263",
+        unzipped_filename="shapefile_single_pluto_feature_no_metadata.shp",
+    )
+    zip_path = (
+        Path(__file__).parent
+        / "resources"
+        / "shapefile_single_pluto_feature_no_metadata.shp.zip"
+    )
+
+    table, geometry = data.read_data_to_arrow(data_format, zip_path)
+    gdf = data.read_data_to_df(data_format, zip_path)
+
+    assert geometry is not None
+    assert geometry.crs == gdf.crs
+    assert geometry.equals(gdf.geometry)
+    # pyogrio reads an all-null string column as None objects rather than strings
+    pd.testing.assert_frame_equal(
+        table.to_pandas().astype(object).fillna(pd.NA),
+        pd.DataFrame(gdf.drop(columns=gdf.geometry.name)).astype(object).fillna(pd.NA),
+        check_dtype=False,
+    )
+
+
+def test_read_zipped_shapefile_in_place(tmp_path: Path):
+    zip_path = tmp_path / "shapefile.zip"
+    shutil.copy(
+        Path(__file__).parent
+        / "resources"
+        / "shapefile_single_pluto_feature_no_metadata.shp.zip",
+        zip_path,
+    )
+    data_format = formats.Shapefile(
+        type="shapefile",
+        crs="EPSG:2263",
+        unzipped_filename="shapefile_single_pluto_feature_no_metadata.shp",
+    )
+    read_stats: dict = {}
+
+    gdf = data.read_data_to_df(data_format, zip_path, read_stats=read_stats)
+
+    assert len(gdf) == 1
+    assert list(tmp_path.iterdir()) == [zip_path], "nothing should be extracted"
+    assert read_stats["unzipped_bytes"] == 0
+
+
+def test_read_zipped_csv_extracts_member(tmp_path: Path):
+    zip_path = tmp_path / "data.zip"
+    with zipfile.ZipFile(zip_path, "w") as zip:
+        zip.writestr("data/a.csv", "a,b\n1,2\n")
+        zip.writestr("data/other.csv", "c\n" + "3\n" * 1_000)
+    data_format = formats.Csv(type="csv", unzipped_filename="data/a.csv")
+    read_stats: dict = {}
+
+    df = data.read_data_to_df(
+        data_format, zip_path, clean_extracted_zip=False, read_stats=read_stats
+    )
+
+    assert df.to_dict("records") == [{"a": 1, "b": 2}]
+    extracted = tmp_path / "extracted_files"
+    assert [p.relative_to(extracted) for p in extracted.rglob("*.csv")] == [
+        Path("data/a.csv")
+    ]
+    assert read_stats["unzipped_bytes"] == len("a,b\n1,2\n")
+    assert read_stats["unzip_seconds"] >= 0
+
+
+def test_read_zipped_missing_member(tmp_path: Path):
+    zip_path = tmp_path / "data.zip"
+    with zipfile.ZipFile(zip_path, "w") as zip:
+        zip.writestr("a.csv", "a,b\n1,2\n")
+    data_format = formats.Csv(type="csv", unzipped_filename="b.csv")
+
+    with pytest.raises(AssertionError, match="b.csv is not present"):
+        data.read_data_to_df(data_format, zip_path)
+
+
+class TestChunkedCsv:
+    @pytest.fixture
+    def csv_path(self, tmp_path: Path) -> Path:
+        csv_path = tmp_path / "data.csv"
+        # enough rows for a few chunks of 1MB
+        rows = [f"{i},{i * 1.5},2024-01-01,,name {i}" for i in range(100_000)]
+        rows += ["x,1.5,2024-01-01,z,name"]
+        csv_path.write_text("id,value,date,empty,name\n" + "\n".join(rows) + "\n")
+        return csv_path
+
+    def test_infer_csv_types(self, csv_path: Path):
+        data_format = formats.Csv(type="csv", dtype={"name": "str"})
+        column_types = data.infer_csv_types(data_format, csv_path, sample_rows=100)
+        assert column_types == {
+            "id": pa.int64(),
+            "value": pa.float64(),
+            "date": pa.string(),
+            "empty": pa.string(),
+            "name": pa.string(),
+        }
+
+    def test_iter_csv_batches(self, csv_path: Path):
+        data_format = formats.Csv(type="csv")
+        column_types = data.infer_csv_types(data_format, csv_path, sample_rows=100)
+
+        with pytest.raises(data.CsvTypeConflictError) as conflict:
+            list(data.iter_csv_batches(data_format, csv_path, column_types, 1))
+        assert conflict.value.column == "id"
+        assert conflict.value.value == "x"
+        assert conflict.value.row > 0, "conflict should be in a later chunk"
+
+        column_types = data.widen_csv_types(column_types, conflict.value)
+        assert column_types["id"] == pa.string()
+        batches = list(data.iter_csv_batches(data_format, csv_path, column_types, 1))
+        assert len(batches) > 1
+        assert sum(batch.num_rows for batch in batches) == 100_001
+
+    def test_duplicate_columns(self, tmp_path: Path):
+        csv_path = tmp_path / "duplicates.csv"
+        csv_path.write_text("a,b,a\n1,x,y\n2,z,\n")
+        data_format = formats.Csv(type="csv")
+        column_types = data.infer_csv_types(data_format, csv_path)
+
+        batches = list(data.iter_csv_batches(data_format, csv_path, column_types, 1))
+
+        assert column_types == {"a": pa.int64(), "b": pa.string(), "a.1": pa.string()}
+        pd.testing.assert_frame_equal(
+            pa.Table.from_batches(batches).to_pandas(),
+            data.read_data_to_df(data_format, csv_path),
+        )
+
+    def test_chunk_size_fits_arrow_block_size(self):
+        with pytest.raises(ValueError, match="less than or equal to 2047"):
+            formats.Csv(type="csv", chunk_size_mb=2048)
+
+    def test_widen_csv_types(self):
+        conflict = data.CsvTypeConflictError("a", pa.int64(), "1.5", 0)
+        assert data.widen_csv_types({"a": pa.int64()}, conflict) == {"a": pa.float64()}
+
+    def test_empty_csv(self, tmp_path: Path):
+        csv_path = tmp_path / "empty.csv"
+        csv_path.write_text("a,b\n")
+        data_format = formats.Csv(type="csv")
+        column_types = data.infer_csv_types(data_format, csv_path)
+
+        batches = list(data.iter_csv_batches(data_format, csv_path, column_types, 1))
+
+        assert [b.num_rows for b in batches] == [0]
+        assert batches[0].schema.names == ["a", "b"]
@@ -3,6 +3,8 @@ from tempfile import TemporaryDirectory
 
 import geopandas as gpd
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import pytest
 import shapely
 from shapely import (
@@ -104,6 +106,28 @@ class TestTransform:
         assert all(pd.isna(g) for g in geom_types[2:])
         assert str(geodata.crs) == epsg
 
+    def test_df_to_gdf_point_xy_str(self):
+        df = pd.DataFrame({"geom": ["-74.0, 40.7", None, "-73.9, 40.8"]})
+        geom = FileGeometry(
+            geom_column="geom",
+            format=geometry.PointXYStr(point_xy_str="x, y"),
+            crs="EPSG:4326",
+        )
+        gdf = transform.df_to_gdf(df, geom)
+        assert gdf.geometry.tolist() == [Point(-74.0, 40.7), None, Point(-73.9, 40.8)]
+
+        df = pd.DataFrame({"geom": ["-74.0, 40.7", "-74.0 40.7"]})
+        with pytest.raises(ValueError, match="does not match format"):
+            transform.df_to_gdf(df, geom)
+
+    def test_df_to_gdf_xy(self):
+        df = pd.DataFrame({"x": [-74.0, None, -73.9], "y": [40.7, 40.8, None]})
+        geom = FileGeometry(
+            geom_column=FileGeometry.PointColumns(x="x", y="y"), crs="EPSG:4326"
+        )
+        gdf = transform.df_to_gdf(df, geom)
+        assert gdf.geometry.tolist() == [Point(-74.0, 40.7), None, None]
+
     def test_projected_crs(self, data_wkb):
         new_crs = "EPSG:2263"
         geom = FileGeometry(
@@ -167,37 +191,130 @@ class TestParquet:
         assert len(batches[0]) == 0
         assert list(batches[0].columns) == ["a", "b"]
 
+    def test_iter_batches_df_geo(self, tmp_path):
+        gdf = gpd.GeoDataFrame(
+            {"a": [1, 2, 3]},
+            geometry=[Point(0, 0), None, Point(1, 1)],
+            crs="EPSG:2263",
+        ).rename_geometry("geom")
+        filepath = tmp_path / "geo.parquet"
+        gdf.to_parquet(filepath)
 
-@pytest.mark.parametrize(
-    "input, expected",
-    [
-        (None, None),
-        (Point(0, 1), MultiPoint([(0, 1)])),
-        (MultiPoint([(2, 3), (4, 5)]), MultiPoint([(2, 3), (4, 5)])),
-        (LineString([(0, 0), (1, 1)]), MultiLineString([[(0, 0), (1, 1)]])),
-        (
-            MultiLineString([[(0, 0), (-1, 1)], [(0, 0), (1, -1)]]),
-            MultiLineString([[(0, 0), (-1, 1)], [(0, 0), (1, -1)]]),
-        ),
-        (
-            Polygon([(0, 0), (0, 1), (1, 0), (0, 0)]),
-            MultiPolygon([Polygon([(0, 0), (0, 1), (1, 0), (0, 0)])]),
+        batches = list(parquet.iter_batches_df(filepath, 2))
+
+        assert [len(b) for b in batches] == [2, 1]
+        assert all(isinstance(b, gpd.GeoDataFrame) for b in batches)
+        assert all(b.crs == "EPSG:2263" and b.geometry.name == "geom" for b in batches)
+        assert pd.concat(batches, ignore_index=True).equals(gdf)
+
+        gdf.iloc[:0].to_parquet(filepath)
+        (empty,) = parquet.iter_batches_df(filepath, 2)
+        assert isinstance(empty, gpd.GeoDataFrame)
+        assert empty.crs == "EPSG:2263"
+
+    @pytest.mark.parametrize(
+        "geoms, expected",
+        [
+            ([Point(0, 0), None], "POINT"),
+            ([Point(0, 0), Point(0, 0, 1)], "POINTZ"),
+            ([Polygon([(0, 0), (0, 1), (1, 0)]), MultiPoint([(1, 1)])], "GEOMETRY"),
+        ],
+    )
+    def test_geometry_types(self, tmp_path, geoms, expected):
+        filepath = tmp_path / "geo.parquet"
+        gpd.GeoDataFrame(geometry=geoms, crs="EPSG:2263").to_parquet(filepath)
+        assert parquet.geometry_types(filepath) == {"geometry": expected}
+
+    @pytest.mark.parametrize(
+        "crs, expected", [("EPSG:2263", 2263), ("EPSG:4326", 4326), (None, 0)]
+    )
+    def test_geometry_srids(self, tmp_path, crs, expected):
+        filepath = tmp_path / "geo.parquet"
+        gpd.GeoDataFrame(geometry=[Point(0, 0)], crs=crs).to_parquet(filepath)
+        assert parquet.geometry_srids(filepath) == {"geometry": expected}
+
+    def test_batch_writer_geo(self, tmp_path):
+        gdf = gpd.GeoDataFrame(
+            {"a": [1, 2, 3]},
+            geometry=[Point(0, 0), MultiPoint([(1, 1), (2, 2)]), None],
+            crs="EPSG:2263",
+        )
+        filepath = tmp_path / "batches.parquet"
+        with parquet.BatchWriter(filepath) as writer:
+            writer.write(gdf.iloc[:1])
+            writer.write(gdf.iloc[1:])
+
+        written = parquet.read_df(filepath)
+        assert isinstance(written, gpd.GeoDataFrame)
+        assert written.crs == gdf.crs
+        assert written.equals(gdf)
+
+    def test_batch_writer_incompatible_schema(self, tmp_path):
+        with parquet.BatchWriter(tmp_path / "batches.parquet") as writer:
+            writer.write(pd.DataFrame({"a": [1]}))
+            with pytest.raises(TypeError, match="incompatible"):
+                writer.write(pd.DataFrame({"a": ["not a number"]}))
+
+    def test_wkb_geo_metadata(self, tmp_path):
+        table = pa.table(
+            {
+                "geom": pa.array([Point(1, 2).wkb, None], type=pa.binary()),
+                "other_geom": pa.array([None, Point(3, 4).wkb], type=pa.binary()),
+            }
+        )
+        metadata = parquet.wkb_geo_metadata(
+            {"geom": ["Point"], "other_geom": []},
+            {"geom": "EPSG:2263", "other_geom": None},
+        )
+        filepath = tmp_path / "wkb.parquet"
+        pq.write_table(table.replace_schema_metadata({b"geo": metadata}), filepath)
+
+        gdf = gpd.read_parquet(filepath)
+        assert gdf.geometry.name == "geom"
+        assert gdf.crs == "EPSG:2263"
+        assert gdf["other_geom"].crs is None
+        assert gdf["other_geom"].tolist() == [None, Point(3, 4)]
+
+
+MULTI_CASES = [
+    (None, None),
+    (Point(0, 1), MultiPoint([(0, 1)])),
+    (MultiPoint([(2, 3), (4, 5)]), MultiPoint([(2, 3), (4, 5)])),
+    (LineString([(0, 0), (1, 1)]), MultiLineString([[(0, 0), (1, 1)]])),
+    (
+        MultiLineString([[(0, 0), (-1, 1)], [(0, 0), (1, -1)]]),
+        MultiLineString([[(0, 0), (-1, 1)], [(0, 0), (1, -1)]]),
+    ),
+    (
+        Polygon([(0, 0), (0, 1), (1, 0), (0, 0)]),
+        MultiPolygon([Polygon([(0, 0), (0, 1), (1, 0), (0, 0)])]),
+    ),
+    (
+        MultiPolygon(
+            [
+                Polygon([(0, 0), (0, 1), (1, 0), (0, 0)]),
+                Polygon([(0, 0), (0, -1), (-1, 0), (0, 0)]),
+            ]
         ),
-        (
-            MultiPolygon(
-                [
-                    Polygon([(0, 0), (0, 1), (1, 0), (0, 0)]),
-                    Polygon([(0, 0), (0, -1), (-1, 0), (0, 0)]),
-                ]
-            ),
-            MultiPolygon(
-                [
-                    Polygon([(0, 0), (0, 1), (1, 0), (0, 0)]),
-                    Polygon([(0, 0), (0, -1), (-1, 0), (0, 0)]),
-                ]
-            ),
+        MultiPolygon(
+            [
+                Polygon([(0, 0), (0, 1), (1, 0), (0, 0)]),
+                Polygon([(0, 0), (0, -1), (-1, 0), (0, 0)]),
+            ]
         ),
-    ],
-)
+    ),
+]
+
+
+@pytest.mark.parametrize("input, expected", MULTI_CASES)
 def test_multi(input, expected):
     assert transform.multi(input) == expected
+
+
+def test_multi_geoseries():
+    inputs, expected = zip(*MULTI_CASES)
+    geoms = gpd.GeoSeries(inputs, index=range(10, 10 + len(inputs)), crs="EPSG:2263")
+    multi = transform.multi_geoseries(geoms)
+    assert multi.crs == geoms.crs
+    assert multi.index.equals(geoms.index)
+    assert multi.tolist() == list(expected)
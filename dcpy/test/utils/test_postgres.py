@@ -1,4 +1,12 @@
+import struct
+from unittest.mock import MagicMock
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
 import pytest
+import shapely
+from shapely import Point
 
 from dcpy.utils import postgres
 
@@ -23,3 +31,172 @@ def test_generate_engine_uri(test_inputs, expected_uri):
         schema=test_inputs[2],
     )
     assert actual_uri == expected_uri
+
+
+def _decode_binary_copy_rows(data: bytes) -> list[list[bytes | None]]:
+    assert data.startswith(postgres._PG_BINARY_HEADER)
+    assert data.endswith(postgres._PG_BINARY_TRAILER)
+    body = data[len(postgres._PG_BINARY_HEADER) : -2]
+    rows, position = [], 0
+    while position < len(body):
+        n_fields = int.from_bytes(body[position : position + 2], "big")
+        position += 2
+        row: list[bytes | None] = []
+        for _ in range(n_fields):
+            length = int.from_bytes(body[position : position + 4], "big", signed=True)
+            position += 4
+            if length < 0:
+                row.append(None)
+            else:
+                row.append(body[position : position + length])
+                position += length
+        rows.append(row)
+    return rows
+
+
+def test_binary_copy_encoding():
+    gdf = gpd.GeoDataFrame(
+        {
+            "i": pd.array([1, None], dtype="Int64"),
+            "f": [1.5, np.nan],
+            "s": ["a", ""],
+            "b": [True, False],
+            "t": pd.to_datetime(["2000-01-02", None]),
+            "geometry": [Point(1, 2), None],
+        },
+        crs="EPSG:2263",
+    )
+    column_types = {
+        "i": "int4",
+        "f": "float8",
+        "s": "text",
+        "b": "bool",
+        "t": "timestamp",
+        "geometry": "geometry",
+    }
+    fields = [
+        postgres._binary_values(gdf[column], pg_type, 2263)
+        for column, pg_type in column_types.items()
+    ]
+    data = (
+        postgres._PG_BINARY_HEADER
+        + postgres._encode_binary_chunk(fields)  # type: ignore[arg-type]
+        + postgres._PG_BINARY_TRAILER
+    )
+
+    first, second = _decode_binary_copy_rows(data)
+    assert first[:5] == [
+        (1).to_bytes(4, "big"),
+        struct.pack(">d", 1.5),
+        b"a",
+        b"\x01",
+        (86_400 * 10**6).to_bytes(8, "big"),
+    ]
+    geom = shapely.from_wkb(first[5])
+    assert geom.equals(Point(1, 2))
+    assert shapely.get_srid(geom) == 2263
+    # empty strings are written as NULL, like the csv COPY
+    assert second == [None, None, None, b"\x00", None, None]
+
+
+@pytest.mark.parametrize(
+    "series, pg_type",
+    [
+        (pd.Series([1, "a"], dtype=object), "text"),
+        (pd.Series([1.5, 2.0]), "int8"),
+        (pd.Series([2**40]), "int4"),
+        (pd.Series(["1"]), "float8"),
+        (pd.to_datetime(pd.Series(["2024-01-01"])), "timestamptz"),
+        (pd.Series([{"a": 1}]), "json"),
+    ],
+)
+def test_binary_copy_unsupported(series: pd.Series, pg_type: str):
+    assert postgres._binary_values(series, pg_type, None) is None
+
+
+def test_copy_stream():
+    chunks = [b"abc", b"", b"defgh", b"i"]
+    with postgres._CopyStream(iter(chunks)) as stream:
+        read = []
+        while data := stream.read(2):
+            read.append(data)
+    assert read == [b"ab", b"cd", b"ef", b"gh", b"i"]
+
+    def failing():
+        yield b"abc"
+        raise ValueError("encoding failed")
+
+    with postgres._CopyStream(failing()) as stream:
+        assert stream.read(3) == b"abc"
+        with pytest.raises(ValueError, match="encoding failed"):
+            stream.read(3)
+
+
+CATALOG_ROWS = pd.DataFrame(
+    {
+        "table_name": ["t", "t", "v", "empty"],
+        "table_type": ["BASE TABLE", "BASE TABLE", "VIEW", "BASE TABLE"],
+        "column_name": ["b", "geom", "a", None],
+        "data_type": ["text", "geometry", "integer", None],
+    }
+)
+
+
+@pytest.fixture
+def catalog_client(monkeypatch):
+    """A client that answers catalog queries from CATALOG_ROWS without a database."""
+    monkeypatch.setattr(postgres.PostgresClient, "create_schema", lambda self: None)
+    client = postgres.PostgresClient(
+        schema="s",
+        database="db",
+        server_url="postgresql+psycopg2://x",
+        cache_catalog=True,
+    )
+    queries = []
+
+    def execute_select_query(query, **kwargs):
+        queries.append(kwargs)
+        return CATALOG_ROWS
+
+    monkeypatch.setattr(client, "execute_select_query", execute_select_query)
+    monkeypatch.setattr(client, "connect", lambda: pytest.fail("no connections"))
+    return client, queries
+
+
+def test_catalog_lookups(catalog_client):
+    client, queries = catalog_client
+
+    assert client.get_schema_tables() == ["empty", "t", "v"]
+    assert client.get_table_columns("t") == ["b", "geom"]
+    assert client.get_column_types("v") == {"a": "integer"}
+    assert client.get_geometry_columns("t") == {"geom"}
+    assert client.get_table_columns("empty") == []
+    assert client.is_view("v") and not client.is_view("t")
+    assert not client.table_or_view_exists("missing")
+    with pytest.raises(ValueError, match="not found"):
+        client.get_table_type("missing")
+
+    assert queries == [{"table_schema": "s", "table_name": None}]
+
+
+def test_catalog_invalidated_by_ddl(catalog_client, monkeypatch):
+    client, queries = catalog_client
+    client.table_or_view_exists("t", schema="other")
+    client.table_or_view_exists("t")
+    assert len(queries) == 2
+
+    monkeypatch.setattr(client, "connect", MagicMock())
+    client.drop_table("t")
+    client.table_or_view_exists("t")
+
+    assert len(queries) == 3
+
+
+def test_catalog_not_cached(catalog_client):
+    client, queries = catalog_client
+    client.cache_catalog = False
+
+    client.table_or_view_exists("t")
+    client.table_or_view_exists("t")
+
+    assert queries == [{"table_schema": "s", "table_name": "t"}] * 2
@@ -0,0 +1,112 @@
+import io
+import os
+import zipfile
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from dcpy.utils.range_reads import BlockCache, RangeReader
+
+BLOCK_SIZE = 16
+
+
+class Remote:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.requests: list[tuple[int, int]] = []
+
+    def fetch(self, start: int, end: int) -> bytes:
+        self.requests.append((start, end))
+        return self.data[start:end]
+
+    def reader(self, cache: BlockCache) -> RangeReader:
+        return RangeReader("remote@1", len(self.data), self.fetch, cache)
+
+
+@pytest.fixture
+def cache() -> BlockCache:
+    return BlockCache(block_size=BLOCK_SIZE, max_bytes=4 * BLOCK_SIZE)
+
+
+def test_reads_like_a_file(cache):
+    remote = Remote(os.urandom(100))
+    reader = remote.reader(cache)
+
+    assert reader.read(10) == remote.data[:10]
+    reader.seek(-5, io.SEEK_END)
+    assert reader.read(10) == remote.data[-5:]
+    assert reader.read() == b""
+    reader.seek(40)
+    reader.seek(2, io.SEEK_CUR)
+    assert reader.tell() == 42
+    buffer = bytearray(20)
+    assert reader.readinto(buffer) == 20
+    assert bytes(buffer) == remote.data[42:62]
+    with pytest.raises(ValueError):
+        reader.seek(-1)
+
+
+def test_missing_blocks_fetched_in_one_request(cache):
+    remote = Remote(os.urandom(100))
+    reader = remote.reader(cache)
+
+    reader.seek(20)
+    reader.read(4)  # block 1
+    reader.seek(0)
+    assert reader.read(64) == remote.data[:64]  # blocks 0 to 3, 1 cached
+
+    assert remote.requests == [(16, 32), (0, 16), (32, 64)]
+    assert (cache.hits, cache.misses) == (1, 4)
+
+
+def test_cache_shared_between_readers(cache):
+    remote = Remote(os.urandom(40))
+
+    assert remote.reader(cache).read() == remote.data
+    assert remote.reader(cache).read() == remote.data
+
+    assert remote.requests == [(0, 40)]
+
+
+def test_least_recently_used_evicted(cache):
+    remote = Remote(os.urandom(100))
+    reader = remote.reader(cache)
+
+    reader.read(BLOCK_SIZE)
+    reader.seek(BLOCK_SIZE * 2)
+    reader.read(BLOCK_SIZE * 4)  # blocks 2 to 5, evicting block 0
+    reader.seek(0)
+    reader.read(1)
+
+    assert remote.requests[-1] == (0, BLOCK_SIZE)
+
+
+def test_parquet_column_projection(tmp_path):
+    path = tmp_path / "wide.parquet"
+    pq.write_table(
+        pa.table({name: [os.urandom(1000) for _ in range(100)] for name in "abcd"}),
+        path,
+        compression="none",
+    )
+    remote = Remote(path.read_bytes())
+
+    with remote.reader(BlockCache(block_size=4096)) as reader:
+        table = pq.read_table(reader, columns=["c"])
+
+    assert table.column_names == ["c"]
+    assert sum(end - start for start, end in remote.requests) < len(remote.data) / 2
+
+
+def test_zip_members_read_lazily(tmp_path):
+    path = tmp_path / "files.zip"
+    with zipfile.ZipFile(path, "w") as zf:
+        for name in "abcd":
+            zf.writestr(name, os.urandom(10_000))
+    remote = Remote(path.read_bytes())
+
+    with zipfile.ZipFile(remote.reader(BlockCache(block_size=1024))) as zf:
+        assert zf.namelist() == list("abcd")
+        assert len(zf.read("b")) == 10_000
+
+    assert sum(end - start for start, end in remote.requests) < len(remote.data) / 2
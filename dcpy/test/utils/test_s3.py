@@ -191,3 +191,159 @@ def test_copy_folder_across_regions(bucket_region, create_buckets, put_test_obje
         target_bucket=PUBLISHING_BUCKET,
     )
     assert s3.get_filenames(PUBLISHING_BUCKET, "") == set(TEST_OBJECTS[:2])
+
+
+def test_upload_and_download_folder(create_buckets, tmp_path):
+    local = tmp_path / "local"
+    for name in ["a.csv", "sub/b.csv", "sub/deeper/c.csv"]:
+        (local / name).parent.mkdir(parents=True, exist_ok=True)
+        (local / name).write_text(name * 10)
+
+    stats = s3.upload_folder(
+        TEST_BUCKET,
+        local,
+        Path("uploaded"),
+        acl="public-read",
+        contents_only=True,
+        metadata={"version": "1"},
+        max_workers=2,
+    )
+    s3.download_folder(
+        TEST_BUCKET,
+        "uploaded",
+        tmp_path / "downloaded",
+        include_prefix_in_export=False,
+        max_workers=2,
+    )
+
+    assert (stats.files, stats.bytes) == (
+        3,
+        sum(len(n) * 10 for n in ["a.csv", "sub/b.csv", "sub/deeper/c.csv"]),
+    )
+    assert s3.get_custom_metadata(TEST_BUCKET, "uploaded/sub/b.csv")["version"] == "1"
+    for name in ["a.csv", "sub/b.csv", "sub/deeper/c.csv"]:
+        assert (tmp_path / "downloaded" / name).read_text() == name * 10
+
+
+@patch("dcpy.utils.s3.get_bucket_region", side_effect=lambda b: mock_regions[b])
+def test_copy_folder_across_regions_keeps_metadata(bucket_region, create_buckets):
+    s3.client().put_object(
+        Bucket=TEST_BUCKET, Key="folder/file", Body=b"data", Metadata={"a": "1"}
+    )
+
+    stats = s3.copy_folder(
+        TEST_BUCKET,
+        "folder",
+        "copied",
+        acl="public-read",
+        target_bucket=PUBLISHING_BUCKET,
+        metadata={"b": "2"},
+    )
+
+    assert (stats.files, stats.bytes) == (1, 4)
+    assert s3.get_custom_metadata(PUBLISHING_BUCKET, "copied/file") == {
+        "a": "1",
+        "b": "2",
+    }
+
+
+def test_transfers_are_retried(monkeypatch):
+    monkeypatch.setattr(s3, "TRANSFER_RETRY_DELAY_SECONDS", 0)
+    attempts = []
+
+    def flaky(callback):
+        attempts.append(1)
+        callback(5)
+        if len(attempts) == 1:
+            raise s3.ClientError({"Error": {"Code": "SlowDown"}}, "PutObject")
+        callback(5)
+
+    stats = s3._run_transfers("Flaky", [s3._Transfer("file", 10, flaky)], max_workers=1)
+
+    assert len(attempts) == 2
+    assert (stats.files, stats.bytes, stats.retries) == (1, 10, 1)
+
+
+def test_failed_transfers_raise(monkeypatch):
+    monkeypatch.setattr(s3, "TRANSFER_RETRY_DELAY_SECONDS", 0)
+    attempts = []
+
+    def failing(callback):
+        attempts.append(1)
+        raise s3.ClientError(
+            {
+                "Error": {"Code": "InternalError"},
+                "ResponseMetadata": {"HTTPStatusCode": 500},
+            },
+            "PutObject",
+        )
+
+    with pytest.raises(s3.ClientError):
+        s3._run_transfers("Failing", [s3._Transfer("file", 1, failing)], max_workers=1)
+    assert len(attempts) == s3.TRANSFER_ATTEMPTS
+
+
+@pytest.mark.parametrize("code, status", [("AccessDenied", 403), ("NoSuchKey", 404)])
+def test_client_errors_not_retried(code, status):
+    attempts = []
+
+    def failing(callback):
+        attempts.append(1)
+        raise s3.ClientError(
+            {"Error": {"Code": code}, "ResponseMetadata": {"HTTPStatusCode": status}},
+            "GetObject",
+        )
+
+    with pytest.raises(s3.ClientError):
+        s3._run_transfers("Failing", [s3._Transfer("file", 1, failing)], max_workers=1)
+    assert len(attempts) == 1
+
+
+def test_wrapped_errors_retried_by_cause():
+    throttled = s3.ClientError({"Error": {"Code": "SlowDown"}}, "UploadPart")
+    denied = s3.ClientError({"Error": {"Code": "AccessDenied"}}, "UploadPart")
+
+    def wrapped(cause):
+        try:
+            raise cause
+        except s3.ClientError:
+            try:
+                raise s3.S3UploadFailedError("Failed to upload")
+            except s3.S3UploadFailedError as e:
+                return e
+
+    assert s3._is_retryable(wrapped(throttled))
+    assert not s3._is_retryable(wrapped(denied))
+    assert s3._is_retryable(
+        s3.RetriesExceededError(s3.BotoConnectionError(error="reset"))
+    )
+    assert not s3._is_retryable(ValueError())
+
+
+def test_delete_folder_in_batches(create_buckets, put_test_objects, monkeypatch):
+    monkeypatch.setattr(s3, "DELETE_BATCH_SIZE", 1)
+    client = s3.client()
+    delete_objects = MagicMock(wraps=client.delete_objects)
+    monkeypatch.setattr(client, "delete_objects", delete_objects)
+    monkeypatch.setattr(s3, "client", lambda: client)
+
+    s3.delete(TEST_BUCKET, f"{TEST_DIR_NAME_1}/")
+
+    # both objects in the folder, and the folder's own key
+    assert delete_objects.call_count == 3
+    assert s3.get_filenames(TEST_BUCKET, "") == {TEST_OBJECTS[2]}
+
+
+def test_delete_file(create_buckets, put_test_objects):
+    s3.delete(TEST_BUCKET, TEST_OBJECTS[0])
+    assert s3.get_filenames(TEST_BUCKET, "") == set(TEST_OBJECTS[1:])
+
+
+def test_iter_objects_pages(create_buckets):
+    for i in range(1001):
+        s3.client().put_object(Bucket=TEST_BUCKET, Key=f"many/{i}")
+
+    objects = s3.iter_objects(TEST_BUCKET, "many/")
+
+    assert next(objects)["Key"] == "many/0"
+    assert len(list(objects)) == 1000
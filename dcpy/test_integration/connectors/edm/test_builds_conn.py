@@ -123,6 +123,11 @@ def _test_builds_connector_interface(conn: _BuildsConnector, tmp_path):
             "Downloaded file should be named build.zip"
         )
 
+        with conn.open_versioned(product, build, "metadata.json") as f:
+            assert f.read().decode() == (
+                f'{{"product": "{product}", "build": "{build}"}}'
+            )
+
 
 def _test_builds_connector_error_cases(conn: _BuildsConnector, tmp_path):
     """Test error cases and edge conditions."""
@@ -4,6 +4,7 @@ import pandas as pd
 import pytest
 import yaml
 
+from dcpy.lifecycle.builds import input_cache
 from dcpy.lifecycle.builds.load import (
     CachedEntityType,
     load_source_data_from_resolved_recipe,
@@ -19,24 +20,42 @@ build_pg_client = postgres.PostgresClient(schema=BUILD_SCHEMA)
 TEST_DATA = pd.read_csv(Path(__file__).parent / "resources" / "test_dataset.csv")
 
 
+def _cache_entries() -> pd.DataFrame:
+    return build_pg_client.execute_select_query(
+        f'SELECT * FROM "{RECIPE_CACHE_SCHEMA}"."{input_cache.CATALOG_TABLE}"'
+    )
+
+
+def _recipe_with(tmp_path: Path, **overrides) -> Path:
+    with open(RECIPE_PATH, "r") as f:
+        recipe_data = yaml.safe_load(f)
+    recipe_data["inputs"]["datasets"][0].update(overrides)
+    temp_recipe_path = tmp_path / "temp_recipe.yml.lock"
+    with open(temp_recipe_path, "w") as f:
+        yaml.dump(recipe_data, f)
+    return temp_recipe_path
+
+
 @pytest.fixture
 def setup_cache_schema(pg_client, setup_mock_connector):
-    """Create cache schema using target_schema parameter"""
-
-    # Load data into the cache
+    """Populate the input cache with a first build"""
     load_source_data_from_resolved_recipe(
         RECIPE_PATH,
+        cache_schema=RECIPE_CACHE_SCHEMA,
+        cached_entity_type=CachedEntityType.view,
         clear_pg_schema=True,
-        target_schema=RECIPE_CACHE_SCHEMA,
+        target_schema=BUILD_SCHEMA,
         _write_metadata_file=False,
     )
+    assert setup_mock_connector.pull_call_count == 1
+    assert len(_cache_entries()) == 1
 
     setup_mock_connector.reset_mock()
     yield
 
-    # Cleanup cache schema
-    cache_pg_client = postgres.PostgresClient(schema=RECIPE_CACHE_SCHEMA)
-    cache_pg_client.drop_schema()
+    # Cleanup build and cache schemas, in that order since builds view cached tables
+    build_pg_client.drop_schema()
+    postgres.PostgresClient(schema=RECIPE_CACHE_SCHEMA).drop_schema()
 
 
 @pytest.mark.parametrize(
@@ -79,19 +98,11 @@ def test_builds_load_source_data_caching(
 def test_builds_load_source_data_caching__cache_miss_wrong_version(
     pg_client, setup_mock_connector, setup_cache_schema, tmp_path
 ):
-    """Test that loading proceeds as normal when the cached data version is different."""
+    """Test that a different version is imported, and cached alongside the first."""
     mock_connector = setup_mock_connector
 
-    # Create a temporary recipe with different version (different from cache) and load it.
-    with open(RECIPE_PATH, "r") as f:
-        recipe_data = yaml.safe_load(f)
-    recipe_data["inputs"]["datasets"][0]["version"] = "1999v1"
-    temp_recipe_path = tmp_path / "temp_recipe.yml.lock"
-    with open(temp_recipe_path, "w") as f:
-        yaml.dump(recipe_data, f)
-
     load_source_data_from_resolved_recipe(
-        temp_recipe_path,
+        _recipe_with(tmp_path, version="1999v1"),
         cache_schema=RECIPE_CACHE_SCHEMA,
         cached_entity_type=CachedEntityType.view,
         clear_pg_schema=True,
@@ -110,7 +121,7 @@ def test_builds_load_source_data_caching__cache_miss_wrong_version(
         table_data.reset_index(drop=True),
         TEST_DATA.sort_values("name").reset_index(drop=True),
     )
-    assert build_pg_client.is_view("test_dataset") is False
+    assert set(_cache_entries()["version"]) == {"2025v2", "1999v1"}
 
 
 @pytest.mark.parametrize(
@@ -122,20 +133,9 @@ def test_builds_load_source_data_caching__different_import_as_name(
 ):
     """Test that loading from cache works when the import_as name is different."""
     target_entity_name = "renamed_dataset"
-    # Rename the cache dataset to match import_as
-    cache_pg_client = postgres.PostgresClient(schema=RECIPE_CACHE_SCHEMA)
-    cache_pg_client.rename_table(old_name="test_dataset", new_name=target_entity_name)
-
-    # Create a temporary recipe with an overridden import_as name
-    with open(RECIPE_PATH, "r") as f:
-        recipe_data = yaml.safe_load(f)
-    recipe_data["inputs"]["datasets"][0]["import_as"] = target_entity_name
-    temp_recipe_path = tmp_path / "temp_recipe.yml.lock"
-    with open(temp_recipe_path, "w") as f:
-        yaml.dump(recipe_data, f)
 
     load_source_data_from_resolved_recipe(
-        temp_recipe_path,
+        _recipe_with(tmp_path, import_as=target_entity_name),
         cache_schema=RECIPE_CACHE_SCHEMA,
         cached_entity_type=cached_entity_type,
         clear_pg_schema=True,
@@ -143,6 +143,7 @@ def test_builds_load_source_data_caching__different_import_as_name(
         _write_metadata_file=False,
     )
 
+    assert setup_mock_connector.pull_call_count == 0
     expected_is_view = cached_entity_type == CachedEntityType.view
     assert build_pg_client.is_view(target_entity_name) is expected_is_view, (
         "The created entity type should match expectations (table or view)"
@@ -150,3 +151,54 @@ def test_builds_load_source_data_caching__different_import_as_name(
     assert not build_pg_client.table_or_view_exists("test_dataset"), (
         "The original dataset name should not exist in the build schema"
     )
+
+
+def test_builds_load_source_data_caching__eviction(
+    pg_client, setup_mock_connector, setup_cache_schema, tmp_path
+):
+    """Entries beyond the maximum count are evicted, least recently used first."""
+    (evicted_table,) = _cache_entries()["table_name"]
+
+    load_source_data_from_resolved_recipe(
+        _recipe_with(tmp_path, version="1999v1"),
+        cache_schema=RECIPE_CACHE_SCHEMA,
+        cached_entity_type=CachedEntityType.copy,
+        clear_pg_schema=True,
+        target_schema=BUILD_SCHEMA,
+        _write_metadata_file=False,
+        cache_max_entries=1,
+    )
+
+    assert list(_cache_entries()["version"]) == ["1999v1"]
+    assert not build_pg_client.table_or_view_exists(
+        evicted_table, schema=RECIPE_CACHE_SCHEMA
+    )
+
+
+def test_builds_load_source_data_caching__legacy_tables_dropped(
+    pg_client, setup_mock_connector
+):
+    """Tables cached before the catalog, listed in source_data_versions, are dropped."""
+    cache_pg_client = postgres.PostgresClient(schema=RECIPE_CACHE_SCHEMA)
+    cache_pg_client.create_schema()
+    for table in ["source_data_versions", "test_dataset", "dcp_layer"]:
+        cache_pg_client.execute_query(
+            f'CREATE TABLE "{RECIPE_CACHE_SCHEMA}"."{table}" (a text)'
+        )
+    try:
+        load_source_data_from_resolved_recipe(
+            RECIPE_PATH,
+            cache_schema=RECIPE_CACHE_SCHEMA,
+            cached_entity_type=CachedEntityType.view,
+            clear_pg_schema=True,
+            target_schema=BUILD_SCHEMA,
+            _write_metadata_file=False,
+        )
+
+        (cached_table,) = _cache_entries()["table_name"]
+        assert cache_pg_client.get_schema_tables() == sorted(
+            [input_cache.CATALOG_TABLE, cached_table]
+        )
+    finally:
+        build_pg_client.drop_schema()
+        cache_pg_client.drop_schema()
@@ -1,7 +1,19 @@
 import uuid
+from datetime import date
+from decimal import Decimal
 
+import geopandas as gpd
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import pytest
+from shapely import Point
+
+from dcpy.connectors.edm.models import DatasetType
+from dcpy.lifecycle import data_loader
+from dcpy.lifecycle.builds.models import InputDataset
+from dcpy.utils import postgres
+from dcpy.utils.geospatial import parquet
 
 SAMPLE_TABLE_NAME = "test_table"
 TEST_DATA = pd.DataFrame(
@@ -63,3 +75,188 @@ def test_copying_a_table_from_another_schema(
         f'SELECT name, value FROM "{SAMPLE_TABLE_NAME}" ORDER BY name'
     ).reset_index(drop=True)
     pd.testing.assert_frame_equal(view_data, TEST_DATA)
+
+
+def test_insert_geodataframe(pg_client):
+    table_name = f"test_geo_{uuid.uuid4().hex[:8]}"
+    gdf = gpd.GeoDataFrame(
+        {"name": ["a", None], "value": [1.5, None]},
+        geometry=[Point(1, 2), None],
+        crs="EPSG:2263",
+    ).rename_geometry("geom")
+
+    pg_client.insert_dataframe(gdf, table_name)
+    pg_client.insert_dataframe(gdf, table_name, if_exists="append")
+    result = pg_client.read_table_gdf(table_name)
+    pg_client.drop_table(table_name)
+
+    assert result.crs == gdf.crs
+    pd.testing.assert_frame_equal(
+        result, pd.concat([gdf, gdf], ignore_index=True), check_dtype=False
+    )
+
+
+def test_insert_dataframe_csv_fallback(pg_client):
+    table_name = f"test_mixed_{uuid.uuid4().hex[:8]}"
+    # mixed values can't be binary encoded for the text column they're created as
+    df = pd.DataFrame({"mixed": [1, "a"], "value": [1, 2]})
+
+    pg_client.insert_dataframe(df, table_name)
+    result = pg_client.read_table_df(table_name)
+    pg_client.drop_table(table_name)
+
+    assert list(result["mixed"]) == ["1", "a"]
+    assert list(result["value"]) == [1, 2]
+
+
+def test_insert_dataframe_csv_fallback_after_first_chunk(pg_client, monkeypatch):
+    monkeypatch.setattr(postgres, "COPY_CHUNK_ROWS", 2)
+    table_name = f"test_mixed_{uuid.uuid4().hex[:8]}"
+    # the first chunk can be binary encoded, the second can't
+    df = pd.DataFrame({"mixed": ["a", "b", "c", 1], "value": [1, 2, 3, 4]})
+
+    pg_client.insert_dataframe(df, table_name)
+    result = pg_client.read_table_df(table_name)
+    pg_client.drop_table(table_name)
+
+    assert list(result["mixed"]) == ["a", "b", "c", "1"]
+    assert list(result["value"]) == [1, 2, 3, 4]
+
+
+def test_copy_dataframe_rolls_back_in_transaction(pg_client, monkeypatch):
+    monkeypatch.setattr(postgres, "COPY_CHUNK_ROWS", 2)
+    table_name = f"test_mixed_{uuid.uuid4().hex[:8]}"
+    pg_client.execute_query(
+        f'CREATE TABLE "{pg_client.schema}"."{table_name}" (mixed text)'
+    )
+    df = pd.DataFrame({"mixed": ["a", "b", "c", 1]})
+
+    with pg_client.engine.connect().execution_options(
+        isolation_level="READ COMMITTED"
+    ) as conn:
+        with conn.begin():
+            copied = postgres.copy_dataframe(
+                conn.connection, df, table_name, schema=pg_client.schema
+            )
+            # the transaction is still usable
+            postgres.copy_dataframe(
+                conn.connection, df.head(2), table_name, schema=pg_client.schema
+            )
+    result = pg_client.read_table_df(table_name)
+    pg_client.drop_table(table_name)
+
+    assert not copied
+    assert list(result["mixed"]) == ["a", "b"]
+
+
+def test_duckdb_load_engine_matches_pandas(pg_client, tmp_path):
+    filepath = tmp_path / "geo.parquet"
+    gpd.GeoDataFrame(
+        {"a name": ["a", None], "value": [1.5, None]},
+        geometry=[Point(1, 2), None],
+        crs="EPSG:2263",
+    ).rename_geometry("geom").to_parquet(filepath)
+
+    results = {}
+    for engine in ("pandas", "duckdb"):
+        table_name = f"test_{engine}_{uuid.uuid4().hex[:8]}"
+        ds = InputDataset(
+            id=table_name,
+            version="1",
+            file_type=DatasetType.parquet,
+            load_engine=engine,
+        )
+        data_loader.load_dataset_into_pg(ds, pg_client, filepath)
+        results[engine] = pg_client.read_table_gdf(table_name)
+        pg_client.drop_table(table_name)
+
+    assert results["duckdb"].crs == results["pandas"].crs
+    pd.testing.assert_frame_equal(results["duckdb"], results["pandas"])
+
+
+def test_session_pins_one_connection(pg_client):
+    with pg_client.session():
+        pg_client.execute_query("CREATE TEMPORARY TABLE session_temp AS SELECT 1 AS a")
+        backend_pids = {
+            pg_client.execute_select_query("SELECT pg_backend_pid() AS pid")["pid"][0]
+            for _ in range(3)
+        }
+        temp_rows = pg_client.execute_select_query("SELECT a FROM session_temp")
+
+    assert len(backend_pids) == 1
+    assert list(temp_rows["a"]) == [1]
+
+
+def test_export_to_parquet(pg_client, tmp_path):
+    table_name = f"test_export_{uuid.uuid4().hex[:8]}"
+    pg_client.execute_query(f'''
+        CREATE TABLE "{table_name}" (
+            id bigint,
+            name varchar(10),
+            amount numeric(10, 2),
+            ratio numeric,
+            created date,
+            tags text[]
+        )
+    ''')
+    pg_client.execute_query(f'''
+        INSERT INTO "{table_name}" VALUES
+            (1, 'a', 1.50, 0.25, '2024-01-31', '{{x,y}}'),
+            (2, NULL, NULL, NULL, NULL, NULL),
+            (3, 'c', 3.00, 3, '2024-03-01', '{{}}')
+    ''')
+    filepath = tmp_path / "export.parquet"
+
+    # a batch size smaller than the table, so rows are written over several batches
+    pg_client.export_to_parquet(table_name, filepath, batch_size=2)
+    pg_client.drop_table(table_name)
+
+    table = pq.read_table(filepath)
+    assert table.schema.field("id").type == pa.int64()
+    assert table.schema.field("amount").type == pa.decimal128(10, 2)
+    assert table.schema.field("ratio").type == pa.float64()
+    assert table.schema.field("created").type == pa.date32()
+    assert table.to_pydict() == {
+        "id": [1, 2, 3],
+        "name": ["a", None, "c"],
+        "amount": [Decimal("1.50"), None, Decimal("3.00")],
+        "ratio": [0.25, None, 3.0],
+        "created": [date(2024, 1, 31), None, date(2024, 3, 1)],
+        "tags": ["{x,y}", None, "{}"],
+    }
+
+
+def test_export_geometries_to_geoparquet(pg_client, tmp_path):
+    table_name = f"test_export_geo_{uuid.uuid4().hex[:8]}"
+    gdf = gpd.GeoDataFrame(
+        {"name": ["a", "b", "c"]},
+        geometry=[Point(1, 2), None, Point(3, 4)],
+        crs="EPSG:2263",
+    ).rename_geometry("geom")
+    pg_client.insert_dataframe(gdf, table_name)
+    pg_client.execute_query(
+        f'ALTER TABLE "{table_name}" ALTER COLUMN geom TYPE geometry(Point, 2263)'
+    )
+    filepath = tmp_path / "export.parquet"
+
+    pg_client.export_to_parquet(table_name, filepath, batch_size=2)
+    pg_client.drop_table(table_name)
+
+    result = gpd.read_parquet(filepath)
+    assert result.crs == gdf.crs
+    pd.testing.assert_frame_equal(result, gdf)
+    metadata = parquet.read_metadata(filepath).geo_parquet
+    assert metadata.primary_column.geometry_types == {"Point"}
+
+
+def test_export_empty_table_to_parquet(pg_client, tmp_path):
+    table_name = f"test_export_empty_{uuid.uuid4().hex[:8]}"
+    pg_client.execute_query(f'CREATE TABLE "{table_name}" (id integer, name text)')
+    filepath = tmp_path / "export.parquet"
+
+    pg_client.export_to_parquet(table_name, filepath)
+    pg_client.drop_table(table_name)
+
+    table = pq.read_table(filepath)
+    assert table.num_rows == 0
+    assert table.schema == pa.schema({"id": pa.int32(), "name": pa.string()})
@@ -1,14 +1,22 @@
+import io
 import json
 import os
+import re
 import shutil
+import time
 import zipfile
 from collections import defaultdict
+from collections.abc import Iterator
 from pathlib import Path
 from typing import Literal
 
 import geopandas as gpd
 import ijson
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyogrio
+from pyarrow import csv as pa_csv
 
 from dcpy.utils import formats as file
 from dcpy.utils.geospatial.transform import df_to_gdf
@@ -30,7 +38,7 @@ def _get_dtype(dtype: str | dict | None) -> str | dict | defaultdict | None:
             return dtype
 
 
-def _read_geojson_crs(local_data_path: Path) -> str | None:
+def _read_geojson_crs(local_data_path: Path | str) -> str | None:
     file_crs = None
     with open(local_data_path, "rb") as f:
         for item in ijson.items(f, "crs"):
@@ -43,7 +51,10 @@ def _read_geojson_crs(local_data_path: Path) -> str | None:
 
 
 def read_data_to_df(
-    data_format: file.Format, local_data_path: Path, clean_extracted_zip: bool = True
+    data_format: file.Format,
+    local_data_path: Path,
+    clean_extracted_zip: bool = True,
+    read_stats: dict | None = None,
 ) -> gpd.GeoDataFrame | pd.DataFrame:
     """
     Reads data from a specified path and returns a pandas or geopandas dataframe depending
@@ -53,49 +64,36 @@ def read_data_to_df(
         data_format(file.Foramt): Object containing metadata about the data, including its format
                          and whether it is geospatial.
         local_data_path(Path): Local path where the data is stored.
+        read_stats(dict | None): If given, filled with how long unzipping took ("unzip_seconds")
+                         and how many bytes were extracted ("unzipped_bytes").
 
     Returns:
         pd.DataFrame or gpd.GeoDataFrame: The loaded data as a DataFrame.
 
     Raises:
-        AssertionError: If a file with `unzipped_filename` exists in local filesystem before unzipping (for zipped files).
-        AssertionError: If the expected unzipped filename is not present in the unzipped files (for zipped files).
+        AssertionError: If the expected unzipped filename is not present in the zip (for zipped files).
         AssertionError: If a specified geometry column does not exist in the DataFrame (for csv data format case).
 
     Notes:
-        - This function will unzip files if the unzipped filename is specified in the config.
+        - If the unzipped filename is specified in the config, shapefiles and geodatabases are read
+          from within the zip, and for other formats only that file is extracted.
         - The function will load the data into a GeoDataFrame if it is geospatial, otherwise into a DataFrame.
     """
 
-    # case when an input file is a zip
-    if data_format.unzipped_filename is not None:
-        logger.info(f"Unzipping files from {local_data_path}...")
-
-        extracted_files_dir = local_data_path.parent / "extracted_files"
-
-        unzipped_filename = data_format.unzipped_filename
-        unzipped_file_path = extracted_files_dir / unzipped_filename
-
-        unzipped_files = unzip_file(
-            zipped_filename=local_data_path, output_dir=extracted_files_dir
-        )
-
-        assert unzipped_filename in unzipped_files, (
-            f"❌ {unzipped_filename} is not present in unzipped files after extraction. Aborting..."
-        )
-
-        local_data_path = unzipped_file_path
+    data_path, extracted_files_dir = unzip_input(
+        data_format, local_data_path, read_stats
+    )
 
     match data_format:
         case file.Shapefile():
             gdf = gpd.read_file(
-                local_data_path,
+                data_path,
                 crs=data_format.crs,
                 encoding=data_format.encoding,
             )
         case file.Geodatabase():
             gdf = gpd.read_file(
-                local_data_path,
+                data_path,
                 encoding=data_format.encoding,
                 layer=data_format.layer,
             )
@@ -109,12 +107,12 @@ def read_data_to_df(
                     f"Specified crs '{data_format.crs}' differs from crs in gdb: '{gdf_crs}'"
                 )
         case file.GeoJson():
-            crs = data_format.crs or _read_geojson_crs(local_data_path) or "EPSG:4326"
-            gdf = gpd.read_file(local_data_path, encoding=data_format.encoding)
+            crs = data_format.crs or _read_geojson_crs(data_path) or "EPSG:4326"
+            gdf = gpd.read_file(data_path, encoding=data_format.encoding)
             gdf.set_crs(crs, allow_override=True, inplace=True)
         case file.Csv():
             model_kwargs = data_format.model_dump()
-            for key in ["type", "geometry", "unzipped_filename", "dtype"]:
+            for key in _CSV_MODEL_FIELDS:
                 model_kwargs.pop(key, None)
             kwargs: dict = {
                 "index_col": False,
@@ -122,13 +120,13 @@ def read_data_to_df(
                 "dtype": _get_dtype(data_format.dtype),
             }
             kwargs.update(model_kwargs)
-            df = pd.read_csv(local_data_path, **kwargs)
+            df = pd.read_csv(data_path, **kwargs)
             gdf = (
                 df if not data_format.geometry else df_to_gdf(df, data_format.geometry)
             )
         case file.Excel():
             df = pd.read_excel(
-                local_data_path,
+                data_path,
                 sheet_name=data_format.sheet_name,
                 engine=data_format.engine,
                 dtype=_get_dtype(data_format.dtype),
@@ -140,12 +138,12 @@ def read_data_to_df(
         case file.Json():
             if data_format.json_read_fn == "read_json":
                 df = (
-                    pd.read_json(local_data_path, **data_format.json_read_kwargs)
+                    pd.read_json(data_path, **data_format.json_read_kwargs)
                     if data_format.json_read_kwargs
-                    else pd.read_json(local_data_path)
+                    else pd.read_json(data_path)
                 )
             else:
-                with open(local_data_path) as f:
+                with open(data_path) as f:
                     json_str = json.load(f)
                 df = (
                     pd.json_normalize(json_str, **data_format.json_read_kwargs)
@@ -158,23 +156,485 @@ def read_data_to_df(
                 df if not data_format.geometry else df_to_gdf(df, data_format.geometry)
             )
         case file.Html():
-            df = pd.read_html(local_data_path, **data_format.kwargs)[data_format.table]
+            df = pd.read_html(data_path, **data_format.kwargs)[data_format.table]
             gdf = (
                 df if not data_format.geometry else df_to_gdf(df, data_format.geometry)
             )
         case file.Parquet():
-            df = pd.read_parquet(local_data_path)
+            df = pd.read_parquet(data_path)
             gdf = (
                 df if not data_format.geometry else df_to_gdf(df, data_format.geometry)
             )
 
-    if data_format.unzipped_filename and clean_extracted_zip:
-        assert extracted_files_dir
+    if extracted_files_dir and clean_extracted_zip:
         shutil.rmtree(extracted_files_dir)
 
     return gdf
 
 
+# Fields of file.Csv that aren't passed through to pd.read_csv as options
+_CSV_MODEL_FIELDS = {
+    "type",
+    "unzipped_filename",
+    "dtype",
+    "geometry",
+    "chunk_size_mb",
+    "sample_rows",
+}
+# pd.read_csv options that have an equivalent in pyarrow.csv
+_ARROW_CSV_OPTIONS = {"encoding", "delimiter", "sep"}
+_STRING_DTYPES = {"str", "string", "object"}
+
+
+def _is_string_dtype(dtype: str | dict | None) -> bool:
+    match dtype:
+        case None:
+            return True
+        case str():
+            return dtype in _STRING_DTYPES
+        case dict():
+            return all(d in _STRING_DTYPES for d in dtype.values())
+        case _:
+            return False
+
+
+def supports_arrow(data_format: file.Format) -> bool:
+    """
+    Whether `read_data_to_arrow` can read this format. Vector formats always can. Csvs
+    can if they have no geometry to convert, use only read options that pyarrow.csv
+    also has, and specify no dtypes other than strings.
+    """
+    match data_format:
+        case file.Shapefile() | file.Geodatabase() | file.GeoJson():
+            return True
+        case file.Csv():
+            read_options = set(data_format.model_dump()) - _CSV_MODEL_FIELDS
+            return (
+                not data_format.geometry
+                and read_options <= _ARROW_CSV_OPTIONS
+                and _is_string_dtype(data_format.dtype)
+            )
+        case _:
+            return False
+
+
+def _mangle_column_names(names: list[str]) -> list[str]:
+    """Name unnamed and duplicate columns the way pd.read_csv does"""
+    mangled: list[str] = []
+    for i, name in enumerate(names):
+        name = name or f"Unnamed: {i}"
+        candidate, n = name, 0
+        while candidate in mangled:
+            n += 1
+            candidate = f"{name}.{n}"
+        mangled.append(candidate)
+    return mangled
+
+
+def _csv_options(
+    data_format: file.Csv, block_size: int | None = None
+) -> tuple[pa_csv.ReadOptions, pa_csv.ParseOptions]:
+    options = data_format.model_dump()
+    read_options = pa_csv.ReadOptions(encoding=options.get("encoding", "utf8"))
+    if block_size:
+        read_options.block_size = block_size
+    parse_options = pa_csv.ParseOptions(
+        delimiter=options.get("delimiter") or options.get("sep") or ","
+    )
+    return read_options, parse_options
+
+
+def _name_columns_uniquely(
+    local_data_path: Path | str,
+    read_options: pa_csv.ReadOptions,
+    parse_options: pa_csv.ParseOptions,
+) -> None:
+    """Names columns the way pd.read_csv does (see `_mangle_column_names`) rather than
+    by the csv's header, so that columns with the same header can be told apart"""
+    with pa_csv.open_csv(
+        local_data_path, read_options=read_options, parse_options=parse_options
+    ) as reader:
+        names = reader.schema.names
+    read_options.column_names = _mangle_column_names(names)
+    read_options.skip_rows = 1
+
+
+def _csv_convert_options(column_types: dict[str, pa.DataType]) -> pa_csv.ConvertOptions:
+    return pa_csv.ConvertOptions(
+        column_types=column_types,
+        # as in pandas, empty strings are null
+        strings_can_be_null=True,
+    )
+
+
+def _csv_string_columns(
+    data_format: file.Csv,
+    local_data_path: Path | str,
+    read_options: pa_csv.ReadOptions,
+    parse_options: pa_csv.ParseOptions,
+) -> dict[str, pa.DataType]:
+    """Column types for the columns that the format's dtype makes strings"""
+    # _get_dtype consumes a dict's "__default__", so give it a copy
+    dtype = _get_dtype(
+        dict(data_format.dtype)
+        if isinstance(data_format.dtype, dict)
+        else data_format.dtype
+    )
+    if isinstance(dtype, str) or isinstance(dtype, defaultdict):
+        # every (other) column is a string, so column names are needed up front
+        with pa_csv.open_csv(
+            local_data_path, read_options=read_options, parse_options=parse_options
+        ) as reader:
+            names = reader.schema.names
+        return {name: pa.string() for name in names}
+    else:
+        return {name: pa.string() for name in dtype or {}}
+
+
+def _temporal_as_strings(
+    schema: pa.Schema, column_types: dict[str, pa.DataType]
+) -> dict[str, pa.DataType]:
+    """pandas doesn't infer dates or times from csvs, so keep those as strings too"""
+    return {
+        field.name: pa.string()
+        for field in schema
+        if field.name not in column_types and pa.types.is_temporal(field.type)
+    }
+
+
+def _read_csv_arrow(data_format: file.Csv, local_data_path: Path | str) -> pa.Table:
+    read_options, parse_options = _csv_options(data_format)
+
+    def read(column_types: dict[str, pa.DataType]) -> pa.Table:
+        return pa_csv.read_csv(
+            local_data_path,
+            read_options=read_options,
+            parse_options=parse_options,
+            convert_options=_csv_convert_options(column_types),
+        )
+
+    column_types = _csv_string_columns(
+        data_format, local_data_path, read_options, parse_options
+    )
+    table = read(column_types)
+    if temporal := _temporal_as_strings(table.schema, column_types):
+        table = read(column_types | temporal)
+
+    return table.rename_columns(_mangle_column_names(table.column_names))
+
+
+DEFAULT_CSV_SAMPLE_ROWS = 100_000
+
+# How pyarrow reports a value that can't be converted to its column's type
+_CSV_CONVERSION_ERROR = re.compile(
+    r"In CSV column #(?P<column>\d+): .*conversion error to (?P<type>\S+): "
+    r"invalid value '(?P<value>.*)'",
+    re.DOTALL,
+)
+
+
+class CsvTypeConflictError(ValueError):
+    """A csv value that can't be converted to the type inferred for its column"""
+
+    def __init__(self, column: str, inferred_type: pa.DataType, value: str, row: int):
+        self.column = column
+        self.inferred_type = inferred_type
+        self.value = value
+        self.row = row
+        super().__init__(
+            f"Column '{column}' was inferred to be {inferred_type}, but has value "
+            f"'{value}' in the chunk starting at row {row}"
+        )
+
+
+def supports_chunked_csv(data_format: file.Format) -> bool:
+    """Whether a format can be read with `iter_csv_batches`. Like `supports_arrow`, but
+    geometry (converted per chunk by the caller) is allowed."""
+    return isinstance(data_format, file.Csv) and supports_arrow(
+        data_format.model_copy(update={"geometry": None})
+    )
+
+
+def infer_csv_types(
+    data_format: file.Csv,
+    local_data_path: Path | str,
+    sample_rows: int | None = None,
+) -> dict[str, pa.DataType]:
+    """
+    Infers the type of every column of a csv from its first `sample_rows` rows
+    (default DEFAULT_CSV_SAMPLE_ROWS), following the same rules as `read_data_to_arrow`.
+    Columns with no values in the sample are inferred to be strings.
+    """
+    sample_rows = sample_rows or DEFAULT_CSV_SAMPLE_ROWS
+    read_options, parse_options = _csv_options(data_format)
+    _name_columns_uniquely(local_data_path, read_options, parse_options)
+    column_types = _csv_string_columns(
+        data_format, local_data_path, read_options, parse_options
+    )
+
+    # read the sample as strings, then write it back out to infer types from
+    batches = []
+    with pa_csv.open_csv(
+        local_data_path, read_options=read_options, parse_options=parse_options
+    ) as reader:
+        string_types: dict[str, pa.DataType] = {
+            name: pa.string() for name in reader.schema.names
+        }
+    with pa_csv.open_csv(
+        local_data_path,
+        read_options=read_options,
+        parse_options=parse_options,
+        convert_options=_csv_convert_options(string_types),
+    ) as reader:
+        rows = 0
+        for batch in reader:
+            batches.append(batch)
+            rows += batch.num_rows
+            if rows >= sample_rows:
+                break
+        sample = pa.Table.from_batches(batches, schema=reader.schema).slice(
+            0, sample_rows
+        )
+
+    sample_csv = pa.BufferOutputStream()
+    pa_csv.write_csv(sample, sample_csv)
+    inferred = pa_csv.read_csv(
+        io.BytesIO(sample_csv.getvalue().to_pybytes()),
+        convert_options=_csv_convert_options(column_types),
+    ).schema
+    column_types = column_types | _temporal_as_strings(inferred, column_types)
+    return {
+        field.name: column_types.get(
+            field.name, pa.string() if pa.types.is_null(field.type) else field.type
+        )
+        for field in inferred
+    }
+
+
+def _widen(column_type: pa.DataType, value: str) -> pa.DataType:
+    """The narrowest type, wider than `column_type`, that `value` can be read as"""
+    if pa.types.is_integer(column_type):
+        try:
+            float(value)
+            return pa.float64()
+        except ValueError:
+            pass
+    return pa.string()
+
+
+def iter_csv_batches(
+    data_format: file.Csv,
+    local_data_path: Path | str,
+    column_types: dict[str, pa.DataType],
+    chunk_size_mb: int,
+) -> Iterator[pa.RecordBatch]:
+    """
+    Streams a csv as record batches of about `chunk_size_mb` of csv each, with
+    `column_types` (see `infer_csv_types`) giving the name and type of every column, in
+    the order they appear in the csv.
+
+    Raises:
+        CsvTypeConflictError: when a value can't be converted to its column's type. The
+            conflict can be resolved by widening the column's type (see
+            `widen_csv_types`) and reading again.
+    """
+    read_options, parse_options = _csv_options(
+        data_format, block_size=chunk_size_mb * 2**20
+    )
+    names = list(column_types)
+    read_options.column_names = names
+    read_options.skip_rows = 1
+    rows = 0
+
+    def conflict(e: pa.ArrowInvalid) -> CsvTypeConflictError | pa.ArrowInvalid:
+        match = _CSV_CONVERSION_ERROR.search(str(e))
+        if not match:
+            return e
+        column = list(column_types)[int(match["column"])]
+        return CsvTypeConflictError(column, column_types[column], match["value"], rows)
+
+    try:
+        # the first chunk is read on opening
+        reader = pa_csv.open_csv(
+            local_data_path,
+            read_options=read_options,
+            parse_options=parse_options,
+            convert_options=_csv_convert_options(column_types),
+        )
+    except pa.ArrowInvalid as e:
+        raise conflict(e) from e
+    with reader:
+        while True:
+            try:
+                batch = reader.read_next_batch()
+            except StopIteration:
+                if not rows:
+                    # still yield one (empty) batch, so the caller gets the columns
+                    yield pa.RecordBatch.from_arrays(
+                        [pa.array([], type=field.type) for field in reader.schema],
+                        names=names,
+                    )
+                return
+            except pa.ArrowInvalid as e:
+                raise conflict(e) from e
+            yield pa.RecordBatch.from_arrays(batch.columns, names=names)
+            rows += batch.num_rows
+
+
+def widen_csv_types(
+    column_types: dict[str, pa.DataType], conflict: CsvTypeConflictError
+) -> dict[str, pa.DataType]:
+    """Column types with the conflicting column widened to fit the conflicting value"""
+    return column_types | {
+        conflict.column: _widen(conflict.inferred_type, conflict.value)
+    }
+
+
+def _read_vector_arrow(
+    data_format: file.Shapefile | file.Geodatabase | file.GeoJson,
+    local_data_path: Path | str,
+) -> tuple[pa.Table, gpd.GeoSeries | None]:
+    layer = data_format.layer if isinstance(data_format, file.Geodatabase) else None
+    meta, table = pyogrio.read_arrow(
+        local_data_path, layer=layer, encoding=data_format.encoding
+    )
+    if meta["geometry_type"] is None:
+        return table, None
+
+    geometry_column = meta["geometry_name"] or "wkb_geometry"
+    file_crs = meta["crs"]
+    match data_format:
+        case file.Shapefile():
+            crs = file_crs or data_format.crs
+        case file.Geodatabase():
+            crs = file_crs
+        case file.GeoJson():
+            crs = data_format.crs or _read_geojson_crs(local_data_path) or "EPSG:4326"
+    geometry = gpd.GeoSeries.from_wkb(
+        table[geometry_column].to_numpy(zero_copy_only=False),
+        crs=crs,
+        name=meta["geometry_name"] or "geometry",
+    )
+    if isinstance(data_format, file.Geodatabase) and data_format.crs:
+        gdb_crs = geometry.crs.to_string() if geometry.crs else None
+        if data_format.crs != gdb_crs:
+            raise ValueError(
+                f"Specified crs '{data_format.crs}' differs from crs in gdb: '{gdb_crs}'"
+            )
+    table = table.drop_columns([geometry_column])
+
+    # gpd.read_file reads dates as datetimes
+    for i, field in enumerate(table.schema):
+        if pa.types.is_date(field.type):
+            table = table.set_column(
+                i, field.name, pc.cast(table[i], pa.timestamp("ms"))
+            )
+    return table, geometry
+
+
+def read_data_to_arrow(
+    data_format: file.Format,
+    local_data_path: Path,
+    clean_extracted_zip: bool = True,
+    read_stats: dict | None = None,
+) -> tuple[pa.Table, gpd.GeoSeries | None]:
+    """
+    Reads data into an arrow table without building pandas columns, for formats where
+    `supports_arrow` is True. Vector formats are read through GDAL's arrow stream
+    (pyogrio's `use_arrow`), csvs with pyarrow.csv.
+
+    Returns:
+        The table of non-geometry columns, and the geometry (if any) as a GeoSeries
+        with one row per row of the table. Column names and types otherwise match
+        what `read_data_to_df` would return.
+
+    Zipped data and `read_stats` are handled as in `read_data_to_df`.
+    """
+    assert supports_arrow(data_format), (
+        f"Reading format '{data_format.type}' with arrow is not supported"
+    )
+    data_path, extracted_files_dir = unzip_input(
+        data_format, local_data_path, read_stats
+    )
+
+    geometry = None
+    match data_format:
+        case file.Csv():
+            table = _read_csv_arrow(data_format, data_path)
+        case file.Shapefile() | file.Geodatabase() | file.GeoJson():
+            table, geometry = _read_vector_arrow(data_format, data_path)
+
+    if extracted_files_dir and clean_extracted_zip:
+        shutil.rmtree(extracted_files_dir)
+
+    return table, geometry
+
+
+# Formats read with GDAL, which can read a file (along with any sidecar files) from
+# within a zip in place, via its /vsizip/ virtual file system
+_IN_ARCHIVE_FORMATS = (file.Shapefile, file.Geodatabase)
+
+
+def _zip_members(zip_ref: zipfile.ZipFile) -> set[str]:
+    """Paths of all files and directories within a zip"""
+    members = set()
+    for info in zip_ref.infolist():
+        path = info.filename.rstrip("/")
+        while path:
+            members.add(path)
+            path = os.path.dirname(path)
+    return members
+
+
+def unzip_input(
+    data_format: file.Format, local_data_path: Path, read_stats: dict | None = None
+) -> tuple[Path | str, Path | None]:
+    """
+    If the format specifies a file within a zip, returns a path it can be read from.
+    GDAL formats are read from within the zip. For other formats, only that file (or
+    directory) is extracted, rather than the whole archive.
+
+    Returns the path to read data from, and the directory files were extracted to
+    (if any). If given, `read_stats` is filled with how long this took and how many
+    bytes were extracted.
+    """
+    if data_format.unzipped_filename is None:
+        return local_data_path, None
+
+    assert local_data_path.exists(), (
+        f"❌ Provided path {local_data_path} to zipped file wasn't found. Try again"
+    )
+    member = data_format.unzipped_filename.rstrip("/")
+    start = time.perf_counter()
+    with zipfile.ZipFile(local_data_path, "r") as zip_ref:
+        assert member in _zip_members(zip_ref), (
+            f"❌ {member} is not present in {local_data_path.name}. Aborting..."
+        )
+
+        if isinstance(data_format, _IN_ARCHIVE_FORMATS):
+            logger.info(f"Reading {member} from within {local_data_path}")
+            read_path: Path | str = f"/vsizip/{local_data_path.absolute()}/{member}"
+            extracted_files_dir = None
+            extracted = []
+        else:
+            logger.info(f"Extracting {member} from {local_data_path}...")
+            extracted_files_dir = local_data_path.parent / "extracted_files"
+            extracted = [
+                info
+                for info in zip_ref.infolist()
+                if info.filename.rstrip("/") == member
+                or info.filename.startswith(f"{member}/")
+            ]
+            for info in extracted:
+                zip_ref.extract(info, extracted_files_dir)
+            read_path = extracted_files_dir / member
+
+    if read_stats is not None:
+        read_stats["unzip_seconds"] = time.perf_counter() - start
+        read_stats["unzipped_bytes"] = sum(info.file_size for info in extracted)
+    return read_path, extracted_files_dir
+
+
 def unzip_file(zipped_filename: Path, output_dir: Path) -> set[str]:
     """
     Extracts file(s) from a specified zipped file into an output directory.
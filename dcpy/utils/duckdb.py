@@ -1,8 +1,12 @@
 import os
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
 from pathlib import Path
 
 import duckdb  # type: ignore
 import pandas as pd
+import pyarrow as pa
 
 from dcpy.utils.logging import logger
 
@@ -27,25 +31,162 @@ def sanitize_name(name: str) -> str:
     return name.strip().replace("-", "_").replace("'", "_").replace(" ", "_").lower()
 
 
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def copy_file_to_postgres(
+    source_path: Path,
+    *,
+    file_format: str,
+    engine_uri: str,
+    schema: str,
+    table_name: str,
+    rename_column: Callable[[str], str] = lambda column: column,
+) -> None:
+    """Create a Postgres table from a csv or parquet file using DuckDB's postgres
+    extension.
+
+    DuckDB reads the file and writes the rows over binary COPY itself, so no data
+    passes through Python. Csv columns are all read as text. GeoParquet geometry
+    columns are written as WKB bytea, to be converted to PostGIS geometry in Postgres.
+
+    Args:
+        source_path: Path to the csv or parquet file
+        file_format: "csv" or "parquet"
+        engine_uri: libpq connection string of the Postgres database
+        schema: Postgres schema to create the table in
+        table_name: Name of table to create, which must not already exist
+        rename_column: Maps each column name in the file to its name in the table
+    """
+    match file_format:
+        case "csv":
+            source = f"read_csv('{source_path}', all_varchar = true)"
+        case "parquet":
+            source = f"read_parquet('{source_path}')"
+        case _:
+            raise ValueError(f"Unsupported file format for DuckDB: {file_format}")
+
+    conn = duckdb.connect()
+    try:
+        # keep geoparquet geometry as WKB, which Postgres can take without PostGIS
+        # support in DuckDB
+        conn.execute("SET enable_geoparquet_conversion = false")
+        columns = [
+            row[0]
+            for row in conn.execute(f"DESCRIBE SELECT * FROM {source}").fetchall()
+        ]
+        select = ", ".join(
+            f"{_quote(column)} AS {_quote(rename_column(column))}" for column in columns
+        )
+        conn.execute("INSTALL postgres; LOAD postgres;")
+        conn.execute(f"ATTACH '{engine_uri}' AS pg (TYPE postgres)")
+        conn.execute(
+            f"CREATE TABLE pg.{_quote(schema)}.{_quote(table_name)} AS "
+            f"SELECT {select} FROM {source}"
+        )
+    finally:
+        conn.close()
+    logger.info(f"Copied {source_path} into {schema}.{table_name}")
+
+
+# DuckDB types of dataset schema column types (see dcpy.utils.schema.COLUMN_TYPES).
+# Geometries in csvs are WKT, so are read as text.
+CSV_COLUMN_TYPES = {
+    "bbl": "VARCHAR",
+    "bool": "BOOLEAN",
+    "date": "DATE",
+    "datetime": "TIMESTAMP",
+    "decimal": "DOUBLE",
+    "geometry": "VARCHAR",
+    "integer": "BIGINT",
+    "number": "DOUBLE",
+    "text": "VARCHAR",
+}
+
+
+@dataclass
+class DuckDBSettings:
+    """Settings of a DuckDB database, unset ones keeping DuckDB's defaults.
+
+    DuckDB defaults to a thread per core and 80% of the machine's memory, and only
+    spills larger-than-memory operations to disk next to a database file.
+    """
+
+    threads: int | None = None
+    # e.g. "8GB"
+    memory_limit: str | None = None
+    temp_directory: Path | None = None
+    # turning this off lets DuckDB load and export out of order, using less memory
+    preserve_insertion_order: bool | None = None
+
+    @classmethod
+    def from_env(cls) -> "DuckDBSettings":
+        """Settings from DUCKDB_THREADS, DUCKDB_MEMORY_LIMIT, DUCKDB_TEMP_DIRECTORY and
+        DUCKDB_PRESERVE_INSERTION_ORDER ("true" or "false")."""
+        threads = os.environ.get("DUCKDB_THREADS")
+        temp_directory = os.environ.get("DUCKDB_TEMP_DIRECTORY")
+        preserve_insertion_order = os.environ.get("DUCKDB_PRESERVE_INSERTION_ORDER")
+        return cls(
+            threads=int(threads) if threads else None,
+            memory_limit=os.environ.get("DUCKDB_MEMORY_LIMIT") or None,
+            temp_directory=Path(temp_directory) if temp_directory else None,
+            preserve_insertion_order=preserve_insertion_order == "true"
+            if preserve_insertion_order
+            else None,
+        )
+
+    def config(self) -> dict[str, str | bool | int]:
+        config: dict[str, str | bool | int] = {}
+        if self.threads is not None:
+            config["threads"] = self.threads
+        if self.memory_limit is not None:
+            config["memory_limit"] = self.memory_limit
+        if self.temp_directory is not None:
+            config["temp_directory"] = str(self.temp_directory)
+        if self.preserve_insertion_order is not None:
+            config["preserve_insertion_order"] = self.preserve_insertion_order
+        return config
+
+
 class DuckDBClient:
-    """Client for managing DuckDB databases with schema support."""
+    """Client for managing DuckDB databases with schema support.
 
-    def __init__(self, db_path: Path, schema: str):
+    A client may be used from several threads at once, e.g. to load datasets
+    concurrently. Each thread runs its queries on its own cursor of the client's
+    connection, which shares the connection's database, settings and extensions.
+    """
+
+    def __init__(
+        self, db_path: Path, schema: str, settings: DuckDBSettings | None = None
+    ):
         """Initialize DuckDB client.
 
         Args:
             db_path: Path to DuckDB database file
             schema: Schema name to use (will be created if doesn't exist)
+            settings: Database settings, by default from the environment
+                (see `DuckDBSettings.from_env`)
         """
         self.db_path = db_path
         self.schema = sanitize_name(schema)
+        self.settings = settings or DuckDBSettings.from_env()
 
         # Connect with storage_compatibility_version set to ensure we get v1.5.0+
         # storage format which is required for geometry columns with CRS
         config: dict[str, str | bool | int | float | list[str]] = {
-            "storage_compatibility_version": "v1.5.0"
+            "storage_compatibility_version": "v1.5.0",
+            **self.settings.config(),
         }
         self.conn = duckdb.connect(str(db_path), config=config)
+        self._owner_thread = threading.get_ident()
+        self._local = threading.local()
+        self._cursors: list[duckdb.DuckDBPyConnection] = []
+        self._cursors_lock = threading.Lock()
 
         # Install and load spatial extension for geometry support
         # This needs to happen on every connection
@@ -54,106 +195,125 @@ class DuckDBClient:
 
         self.create_schema()
 
+    def _cursor(self) -> duckdb.DuckDBPyConnection:
+        """The calling thread's cursor, as a DuckDB connection can't be shared by
+        threads."""
+        if threading.get_ident() == self._owner_thread:
+            return self.conn
+        cursor = getattr(self._local, "cursor", None)
+        if cursor is None:
+            with self._cursors_lock:
+                cursor = self._local.cursor = self.conn.cursor()
+                self._cursors.append(cursor)
+        return cursor
+
     def create_schema(self) -> None:
         """Create schema if it doesn't exist."""
-        self.conn.execute(f"CREATE SCHEMA IF NOT EXISTS {self.schema}")
+        self._cursor().execute(f"CREATE SCHEMA IF NOT EXISTS {self.schema}")
         logger.info(f"Created/verified schema: {self.schema}")
 
     def execute_query(self, query: str) -> None:
         """Execute a SQL query."""
-        self.conn.execute(query)
+        self._cursor().execute(query)
 
     def table_exists(self, table_name: str) -> bool:
         """Check if a table exists in the schema."""
-        result = self.conn.execute(
-            """
+        result = (
+            self._cursor()
+            .execute(
+                """
             SELECT COUNT(*) FROM information_schema.tables
             WHERE table_schema = ? AND table_name = ?
             """,
-            [self.schema, sanitize_name(table_name)],
-        ).fetchone()
+                [self.schema, sanitize_name(table_name)],
+            )
+            .fetchone()
+        )
         return result[0] > 0 if result else False
 
     def load_csv(
-        self, csv_path: Path, table_name: str, include_ogc_fid_col: bool = True
+        self,
+        csv_path: Path,
+        table_name: str,
+        include_ogc_fid_col: bool = True,
+        *,
+        column_types: dict[str, str] | None = None,
     ) -> str:
         """Load CSV file into DuckDB table.
 
+        Without column_types, DuckDB infers column types from a sample of the file.
+        With them, no types are inferred: listed columns are read as the given DuckDB
+        types (see `CSV_COLUMN_TYPES`), the rest as text.
+
         Args:
             csv_path: Path to CSV file
             table_name: Name of table to create
             include_ogc_fid_col: Whether to add ogc_fid primary key column
+            column_types: DuckDB type of each column, by column name
 
         Returns:
             Fully qualified table name (schema.table)
         """
-        sanitized_table = sanitize_name(table_name)
-        full_table_name = f"{self.schema}.{sanitized_table}"
-
-        # Drop table if exists
-        self.conn.execute(f"DROP TABLE IF EXISTS {full_table_name}")
-
-        # Create table from CSV
-        if include_ogc_fid_col:
-            # Use row_number() as ogc_fid
-            self.conn.execute(
-                f"""
-                CREATE TABLE {full_table_name} AS
-                SELECT row_number() OVER () AS ogc_fid, *
-                FROM read_csv_auto('{csv_path}')
-                """
-            )
+        if column_types is None:
+            source = f"read_csv_auto('{csv_path}')"
         else:
-            self.conn.execute(
-                f"""
-                CREATE TABLE {full_table_name} AS
-                SELECT * FROM read_csv_auto('{csv_path}')
-                """
+            types = ", ".join(
+                f"{_literal(column)}: {_literal(column_type)}"
+                for column, column_type in column_types.items()
             )
-
+            source = f"read_csv('{csv_path}', all_varchar = true, types = {{{types}}})"
+        full_table_name = self._create_table_from(
+            source, table_name, include_ogc_fid_col
+        )
         logger.info(f"Loaded CSV {csv_path} into {full_table_name}")
         return full_table_name
 
     def load_parquet(
-        self, parquet_path: Path, table_name: str, include_ogc_fid_col: bool = True
+        self,
+        parquet_path: Path | str,
+        table_name: str,
+        include_ogc_fid_col: bool = True,
     ) -> str:
-        """Load Parquet file into DuckDB table.
+        """Load Parquet file(s) into DuckDB table.
+
+        Multiple files, given by a glob (e.g. `data/*.parquet`) or a directory, are
+        loaded into one table, matching their columns by name. Hive partition columns
+        (e.g. `borough` of `data/borough=1/part-0.parquet`) become table columns.
 
         Args:
-            parquet_path: Path to Parquet file
+            parquet_path: Path to Parquet file, glob of Parquet files, or directory
+                of (possibly hive partitioned) Parquet files
             table_name: Name of table to create
             include_ogc_fid_col: Whether to add ogc_fid primary key column
 
         Returns:
             Fully qualified table name (schema.table)
         """
-        sanitized_table = sanitize_name(table_name)
-        full_table_name = f"{self.schema}.{sanitized_table}"
-
-        # Drop table if exists
-        self.conn.execute(f"DROP TABLE IF EXISTS {full_table_name}")
-
-        # Create table from Parquet
-        if include_ogc_fid_col:
-            # Use row_number() as ogc_fid
-            self.conn.execute(
-                f"""
-                CREATE TABLE {full_table_name} AS
-                SELECT row_number() OVER () AS ogc_fid, *
-                FROM read_parquet('{parquet_path}')
-                """
+        if isinstance(parquet_path, Path) and parquet_path.is_dir():
+            source = (
+                f"read_parquet('{parquet_path}/**/*.parquet', "
+                "hive_partitioning = true, union_by_name = true)"
             )
         else:
-            self.conn.execute(
-                f"""
-                CREATE TABLE {full_table_name} AS
-                SELECT * FROM read_parquet('{parquet_path}')
-                """
-            )
-
+            source = f"read_parquet('{parquet_path}', union_by_name = true)"
+        full_table_name = self._create_table_from(
+            source, table_name, include_ogc_fid_col
+        )
         logger.info(f"Loaded Parquet {parquet_path} into {full_table_name}")
         return full_table_name
 
+    def _create_table_from(
+        self, source: str, table_name: str, include_ogc_fid_col: bool
+    ) -> str:
+        """(Re)create a table from a table function call, e.g. `read_parquet(...)`."""
+        full_table_name = f"{self.schema}.{sanitize_name(table_name)}"
+        self._cursor().execute(f"DROP TABLE IF EXISTS {full_table_name}")
+        ogc_fid = "row_number() OVER () AS ogc_fid, " if include_ogc_fid_col else ""
+        self._cursor().execute(
+            f"CREATE TABLE {full_table_name} AS SELECT {ogc_fid}* FROM {source}"
+        )
+        return full_table_name
+
     def load_spatial(
         self,
         source_path: Path,
@@ -179,7 +339,7 @@ class DuckDBClient:
         full_table_name = f"{self.schema}.{sanitized_table}"
 
         # Drop table if exists
-        self.conn.execute(f"DROP TABLE IF EXISTS {full_table_name}")
+        self._cursor().execute(f"DROP TABLE IF EXISTS {full_table_name}")
 
         st_read_call = (
             f"ST_Read('{source_path}', layer='{layer_name}')"
@@ -190,7 +350,7 @@ class DuckDBClient:
         # ST_Read includes its own OGC_FID column; exclude it so our row_number()
         # based ogc_fid (consistent with the CSV/Parquet loaders) doesn't collide with it.
         if include_ogc_fid_col:
-            self.conn.execute(
+            self._cursor().execute(
                 f"""
                 CREATE TABLE {full_table_name} AS
                 SELECT row_number() OVER () AS ogc_fid, * EXCLUDE (OGC_FID)
@@ -198,7 +358,7 @@ class DuckDBClient:
                 """
             )
         else:
-            self.conn.execute(
+            self._cursor().execute(
                 f"""
                 CREATE TABLE {full_table_name} AS
                 SELECT * EXCLUDE (OGC_FID) FROM {st_read_call}
@@ -226,7 +386,7 @@ class DuckDBClient:
         """
         select = query or f"SELECT * FROM {self.schema}.{sanitize_name(table_name)}"
         header = "true" if include_header else "false"
-        self.conn.execute(
+        self._cursor().execute(
             f"COPY ({select}) TO '{output_path}' (FORMAT CSV, HEADER {header})"
         )
         logger.info(f"Exported {table_name} to {output_path}")
@@ -246,9 +406,44 @@ class DuckDBClient:
             query: Optional SQL query to export instead of the full table
         """
         select = query or f"SELECT * FROM {self.schema}.{sanitize_name(table_name)}"
-        self.conn.execute(f"COPY ({select}) TO '{output_path}' (FORMAT PARQUET)")
+        self._cursor().execute(f"COPY ({select}) TO '{output_path}' (FORMAT PARQUET)")
         logger.info(f"Exported {table_name} to {output_path}")
 
+    def export_to_gdal(
+        self,
+        table_name: str,
+        output_path: Path,
+        *,
+        driver: str,
+        query: str | None = None,
+        layer_name: str | None = None,
+        geometry_type: str | None = None,
+    ) -> None:
+        """Export a table (or query) with the spatial extension's GDAL writer.
+
+        The CRS of the output is that of the geometry column's type, e.g.
+        GEOMETRY('EPSG:2263').
+
+        Args:
+            table_name: Name of table to export (ignored if `query` is given)
+            output_path: Path to write to, e.g. a .shp or .geojson file
+            driver: GDAL driver to write with, e.g. "ESRI Shapefile" or "GeoJSON"
+            query: Optional SQL query to export instead of the full table
+            layer_name: Name of the layer to write, by default the file name
+            geometry_type: Geometry type of the layer, e.g. "MULTIPOLYGON", which
+                drivers like ESRI Shapefile need to write a single type
+        """
+        select = query or f"SELECT * FROM {self.schema}.{sanitize_name(table_name)}"
+        options = ["FORMAT GDAL", f"DRIVER {_literal(driver)}"]
+        if layer_name:
+            options.append(f"LAYER_NAME {_literal(layer_name)}")
+        if geometry_type:
+            options.append(f"GEOMETRY_TYPE {_literal(geometry_type)}")
+        self._cursor().execute(
+            f"COPY ({select}) TO '{output_path}' ({', '.join(options)})"
+        )
+        logger.info(f"Exported {table_name} to {output_path} with GDAL driver {driver}")
+
     def add_table_column(
         self, table_name: str, col_name: str, col_type: str, default_value: str
     ) -> None:
@@ -263,7 +458,7 @@ class DuckDBClient:
         sanitized_table = sanitize_name(table_name)
         full_table_name = f"{self.schema}.{sanitized_table}"
 
-        self.conn.execute(
+        self._cursor().execute(
             f"""
             ALTER TABLE {full_table_name}
             ADD COLUMN {col_name} {col_type} DEFAULT '{default_value}'
@@ -283,9 +478,34 @@ class DuckDBClient:
         sanitized_table = sanitize_name(table_name)
         full_table_name = f"{self.schema}.{sanitized_table}"
 
-        result = self.conn.execute(f"SELECT COUNT(*) FROM {full_table_name}").fetchone()
+        result = (
+            self._cursor().execute(f"SELECT COUNT(*) FROM {full_table_name}").fetchone()
+        )
         return result[0] if result else 0
 
+    def get_column_types(self, table_name: str) -> dict[str, str]:
+        """Get the type of each column of a table, e.g. GEOMETRY('EPSG:4326').
+
+        Args:
+            table_name: Name of table
+
+        Returns:
+            Column types by column name, in column order
+        """
+        rows = (
+            self._cursor()
+            .execute(
+                """
+                SELECT column_name, data_type FROM information_schema.columns
+                WHERE table_schema = ? AND table_name = ?
+                ORDER BY ordinal_position
+                """,
+                [self.schema, sanitize_name(table_name)],
+            )
+            .fetchall()
+        )
+        return dict(rows)
+
     def query_to_df(self, query: str) -> pd.DataFrame:
         """Execute query and return results as DataFrame.
 
@@ -295,8 +515,28 @@ class DuckDBClient:
         Returns:
             Query results as DataFrame
         """
-        return self.conn.execute(query).df()
+        return self._cursor().execute(query).df()
+
+    def query_to_arrow_reader(
+        self, query: str, batch_size: int = 100_000
+    ) -> pa.RecordBatchReader:
+        """Execute query and stream results as Arrow record batches.
+
+        Geometries are GeoArrow WKB, carrying their column's CRS.
+
+        Args:
+            query: SQL query to execute
+            batch_size: Rows per record batch
+
+        Returns:
+            Reader of the query results, which must be read on the calling thread
+        """
+        return self._cursor().execute(query).to_arrow_reader(batch_size)
 
     def close(self) -> None:
-        """Close the database connection."""
+        """Close the database connection, and the cursors of other threads."""
+        with self._cursors_lock:
+            for cursor in self._cursors:
+                cursor.close()
+            self._cursors.clear()
         self.conn.close()
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import Literal, TypeAlias
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from dcpy.utils.geospatial import geometry
 from dcpy.utils.models import SortedSerializedBase
@@ -29,11 +29,27 @@ class Geometry(SortedSerializedBase, extra="forbid"):
         y: str
 
 
+# csvs are streamed in blocks of this size, which pyarrow holds in an int32
+MAX_CSV_CHUNK_SIZE_MB = 2047
+
+
 class Csv(BaseModel, extra="allow"):
+    """
+    Other (extra) fields are passed to pd.read_csv as options.
+
+    Attributes:
+        chunk_size_mb: If set, large csvs are streamed to parquet this many megabytes at a time,
+            rather than read into memory at once. At most MAX_CSV_CHUNK_SIZE_MB.
+        sample_rows: When streaming, column types are inferred from this many rows at the start
+            of the file (columns given a dtype excepted).
+    """
+
     type: Literal["csv"]
     unzipped_filename: str | None = None
     dtype: str | dict | None = None
     geometry: Geometry | None = None
+    chunk_size_mb: int | None = Field(default=None, gt=0, le=MAX_CSV_CHUNK_SIZE_MB)
+    sample_rows: int | None = None
 
 
 class Excel(SortedSerializedBase, extra="forbid"):
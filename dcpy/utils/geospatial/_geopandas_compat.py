@@ -0,0 +1,36 @@
+"""Private geopandas functions that dcpy relies on, kept in one place.
+
+geopandas has no public equivalents of these:
+  - converting between (Geo)DataFrames and arrow tables carrying GeoParquet metadata,
+    which its public `to_arrow`/`from_arrow` express as GeoArrow extension types instead
+  - the geometry types, SRIDs and LinearRing handling that `GeoDataFrame.to_postgis`
+    derives for its columns, which tables created without it should match
+
+They're tested against the geopandas versions in
+dcpy/test/utils/geospatial/test_geopandas_compat.py. Check them again, and add the
+version there, when upgrading geopandas.
+"""
+
+from geopandas.io.arrow import (
+    _arrow_to_geopandas as arrow_to_geopandas,
+)
+from geopandas.io.arrow import (
+    _geopandas_to_arrow as geopandas_to_arrow,
+)
+from geopandas.io.arrow import (
+    _validate_and_decode_metadata as decode_geo_metadata,
+)
+from geopandas.io.sql import (
+    _convert_linearring_to_linestring as convert_linearring_to_linestring,
+)
+from geopandas.io.sql import _get_geometry_type as get_geometry_type
+from geopandas.io.sql import _get_srid_from_crs as get_srid_from_crs
+
+__all__ = [
+    "arrow_to_geopandas",
+    "convert_linearring_to_linestring",
+    "decode_geo_metadata",
+    "geopandas_to_arrow",
+    "get_geometry_type",
+    "get_srid_from_crs",
+]
@@ -31,7 +31,10 @@ class PointXYStr(BaseModel, extra="forbid"):
 
     point_xy_str: str
 
-    def wkt(self, s: str) -> str:
+    @property
+    def pattern(self) -> str:
+        """Regex matching the full string, with named groups 'x' and 'y'"""
+
         def capture(x: str) -> str:
             return rf"(?P<{x}>-?\d+\.\d+)"
 
@@ -40,7 +43,10 @@ class PointXYStr(BaseModel, extra="forbid"):
             .replace("x", capture("x"))
             .replace("y", capture("y"))
         )
-        re_match = re.match(rf"^{regex_str}$", s)
+        return rf"^{regex_str}$"
+
+    def wkt(self, s: str) -> str:
+        re_match = re.match(self.pattern, s)
         if re_match:
             return f"Point({re_match['x']} {re_match['y']})"
         else:
@@ -4,8 +4,11 @@ from pathlib import Path
 
 import geopandas as gpd
 import pandas as pd
+import pyarrow as pa
+import pyproj
 from pyarrow import parquet
 
+from dcpy.utils.geospatial import _geopandas_compat as gpd_compat
 from dcpy.utils.geospatial import parquet_models as geoparquet
 
 
@@ -48,15 +51,175 @@ def read_df(filepath: Path) -> pd.DataFrame:
 def iter_batches_df(filepath: Path, batch_size: int) -> Iterator[pd.DataFrame]:
     """Yield a parquet file as pd.DataFrames of at most batch_size rows each.
 
-    Lets a caller stream a large file without materializing it all at once.
-    For non-geospatial parquet only: geometry columns are not reconstructed as a
-    GeoDataFrame (use read_df for geoparquet). An empty file still yields one
-    empty frame so a downstream table gets created with the right columns.
+    Lets a caller stream a large file without materializing it all at once. Batches of
+    a geoparquet file are gpd.GeoDataFrames, with geometry rebuilt from the file's
+    GeoParquet metadata (including crs) as `read_df` would. An empty file still yields
+    one empty frame so a downstream table gets created with the right columns.
     """
     pq_file = parquet.ParquetFile(filepath)
+    schema = pq_file.schema_arrow
+    geo_metadata = (
+        gpd_compat.decode_geo_metadata(schema.metadata)
+        if schema.metadata and geoparquet.GEOPARQUET_METADATA_KEY in schema.metadata
+        else None
+    )
+
+    def to_df(table: pa.Table) -> pd.DataFrame:
+        if geo_metadata is None:
+            return table.to_pandas()
+        return gpd_compat.arrow_to_geopandas(table, geo_metadata)
+
     yielded = False
     for batch in pq_file.iter_batches(batch_size=batch_size):
         yielded = True
-        yield batch.to_pandas()
+        yield to_df(pa.Table.from_batches([batch], schema=schema))
     if not yielded:
-        yield pq_file.schema_arrow.empty_table().to_pandas()
+        yield to_df(schema.empty_table())
+
+
+def geometry_types(filepath: Path) -> dict[str, str]:
+    """The PostGIS geometry type of each geometry column of a geoparquet file, from the
+    geometry types listed in its metadata. As with `gpd.GeoDataFrame.to_postgis`, a
+    column with more than one type (or with types unknown) is a generic GEOMETRY.
+    """
+    geo_metadata = gpd_compat.decode_geo_metadata(
+        parquet.read_schema(filepath).metadata
+    )
+    types = {}
+    for name, column in geo_metadata["columns"].items():
+        column_types = {t.removesuffix(" Z") for t in column["geometry_types"]}
+        has_z = any(t.endswith(" Z") for t in column["geometry_types"])
+        if len(column_types) == 1:
+            geometry_type = column_types.pop().upper()
+            if geometry_type == "LINEARRING":
+                geometry_type = "LINESTRING"
+        else:
+            geometry_type = "GEOMETRY"
+        types[name] = geometry_type + ("Z" if has_z else "")
+    return types
+
+
+def geometry_srids(filepath: Path) -> dict[str, int]:
+    """The SRID of each geometry column of a geoparquet file, derived from its crs the
+    way `gpd.GeoDataFrame.to_postgis` does (0 if the crs is unknown). Per the spec, a
+    column without a crs is in OGC:CRS84.
+    """
+    geo_metadata = gpd_compat.decode_geo_metadata(
+        parquet.read_schema(filepath).metadata
+    )
+    return {
+        name: gpd_compat.get_srid_from_crs(
+            gpd.GeoSeries([], crs=column.get("crs", "OGC:CRS84"))
+        )
+        for name, column in geo_metadata["columns"].items()
+    }
+
+
+def append_geometry(table: pa.Table, geometry: gpd.GeoSeries) -> pa.Table:
+    """Append `geometry` to an arrow table as a GeoParquet geometry column, named after
+    the series. The table's other columns are left as they are, so attribute data read
+    as arrow never needs to be converted to pandas."""
+    assert len(geometry) == len(table), "geometry must have one row per table row"
+    geo_table = gpd_compat.geopandas_to_arrow(
+        gpd.GeoDataFrame(
+            {geometry.name: geometry.reset_index(drop=True)}, geometry=geometry.name
+        ),
+        index=False,
+    )
+    table = table.append_column(geo_table.schema.field(0), geo_table.column(0))
+    return table.replace_schema_metadata(
+        {
+            **(table.schema.metadata or {}),
+            geoparquet.GEOPARQUET_METADATA_KEY: geo_table.schema.metadata[
+                geoparquet.GEOPARQUET_METADATA_KEY
+            ],
+        }
+    )
+
+
+def wkb_geo_metadata(
+    geometry_types: dict[str, list[str]], crs: dict[str, str | None]
+) -> bytes:
+    """GeoParquet metadata for WKB geometry columns written without geopandas, e.g.
+    straight from a database. Both arguments are keyed by column name, the first
+    column being the primary one: the geometry types in each column (empty if any
+    type may be present) and its crs (None if unknown)."""
+    return json.dumps(
+        {
+            "version": "1.0.0",
+            "primary_column": next(iter(geometry_types)),
+            "columns": {
+                column: {
+                    "encoding": "WKB",
+                    "geometry_types": types,
+                    "crs": pyproj.CRS.from_user_input(crs[column]).to_json_dict()
+                    if crs[column]
+                    else None,
+                }
+                for column, types in geometry_types.items()
+            },
+        }
+    ).encode()
+
+
+def _to_arrow(df: pd.DataFrame | pa.Table | pa.RecordBatch) -> pa.Table:
+    if isinstance(df, pa.RecordBatch):
+        return pa.Table.from_batches([df])
+    if isinstance(df, pa.Table):
+        return df
+    if not isinstance(df, gpd.GeoDataFrame):
+        return pa.Table.from_pandas(df, preserve_index=False)
+    table = gpd_compat.geopandas_to_arrow(df, index=False)
+    # File-level geo metadata is fixed by the first batch written, so drop the parts
+    # of it that describe only that batch. Per the spec, an empty list of geometry
+    # types means that any type may be present, and bbox is optional.
+    geo = json.loads(table.schema.metadata[geoparquet.GEOPARQUET_METADATA_KEY])
+    for column in geo["columns"].values():
+        column["geometry_types"] = []
+        column.pop("bbox", None)
+    return table.replace_schema_metadata(
+        {
+            **table.schema.metadata,
+            geoparquet.GEOPARQUET_METADATA_KEY: json.dumps(geo).encode(),
+        }
+    )
+
+
+class BatchWriter:
+    """Incrementally write pd.DataFrames or gpd.GeoDataFrames (or arrow tables and record
+    batches, written as they are) to one parquet file.
+
+    The schema (including GeoParquet metadata) is set by the first batch. Later batches
+    are cast to it, and a TypeError is raised if that isn't possible, e.g. if a column
+    is entirely null in the first batch but not in a later one.
+    """
+
+    def __init__(self, filepath: Path):
+        self.filepath = filepath
+        self._writer: parquet.ParquetWriter | None = None
+        self._schema: pa.Schema | None = None
+
+    def write(self, df: pd.DataFrame | pa.Table | pa.RecordBatch) -> None:
+        table = _to_arrow(df)
+        if self._writer is None or self._schema is None:
+            self._schema = table.schema
+            self._writer = parquet.ParquetWriter(self.filepath, self._schema)
+        elif not table.schema.equals(self._schema, check_metadata=False):
+            try:
+                table = table.cast(self._schema)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError, ValueError) as e:
+                raise TypeError(
+                    f"Batch schema is incompatible with the schema of {self.filepath.name}."
+                    f"\nExpected:\n{self._schema}\nGot:\n{table.schema}"
+                ) from e
+        self._writer.write_table(table)
+
+    def close(self) -> None:
+        if self._writer:
+            self._writer.close()
+
+    def __enter__(self) -> "BatchWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -1,5 +1,7 @@
 import geopandas as gpd
+import numpy as np
 import pandas as pd
+import shapely
 from numpy import floor
 from rich.progress import (
     BarColumn,
@@ -35,6 +37,50 @@ def multi(geom: Geometry | None) -> Geometry | None:
             return geom
 
 
+# shapely type ids of single-part geometries, and how to collect each into its multi-part
+# equivalent. A LinearRing is a LineString, so becomes a MultiLineString (as in `multi`)
+_MULTI_CONSTRUCTORS = {
+    shapely.GeometryType.POINT: shapely.multipoints,
+    shapely.GeometryType.LINESTRING: shapely.multilinestrings,
+    shapely.GeometryType.LINEARRING: shapely.multilinestrings,
+    shapely.GeometryType.POLYGON: shapely.multipolygons,
+}
+
+
+def multi_geoseries(geoms: gpd.GeoSeries) -> gpd.GeoSeries:
+    """Vectorized `multi`: converts each single-part geometry to a multi-part one."""
+    result = np.array(geoms.array, dtype=object)
+    type_ids = shapely.get_type_id(result)
+    for type_id, constructor in _MULTI_CONSTRUCTORS.items():
+        mask = type_ids == type_id
+        if mask.any():
+            # one part per multi-part geometry
+            result[mask] = constructor(result[mask], indices=np.arange(mask.sum()))
+    return gpd.GeoSeries(result, index=geoms.index, crs=geoms.crs, name=geoms.name)
+
+
+def _points_from_xy_str(values: pd.Series, format: geom.PointXYStr) -> np.ndarray:
+    """Parses points from strings in the format described by `format`, raising on
+    any (non-null) value that doesn't match it. Null values become null geometries."""
+    coords = values.str.extract(format.pattern)
+    unmatched = values.notna() & coords.isna().any(axis=1)
+    if unmatched.any():
+        # surface the same error as parsing the first bad value individually would
+        format.wkt(values[unmatched].iloc[0])
+    return _null_invalid_points(
+        gpd.points_from_xy(coords["x"].astype(float), coords["y"].astype(float))
+    )
+
+
+def _null_invalid_points(points: np.ndarray) -> np.ndarray:
+    # maybe bug in shapely 2.1 - Point(NaN NaN) no longer returns true with .is_empty
+    # regardless, only way a point can be invalid is if one of coordinates is invalid
+    points = np.array(points, dtype=object)
+    invalid = ~(np.isfinite(shapely.get_x(points)) & np.isfinite(shapely.get_y(points)))
+    points[invalid] = None
+    return points
+
+
 def df_to_gdf(df: pd.DataFrame, geometry: file.Geometry) -> gpd.GeoDataFrame:
     """
     Convert a pandas DataFrame to a GeoDataFrame based on the provided geometry information.
@@ -60,8 +106,10 @@ def df_to_gdf(df: pd.DataFrame, geometry: file.Geometry) -> gpd.GeoDataFrame:
             case geom.StandardGeometryFormat.wkb:
                 df[geom_column] = gpd.GeoSeries.from_wkb(df[geom_column])
             case geom.PointXYStr():
-                df[geom_column] = df[geom_column].apply(geometry.format.wkt)
-                df[geom_column] = gpd.GeoSeries.from_wkt(df[geom_column])
+                df[geom_column] = gpd.GeoSeries(
+                    _points_from_xy_str(df[geom_column], geometry.format),
+                    index=df.index,
+                )
             case _:
                 raise ValueError(
                     f"Unsupported geometry column format {geometry.format}"
@@ -82,12 +130,11 @@ def df_to_gdf(df: pd.DataFrame, geometry: file.Geometry) -> gpd.GeoDataFrame:
 
         gdf = gpd.GeoDataFrame(
             df,
-            geometry=gpd.points_from_xy(df[x_column], df[y_column]),
+            geometry=_null_invalid_points(
+                gpd.points_from_xy(df[x_column], df[y_column])
+            ),
             crs=geometry.crs,
         )
-        # maybe bug in shapely 2.1 - Point(NaN NaN) no longer returns true with .is_empty
-        # regardless, only way a point can be invalid is if one of coordinates is invalid
-        gdf.geometry = gdf.geometry.apply(lambda geom: geom if geom.is_valid else None)
 
     return gdf
 
@@ -1,16 +1,33 @@
 import csv
+import itertools
 import os
+import queue
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from enum import Enum
 from io import StringIO
 from pathlib import Path
 from typing import Literal
 
 import geopandas as gpd
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import shapely
 import typer
+from geoalchemy2 import Geometry
+from psycopg2 import errors as pg_errors
 from psycopg2.extensions import AsIs
 from sqlalchemy import create_engine, dialects, text
+from sqlalchemy.engine import Connection
 
+from dcpy.utils.geospatial import _geopandas_compat as gpd_compat
+from dcpy.utils.geospatial import parquet as geoparquet
+from dcpy.utils.geospatial import parquet_models
 from dcpy.utils.logging import logger
 
 
@@ -20,6 +37,22 @@ class TableType(Enum):
     OTHER = "OTHER"  # Encompasses FOREIGN TABLE, LOCAL TEMPORARY, etc. - we don't expect to encounter these often
 
 
+@dataclass
+class TableCatalog:
+    """A table's entry in the information_schema: its type, and the data type of each
+    column (the udt name, e.g. "geometry", for user-defined types), in column order."""
+
+    table_type: TableType
+    columns: dict[str, str] = field(default_factory=dict)
+
+
+# Connections kept open by a client's pool, and how many more it may open under load
+DEFAULT_POOL_SIZE = 5
+DEFAULT_POOL_MAX_OVERFLOW = 10
+
+# Rows fetched per round trip, and written per parquet row group, by export_to_parquet
+EXPORT_BATCH_ROWS = 100_000
+
 DEFAULT_POSTGRES_SCHEMA = "public"
 PROTECTED_POSTGRES_SCHEMAS = [
     DEFAULT_POSTGRES_SCHEMA,
@@ -62,12 +95,25 @@ def execute_query_via_shell(engine_uri: str, sql_statement) -> None:
 
 
 class PostgresClient:
+    """Runs queries against one schema of a build database.
+
+    Each operation checks a connection out of the client's SQLAlchemy pool, unless a
+    `session` is open on the calling thread, in which case it runs on the session's
+    connection. With `cache_catalog`, table and column lookups are answered from one
+    information_schema query per schema, which is dropped whenever a statement that
+    may be DDL runs through the client. Changes made to the database by anything
+    else (psql, another client) are not seen until then.
+    """
+
     def __init__(
         self,
         *,
         schema: str | None = None,
         database: str | None = None,
         server_url: str | None = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        max_overflow: int = DEFAULT_POOL_MAX_OVERFLOW,
+        cache_catalog: bool = False,
     ):
         self.schema = schema if schema else os.environ["BUILD_ENGINE_SCHEMA"]
         self.schema_tests = generate_schema_tests_name(self.schema)
@@ -80,18 +126,134 @@ class PostgresClient:
         self.engine = create_engine(
             self.engine_uri,
             isolation_level="AUTOCOMMIT",
+            pool_size=pool_size,
+            max_overflow=max_overflow,
         )
+        self.cache_catalog = cache_catalog
+        self._catalogs: dict[str, dict[str, TableCatalog]] = {}
+        # bumped on every invalidation, so that a catalog queried while DDL ran on
+        # another thread isn't cached afterwards
+        self._catalogs_generation = 0
+        self._catalogs_lock = threading.Lock()
+        self._session = threading.local()
         self.create_schema()
 
-    def connect(self):
-        return self.engine.connect()
+    @contextmanager
+    def connect(self) -> Iterator[Connection]:
+        """A connection for one operation: the calling thread's session connection if
+        it has one open, or else one checked out of the pool."""
+        pinned = getattr(self._session, "conn", None)
+        if pinned is None:
+            with self.engine.connect() as conn:
+                yield conn
+            return
+        try:
+            yield pinned
+        except BaseException:
+            if pinned.in_transaction():
+                pinned.rollback()
+            raise
+        # statements autobegin a transaction (a no-op under AUTOCOMMIT); end it so the
+        # session's next operation can begin its own
+        if pinned.in_transaction():
+            pinned.commit()
+
+    @contextmanager
+    def session(self) -> Iterator[Connection]:
+        """Pin one pooled connection to the calling thread, so that every operation
+        in the block runs on it, e.g. to use temporary tables across calls or to
+        avoid a checkout per call. Sessions nest, and don't affect other threads."""
+        pinned = getattr(self._session, "conn", None)
+        if pinned is not None:
+            yield pinned
+            return
+        with self.engine.connect() as conn:
+            self._session.conn = conn
+            try:
+                yield conn
+            finally:
+                self._session.conn = None
+
+    def invalidate_catalog(self) -> None:
+        """Drop cached catalog metadata, after statements that may have changed it."""
+        with self._catalogs_lock:
+            self._catalogs.clear()
+            self._catalogs_generation += 1
+
+    def get_catalog(
+        self, schema: str | None = None, *, table_name: str | None = None
+    ) -> dict[str, TableCatalog]:
+        """Tables (and views) of a schema, with their columns, from one
+        information_schema query. Cached per schema if the client caches its
+        catalog; otherwise only `table_name` is looked up when given."""
+        schema = schema or self.schema
+        if not self.cache_catalog:
+            return self._query_catalog(schema, table_name)
+
+        with self._catalogs_lock:
+            if schema in self._catalogs:
+                return self._catalogs[schema]
+            generation = self._catalogs_generation
+        catalog = self._query_catalog(schema)
+        with self._catalogs_lock:
+            if generation == self._catalogs_generation:
+                self._catalogs[schema] = catalog
+        return catalog
+
+    def _query_catalog(
+        self, schema: str, table_name: str | None = None
+    ) -> dict[str, TableCatalog]:
+        rows = self.execute_select_query(
+            """
+            SELECT
+                t.table_name,
+                t.table_type,
+                c.column_name,
+                CASE
+                    WHEN c.data_type = 'USER-DEFINED' THEN c.udt_name
+                    ELSE c.data_type
+                END AS data_type
+            FROM information_schema.tables t
+            LEFT JOIN information_schema.columns c
+                ON c.table_schema = t.table_schema AND c.table_name = t.table_name
+            WHERE t.table_schema = :table_schema
+            """
+            + ("AND t.table_name = :table_name" if table_name is not None else "")
+            + """
+            ORDER BY t.table_name, c.ordinal_position
+            """,
+            table_schema=schema,
+            table_name=table_name,
+        )
+        catalog: dict[str, TableCatalog] = {}
+        for table, table_type, column, data_type in rows.itertuples(
+            index=False, name=None
+        ):
+            if table not in catalog:
+                catalog[table] = TableCatalog(
+                    table_type=TableType(table_type)
+                    if table_type in TableType._value2member_map_
+                    else TableType.OTHER
+                )
+            if pd.notna(column):
+                catalog[table].columns[column] = data_type
+        return catalog
+
+    def _get_table_catalog(
+        self, table_name: str, schema: str | None = None
+    ) -> TableCatalog | None:
+        return self.get_catalog(schema, table_name=table_name).get(table_name)
 
     def execute_query(self, query: str, *, conn=None, **kwargs) -> None:
-        if conn is None:
-            with self.connect() as conn:
+        try:
+            if conn is None:
+                with self.connect() as conn:
+                    conn.execute(statement=text(query), parameters=kwargs)
+            else:
                 conn.execute(statement=text(query), parameters=kwargs)
-        else:
-            conn.execute(statement=text(query), parameters=kwargs)
+        finally:
+            # any statement may be DDL
+            self.invalidate_catalog()
 
     def execute_file(self, path: Path, *, conn=None, **kwargs) -> None:
         """Execute a .sql script at given path using sqlalchemy and kwargs to set variables."""
@@ -101,7 +263,10 @@ class PostgresClient:
 
     def execute_file_via_shell(self, path: Path, **kwargs) -> None:
         """Execute a .sql script at given path using psql CLI and kwargs to set variables."""
-        execute_file_via_shell(self.engine_uri, path, **kwargs)
+        try:
+            execute_file_via_shell(self.engine_uri, path, **kwargs)
+        finally:
+            self.invalidate_catalog()
 
     def execute_select_query(
         self,
@@ -111,7 +276,7 @@ class PostgresClient:
         **kwargs,
     ) -> pd.DataFrame:
         if conn is None:
-            with self.engine.connect() as conn:
+            with self.connect() as conn:
                 select_records = pd.read_sql(sql=text(query), con=conn, params=kwargs)
         else:
             select_records = pd.read_sql(sql=text(query), con=conn, params=kwargs)
@@ -125,7 +290,7 @@ class PostgresClient:
         **kwargs,
     ) -> pd.DataFrame:
         if conn is None:
-            with self.engine.connect() as conn:
+            with self.connect() as conn:
                 return pd.read_sql_table(table_name=table_name, con=conn, **kwargs)
         else:
             return pd.read_sql_table(table_name=table_name, con=conn, **kwargs)
@@ -139,7 +304,7 @@ class PostgresClient:
         **kwargs,
     ) -> gpd.GeoDataFrame:
         if conn is None:
-            with self.engine.connect() as conn:
+            with self.connect() as conn:
                 return gpd.read_postgis(
                     table_name, conn, geom_col=geom_column, **kwargs
                 )
@@ -183,46 +348,25 @@ class PostgresClient:
         )
 
     def get_schema_tables(self) -> list[str]:
-        select_table_names = self.execute_select_query(
-            """
-            SELECT table_name FROM information_schema.tables WHERE table_schema = :table_schema
-            """,
-            table_schema=self.schema,
-        )
-        all_table_names = sorted(select_table_names["table_name"].to_list())
         postgis_tables = [
             "spatial_ref_sys",
             "geography_columns",
             "geometry_columns",
         ]
-        table_names = [
+        return sorted(
             table_name
-            for table_name in all_table_names
+            for table_name in self.get_catalog()
             if table_name not in postgis_tables
-        ]
-        return table_names
+        )
 
     def get_table_type(self, table_name: str, schema: str | None = None) -> TableType:
         """Get the type of a table (VIEW, BASE TABLE, etc.)"""
-        schema_to_check = schema or self.schema
-        result = self.execute_select_query(
-            "SELECT table_type FROM information_schema.tables WHERE table_schema = :schema AND table_name = :table_name",
-            schema=schema_to_check,
-            table_name=table_name,
-        )
-        if result.empty:
+        table = self._get_table_catalog(table_name, schema)
+        if table is None:
             raise ValueError(
-                f"Table '{table_name}' not found in schema '{schema_to_check}'"
+                f"Table '{table_name}' not found in schema '{schema or self.schema}'"
             )
-        raw_type = result.iloc[0]["table_type"]
-
-        # Map raw PostgreSQL table types to our enum
-        if raw_type == "VIEW":
-            return TableType.VIEW
-        elif raw_type == "BASE TABLE":
-            return TableType.BASE_TABLE
-        else:
-            return TableType.OTHER
+        return table.table_type
 
     def is_view(self, table_name: str, schema: str | None = None) -> bool:
         """Check if a table is a view"""
@@ -230,15 +374,7 @@ class PostgresClient:
 
     def table_or_view_exists(self, table_name: str, schema: str | None = None) -> bool:
         """Check if a table or view exists in the schema"""
-        result = self.execute_select_query(
-            """
-            SELECT COUNT(*) AS count FROM information_schema.tables
-            WHERE table_schema = :schema AND table_name = :table_name
-            """,
-            schema=schema or self.schema,
-            table_name=table_name,
-        )
-        return result.iloc[0]["count"] > 0
+        return self._get_table_catalog(table_name, schema) is not None
 
     def set_table_schema(self, table, *, old_schema, new_schema):
         """Set the schema for a table."""
@@ -260,53 +396,21 @@ class PostgresClient:
     def get_table_columns(
         self, table_name: str, schema: str | None = None
     ) -> list[str]:
-        column_names = self.execute_select_query(
-            """
-            SELECT column_name FROM information_schema.columns
-            WHERE table_schema = ':table_schema'
-            AND table_name   = ':table_name';
-            """,
-            table_schema=AsIs(schema or self.schema),
-            table_name=AsIs(table_name),
-        )
-        return sorted(column_names["column_name"])
+        table = self._get_table_catalog(table_name, schema)
+        return sorted(table.columns) if table else []
 
     def get_column_types(
         self, table_name: str, schema: str | None = None
     ) -> dict[str, str]:
-        columns = self.execute_select_query(
-            """
-            SELECT
-                column_name,
-                CASE
-                    WHEN data_type = 'USER-DEFINED' THEN udt_name
-                    ELSE data_type
-                END AS data_type
-            FROM information_schema.columns
-            WHERE table_schema = ':table_schema'
-            AND table_name = ':table_name';
-            """,
-            table_schema=AsIs(schema or self.schema),
-            table_name=AsIs(table_name),
-        )
-        return {r["column_name"]: r["data_type"] for _, r in columns.iterrows()}
+        table = self._get_table_catalog(table_name, schema)
+        return dict(table.columns) if table else {}
 
     def get_geometry_columns(self, table_name: str) -> set[str]:
-        columns = self.execute_select_query(
-            """
-            SELECT
-                column_name
-            FROM information_schema.columns
-            WHERE
-                table_schema = ':table_schema'
-                AND table_name = ':table_name'
-                AND data_type = 'USER-DEFINED'
-                AND udt_name = 'geometry';
-            """,
-            table_schema=AsIs(self.schema),
-            table_name=AsIs(table_name),
-        )
-        return set(columns["column_name"])
+        return {
+            column
+            for column, data_type in self.get_column_types(table_name).items()
+            if data_type == "geometry"
+        }
 
     def add_pk(self, table: str, id_column: str = "id"):
         self.execute_query(
@@ -317,6 +421,20 @@ class PostgresClient:
             constraint=AsIs(f"{table}_pk"),
         )
 
+    def wkb_to_geometry(
+        self, table: str, column: str, geometry_type: str, srid: int = 0
+    ) -> None:
+        """Convert a bytea column of WKB into a PostGIS geometry column."""
+        self.execute_query(
+            'ALTER TABLE ":schema".":table" ALTER COLUMN ":column" '
+            'TYPE geometry(:geometry_type, :srid) USING ST_SetSRID(ST_GeomFromWKB(":column"), :srid);',
+            schema=AsIs(self.schema),
+            table=AsIs(table),
+            column=AsIs(column),
+            geometry_type=AsIs(geometry_type),
+            srid=srid,
+        )
+
     def drop_table(self, table):
         self.execute_query(
             'DROP TABLE IF EXISTS ":schema".":table" CASCADE;',
@@ -355,13 +473,15 @@ class PostgresClient:
         self, file_path: Path, table_name: str | None = None
     ) -> None:
         table_name = table_name or file_path.stem
-        pd.read_csv(file_path).to_sql(
-            name=table_name,
-            con=self.engine,
-            index=False,
-            if_exists="replace",
-            method=insert_copy,
-        )
+        with self.connect() as conn:
+            pd.read_csv(file_path).to_sql(
+                name=table_name,
+                con=conn,
+                index=False,
+                if_exists="replace",
+                method=insert_copy,
+            )
+        self.invalidate_catalog()
 
     def import_pg_dump(
         self,
@@ -403,38 +523,86 @@ class PostgresClient:
         table_name: str,
         schema: str | None = None,
         if_exists: Literal["fail", "replace", "append"] = "replace",
+        geometry_types: dict[str, str] | None = None,
     ):
-        # our custom insert method seems to make this not work properly, so need to manually drop first
-        with self.connect() as conn:
-            with conn.begin():
-                if if_exists == "replace":
-                    self.execute_query(
-                        'DROP TABLE IF EXISTS ":table_name" CASCADE;',
-                        table_name=AsIs(table_name),
-                        conn=conn,
-                    )
-                if isinstance(df, gpd.GeoDataFrame):
-                    df.to_postgis(
-                        name=table_name,
-                        schema=schema or self.schema,
+        """Insert a DataFrame or GeoDataFrame into a table, creating it if needed.
+
+        Rows are streamed to a `COPY ... FROM STDIN`, encoded on a background thread
+        while earlier rows are sent (see `copy_dataframe`). The table is created with
+        the same column types `df.to_sql` / `df.to_postgis` would have used. When df is
+        one batch of a larger dataset, `geometry_types` gives the PostGIS type of
+        geometry columns across the whole dataset, rather than inferring it from df.
+        """
+        geometry_types = geometry_types or {}
+        schema = schema or self.schema
+        # geometry columns are created like geopandas would, and written as EWKB
+        dtype: dict = {
+            "geo_1b": dialects.postgresql.JSON,
+            "geo_bl": dialects.postgresql.JSON,
+            "geo_bn": dialects.postgresql.JSON,
+        }
+        geometry_srids = {}
+        for column in df.columns[df.dtypes == "geometry"]:
+            column_gdf = gpd.GeoDataFrame(geometry=df[column])
+            srid = gpd_compat.get_srid_from_crs(column_gdf)
+            if column in geometry_types:
+                geometry_type = geometry_types[column]
+                has_curve = bool((column_gdf.geom_type == "LinearRing").any())
+            else:
+                geometry_type, has_curve = gpd_compat.get_geometry_type(column_gdf)
+            if has_curve:
+                df = df.assign(
+                    **{
+                        column: gpd_compat.convert_linearring_to_linestring(
+                            column_gdf, "geometry"
+                        ).geometry
+                    }
+                )
+            dtype[column] = Geometry(geometry_type=geometry_type, srid=srid)
+            geometry_srids[column] = srid
+
+        try:
+            with self.connect() as conn:
+                with conn.begin():
+                    # our custom insert method seems to make this not work properly, so need to manually drop first
+                    if if_exists == "replace":
+                        self.execute_query(
+                            'DROP TABLE IF EXISTS ":table_name" CASCADE;',
+                            table_name=AsIs(table_name),
+                            conn=conn,
+                        )
+                    elif if_exists == "append" and geometry_srids:
+                        _check_append_srids(conn, schema, table_name, geometry_srids)
+                    frame = pd.DataFrame(df, copy=False)
+                    # creates the table (if needed), without inserting anything
+                    frame.head(0).to_sql(
+                        table_name,
                         con=conn,
+                        schema=schema,
                         if_exists=if_exists,
                         index=False,
+                        dtype=dtype,
                     )
-                else:
-                    df.to_sql(
+                    copied = copy_dataframe(
+                        conn.connection,
+                        frame,
                         table_name,
-                        schema=schema or self.schema,
-                        con=conn,
-                        if_exists=if_exists,
-                        index=False,
-                        dtype={
-                            "geo_1b": dialects.postgresql.JSON,
-                            "geo_bl": dialects.postgresql.JSON,
-                            "geo_bn": dialects.postgresql.JSON,
-                        },
-                        method=insert_copy,
+                        schema=schema,
+                        geometry_srids=geometry_srids,
                     )
+                    if not copied:
+                        _with_hex_ewkb(frame, geometry_srids).to_sql(
+                            table_name,
+                            schema=schema,
+                            con=conn,
+                            if_exists="append",
+                            index=False,
+                            dtype=dtype,
+                            method=insert_copy,
+                        )
+        finally:
+            # the table is (re)created
+            self.invalidate_catalog()
 
     def export_to_csv(
         self,
@@ -445,54 +613,543 @@ class PostgresClient:
         columns: list[str] | None = None,
         include_header: bool = True,
     ) -> None:
-        dbapi_conn = self.engine.raw_connection()
-        try:
-            with dbapi_conn.cursor() as cur:
-                header_clause = "WITH CSV HEADER" if include_header else "WITH CSV"
+        header_clause = "WITH CSV HEADER" if include_header else "WITH CSV"
+        if query:
+            copy_sql = f"COPY ({query}) TO STDOUT {header_clause}"
+        else:
+            full_table_name = f'"{self.schema}"."{table_name}"'
+            if columns:
+                columns_str = ", ".join(f'"{col}"' for col in columns)
+                copy_sql = (
+                    f"COPY {full_table_name} ({columns_str}) TO STDOUT {header_clause}"
+                )
+            else:
+                copy_sql = f"COPY {full_table_name} TO STDOUT {header_clause}"
 
-                if query:
-                    copy_sql = f"COPY ({query}) TO STDOUT {header_clause}"
-                else:
-                    full_table_name = f'"{self.schema}"."{table_name}"'
-                    if columns:
-                        columns_str = ", ".join(f'"{col}"' for col in columns)
-                        copy_sql = f"COPY {full_table_name} ({columns_str}) TO STDOUT {header_clause}"
-                    else:
-                        copy_sql = f"COPY {full_table_name} TO STDOUT {header_clause}"
-
-                with open(output_path, "w") as f:
-                    cur.copy_expert(copy_sql, f)
-        finally:
-            dbapi_conn.close()
+        with self.connect() as conn, conn.connection.cursor() as cur:
+            with open(output_path, "w") as f:
+                cur.copy_expert(copy_sql, f)
 
-    def create_view(self, table_name: str, from_schema: str) -> str:
-        """Create a view in the current schema."""
+    def export_to_parquet(
+        self,
+        table_name: str,
+        output_path: Path,
+        *,
+        batch_size: int = EXPORT_BATCH_ROWS,
+    ) -> None:
+        """Stream a table to a parquet file, batch_size rows at a time.
+
+        Rows are read over a server-side cursor and written as they arrive, so memory
+        use doesn't grow with the table. Geometry columns are written as GeoParquet,
+        i.e. WKB with their geometry types and crs in the file's metadata. Other
+        columns get the arrow type of their postgres type, see `_export_column`.
+        """
+        # one snapshot for the table's metadata and its rows. A fresh connection, as a
+        # server-side cursor needs a transaction, and a session's connection autocommits
+        with self.engine.connect().execution_options(
+            isolation_level="REPEATABLE READ"
+        ) as conn:
+            columns = conn.execute(
+                text(
+                    """
+                    SELECT column_name, udt_name, numeric_precision, numeric_scale
+                    FROM information_schema.columns
+                    WHERE table_schema = :schema AND table_name = :table_name
+                    ORDER BY ordinal_position
+                    """
+                ),
+                {"schema": self.schema, "table_name": table_name},
+            ).fetchall()
+            if not columns:
+                raise ValueError(f"Table {self.schema}.{table_name} does not exist")
+
+            selects = []
+            fields = []
+            for column, udt_name, precision, scale in columns:
+                select, arrow_type = _export_column(column, udt_name, precision, scale)
+                selects.append(select)
+                fields.append(pa.field(column, arrow_type))
+            schema = pa.schema(fields)
+
+            geometry_columns = [c[0] for c in columns if c[1] == "geometry"]
+            if geometry_columns:
+                geometry_types, crs = self._export_geometry_metadata(
+                    conn, table_name, geometry_columns
+                )
+                schema = schema.with_metadata(
+                    {
+                        parquet_models.GEOPARQUET_METADATA_KEY: geoparquet.wkb_geo_metadata(
+                            geometry_types, crs
+                        )
+                    }
+                )
+
+            with (
+                conn.connection.cursor(name="export_to_parquet") as cur,
+                pq.ParquetWriter(output_path, schema) as writer,
+            ):
+                cur.itersize = batch_size
+                cur.execute(
+                    f'SELECT {", ".join(selects)} FROM "{self.schema}"."{table_name}"'
+                )
+                while rows := cur.fetchmany(batch_size):
+                    writer.write_table(
+                        pa.Table.from_arrays(
+                            [
+                                pa.array(values, type=field.type)
+                                for values, field in zip(zip(*rows), schema)
+                            ],
+                            schema=schema,
+                        )
+                    )
+        logger.info(f"Exported {table_name} to {output_path}")
+
+    def _export_geometry_metadata(
+        self, conn, table_name: str, geometry_columns: list[str]
+    ) -> tuple[dict[str, list[str]], dict[str, str | None]]:
+        """The GeoParquet geometry types and crs of a table's geometry columns, from
+        their type modifiers, e.g. geometry(MultiPolygon,2263). A column without an
+        srid modifier takes the srid of its first geometry."""
+        constraints = {
+            column: (geometry_type, dimensions, srid)
+            for column, geometry_type, dimensions, srid in conn.execute(
+                text(
+                    """
+                    SELECT f_geometry_column, type, coord_dimension, srid
+                    FROM geometry_columns
+                    WHERE f_table_schema = :schema AND f_table_name = :table_name
+                    """
+                ),
+                {"schema": self.schema, "table_name": table_name},
+            ).fetchall()
+        }
+        geometry_types: dict[str, list[str]] = {}
+        crs: dict[str, str | None] = {}
+        for column in geometry_columns:
+            geometry_type, dimensions, srid = constraints.get(
+                column, ("GEOMETRY", 2, 0)
+            )
+            geometry_types[column] = (
+                [
+                    _GEOPARQUET_GEOMETRY_TYPES[geometry_type]
+                    + (" Z" if dimensions == 3 else "")
+                ]
+                if geometry_type in _GEOPARQUET_GEOMETRY_TYPES
+                else []
+            )
+            if not srid:
+                srid = conn.execute(
+                    text(
+                        f'SELECT ST_SRID("{column}") FROM "{self.schema}"."{table_name}" '
+                        f'WHERE "{column}" IS NOT NULL LIMIT 1'
+                    )
+                ).scalar()
+            crs[column] = f"EPSG:{srid}" if srid else None
+        return geometry_types, crs
+
+    def create_view(
+        self, table_name: str, from_schema: str, *, from_table_name: str | None = None
+    ) -> str:
+        """Create a view in the current schema, of a table of the same name unless
+        from_table_name is given."""
+        from_table_name = from_table_name or table_name
         self.execute_query(f'''
             CREATE VIEW "{self.schema}"."{table_name}" AS
-            SELECT * FROM "{from_schema}"."{table_name}"
+            SELECT * FROM "{from_schema}"."{from_table_name}"
             ''')
         logger.info(
-            f"Created view {table_name} in schema {self.schema} referencing {from_schema}.{table_name}"
+            f"Created view {table_name} in schema {self.schema} referencing {from_schema}.{from_table_name}"
         )
 
         return table_name
 
-    def copy_table(self, from_table_name: str, from_schema: str) -> str:
-        """Copy a table."""
+    def copy_table(
+        self, from_table_name: str, from_schema: str, *, table_name: str | None = None
+    ) -> str:
+        """Copy a table, to one of the same name unless table_name is given."""
+        table_name = table_name or from_table_name
         self.execute_query(f'''
-        CREATE TABLE "{self.schema}"."{from_table_name}" AS
+        CREATE TABLE "{self.schema}"."{table_name}" AS
         SELECT * FROM "{from_schema}"."{from_table_name}"
         ''')
         logger.info(
-            f"Copied table {from_table_name} from schema {from_schema} to schema {self.schema}"
+            f"Copied table {from_table_name} from schema {from_schema} to {table_name} in schema {self.schema}"
+        )
+
+        return table_name
+
+
+# Rows encoded per chunk of a streamed COPY, and chunks encoded ahead of the one being
+# sent. Chunks are small enough that holding a few costs little memory.
+COPY_CHUNK_ROWS = 20_000
+COPY_PREFETCH_CHUNKS = 2
+COPY_READ_BYTES = 2**20
+
+# Postgres binary timestamps and dates count from 2000-01-01
+_PG_EPOCH = np.datetime64("2000-01-01T00:00:00", "us")
+_PG_BINARY_HEADER = b"PGCOPY\n\xff\r\n\x00" + (0).to_bytes(4, "big") * 2
+_PG_BINARY_TRAILER = (-1).to_bytes(2, "big", signed=True)
+_PG_INTEGER_TYPES = {"int2": ">i2", "int4": ">i4", "int8": ">i8"}
+_PG_FLOAT_TYPES = {"float4": ">f4", "float8": ">f8"}
+_PG_TEXT_TYPES = {"text", "varchar", "bpchar"}
+
+# Arrow types of postgres types (by udt name) that export_to_parquet writes as they are
+_PG_ARROW_TYPES: dict[str, pa.DataType] = {
+    "int2": pa.int16(),
+    "int4": pa.int32(),
+    "int8": pa.int64(),
+    "float4": pa.float32(),
+    "float8": pa.float64(),
+    "bool": pa.bool_(),
+    **{pg_type: pa.string() for pg_type in _PG_TEXT_TYPES},
+    "date": pa.date32(),
+    "timestamp": pa.timestamp("us"),
+    "timestamptz": pa.timestamp("us", tz="UTC"),
+    "bytea": pa.binary(),
+}
+# GeoParquet names of PostGIS geometry types, as geometry_columns lists them
+_GEOPARQUET_GEOMETRY_TYPES = {
+    geometry_type.upper(): geometry_type
+    for geometry_type in [
+        "Point",
+        "LineString",
+        "Polygon",
+        "MultiPoint",
+        "MultiLineString",
+        "MultiPolygon",
+        "GeometryCollection",
+    ]
+}
+
+
+def _export_column(
+    column: str, udt_name: str, precision: int | None, scale: int | None
+) -> tuple[str, pa.DataType]:
+    """How export_to_parquet selects a column, and the arrow type it's written as.
+
+    Geometries are selected as WKB. Numerics with a precision of at most 38 are
+    decimals, other numerics doubles. Types without an arrow equivalent (e.g. json,
+    arrays, enums) are written as their text representation.
+    """
+    quoted = f'"{column}"'
+    if udt_name == "geometry":
+        return f"ST_AsBinary({quoted})", pa.binary()
+    if udt_name == "numeric":
+        if precision is not None and precision <= 38:
+            return quoted, pa.decimal128(precision, scale or 0)
+        return f"{quoted}::float8", pa.float64()
+    if udt_name in _PG_ARROW_TYPES:
+        return quoted, _PG_ARROW_TYPES[udt_name]
+    return f"{quoted}::text", pa.string()
+
+
+class _CopyStream:
+    """File-like object over chunks of bytes produced on a background thread, so that
+    encoding later chunks overlaps with psycopg2 sending earlier ones to the server.
+    """
+
+    _END = object()
+
+    def __init__(self, chunks: Iterator[bytes], prefetch: int = COPY_PREFETCH_CHUNKS):
+        self._queue: queue.Queue = queue.Queue(maxsize=prefetch)
+        self._stopped = threading.Event()
+        self._chunk = b""
+        self._position = 0
+        self._done = False
+        self._thread = threading.Thread(
+            target=self._produce, args=(chunks,), daemon=True
         )
+        self._thread.start()
 
-        return from_table_name
+    def _put(self, item) -> None:
+        while not self._stopped.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _produce(self, chunks: Iterator[bytes]) -> None:
+        try:
+            for chunk in chunks:
+                if self._stopped.is_set():
+                    return
+                self._put(chunk)
+        except BaseException as e:
+            self._put(e)
+        else:
+            self._put(self._END)
+
+    def read(self, size: int = -1) -> bytes:
+        parts = []
+        while size != 0 and not self._done:
+            if self._position == len(self._chunk):
+                item = self._queue.get()
+                if item is self._END:
+                    self._done = True
+                elif isinstance(item, BaseException):
+                    self._done = True
+                    raise item
+                else:
+                    self._chunk, self._position = item, 0
+                continue
+            end = (
+                len(self._chunk)
+                if size < 0
+                else min(len(self._chunk), self._position + size)
+            )
+            parts.append(self._chunk[self._position : end])
+            if size > 0:
+                size -= end - self._position
+            self._position = end
+        return b"".join(parts)
+
+    def close(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+    def __enter__(self) -> "_CopyStream":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+
+def _fixed_width_values(values: np.ndarray, valid: np.ndarray, dtype: str) -> pa.Array:
+    """Big-endian binary values of a numeric array, null where not valid."""
+    data = np.ascontiguousarray(values.astype(dtype, copy=False))
+    validity = np.packbits(valid, bitorder="little")
+    return pa.FixedSizeBinaryArray.from_buffers(
+        pa.binary(data.dtype.itemsize),
+        len(data),
+        [pa.py_buffer(validity), pa.py_buffer(data)],  # type: ignore[arg-type]
+    ).cast(pa.binary())
+
+
+def _binary_values(
+    series: pd.Series, pg_type: str, srid: int | None
+) -> pa.Array | None:
+    """Encodes a column to Postgres' binary COPY format for a column of type pg_type,
+    i.e. each value's bytes without its length. Returns None if the column's values
+    can't be encoded for that type."""
+    valid = series.notna().to_numpy()
+    dtype = series.dtype
+    if pg_type == "geometry":
+        if srid is None or dtype != "geometry":
+            return None
+        geoms = shapely.set_srid(series.to_numpy(), srid)
+        return pa.array(
+            shapely.to_wkb(geoms, include_srid=True), type=pa.binary(), from_pandas=True
+        )
+    elif pg_type in _PG_INTEGER_TYPES:
+        if not (
+            pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_float_dtype(dtype)
+        ):
+            return None
+        target = np.dtype(_PG_INTEGER_TYPES[pg_type])
+        values = series.to_numpy(
+            dtype="float64" if dtype.kind == "f" else "int64", na_value=0
+        )
+        info = np.iinfo(target)
+        if values.size and (
+            values.min() < info.min
+            or values.max() > info.max
+            or (values.dtype.kind == "f" and not np.all(np.trunc(values) == values))
+        ):
+            return None
+        return _fixed_width_values(values, valid, _PG_INTEGER_TYPES[pg_type])
+    elif pg_type in _PG_FLOAT_TYPES:
+        if not (
+            pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_float_dtype(dtype)
+        ):
+            return None
+        values = series.to_numpy(dtype="float64", na_value=0)
+        return _fixed_width_values(values, valid, _PG_FLOAT_TYPES[pg_type])
+    elif pg_type == "bool":
+        if not pd.api.types.is_bool_dtype(dtype):
+            return None
+        return _fixed_width_values(
+            series.to_numpy(dtype="bool", na_value=False), valid, "u1"
+        )
+    elif pg_type in ("timestamp", "timestamptz", "date"):
+        if not pd.api.types.is_datetime64_any_dtype(dtype):
+            return None
+        is_tz_aware = isinstance(dtype, pd.DatetimeTZDtype)
+        if (pg_type == "timestamptz") != is_tz_aware:
+            return None
+        if is_tz_aware:
+            series = series.dt.tz_convert("UTC").dt.tz_localize(None)
+        microseconds = (
+            series.to_numpy(dtype="datetime64[us]", na_value=_PG_EPOCH) - _PG_EPOCH
+        ).astype("int64")
+        if pg_type == "date":
+            days = microseconds // (86_400 * 10**6)
+            if np.any(days * 86_400 * 10**6 != microseconds):
+                return None
+            return _fixed_width_values(days, valid, ">i4")
+        return _fixed_width_values(microseconds, valid, ">i8")
+    elif pg_type in _PG_TEXT_TYPES:
+        if not pd.api.types.is_string_dtype(dtype):
+            return None
+        try:
+            text = pa.array(series, type=pa.string(), from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            return None
+        # the csv COPY this replaced wrote empty strings as NULL
+        return pc.if_else(pc.equal(text, pa.scalar("")), None, text).cast(pa.binary())
+    return None
+
+
+def _encode_binary_chunk(fields: list[pa.Array]) -> bytes:
+    """Encodes rows of binary values (one array per column) as binary COPY tuples:
+    a field count, then each field's length (-1 for NULL) and bytes."""
+    n_rows = len(fields[0])
+    field_count = np.full(n_rows, len(fields), dtype=">i2")
+    parts = [_fixed_width_values(field_count, np.ones(n_rows, dtype=bool), ">i2")]
+    for values in fields:
+        lengths = pc.fill_null(pc.binary_length(values), -1).to_numpy()  # type: ignore[call-overload]
+        parts.append(_fixed_width_values(lengths, np.ones(n_rows, dtype=bool), ">i4"))
+        parts.append(values)
+    rows = pc.binary_join_element_wise(  # type: ignore[call-overload]
+        *parts, b"", null_handling="replace", null_replacement=""
+    )
+    # the rows' values are contiguous, so the chunk is just their data buffer
+    _, offsets_buffer, data_buffer = rows.buffers()
+    offsets = np.frombuffer(offsets_buffer, dtype=np.int32)
+    return data_buffer[
+        offsets[rows.offset] : offsets[rows.offset + n_rows]
+    ].to_pybytes()
+
+
+def copy_dataframe(
+    dbapi_conn,
+    df: pd.DataFrame,
+    table_name: str,
+    *,
+    schema: str,
+    geometry_srids: dict | None = None,
+) -> bool:
+    """Streams df into an existing table with `COPY ... WITH (FORMAT binary)`.
+
+    Every column must be encodable for its column type in the table: numbers, booleans,
+    timestamps and dates, strings, and geometries (as EWKB with the srids given).
+    Returns False, without writing anything, if any column isn't: rows already sent
+    are rolled back if a later chunk of rows turns out not to be encodable.
+    """
+    geometry_srids = geometry_srids or {}
+    with dbapi_conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT column_name, udt_name FROM information_schema.columns
+            WHERE table_schema = %s AND table_name = %s
+            """,
+            (schema, table_name),
+        )
+        column_types = dict(cur.fetchall())
+
+    def encode(chunk: pd.DataFrame) -> list[pa.Array] | None:
+        fields = []
+        for column in chunk.columns:
+            if column not in column_types:
+                return None
+            values = _binary_values(
+                chunk[column], column_types[column], geometry_srids.get(column)
+            )
+            if values is None:
+                return None
+            fields.append(values)
+        return fields
+
+    if len(df.columns) == 0:
+        return False
+    # check the first chunk up front, so that nothing is sent if it falls back
+    chunks = (
+        df.iloc[start : start + COPY_CHUNK_ROWS]
+        for start in range(0, len(df), COPY_CHUNK_ROWS)
+    )
+    first = encode(next(chunks, df))
+    if first is None:
+        return False
+
+    later_chunk_not_encodable = threading.Event()
+
+    def stream() -> Iterator[bytes]:
+        yield _PG_BINARY_HEADER
+        if len(df):
+            yield _encode_binary_chunk(first)
+        for chunk in chunks:
+            fields = encode(chunk)
+            if fields is None:
+                later_chunk_not_encodable.set()
+                raise ValueError(f"Rows of {table_name} can't be binary encoded")
+            yield _encode_binary_chunk(fields)
+        yield _PG_BINARY_TRAILER
+
+    columns = ", ".join(f'"{c}"' for c in df.columns)
+    # a failed COPY aborts the transaction it's in, so within one, COPY in a savepoint.
+    # Otherwise the COPY is its own transaction
+    in_transaction = not dbapi_conn.autocommit
+    with dbapi_conn.cursor() as cur:
+        if in_transaction:
+            cur.execute("SAVEPOINT copy_dataframe")
+        try:
+            with _CopyStream(stream()) as data:
+                cur.copy_expert(
+                    f'COPY "{schema}"."{table_name}" ({columns}) FROM STDIN WITH (FORMAT binary)',
+                    data,
+                    size=COPY_READ_BYTES,
+                )
+        except pg_errors.QueryCanceled:
+            # psycopg2 cancels the COPY when reading from the stream fails
+            if not later_chunk_not_encodable.is_set():
+                raise
+            if in_transaction:
+                cur.execute("ROLLBACK TO SAVEPOINT copy_dataframe")
+            return False
+        if in_transaction:
+            cur.execute("RELEASE SAVEPOINT copy_dataframe")
+    return True
+
+
+def _with_hex_ewkb(df: pd.DataFrame, geometry_srids: dict) -> pd.DataFrame:
+    """Geometries as hex EWKB text, as geopandas inserts them."""
+    return df.assign(
+        **{
+            column: shapely.to_wkb(
+                shapely.set_srid(df[column].to_numpy(), srid),
+                hex=True,
+                include_srid=True,
+            )
+            for column, srid in geometry_srids.items()
+        }
+    )
+
+
+def _check_append_srids(conn, schema: str, table_name: str, srids: dict) -> None:
+    if not conn.dialect.has_table(conn, table_name, schema):
+        return
+    for column, srid in srids.items():
+        target_srid = conn.execute(
+            text("SELECT Find_SRID(:schema, :table_name, :column)"),
+            {"schema": schema, "table_name": table_name, "column": column},
+        ).scalar()
+        if target_srid != srid:
+            raise ValueError(
+                f"The CRS of the target table (EPSG:{target_srid}) differs "
+                f"from the CRS of current GeoDataFrame (EPSG:{srid})."
+            )
+
+
+def _csv_chunks(data_iter: Iterator, rows_per_chunk: int) -> Iterator[bytes]:
+    while rows := list(itertools.islice(data_iter, rows_per_chunk)):
+        buffer = StringIO()
+        csv.writer(buffer).writerows(rows)
+        yield buffer.getvalue().encode()
 
 
 def insert_copy(table, conn, keys, data_iter):
     """
-    Execute SQL statement inserting data.
+    Execute SQL statement inserting data, streaming it as csv to a COPY.
     Parameters
     ----------
     table : pandas.io.sql.SQLTable
@@ -501,20 +1158,18 @@ def insert_copy(table, conn, keys, data_iter):
     data_iter : Iterable that iterates the values to be inserted
     """
     dbapi_conn = conn.connection
-    with dbapi_conn.cursor() as cur:
-        s_buf = StringIO()
-        writer = csv.writer(s_buf)
-        writer.writerows(data_iter)
-        s_buf.seek(0)
-
-        columns = ", ".join('"{}"'.format(k) for k in keys)
-        if table.schema:
-            table_name = "{}.{}".format(table.schema, table.name)
-        else:
-            table_name = table.name
-
-        sql = "COPY {} ({}) FROM STDIN WITH CSV".format(table_name, columns)
-        cur.copy_expert(sql=sql, file=s_buf)
+    columns = ", ".join('"{}"'.format(k) for k in keys)
+    if table.schema:
+        table_name = "{}.{}".format(table.schema, table.name)
+    else:
+        table_name = table.name
+
+    sql = "COPY {} ({}) FROM STDIN WITH CSV".format(table_name, columns)
+    with (
+        dbapi_conn.cursor() as cur,
+        _CopyStream(_csv_chunks(iter(data_iter), COPY_CHUNK_ROWS)) as data,
+    ):
+        cur.copy_expert(sql=sql, file=data, size=COPY_READ_BYTES)
 
 
 app = typer.Typer(add_completion=False)
@@ -0,0 +1,157 @@
+"""Seekable, read-only files over range requests to remote objects.
+
+A `RangeReader` fetches only the bytes that are read, so e.g. pyarrow can read a
+parquet file's footer and then just the column chunks (of the row groups) it needs,
+and `ZipFile` the central directory and then just the members opened.
+
+Reads go through a `BlockCache` of fixed-size blocks, shared by readers of the same
+object. Missing blocks of a read are fetched in as few range requests as possible.
+"""
+
+import io
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+
+BLOCK_SIZE = 2**20
+CACHE_MAX_BYTES = 64 * 2**20
+
+# (start, end) -> the object's bytes from start (inclusive) to end (exclusive)
+RangeFetcher = Callable[[int, int], bytes]
+
+
+def _contiguous_runs(indices: list[int]) -> list[list[int]]:
+    runs: list[list[int]] = []
+    for i in indices:
+        if runs and runs[-1][-1] == i - 1:
+            runs[-1].append(i)
+        else:
+            runs.append([i])
+    return runs
+
+
+class BlockCache:
+    """Thread-safe read-through LRU cache of blocks of remote objects.
+
+    Objects are keyed by the caller, which should include a version of the object
+    (e.g. its ETag) in the key so that blocks of an overwritten object aren't served.
+    """
+
+    def __init__(self, block_size: int = BLOCK_SIZE, max_bytes: int = CACHE_MAX_BYTES):
+        self.block_size = block_size
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._blocks: OrderedDict[tuple[str, int], bytes] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def read(
+        self, key: str, object_size: int, fetch: RangeFetcher, start: int, end: int
+    ) -> bytes:
+        """Bytes start to end (exclusive) of the object, fetching the blocks they
+        span that aren't cached."""
+        first, last = start // self.block_size, (end - 1) // self.block_size
+        blocks: dict[int, bytes] = {}
+        with self._lock:
+            for i in range(first, last + 1):
+                block = self._blocks.get((key, i))
+                if block is not None:
+                    self._blocks.move_to_end((key, i))
+                    blocks[i] = block
+            self.hits += len(blocks)
+            self.misses += last - first + 1 - len(blocks)
+
+        missing = [i for i in range(first, last + 1) if i not in blocks]
+        for run in _contiguous_runs(missing):
+            data = fetch(
+                run[0] * self.block_size,
+                min((run[-1] + 1) * self.block_size, object_size),
+            )
+            for n, i in enumerate(run):
+                blocks[i] = data[n * self.block_size : (n + 1) * self.block_size]
+            self._add(key, {i: blocks[i] for i in run})
+
+        data = b"".join(blocks[i] for i in range(first, last + 1))
+        offset = first * self.block_size
+        return data[start - offset : end - offset]
+
+    def _add(self, key: str, blocks: dict[int, bytes]) -> None:
+        with self._lock:
+            for i, block in blocks.items():
+                if (key, i) not in self._blocks:
+                    self._size += len(block)
+                self._blocks[(key, i)] = block
+            while self._size > self.max_bytes and self._blocks:
+                _, evicted = self._blocks.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._blocks.clear()
+            self._size = 0
+            self.hits = self.misses = 0
+
+
+block_cache = BlockCache()
+
+
+class RangeReader(io.RawIOBase):
+    """Seekable, read-only file of a remote object of known size. Reading past the
+    end returns what's left, like a local file."""
+
+    def __init__(
+        self,
+        key: str,
+        size: int,
+        fetch: RangeFetcher,
+        cache: BlockCache | None = None,
+    ):
+        self.key = key
+        self.size = size
+        self._fetch = fetch
+        self._cache = cache or block_cache
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        match whence:
+            case io.SEEK_SET:
+                position = offset
+            case io.SEEK_CUR:
+                position = self._position + offset
+            case io.SEEK_END:
+                position = self.size + offset
+            case _:
+                raise ValueError(f"Invalid whence: {whence}")
+        if position < 0:
+            raise ValueError(f"Negative seek position {position}")
+        self._position = position
+        return position
+
+    def read(self, size: int | None = -1) -> bytes:
+        self._checkClosed()
+        end = self.size if size is None or size < 0 else self._position + size
+        end = min(end, self.size)
+        if self._position >= end:
+            return b""
+        data = self._cache.read(self.key, self.size, self._fetch, self._position, end)
+        self._position = end
+        return data
+
+    def readall(self) -> bytes:
+        return self.read()
+
+    def readinto(self, buffer) -> int:
+        view = memoryview(buffer).cast("B")
+        data = self.read(len(view))
+        view[: len(data)] = data
+        return len(data)
@@ -1,15 +1,26 @@
 import os
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from datetime import datetime
 from io import BytesIO
 from pathlib import Path
-from tempfile import TemporaryDirectory
 from typing import TYPE_CHECKING, Any, Literal, cast, get_args
 
 import boto3
 import pytz
 import typer
+from boto3.exceptions import (
+    RetriesExceededError,
+    S3TransferFailedError,
+    S3UploadFailedError,
+)
+from boto3.s3.transfer import TransferConfig
 from botocore.client import Config
-from botocore.exceptions import ClientError
+from botocore.exceptions import ClientError, HTTPClientError, IncompleteReadError
+from botocore.exceptions import ConnectionError as BotoConnectionError
 from botocore.response import StreamingBody
 from pyarrow import fs
 from pydantic import BaseModel
@@ -39,6 +50,37 @@ ACL = Literal[
     "public-read-write",
 ]
 MAX_FILE_COUNT = 150
+# Most keys a DeleteObjects request takes
+DELETE_BATCH_SIZE = 1000
+
+# Files moved at once by folder operations, and parts moved at once per file
+TRANSFER_WORKERS = 8
+TRANSFER_PARTS_PER_FILE = 4
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=32 * 2**20,
+    multipart_chunksize=32 * 2**20,
+    max_concurrency=TRANSFER_PARTS_PER_FILE,
+)
+# Attempts per file in folder operations, on top of botocore's retries of requests
+TRANSFER_ATTEMPTS = 3
+TRANSFER_RETRY_DELAY_SECONDS = 2.0
+# Only throttling, server and connection errors are retried: anything else, e.g.
+# AccessDenied or NoSuchKey, would just fail again
+_RETRYABLE_ERROR_CODES = {
+    "InternalError",
+    "RequestLimitExceeded",
+    "RequestTimeout",
+    "ServiceUnavailable",
+    "SlowDown",
+    "Throttling",
+    "ThrottlingException",
+    "TooManyRequestsException",
+}
+_RETRYABLE_CONNECTION_ERRORS = (
+    BotoConnectionError,
+    HTTPClientError,
+    IncompleteReadError,
+)
 
 
 class Metadata(BaseModel):
@@ -46,6 +88,7 @@ class Metadata(BaseModel):
     content_length: int
     content_type: str
     custom: dict[str, Any]
+    etag: str | None = None
 
 
 def generate_metadata() -> dict[str, str]:
@@ -94,7 +137,11 @@ def client() -> S3Client:
     aws_s3_endpoint = os.environ.get("AWS_S3_ENDPOINT")
     aws_access_key_id = os.environ["AWS_ACCESS_KEY_ID"]
     aws_secret_access_key = os.environ["AWS_SECRET_ACCESS_KEY"]
-    config = Config(read_timeout=120)
+    config = Config(
+        read_timeout=120,
+        # enough connections for every part of every file a folder operation moves
+        max_pool_connections=TRANSFER_WORKERS * TRANSFER_PARTS_PER_FILE,
+    )
     return boto3.client(
         "s3",
         aws_access_key_id=aws_access_key_id,
@@ -120,17 +167,31 @@ def get_bucket_region(bucket: str) -> str:
     return bucket_id.split("-")[-1]
 
 
-def list_objects(bucket: str, prefix: str) -> list[dict]:
-    """Lists all objects with given prefix within bucket"""
-    objects: list[dict] = []
+def iter_objects(bucket: str, prefix: str) -> Iterator[dict]:
+    """Lazily lists all objects with given prefix within bucket, a page (of up to
+    1000 objects) at a time"""
     try:
         paginator = client().get_paginator("list_objects_v2")
         for result in paginator.paginate(Bucket=bucket, Prefix=prefix):
-            objects = objects + cast(list[dict], result.get("Contents", []))
+            yield from cast(list[dict], result.get("Contents", []))
     except Exception as exc:
         logger.info(f"get_objects(bucket={bucket}, prefix={prefix}) failed. {str(exc)}")
         raise exc
-    return objects
+
+
+def list_objects(bucket: str, prefix: str) -> list[dict]:
+    """Lists all objects with given prefix within bucket"""
+    return list(iter_objects(bucket, prefix))
+
+
+def iter_common_prefixes(bucket: str, prefix: str) -> Iterator[str]:
+    """Lazily lists the 'folders' directly within a prefix, i.e. the distinct
+    prefixes of keys up to the next '/' after it. S3 groups keys by prefix
+    server-side, so the objects within them aren't listed."""
+    paginator = client().get_paginator("list_objects_v2")
+    for result in paginator.paginate(Bucket=bucket, Prefix=prefix, Delimiter="/"):
+        for common_prefix in result.get("CommonPrefixes", []):
+            yield common_prefix["Prefix"]
 
 
 def object_exists(bucket: str, key: str) -> bool:
@@ -160,6 +221,7 @@ def get_metadata(bucket: str, key: str) -> Metadata:
         content_length=response["ContentLength"],
         content_type=response["ContentType"],
         custom=response["Metadata"],
+        etag=response.get("ETag"),
     )
 
 
@@ -204,6 +266,7 @@ def download_file(
             Key=key,
             Filename=str(filepath),
             Callback=lambda bytes: progress.update(task, advance=bytes),
+            Config=TRANSFER_CONFIG,
         )
     return filepath
 
@@ -234,6 +297,7 @@ def upload_file(
             key,
             ExtraArgs=extra_args,
             Callback=lambda bytes: progress.update(task, advance=bytes),
+            Config=TRANSFER_CONFIG,
         )
 
 
@@ -259,44 +323,174 @@ def upload_file_obj(
             key,
             ExtraArgs=extra_args,
             Callback=lambda bytes: progress.update(task, advance=bytes),
+            Config=TRANSFER_CONFIG,
         )
 
 
-def copy_file(
+def _copy_object(
+    client_: S3Client,
     bucket: str,
     source_key: str,
+    target_bucket: str,
     target_key: str,
     acl: ACL,
-    *,
-    target_bucket: str | None = None,
-    metadata: dict[str, Any] | None = None,
+    metadata: dict[str, Any] | None,
+    callback: Callable[[int], None] | None = None,
 ) -> None:
-    """Copies a file from from one location in S3 to another"""
-    if target_bucket is None:
-        target_bucket = bucket
-    client_ = client()
-    existing_metadata = get_metadata(bucket, source_key).custom
+    """Server-side copy, in parts for large objects, keeping the object's custom
+    metadata (updated with metadata)."""
+    existing_metadata = client_.head_object(Bucket=bucket, Key=source_key)["Metadata"]
     if metadata is not None:
         existing_metadata.update(metadata)
-    client_.copy_object(
+    client_.copy(
         CopySource={"Bucket": bucket, "Key": source_key},
         Bucket=target_bucket,
         Key=target_key,
-        ACL=acl,
-        Metadata=existing_metadata,
-        MetadataDirective="REPLACE",
+        ExtraArgs={
+            "ACL": acl,
+            "Metadata": existing_metadata,
+            "MetadataDirective": "REPLACE",
+        },
+        Callback=callback,
+        Config=TRANSFER_CONFIG,
+    )
+
+
+def copy_file(
+    bucket: str,
+    source_key: str,
+    target_key: str,
+    acl: ACL,
+    *,
+    target_bucket: str | None = None,
+    metadata: dict[str, Any] | None = None,
+) -> None:
+    """Copies a file from from one location in S3 to another"""
+    _copy_object(
+        client(),
+        bucket,
+        source_key,
+        target_bucket or bucket,
+        target_key,
+        acl,
+        metadata,
     )
 
 
+@dataclass
+class TransferStats:
+    """What a folder operation moved, and how long it took."""
+
+    files: int = 0
+    bytes: int = 0
+    retries: int = 0
+    seconds: float = 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.files} file(s), {self.bytes / 2**20:,.1f} MB in "
+            f"{self.seconds:,.1f}s ({self.bytes_per_second / 2**20:,.1f} MB/s), "
+            f"{self.retries} retried"
+        )
+
+
+@dataclass
+class _Transfer:
+    name: str
+    size: int
+    # moves the file, reporting bytes moved to the callback it's given
+    run: Callable[[Callable[[int], None]], None]
+
+
+def _is_retryable(e: BaseException) -> bool:
+    """Whether a failed transfer might succeed if tried again."""
+    match e:
+        case ClientError():
+            status = e.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0)
+            code = e.response.get("Error", {}).get("Code")
+            return code in _RETRYABLE_ERROR_CODES or status == 429 or status >= 500
+        case RetriesExceededError():
+            # downloads whose own retries of dropped connections ran out
+            last_exception = getattr(e, "last_exception", None)
+            return last_exception is not None and _is_retryable(last_exception)
+        case S3TransferFailedError() | S3UploadFailedError():
+            # boto3 raises these while handling the error that caused them
+            cause = e.__cause__ or e.__context__
+            return cause is not None and _is_retryable(cause)
+        case _:
+            return isinstance(e, _RETRYABLE_CONNECTION_ERRORS)
+
+
+def _run_transfers(
+    description: str, transfers: list[_Transfer], *, max_workers: int
+) -> TransferStats:
+    """Runs transfers on a pool of max_workers threads, with one progress bar for
+    all of them. A file that fails with a throttling, server or connection error is
+    retried (from scratch) up to TRANSFER_ATTEMPTS times; the first file to fail for
+    good cancels the rest."""
+    stats = TransferStats()
+    stats_lock = threading.Lock()
+    start = time.perf_counter()
+    with _progress() as progress:
+        task = progress.add_task(
+            f"[green]{description}", total=sum(t.size for t in transfers)
+        )
+
+        def run(transfer: _Transfer) -> None:
+            for attempt in range(1, TRANSFER_ATTEMPTS + 1):
+                moved = 0
+
+                def callback(bytes: int) -> None:
+                    nonlocal moved
+                    moved += bytes
+                    progress.update(task, advance=bytes)
+
+                try:
+                    transfer.run(callback)
+                    break
+                except Exception as e:
+                    progress.update(task, advance=-moved)
+                    if attempt == TRANSFER_ATTEMPTS or not _is_retryable(e):
+                        raise
+                    logger.warning(
+                        f"Retrying {transfer.name} "
+                        f"(attempt {attempt + 1} of {TRANSFER_ATTEMPTS}): {e}"
+                    )
+                    with stats_lock:
+                        stats.retries += 1
+                    time.sleep(TRANSFER_RETRY_DELAY_SECONDS * attempt)
+            with stats_lock:
+                stats.files += 1
+                stats.bytes += transfer.size
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(run, transfer) for transfer in transfers]
+            try:
+                for future in as_completed(futures):
+                    future.result()
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+    stats.seconds = time.perf_counter() - start
+    logger.info(f"{description}: {stats.summary()}")
+    return stats
+
+
 def download_folder(
     bucket: str,
     prefix: str,
     export_path: Path,
     *,
     include_prefix_in_export: bool = True,
+    max_workers: int = TRANSFER_WORKERS,
 ) -> list[dict]:
     """
-    Download contents of folder from s3 recursively.
+    Download contents of folder from s3 recursively, max_workers files at a time.
     Returns list of objects downloaded.
     """
     prefix = _folderize(prefix)
@@ -306,12 +500,29 @@ def download_folder(
         raise Exception(
             f"Empty listing returned for {bucket}/{prefix}. This might indicate that the path doesn't exist."
         )
+    client_ = client()
+
+    def download(source_key: str, filepath: Path) -> Callable:
+        return lambda callback: client_.download_file(
+            Bucket=bucket,
+            Key=source_key,
+            Filename=str(filepath),
+            Callback=callback,
+            Config=TRANSFER_CONFIG,
+        )
+
+    transfers = []
     for obj in objs:
         key = obj["Key"] if include_prefix_in_export else obj["Key"].replace(prefix, "")
         if key and (key != prefix) and (key[-1] != "/"):
             key_directory = Path(key).parent
             (export_path / key_directory).mkdir(parents=True, exist_ok=True)
-            download_file(bucket, obj["Key"], export_path / key)
+            transfers.append(
+                _Transfer(
+                    obj["Key"], obj["Size"], download(obj["Key"], export_path / key)
+                )
+            )
+    _run_transfers(f"Downloading {bucket}/{prefix}", transfers, max_workers=max_workers)
     return objs
 
 
@@ -325,8 +536,10 @@ def upload_folder(
     contents_only: bool = False,
     metadata: dict[str, Any] | None = None,
     keep_existing: bool = False,
-) -> None:
-    """Given bucket, local folder path, and upload path, uploads contents of folder to s3 recursively"""
+    max_workers: int = TRANSFER_WORKERS,
+) -> TransferStats:
+    """Given bucket, local folder path, and upload path, uploads contents of folder to
+    s3 recursively, max_workers files at a time"""
     if not local_folder_path.exists() or (not local_folder_path.is_dir()):
         raise NotADirectoryError(f"'{local_folder_path}' is not a folder.")
     files = [object for object in local_folder_path.rglob("*") if object.is_file()]
@@ -342,6 +555,23 @@ def upload_folder(
         delete(bucket, _folderize(str(upload_path)))
 
     logger.info(f"Uploading {local_folder_path} to {upload_path} in bucket {bucket}")
+    client_ = client()
+    extra_args: dict[Any, Any] = {
+        "ACL": acl,
+        "Metadata": {**(metadata or {}), **generate_metadata()},
+    }
+
+    def upload(file: Path, key: str) -> Callable:
+        return lambda callback: client_.upload_file(
+            str(file),
+            bucket,
+            key,
+            ExtraArgs=extra_args,
+            Callback=callback,
+            Config=TRANSFER_CONFIG,
+        )
+
+    transfers = []
     for file in files:
         relative_filepath = file.relative_to(local_folder_path)
         key = (
@@ -349,25 +579,62 @@ def upload_folder(
             if contents_only
             else upload_path / local_folder_path.name / relative_filepath
         )
-        upload_file(bucket, file, str(key), acl=acl, metadata=metadata)
+        transfers.append(
+            _Transfer(str(file), file.stat().st_size, upload(file, str(key)))
+        )
+    return _run_transfers(
+        f"Uploading {local_folder_path}", transfers, max_workers=max_workers
+    )
 
 
 def copy_folder_via_download(
-    source_bucket: str, target_bucket: str, source_path: str, target_path: str, acl: ACL
-) -> None:
-    """If cross-bucket copying is not possible, this utility downloads and then uploads a folder"""
-    with TemporaryDirectory() as _dir:
-        dir = Path(_dir)
-        logger.info(f"Copying {source_bucket}/{source_path} to temporary directory")
-        download_folder(source_bucket, prefix=source_path, export_path=dir)
-        logger.info(f"Copying temporary directory to {target_bucket}/{source_path}")
-        upload_folder(
-            target_bucket,
-            dir / source_path,
-            Path(target_path),
-            acl,
-            contents_only=True,
+    source_bucket: str,
+    target_bucket: str,
+    source_path: str,
+    target_path: str,
+    acl: ACL,
+    *,
+    metadata: dict[str, Any] | None = None,
+    max_workers: int = TRANSFER_WORKERS,
+) -> TransferStats:
+    """If cross-bucket copying is not possible (i.e. across regions), this utility
+    copies a folder by streaming each object down from its source and back up to its
+    target, max_workers objects at a time. Nothing is staged on disk."""
+    source_path = _folderize(source_path)
+    target_path = _folderize(target_path)
+    client_ = client()
+
+    def stream(source_key: str, target_key: str) -> Callable:
+        def run(callback: Callable[[int], None]) -> None:
+            source = client_.get_object(Bucket=source_bucket, Key=source_key)
+            client_.upload_fileobj(
+                source["Body"],
+                target_bucket,
+                target_key,
+                ExtraArgs={
+                    "ACL": acl,
+                    "Metadata": {**source["Metadata"], **(metadata or {})},
+                },
+                Callback=callback,
+                Config=TRANSFER_CONFIG,
+            )
+
+        return run
+
+    transfers = [
+        _Transfer(
+            obj["Key"],
+            obj["Size"],
+            stream(obj["Key"], target_path + obj["Key"].removeprefix(source_path)),
         )
+        for obj in iter_objects(source_bucket, source_path)
+        if obj["Key"] != source_path and not obj["Key"].endswith("/")
+    ]
+    return _run_transfers(
+        f"Copying {source_bucket}/{source_path} to {target_bucket}/{target_path}",
+        transfers,
+        max_workers=max_workers,
+    )
 
 
 def copy_folder(
@@ -380,8 +647,10 @@ def copy_folder(
     metadata: dict[str, Any] | None = None,
     target_bucket: str | None = None,
     keep_existing: bool = False,
-) -> None:
-    """Given bucket, prefix filter, and export path, download contents of folder from s3 recursively"""
+    max_workers: int = TRANSFER_WORKERS,
+) -> TransferStats:
+    """Copies the contents of a folder in s3 to another folder, max_workers files at
+    a time. Copies are server-side, unless the target bucket is in another region."""
     source_path = _folderize(source_path)
     target_path = _folderize(target_path)
 
@@ -398,47 +667,92 @@ def copy_folder(
         delete(target_bucket_, target_path)
 
     if target_bucket and get_bucket_region(bucket) != get_bucket_region(target_bucket):
-        if get_bucket_region(bucket) != get_bucket_region(target_bucket):
-            copy_folder_via_download(
-                bucket, target_bucket, source_path, target_path, acl
+        return copy_folder_via_download(
+            bucket,
+            target_bucket,
+            source_path,
+            target_path,
+            acl,
+            metadata=metadata,
+            max_workers=max_workers,
+        )
+
+    logger.info(f"Copying {bucket}/{source_path} to {target_bucket_}/{target_path}")
+    client_ = client()
+
+    def copy(source_key: str, target_key: str) -> Callable:
+        return lambda callback: _copy_object(
+            client_,
+            bucket,
+            source_key,
+            target_bucket_,
+            target_key,
+            acl,
+            metadata,
+            callback,
+        )
+
+    transfers = []
+    for obj in objects:
+        key = obj["Key"].replace(source_path, "")
+        if key and (key[-1] != "/"):
+            transfers.append(
+                _Transfer(obj["Key"], obj["Size"], copy(obj["Key"], target_path + key))
             )
-            return
-    else:
-        target_bucket = target_bucket or bucket
-
-        logger.info(f"Copying {bucket}/{source_path} to {target_bucket}/{target_path}")
-        for obj in objects:
-            key = obj["Key"].replace(source_path, "")
-            print(key)
-            print(target_path)
-            if key and (key[-1] != "/"):
-                copy_file(
-                    bucket,
-                    obj["Key"],
-                    f"{target_path}{key}",
-                    acl,
-                    metadata=metadata,
-                    target_bucket=target_bucket,
-                )
+    return _run_transfers(
+        f"Copying {bucket}/{source_path} to {target_bucket_}/{target_path}",
+        transfers,
+        max_workers=max_workers,
+    )
+
+
+def delete_objects(bucket: str, keys: Iterable[str]) -> int:
+    """Deletes objects in batches of DELETE_BATCH_SIZE keys, a request per batch.
+    Returns the number of keys deleted."""
+    client_ = client()
+    deleted = 0
+
+    def delete_batch(batch: list[str]) -> None:
+        response = client_.delete_objects(
+            Bucket=bucket,
+            Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+        )
+        if errors := response.get("Errors"):
+            raise Exception(
+                f"Failed to delete {len(errors)} object(s) from bucket {bucket}, "
+                f"e.g. {errors[0].get('Key')}: {errors[0].get('Message')}"
+            )
+
+    batch: list[str] = []
+    for key in keys:
+        batch.append(key)
+        if len(batch) == DELETE_BATCH_SIZE:
+            delete_batch(batch)
+            deleted += len(batch)
+            batch = []
+    if batch:
+        delete_batch(batch)
+        deleted += len(batch)
+    return deleted
 
 
 def delete(bucket: str, path: str) -> None:
     """Deletes from s3 given path and bucket
     if slash is final character of path, assumed to be folder
     otherwise, assumed to be file"""
-    client_ = client()
     if path[-1] == "/":
-        for object in list_objects(bucket, path):
-            print(object["Key"])
-            client_.delete_object(Bucket=bucket, Key=object["Key"])
-    client_.delete_object(Bucket=bucket, Key=path)
+        keys = {obj["Key"] for obj in iter_objects(bucket, path)} | {path}
+        deleted = delete_objects(bucket, keys)
+        logger.info(f"Deleted {deleted} object(s) in {bucket}/{path}")
+    else:
+        client().delete_object(Bucket=bucket, Key=path)
 
 
 def get_suffixes(bucket: str, prefix: str) -> set[str]:
     """Gets all suffixes of objects in bucket given a prefix"""
     return {
         obj["Key"].removeprefix(prefix)
-        for obj in list_objects(bucket, prefix)
+        for obj in iter_objects(bucket, prefix)
         if obj["Key"].removeprefix(prefix) != ""
     }
 
@@ -474,30 +788,22 @@ def get_subfolders(bucket: str, prefix: str, index=1) -> list[str]:
     ['folder1/folder2']
     """
     prefix = _folderize(prefix)
-    prefix_path = Path(prefix)
-    subfolders: set[str] = set()
+    # folders one level deeper at each step, listed with a delimiter so that S3 only
+    # returns folders rather than every object within them
+    folders = [prefix]
 
     try:
-        all_objects = list_objects(bucket=bucket, prefix=prefix)
-        for obj in all_objects:
-            obj_path = Path(obj["Key"])
-
-            # Determine the directory path (if object is a file, get parent directory)
-            dir_path = obj_path if obj["Key"].endswith("/") else obj_path.parent
-
-            # Get relative parts of the directory path after the prefix
-            relative_parts = dir_path.relative_to(prefix_path).parts
-
-            # Add the directory path up to the specified folder depth to the subfolders set
-            if len(relative_parts) >= index:
-                partial_path = Path(*relative_parts[:index])
-                subfolders.add(str(partial_path))
-
+        for _ in range(index):
+            folders = [
+                subfolder
+                for folder in folders
+                for subfolder in iter_common_prefixes(bucket, folder)
+            ]
     except Exception as exc:
         print(f"get_subfolders(bucket={bucket}, prefix={prefix}, index={index}) failed")
         raise exc
 
-    return sorted(list(subfolders))
+    return sorted(folder.removeprefix(prefix).rstrip("/") for folder in folders)
 
 
 def get_file_as_stream(bucket: str, path: str) -> BytesIO: